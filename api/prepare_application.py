@@ -5,12 +5,15 @@ Comprehensive Application Preparation API
 import os
 import re
 import json
+import time
 import requests
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, field
 
+from utils.metrics import observe_ai
+
 
 # Ensure ANTHROPIC_API_KEY is loaded from .env
 _env_file = Path(__file__).parent.parent / ".env"
@@ -94,18 +97,26 @@ def call_claude_api(prompt: str, max_tokens: int = 2000) -> Optional[str]:
     if not api_key:
         print("[PrepareApp] No ANTHROPIC_API_KEY")
         return None
+    model = "claude-sonnet-4-20250514"
+    started = time.perf_counter()
     try:
         resp = requests.post(
             "https://api.anthropic.com/v1/messages",
             headers={"x-api-key": api_key, "anthropic-version": "2023-06-01", "content-type": "application/json"},
-            json={"model": "claude-sonnet-4-20250514", "max_tokens": max_tokens, "messages": [{"role": "user", "content": prompt}]},
+            json={"model": model, "max_tokens": max_tokens, "messages": [{"role": "user", "content": prompt}]},
             timeout=60
         )
         if resp.status_code != 200:
+            observe_ai("claude", model, time.perf_counter() - started, ok=False)
             print(f"[PrepareApp] API error: {resp.status_code}")
             return None
-        return resp.json().get("content", [{}])[0].get("text", "")
+        data = resp.json()
+        usage = data.get("usage") or {}
+        observe_ai("claude", model, time.perf_counter() - started,
+                   input_tokens=usage.get("input_tokens", 0), output_tokens=usage.get("output_tokens", 0))
+        return data.get("content", [{}])[0].get("text", "")
     except Exception as e:
+        observe_ai("claude", model, time.perf_counter() - started, ok=False)
         print(f"[PrepareApp] Exception: {e}")
         return None
 
@@ -259,8 +270,32 @@ ANALYSIS RULES:
 """
 
 
-def analyze_job_with_ai(job_title: str, company: str, jd: str, role_family: str) -> Dict:
-    """Analyze job match using RAG - loads actual CV for comparison"""
+# Extra schema appended to the match prompt so one call also yields the JD summary
+# (same fields as parsers.jd_parser.analyze_jd_with_ai).
+JD_SUMMARY_SCHEMA = """,
+  "jd_summary": {
+    "keywords": ["5-10 key skills/technologies mentioned"],
+    "requirements": ["3-7 must-have requirements"],
+    "nice_to_have": ["2-5 nice-to-have qualifications"],
+    "responsibilities": ["3-5 main responsibilities"],
+    "tech_stack": ["specific technologies, tools, platforms mentioned"],
+    "years_experience": "extracted years requirement or null",
+    "role_level": "junior/mid/senior/lead/director/vp",
+    "domain": "industry domain (fintech, security, healthcare, etc)",
+    "remote_friendly": true/false/null,
+    "summary": "2-3 sentence summary of the role"
+  }"""
+
+
+def analyze_job_with_ai(job_title: str, company: str, jd: str, role_family: str,
+                        include_jd_summary: bool = False, call_fn=None) -> Dict:
+    """
+    Analyze job match using RAG - loads actual CV for comparison.
+
+    include_jd_summary: also extract the structured JD summary in the same call
+        (saves the separate analyze_jd_with_ai request in batch scoring).
+    call_fn: override for call_claude_api(prompt, max_tokens), e.g. AIBatchExecutor.call
+    """
     
     # Try to load actual CV for this role type (pass job_title for better detection)
     cv_path, cv_text = get_cv_for_role(role_family, job_title)
@@ -281,6 +316,8 @@ ADDITIONAL CONTEXT:
         candidate_info = CANDIDATE_PROFILE
         print(f"[PrepareApp] Using static profile (CV not found or too short)")
     
+    jd_summary_schema = JD_SUMMARY_SCHEMA if include_jd_summary else ""
+
     prompt = f"""{candidate_info}
 
 === JOB TO ANALYZE ===
@@ -355,10 +392,11 @@ Return ONLY valid JSON:
   "cv_decision": "<base|optimize>",
   "cv_reason": "<why>",
   "keywords_to_add": ["<relevant keywords from JD>"],
-  "cover_letter_focus": ["<key points to emphasize>"]
+  "cover_letter_focus": ["<key points to emphasize>"]{jd_summary_schema}
 }}"""
 
-    response = call_claude_api(prompt, 1500)
+    call_fn = call_fn or call_claude_api
+    response = call_fn(prompt, 2200 if include_jd_summary else 1500)
     if not response:
         return {"error": "AI failed"}
     try:
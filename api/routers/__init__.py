@@ -0,0 +1,115 @@
+"""
+Lazy API routers
+
+main.py registers only the core endpoints (daemon, companies, cache, stats,
+onboarding, analysis). Endpoint groups live in api/routers/<name>.py as
+APIRouter modules and are imported + included on the first request under one
+of their path prefixes, so importing main (uvicorn startup, tests) does not
+build ~100 routes and their pydantic models up front.
+
+- ROUTERS: name → path prefixes
+- LazyRouterMiddleware: pure ASGI, loads the matching router before routing;
+  /openapi.json, /docs, /redoc load everything
+- warmup(): load all routers and their WARMUP_IMPORTS (bs4, docx, anthropic…)
+  in the background — main does it on startup with ROUTERS_WARMUP=1
+
+Router modules import shared helpers from main; that is safe because they are
+only imported after main has finished loading.
+"""
+
+import importlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+ROUTERS: Dict[str, Tuple[str, ...]] = {
+    "jobs": ("/jobs",),
+    "pipeline": ("/pipeline/", "/jd/", "/job/"),
+    "discovery": ("/discovery/",),
+    "apply": ("/apply", "/chrome/"),
+    "cv": ("/cv/",),
+    "knowledge_base": ("/api/v5/", "/answers"),
+}
+
+LOAD_ALL_PATHS = ("/openapi.json", "/docs", "/redoc")
+
+
+class LazyRouters:
+    def __init__(self, app, routers: Dict[str, Tuple[str, ...]] = ROUTERS, package: str = __name__):
+        self.app = app
+        self.routers = dict(routers)
+        self.package = package
+        self.loaded: Dict[str, float] = {}  # name → load time, ms
+        self.warmed: Dict[str, str] = {}    # module → "ok" / error
+        self._lock = threading.Lock()
+
+    def match(self, path: str) -> Optional[str]:
+        for name, prefixes in self.routers.items():
+            if any(path.startswith(p) for p in prefixes):
+                return name
+        return None
+
+    def load(self, name: str) -> bool:
+        """Import and include router `name` once; True if it was loaded by this call."""
+        if name in self.loaded:
+            return False
+        with self._lock:
+            if name in self.loaded:
+                return False
+            t0 = time.perf_counter()
+            module = importlib.import_module(f"{self.package}.{name}")
+            self.app.include_router(module.router)
+            self.app.openapi_schema = None  # пересобрать схему с новыми routes
+            self.loaded[name] = round((time.perf_counter() - t0) * 1000, 1)
+        print(f"[Routers] 📦 {name} loaded in {self.loaded[name]}ms")
+        return True
+
+    def load_for_path(self, path: str):
+        if path in LOAD_ALL_PATHS:
+            self.load_all()
+            return
+        name = self.match(path)
+        if name:
+            self.load(name)
+
+    def load_all(self):
+        for name in self.routers:
+            self.load(name)
+
+    def warmup(self):
+        """Load every router and pre-import the heavy modules its handlers use."""
+        t0 = time.perf_counter()
+        self.load_all()
+        for name in self.routers:
+            module = importlib.import_module(f"{self.package}.{name}")
+            for dep in getattr(module, "WARMUP_IMPORTS", ()):
+                if dep in self.warmed:
+                    continue
+                try:
+                    importlib.import_module(dep)
+                    self.warmed[dep] = "ok"
+                except Exception as e:  # noqa: BLE001 — optional deps (playwright…) may be missing
+                    self.warmed[dep] = f"{type(e).__name__}: {e}"
+        failed = [m for m, status in self.warmed.items() if status != "ok"]
+        print(f"[Routers] 🔥 Warm-up done in {(time.perf_counter() - t0) * 1000:.0f}ms"
+              + (f" (skipped: {', '.join(failed)})" if failed else ""))
+
+    def info(self) -> dict:
+        return {
+            "loaded": dict(self.loaded),
+            "pending": [n for n in self.routers if n not in self.loaded],
+            "warmed": dict(self.warmed),
+        }
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware: make sure the router for this path is included before routing."""
+
+    def __init__(self, app, routers: LazyRouters):
+        self.app = app
+        self.routers = routers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            self.routers.load_for_path(scope.get("path", ""))
+        await self.app(scope, receive, send)
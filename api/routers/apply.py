@@ -0,0 +1,480 @@
+"""
+Apply router: /apply/* form-filler endpoints (Greenhouse V3.5, Vision, warm
+V5/V6/V7 workers), /apply-log, /chrome/*.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+# Лениво грузится после main → общие хелперы берём оттуда
+from main import AI_PROJECTS_PATH, ICLOUD_PATH
+
+router = APIRouter(tags=["apply"])
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+# Тяжёлые зависимости handler-ов, импортируются заранее при ROUTERS_WARMUP=1
+WARMUP_IMPORTS = ("utils.llm_stream", "browser.apply_worker")
+
+
+# ============= APPLY AUTOMATION ENDPOINTS =============
+
+class ApplyRequest(BaseModel):
+    job_url: str
+    profile: str = "anton_tpm"
+
+
+@router.post("/apply/greenhouse")
+def apply_greenhouse_endpoint(payload: ApplyRequest):
+    """
+    Open Greenhouse job application and auto-fill form using SmartFillerV35.
+    """
+    import subprocess
+    import sys
+    
+    job_url = payload.job_url
+    profile_name = payload.profile
+    
+    if "greenhouse" not in job_url.lower() and "gh_jid" not in job_url.lower():
+        return {"ok": False, "error": "Only Greenhouse URLs supported"}
+    
+    profile_path = Path(f"browser/profiles/{profile_name}.json")
+    if not profile_path.exists():
+        return {"ok": False, "error": f"Profile '{profile_name}' not found"}
+    
+    # Use absolute path 
+    cwd = str(PROJECT_ROOT)
+    
+    # Write script to file to avoid shell escaping issues
+    script_file = "/tmp/greenhouse_apply_script.py"
+    with open(script_file, "w") as f:
+        f.write(f'''
+import sys
+sys.path.insert(0, '{cwd}')
+import os
+os.chdir('{cwd}')
+
+from browser.smart_filler_v35 import SmartFillerV35
+import re
+
+job_url = "{job_url}"
+
+# Convert company career page URL to direct Greenhouse form URL
+if 'gh_jid=' in job_url and 'job-boards.greenhouse.io' not in job_url:
+    match = re.search(r'gh_jid=(\\d+)', job_url)
+    if match:
+        gh_jid = match.group(1)
+        company_match = re.search(r'https?://(?:www\\.)?([^/]+)\\.com', job_url)
+        company = company_match.group(1) if company_match else 'company'
+        job_url = "https://job-boards.greenhouse.io/embed/job_app?token=" + gh_jid + "&for=" + company + "&gh_jid=" + gh_jid
+        print("Converted to direct Greenhouse URL: " + job_url)
+
+try:
+    filler = SmartFillerV35(headless=False)
+    filler.run(job_url, interactive=False)
+    
+    print("\\n" + "="*60)
+    print("Browser will stay open for 60 seconds for review...")
+    print("="*60)
+    
+    import time
+    time.sleep(60)
+except KeyboardInterrupt:
+    pass
+except Exception as e:
+    print(f"Error: {{e}}")
+    import traceback
+    traceback.print_exc()
+    import time
+    time.sleep(10)
+finally:
+    if 'filler' in dir() and filler:
+        filler.stop()
+    print("Browser closed")
+''')
+    
+    # Run script in background
+    log_file = "/tmp/apply_greenhouse.log"
+    with open(log_file, "w") as log:
+        log.write(f"Starting apply for: {job_url}\n")
+        log.write(f"Profile: {profile_name}\n")
+        log.write("="*60 + "\n")
+    
+    # Start subprocess
+    process = subprocess.Popen(
+        [sys.executable, script_file],
+        stdout=open(log_file, "a"),
+        stderr=subprocess.STDOUT,
+        cwd=cwd
+    )
+    
+    return {
+        "ok": True,
+        "message": "Application form opened with SmartFiller V3.5",
+        "pid": process.pid,
+        "log_file": log_file
+    }
+
+
+@router.get("/apply-log")
+def get_apply_log():
+    """
+    Get the latest apply log content.
+    """
+    log_path = Path("/tmp/greenhouse_apply.log")
+    if not log_path.exists():
+        return {"ok": False, "log": "No log file found"}
+    
+    try:
+        with open(log_path, "r") as f:
+            content = f.read()
+        return {"ok": True, "log": content}
+    except Exception as e:
+        return {"ok": False, "log": f"Error reading log: {e}"}
+
+
+@router.post("/apply/vision")
+def apply_with_vision(payload: ApplyRequest):
+    """
+    Apply to job using Vision AI Agent.
+    AI looks at screenshots and fills form like a human.
+    """
+    import subprocess
+    import sys
+    
+    job_url = payload.job_url
+    profile_name = payload.profile
+    
+    profile_path = Path(f"browser/profiles/{profile_name}.json")
+    if not profile_path.exists():
+        return {"ok": False, "error": f"Profile '{profile_name}' not found"}
+    
+    # Load profile data
+    with open(profile_path) as f:
+        profile_data = json.load(f)
+    
+    cwd = str(PROJECT_ROOT)
+    if "Mobile Documents" in cwd:
+        cwd = cwd.replace(
+            str(AI_PROJECTS_PATH),
+            str(ICLOUD_PATH)
+        )
+    
+    script = f'''import sys
+sys.path.insert(0, '{cwd}')
+import os
+os.chdir('{cwd}')
+
+from browser.client import BrowserClient
+from browser.vision_agent import VisionFormAgent
+import json
+import time
+
+# Load profile from file
+with open("browser/profiles/{profile_name}.json") as f:
+    profile = json.load(f)
+
+# Start browser
+browser = BrowserClient()
+browser.start()
+
+try:
+    # Open job page
+    browser.open_job_page("{job_url}")
+    time.sleep(3)
+    
+    # Start Vision Agent
+    agent = VisionFormAgent(browser.page, profile)
+    result = agent.fill_form()
+    
+    print("\\n" + "="*50)
+    print(f"Result: {{result}}")
+    print("="*50)
+    
+    # Keep open for review
+    print("\\nBrowser stays open for 60 seconds...")
+    time.sleep(60)
+    
+except Exception as e:
+    print(f"Error: {{e}}")
+    import traceback
+    traceback.print_exc()
+    time.sleep(10)
+finally:
+    browser.close()
+'''
+    
+    # Write and execute script
+    script_file = "/tmp/vision_apply_script.py"
+    log_file = "/tmp/vision_apply.log"
+    
+    with open(script_file, "w") as f:
+        f.write(script)
+    
+    # Run in background
+    subprocess.Popen(
+        [sys.executable, script_file],
+        stdout=open(log_file, "w"),
+        stderr=subprocess.STDOUT,
+        start_new_session=True
+    )
+    
+    return {
+        "ok": True,
+        "message": f"Vision AI Agent started for {job_url}",
+        "log_file": log_file,
+        "screenshots_dir": "/tmp/vision_agent"
+    }
+
+
+# ============= WARM APPLY WORKERS (V5 / V6 / V7) =============
+# Apply jobs run in browser/apply_worker.py threads that keep Playwright,
+# the CDP connection and the v5 DBs loaded between requests.
+
+
+def _apply_job_response(job, message: str) -> dict:
+    pool_status = _apply_pool().status()
+    return {
+        "ok": True,
+        "message": message,
+        "job_id": job.id,
+        "position": pool_status["queued"],
+        "stream_url": f"/apply/jobs/{job.id}/stream",
+        "log_url": f"/apply/jobs/{job.id}",
+        "job_url": job.job_url,
+    }
+
+
+def _apply_pool():
+    from browser.apply_worker import get_pool
+    return get_pool()
+
+
+def _submit_apply(engine: str, payload: ApplyRequest) -> dict:
+    """Start automation Chrome (debug port) and enqueue the job for a warm worker."""
+    try:
+        from browser.start_chrome_debug import start_chrome_debug
+        result = start_chrome_debug()
+        if not result["ok"]:
+            return {"ok": False, "error": result.get("message", "Failed to start Chrome")}
+    except Exception as e:
+        return {"ok": False, "error": f"Chrome start error: {e}"}
+
+    job = _apply_pool().submit(engine, payload.job_url, payload.profile)
+    print(f"[Apply] {engine} job {job.id} queued: {payload.job_url}")
+    return _apply_job_response(job, f"{engine.upper()} Form Filler job queued")
+
+
+def _latest_apply_log(engine: str) -> dict:
+    job = _apply_pool().latest(engine)
+    if not job:
+        return {"ok": False, "log": "No log file"}
+    return {"ok": True, "log": "\n".join(job.log), "job_id": job.id, "status": job.status}
+
+
+# ============= V5 FORM FILLER ENDPOINT =============
+
+@router.post("/apply/v5")
+def apply_v5_endpoint(payload: ApplyRequest):
+    """
+    Apply to job using V5 Form Filler with Claude AI.
+    Auto-starts Chrome with debug port if not running.
+    Runs in a warm worker (AUTONOMOUS mode), output via /apply/jobs/{id}/stream.
+    """
+    # Check profile exists
+    profile_path = Path(f"browser/profiles/{payload.profile}.json")
+    if not profile_path.exists():
+        return {"ok": False, "error": f"Profile '{payload.profile}' not found"}
+
+    return _submit_apply("v5", payload)
+
+
+@router.get("/apply/v5/log")
+def get_v5_log():
+    """Get log of the latest V5 apply job + fill timing summary by ATS (telemetry rollup)."""
+    result = _latest_apply_log("v5")
+    try:
+        from browser.v5.telemetry import summarize
+        result["summary"] = summarize()
+    except Exception as e:
+        result["summary_error"] = str(e)
+    return result
+
+
+# ============= V6 FORM FILLER ENDPOINT =============
+
+@router.post("/apply/v6")
+def apply_v6_endpoint(payload: ApplyRequest):
+    """
+    Apply to job using V6 Form Filler with Claude AI.
+    Simpler engine, focused on Greenhouse forms.
+    """
+    return _submit_apply("v6", payload)
+
+
+@router.get("/apply/v6/log")
+def get_v6_log():
+    """Get log of the latest V6 apply job."""
+    return _latest_apply_log("v6")
+
+
+# ============= V7 AGENT FORM FILLER ENDPOINT =============
+
+@router.post("/apply/v7")
+def apply_v7(payload: ApplyRequest):
+    """
+    V7 Agent Form Filler - Uses Claude Vision to fill forms like a human.
+    """
+    return _submit_apply("v7", payload)
+
+
+# ============= APPLY JOBS =============
+
+@router.get("/apply/jobs")
+def list_apply_jobs():
+    """Queued / running / finished apply jobs + worker pool status."""
+    pool = _apply_pool()
+    return {"ok": True, "pool": pool.status(), "jobs": pool.list_jobs()}
+
+
+@router.get("/apply/jobs/{job_id}")
+def get_apply_job(job_id: str):
+    """Apply job status, result and full log."""
+    job = _apply_pool().get(job_id)
+    if not job:
+        return {"ok": False, "error": "Job not found"}
+    return {"ok": True, **job.to_dict(with_log=True)}
+
+
+@router.get("/apply/jobs/{job_id}/stream")
+def stream_apply_job(job_id: str):
+    """SSE: log lines of an apply job as they are printed, then final status."""
+    from utils.llm_stream import sse, sse_response
+    job = _apply_pool().get(job_id)
+    if not job:
+        return sse_response(iter([sse("error", error="Job not found")]))
+
+    def events():
+        yield sse("start", job_id=job.id, engine=job.engine, job_url=job.job_url)
+        for kind, line in job.follow():
+            if kind == "line":
+                yield sse("log", text=line)
+            elif kind == "ping":
+                yield ": ping\n\n"
+        if job.status == "error":
+            yield sse("error", error=job.error, job=job.to_dict())
+        else:
+            yield sse("done", result=job.result, job=job.to_dict())
+    return sse_response(events())
+
+
+@router.get("/chrome/status")
+def chrome_debug_status():
+    """Check if Chrome is running with debug port."""
+    import socket
+    
+    def check_port(port):
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.settimeout(1)
+                return s.connect_ex(('localhost', port)) == 0
+        except:
+            return False
+    
+    running = check_port(9222)
+    return {
+        "running": running,
+        "port": 9222,
+        "message": "Chrome debug ready" if running else "Chrome not running on debug port"
+    }
+
+
+@router.post("/chrome/start")
+def start_chrome_debug_endpoint():
+    """Start Chrome with debug port."""
+    import subprocess
+    import sys
+    
+    cwd = PROJECT_ROOT
+    
+    try:
+        result = subprocess.run(
+            [sys.executable, str(cwd / "browser/start_chrome_debug.py")],
+            capture_output=True,
+            text=True,
+            timeout=15
+        )
+        
+        if "✅" in result.stdout:
+            return {"ok": True, "message": result.stdout.strip()}
+        else:
+            return {"ok": False, "error": result.stdout.strip()}
+            
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Vision-based Form Filler
+# ─────────────────────────────────────────────────────────────────────
+
+@router.post("/apply/vision")
+async def apply_vision(payload: dict):
+    """
+    Fill job application using Claude Vision API.
+    Analyzes form screenshots and fills fields intelligently.
+    """
+    job_url = payload.get("job_url", "")
+    if not job_url:
+        return {"ok": False, "error": "job_url required"}
+    
+    # Run in background terminal
+    script = f'''
+import asyncio
+import sys
+sys.path.insert(0, str(Path(__file__).parent))
+
+from browser.v5.vision_filler import VisionFormFiller
+from playwright.async_api import async_playwright
+
+async def main():
+    filler = VisionFormFiller()
+    
+    async with async_playwright() as p:
+        browser = await p.chromium.connect_over_cdp("http://localhost:9222")
+        ctx = browser.contexts[0]
+        
+        print("Creating new page...")
+        page = await ctx.new_page()
+        await page.goto("{job_url}", wait_until="domcontentloaded", timeout=30000)
+        await asyncio.sleep(6)
+        
+        await page.bring_to_front()
+        print(f"Page loaded: {{await page.title()}}")
+        
+        print("\\nAnalyzing form with Claude Vision...")
+        analysis = await filler.analyze_form(page, num_screenshots=3)
+        print(analysis)
+        
+        input("\\nPress Enter to continue or Ctrl+C to cancel...")
+
+asyncio.run(main())
+'''
+    
+    # Save and run script
+    script_path = "/tmp/vision_apply.py"
+    with open(script_path, "w") as f:
+        f.write(script)
+    
+    import subprocess
+    subprocess.Popen([
+        "osascript", "-e",
+        f'tell application "Terminal" to do script "cd {PROJECT_ROOT} && source .venv/bin/activate && python {script_path}"'
+    ])
+    
+    return {"ok": True, "message": "Vision Form Filler started in Terminal"}
@@ -0,0 +1,430 @@
+"""
+CV router: /cv/preview, /cv/tailor, /cv/optimize-ai.
+"""
+
+from __future__ import annotations
+
+import json
+
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+
+# Лениво грузится после main → общие хелперы берём оттуда
+from main import GOLD_CV_PATH
+from utils.async_io import run_blocking
+
+router = APIRouter(tags=["cv"])
+
+# Тяжёлые зависимости handler-ов, импортируются заранее при ROUTERS_WARMUP=1
+WARMUP_IMPORTS = ("docx", "utils.llm_stream")
+
+
+class CVPreviewRequest(BaseModel):
+    job_title: str
+    company: str
+    role_family: str = "product"
+    keywords_to_add: list = []
+    matched_keywords: list = []
+    cv_path: str = None  # Optional: path to specific CV (e.g., AI-optimized)
+
+@router.post("/cv/preview")
+async def cv_preview_endpoint(payload: CVPreviewRequest):
+    """
+    Generate CV preview with highlighted keywords.
+    Returns HTML with:
+    - Green highlights: matched keywords (already in CV and JD)
+    - Yellow highlights: injected keywords (added to Skills section)
+    """
+    from docx import Document
+    from pathlib import Path
+    import re
+    
+    gold_cv_path = GOLD_CV_PATH
+    
+    # Use provided cv_path if specified, otherwise select by role
+    print(f"DEBUG cv/preview: payload.cv_path = {payload.cv_path}")
+    if payload.cv_path and Path(payload.cv_path).exists():
+        cv_path = Path(payload.cv_path)
+        cv_filename = cv_path.name
+        print(f"DEBUG cv/preview: Using provided CV: {cv_path}")
+    else:
+        # Select CV based on role
+        role_cv_map = {
+            "product": "CV_Anton_Kondakov_Product Manager.docx",
+            "tpm_program": "CV_Anton_Kondakov_TPM.docx",
+            "project": "CV_Anton_Kondakov_Project Manager.docx",
+        }
+        cv_filename = role_cv_map.get(payload.role_family, "CV_Anton_Kondakov_Product Manager.docx")
+        cv_path = gold_cv_path / cv_filename
+        print(f"DEBUG cv/preview: Using role-based CV: {cv_path}")
+    
+    if not cv_path.exists():
+        return {"ok": False, "error": f"CV not found: {cv_filename}"}
+    
+    doc = await run_blocking(Document, cv_path)
+    
+    # Build HTML preview
+    html_parts = []
+    html_parts.append('<div class="cv-preview" style="font-family: Arial, sans-serif; font-size: 12px; line-height: 1.4; max-width: 800px;">')
+    
+    matched_kw = set(k.lower() for k in payload.matched_keywords)
+    inject_kw = set(k.lower() for k in payload.keywords_to_add)
+    
+    # Add yellow banner at the TOP if there are keywords to add
+    if inject_kw:
+        html_parts.append('<div style="margin: 0 0 16px 0; padding: 12px; background-color: #fef08a; border-radius: 8px; border-left: 4px solid #eab308;">')
+        html_parts.append('<strong style="color: #854d0e; font-size: 13px;">🔑 Keywords to be added to your CV:</strong><br>')
+        html_parts.append('<div style="margin-top: 8px;">')
+        html_parts.append(', '.join(f'<mark style="background-color: #facc15; padding: 2px 6px; border-radius: 3px; font-weight: 500;">{kw}</mark>' for kw in payload.keywords_to_add))
+        html_parts.append('</div></div>')
+    
+    # Fallback: if no keywords provided, use common PM keywords for highlighting
+    if not matched_kw:
+        matched_kw = {
+            "product strategy", "roadmap", "agile", "scrum", "stakeholder",
+            "cross-functional", "backlog", "user stories", "sprint", "kpi",
+            "okr", "prioritization", "requirements", "delivery", "release",
+            "jira", "confluence", "aws", "sql", "data analysis"
+        }
+    
+    def highlight_text(text: str, is_technical_section: bool = False) -> str:
+        """Highlight matched and injected keywords in text."""
+        result = text
+        
+        # First highlight matched keywords (green) - preserve original case
+        for kw in matched_kw:
+            pattern = re.compile(f'({re.escape(kw)})', re.IGNORECASE)
+            result = pattern.sub(
+                r'<mark style="background-color: #86efac !important; padding: 1px 3px; border-radius: 2px;">\1</mark>',
+                result
+            )
+        
+        # Add injected keywords to Technical section with yellow highlight
+        if is_technical_section and inject_kw:
+            injected_str = ', '.join(f'<mark style="background-color: #facc15 !important; padding: 1px 3px; border-radius: 2px; font-weight: 500;">{kw}</mark>' for kw in payload.keywords_to_add)
+            result += f' <span style="color: #854d0e;">[+Added: {injected_str}]</span>'
+        
+        return result
+    
+    keywords_injected = False
+    
+    for para in doc.paragraphs:
+        text = para.text.strip()
+        if not text:
+            continue
+        
+        style = para.style.name if para.style else "Normal"
+        
+        # Check if this is Technical Delivery/Acumen line where we inject keywords
+        # Must start with bullet point marker or "Technical Delivery" / "Technical Acumen"
+        is_technical = (text.startswith("Technical Delivery") or text.startswith("Technical Acumen") or 
+                       (text.startswith("•") and "Technical" in text)) and not keywords_injected
+        highlighted = highlight_text(text, is_technical_section=is_technical)
+        if is_technical and inject_kw:
+            keywords_injected = True
+        
+        # Detect section headers
+        if text.isupper() or style == "Heading 1" or text in ["CORE COMPETENCIES", "PROFESSIONAL EXPERIENCE", "EDUCATION", "CERTIFICATIONS"]:
+            html_parts.append(f'<h3 style="margin: 16px 0 8px 0; color: #1e3a5f; border-bottom: 1px solid #ddd; padding-bottom: 4px;">{text}</h3>')
+                
+        elif style == "List Paragraph":
+            html_parts.append(f'<div style="margin: 4px 0 4px 20px; padding-left: 10px; border-left: 2px solid #e5e7eb;">• {highlighted}</div>')
+        else:
+            # Check if it's a job title/company line
+            if " | " in text or "–" in text:
+                html_parts.append(f'<div style="margin: 12px 0 4px 0; font-weight: 600; color: #374151;">{highlighted}</div>')
+            else:
+                html_parts.append(f'<div style="margin: 4px 0;">{highlighted}</div>')
+    
+    html_parts.append('</div>')
+    
+    # Summary stats
+    stats = {
+        "matched_count": len(matched_kw),
+        "injected_count": len(inject_kw),
+        "cv_file": cv_filename
+    }
+    
+    return {
+        "ok": True,
+        "html": "\n".join(html_parts),
+        "stats": stats,
+        "keywords_matched": list(matched_kw),
+        "keywords_injected": list(inject_kw)
+    }
+
+
+class CVTailorRequest(BaseModel):
+    company: str
+    position: str  # Job title
+    role_family: str = "product"
+    keywords_to_add: list = []
+
+def _cv_tailor_steps(payload: CVTailorRequest):
+    """
+    Create tailored CV with injected keywords, yielding progress steps.
+    Yields {"type": "progress", "step": ...} dicts and finally {"type": "done", "result": {...}}.
+    """
+    from docx import Document
+    import re
+    
+    gold_cv_path = GOLD_CV_PATH
+    apps_path = gold_cv_path / "Applications"
+    
+    # Select CV based on role
+    role_cv_map = {
+        "product": "CV_Anton_Kondakov_Product Manager.docx",
+        "tpm_program": "CV_Anton_Kondakov_TPM.docx",
+        "project": "CV_Anton_Kondakov_Project Manager.docx",
+    }
+    cv_filename = role_cv_map.get(payload.role_family, "CV_Anton_Kondakov_Product Manager.docx")
+    cv_path = gold_cv_path / cv_filename
+    
+    if not cv_path.exists():
+        yield {"type": "done", "result": {"ok": False, "error": f"CV not found: {cv_filename}"}}
+        return
+    
+    # Create application folder
+    safe_company = re.sub(r'[^\w\s-]', '', payload.company).strip().replace(' ', '_')
+    safe_position = re.sub(r'[^\w\s-]', '', payload.position).strip().replace(' ', '_')[:50]
+    folder_name = f"{safe_company}_{safe_position}"
+    app_folder = apps_path / folder_name
+    app_folder.mkdir(parents=True, exist_ok=True)
+    
+    # Load and modify CV
+    yield {"type": "progress", "step": "load_cv", "cv": cv_filename}
+    doc = Document(cv_path)
+    
+    keywords_to_add = payload.keywords_to_add
+    
+    if keywords_to_add:
+        # Find CORE COMPETENCIES section and add keywords
+        for i, para in enumerate(doc.paragraphs):
+            text = para.text.strip().upper()
+            if "COMPETENCIES" in text or "SKILLS" in text:
+                # Find the next list paragraph and add keywords there
+                for j in range(i+1, min(i+10, len(doc.paragraphs))):
+                    next_para = doc.paragraphs[j]
+                    if next_para.style and "List" in next_para.style.name:
+                        # Add keywords to Technical Acumen or create new line
+                        if "technical" in next_para.text.lower() or "tools" in next_para.text.lower():
+                            # Append to existing
+                            current_text = next_para.text
+                            if not current_text.endswith('.'):
+                                current_text += '.'
+                            new_keywords = ', '.join(keywords_to_add)
+                            next_para.clear()
+                            next_para.add_run(f"{current_text} Additional: {new_keywords}.")
+                            break
+                break
+    
+    # Save tailored CV
+    output_filename = f"CV_Anton_Kondakov_{safe_company}_{safe_position}.docx"
+    output_path = app_folder / output_filename
+    doc.save(output_path)
+    yield {"type": "progress", "step": "saved_docx", "cv_path": str(output_path)}
+    
+    # Also try to create PDF (if possible)
+    pdf_path = None
+    try:
+        import subprocess
+        # Try using LibreOffice for conversion (if available)
+        yield {"type": "progress", "step": "convert_pdf"}
+        pdf_output = output_path.with_suffix('.pdf')
+        result = subprocess.run([
+            'soffice', '--headless', '--convert-to', 'pdf',
+            '--outdir', str(app_folder), str(output_path)
+        ], capture_output=True, timeout=30)
+        if pdf_output.exists():
+            pdf_path = str(pdf_output)
+    except Exception:
+        pass  # PDF conversion optional
+    
+    yield {"type": "done", "result": {
+        "ok": True,
+        "cv_path": str(output_path),
+        "pdf_path": pdf_path,
+        "folder": str(app_folder),
+        "keywords_added": keywords_to_add
+    }}
+
+
+@router.post("/cv/tailor")
+def cv_tailor_endpoint(payload: CVTailorRequest, stream: bool = Query(False, description="SSE: report progress steps (PDF conversion can take ~30s)")):
+    """
+    Create tailored CV with injected keywords.
+    Saves to Applications folder.
+    Returns path to new CV.
+    stream=true: text/event-stream of {type: start|progress|done|error}.
+    """
+    from utils.llm_stream import sse, sse_response
+
+    if stream:
+        def events():
+            yield sse("start", company=payload.company, position=payload.position)
+            try:
+                for step in _cv_tailor_steps(payload):
+                    yield sse(step.pop("type"), **step)
+            except Exception as e:
+                yield sse("error", error=str(e))
+        return sse_response(events())
+
+    result = None
+    for step in _cv_tailor_steps(payload):
+        if step["type"] == "done":
+            result = step["result"]
+    return result
+
+
+class CVOptimizeRequest(BaseModel):
+    job_title: str
+    company: str
+    job_description: str
+    role_family: str = "product"
+
+
+def _cv_optimize_prompt(payload: CVOptimizeRequest) -> str:
+    return f"""Analyze this job description and extract:
+1. Top 10 most important technical skills/tools required
+2. Top 5 soft skills emphasized
+3. Key experience requirements (years, domains)
+4. Any specific keywords that should be in the CV
+
+Job Title: {payload.job_title}
+Company: {payload.company}
+
+Job Description:
+{payload.job_description[:4000]}
+
+Respond in JSON format:
+{{
+  "technical_skills": ["skill1", "skill2", ...],
+  "soft_skills": ["skill1", ...],
+  "experience_requirements": ["req1", ...],
+  "keywords_to_add": ["keyword1", ...],
+  "cv_recommendations": ["recommendation1", ...]
+}}"""
+
+
+def _cv_optimize_finish(payload: CVOptimizeRequest, ai_text: str) -> dict:
+    """Parse Claude's JD analysis and write the keyword-tailored CV."""
+    import re
+    
+    # Parse JSON from response
+    # Extract JSON from potential markdown
+    json_match = re.search(r'\{[\s\S]*\}', ai_text or "")
+    if json_match:
+        analysis = json.loads(json_match.group())
+    else:
+        analysis = {"error": "Could not parse AI response"}
+    
+    # Now tailor CV with extracted keywords
+    keywords = analysis.get("keywords_to_add", []) + analysis.get("technical_skills", [])[:5]
+    keywords = list(set(keywords))[:10]  # Dedupe and limit
+    
+    if not keywords:
+        return {
+            "ok": True,
+            "cv_path": None,
+            "cv_name": "No optimization needed",
+            "keywords_added": [],
+            "analysis": analysis
+        }
+
+    # Call existing tailor endpoint logic
+    from docx import Document
+    
+    gold_cv_path = GOLD_CV_PATH
+    apps_path = gold_cv_path / "Applications"
+    
+    role_cv_map = {
+        "product": "CV_Anton_Kondakov_Product Manager.docx",
+        "tpm_program": "CV_Anton_Kondakov_TPM.docx",
+        "project": "CV_Anton_Kondakov_Project Manager.docx",
+    }
+    cv_filename = role_cv_map.get(payload.role_family, "CV_Anton_Kondakov_Product Manager.docx")
+    cv_path = gold_cv_path / cv_filename
+    
+    if not cv_path.exists():
+        return {"ok": False, "error": f"Base CV not found: {cv_filename}"}
+    
+    # Create folder
+    safe_company = re.sub(r'[^\w\s-]', '', payload.company).strip().replace(' ', '_')
+    safe_position = re.sub(r'[^\w\s-]', '', payload.job_title).strip().replace(' ', '_')[:50]
+    folder_name = f"{safe_company}_{safe_position}_AI"
+    app_folder = apps_path / folder_name
+    app_folder.mkdir(parents=True, exist_ok=True)
+    
+    # Load and modify CV
+    doc = Document(cv_path)
+    
+    # Add keywords to Technical section
+    for i, para in enumerate(doc.paragraphs):
+        if "COMPETENCIES" in para.text.upper() or "SKILLS" in para.text.upper():
+            for j in range(i+1, min(i+15, len(doc.paragraphs))):
+                next_para = doc.paragraphs[j]
+                if "technical" in next_para.text.lower() or "acumen" in next_para.text.lower():
+                    current = next_para.text.rstrip('.')
+                    added_kw = ', '.join(keywords[:5])
+                    next_para.clear()
+                    next_para.add_run(f"{current} [+Added: {added_kw}]")
+                    break
+            break
+    
+    # Save
+    output_filename = f"CV_Anton_Kondakov_{safe_company}_AI_Optimized.docx"
+    output_path = app_folder / output_filename
+    doc.save(output_path)
+    
+    return {
+        "ok": True,
+        "cv_path": str(output_path),
+        "cv_name": output_filename,
+        "keywords_added": keywords[:5],
+        "analysis": analysis,
+        "folder": str(app_folder)
+    }
+
+
+@router.post("/cv/optimize-ai")
+async def cv_optimize_ai_endpoint(payload: CVOptimizeRequest, stream: bool = Query(False, description="SSE: forward Claude tokens as they arrive")):
+    """
+    Use Claude API to analyze JD and optimize CV.
+    Extracts key requirements and tailors CV accordingly.
+    stream=true: text/event-stream of {type: start|token|done|error}; `done` carries the same result.
+    """
+    import os
+    from utils.llm_stream import claude_stream, complete, sse, sse_response
+    
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        error = "ANTHROPIC_API_KEY not set"
+    elif not payload.job_description or len(payload.job_description) < 50:
+        error = "Job description too short for analysis"
+    else:
+        error = None
+    if error:
+        return sse_response(iter([sse("error", error=error)])) if stream else {"ok": False, "error": error}
+    
+    prompt = _cv_optimize_prompt(payload)
+
+    if stream:
+        def events():
+            yield sse("start", company=payload.company, job_title=payload.job_title)
+            parts = []
+            try:
+                for token in claude_stream(prompt, max_tokens=1000, api_key=api_key):
+                    parts.append(token)
+                    yield sse("token", text=token)
+                yield sse("done", result=_cv_optimize_finish(payload, "".join(parts)))
+            except Exception as e:
+                yield sse("error", error=str(e))
+        return sse_response(events())
+
+    # Call Claude API to analyze JD (off the event loop)
+    try:
+        ai_text = await run_blocking(complete, claude_stream(prompt, max_tokens=1000, api_key=api_key))
+        return await run_blocking(_cv_optimize_finish, payload, ai_text)
+    except Exception as e:
+        import traceback
+        return {"ok": False, "error": str(e), "traceback": traceback.format_exc()}
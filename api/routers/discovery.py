@@ -0,0 +1,672 @@
+"""
+Discovery router: /discovery/* — company auto-discovery (AI, seed list,
+BuiltIn), ATS validation, role preview, approve / reject / retry.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import APIRouter
+
+# Лениво грузится после main → общие хелперы берём оттуда
+from main import ATS_PARSERS, detect_ats_from_url, refresh_company_sync
+
+router = APIRouter(tags=["discovery"])
+
+# Тяжёлые зависимости handler-ов, импортируются заранее при ROUTERS_WARMUP=1
+WARMUP_IMPORTS = ("bs4", "tools.company_discovery")
+
+
+# ===== Discovery endpoints =====
+# Auto-discovery of companies with relevant PM/TPM roles
+
+@router.post("/discovery/search")
+def discovery_search(ai: bool = True, seed: bool = True):
+    """
+    Run company discovery pipeline: AI search + seed list.
+    Found companies go to data/discovered_companies.json staging area.
+    """
+    from tools.company_discovery import (
+        load_companies, load_staging, save_staging,
+        get_existing_ids, get_staging_ids,
+        discover_via_ai, discover_from_seed_list,
+    )
+
+    existing_ids = get_existing_ids()
+    existing_names = {c.get("name", "") for c in load_companies()}
+    candidates = load_staging()
+    initial_count = len(candidates)
+
+    new_candidates = []
+    ai_count = 0
+    seed_count = 0
+
+    if ai:
+        ai_candidates = discover_via_ai(existing_ids, existing_names)
+        new_candidates.extend(ai_candidates)
+        ai_count = len(ai_candidates)
+
+    if seed:
+        seed_candidates = discover_from_seed_list(existing_ids)
+        new_candidates.extend(seed_candidates)
+        seed_count = len(seed_candidates)
+
+    # Deduplicate with staging
+    staging_ids = {c.get("id") for c in candidates}
+    added = 0
+    for nc in new_candidates:
+        if nc["id"] not in staging_ids:
+            candidates.append(nc)
+            staging_ids.add(nc["id"])
+            added += 1
+
+    save_staging(candidates)
+
+    return {
+        "ok": True,
+        "ai_suggested": ai_count,
+        "seed_suggested": seed_count,
+        "added_to_staging": added,
+        "total_staging": len(candidates),
+    }
+
+
+@router.get("/discovery/candidates")
+def discovery_candidates(status: str = None):
+    """
+    List discovered companies from staging area.
+    Optional filter by status: pending_validation, validated, ready_to_approve, etc.
+    """
+    staging_path = Path("data/discovered_companies.json")
+    if not staging_path.exists():
+        return {"candidates": [], "total": 0}
+
+    with open(staging_path, "r", encoding="utf-8") as f:
+        candidates = json.load(f)
+
+    if status:
+        candidates = [c for c in candidates if c.get("status") == status]
+
+    # Group counts by status
+    all_candidates = json.load(open(staging_path, "r", encoding="utf-8"))
+    status_counts = {}
+    for c in all_candidates:
+        s = c.get("status", "unknown")
+        status_counts[s] = status_counts.get(s, 0) + 1
+
+    return {
+        "candidates": candidates,
+        "total": len(candidates),
+        "status_counts": status_counts,
+    }
+
+
+@router.post("/discovery/validate")
+def discovery_validate():
+    """
+    Validate ATS for pending candidates in staging.
+    Detects ATS via URL patterns and HTTP checks.
+    """
+    from tools.company_discovery import load_staging, save_staging, validate_candidates
+
+    candidates = load_staging()
+    if not candidates:
+        return {"ok": True, "validated": 0, "message": "Staging is empty"}
+
+    changes = validate_candidates(candidates)
+    save_staging(candidates)
+
+    supported = sum(1 for c in candidates if c.get("supported"))
+    unsupported = sum(1 for c in candidates if c.get("status") == "unsupported_ats")
+    no_ats = sum(1 for c in candidates if c.get("status") == "no_ats_detected")
+
+    return {
+        "ok": True,
+        "validated": changes,
+        "supported_ats": supported,
+        "unsupported_ats": unsupported,
+        "no_ats": no_ats,
+    }
+
+
+@router.post("/discovery/preview")
+def discovery_preview():
+    """
+    Preview relevant PM/TPM roles for validated candidates.
+    Parses jobs from ATS and counts matching role titles.
+    """
+    from tools.company_discovery import load_staging, save_staging, preview_relevant_roles
+
+    candidates = load_staging()
+    if not candidates:
+        return {"ok": True, "previewed": 0, "message": "Staging is empty"}
+
+    changes = preview_relevant_roles(candidates)
+    save_staging(candidates)
+
+    ready = sum(1 for c in candidates if c.get("status") == "ready_to_approve")
+    no_roles = sum(1 for c in candidates if c.get("status") == "no_relevant_roles")
+
+    return {
+        "ok": True,
+        "previewed": changes,
+        "ready_to_approve": ready,
+        "no_relevant_roles": no_roles,
+    }
+
+
+@router.post("/discovery/approve/{candidate_id}")
+def discovery_approve(candidate_id: str):
+    """
+    Approve a discovered company — move from staging to companies.json.
+    Triggers initial parsing via refresh_company_sync() (same as /onboard auto-add).
+    """
+    staging_path = Path("data/discovered_companies.json")
+    companies_path = Path("data/companies.json")
+
+    # Load staging
+    if not staging_path.exists():
+        return {"ok": False, "error": "No staging file"}
+
+    with open(staging_path, "r", encoding="utf-8") as f:
+        candidates = json.load(f)
+
+    # Find candidate
+    candidate = None
+    for c in candidates:
+        if c.get("id") == candidate_id:
+            candidate = c
+            break
+
+    if not candidate:
+        return {"ok": False, "error": f"Candidate '{candidate_id}' not found in staging"}
+
+    if not candidate.get("supported"):
+        return {"ok": False, "error": f"Candidate has unsupported ATS: {candidate.get('ats')}"}
+
+    # Check not already in companies.json
+    companies = json.load(open(companies_path, "r", encoding="utf-8")) if companies_path.exists() else []
+    for c in companies:
+        if c.get("id") == candidate_id or c.get("name", "").lower() == candidate.get("name", "").lower():
+            return {"ok": False, "error": f"Company '{candidate_id}' already exists"}
+
+    # Create company entry (same format as /onboard auto-add in main.py)
+    new_company = {
+        "id": candidate_id,
+        "name": candidate.get("name", candidate_id),
+        "ats": candidate.get("ats"),
+        "board_url": candidate.get("board_url"),
+        "industry": candidate.get("industry", ""),
+        "tags": candidate.get("tags", []),
+        "priority": 0,
+        "hq_state": candidate.get("hq_state"),
+        "region": "us",
+        "enabled": True,
+    }
+
+    from company_storage import companies_update
+
+    with companies_update(companies_path) as companies:
+        if any(c.get("id") == candidate_id for c in companies):  # added meanwhile
+            return {"ok": False, "error": f"Company '{candidate_id}' already exists"}
+        companies.append(new_company)
+
+    # Trigger initial parsing (same as /onboard in main.py)
+    parsing_result = {"ok": False, "jobs": 0}
+    try:
+        fetch_result = refresh_company_sync(new_company)
+        parsing_result = {
+            "ok": fetch_result.get("ok", False),
+            "jobs": fetch_result.get("jobs", 0),
+            "jobs_added": fetch_result.get("jobs_added", 0),
+        }
+    except Exception as e:
+        parsing_result["error"] = str(e)
+
+    # Update staging status
+    candidate["status"] = "approved"
+    candidate["approved_at"] = datetime.now().isoformat()
+    with open(staging_path, "w", encoding="utf-8") as f:
+        json.dump(candidates, f, indent=2, ensure_ascii=False)
+
+    return {
+        "ok": True,
+        "company": new_company,
+        "parsing": parsing_result,
+    }
+
+
+@router.post("/discovery/reject/{candidate_id}")
+def discovery_reject(candidate_id: str):
+    """Reject a discovered company — mark as rejected in staging."""
+    staging_path = Path("data/discovered_companies.json")
+
+    if not staging_path.exists():
+        return {"ok": False, "error": "No staging file"}
+
+    with open(staging_path, "r", encoding="utf-8") as f:
+        candidates = json.load(f)
+
+    found = False
+    for c in candidates:
+        if c.get("id") == candidate_id:
+            c["status"] = "rejected"
+            c["rejected_at"] = datetime.now().isoformat()
+            found = True
+            break
+
+    if not found:
+        return {"ok": False, "error": f"Candidate '{candidate_id}' not found"}
+
+    with open(staging_path, "w", encoding="utf-8") as f:
+        json.dump(candidates, f, indent=2, ensure_ascii=False)
+
+    return {"ok": True, "rejected": candidate_id}
+
+
+@router.post("/discovery/retry/{candidate_id}")
+def discovery_retry(candidate_id: str):
+    """
+    Retry parsing for a parse_error candidate.
+    Tries refresh_company_sync to re-fetch jobs.
+    """
+    staging_path = Path("data/discovered_companies.json")
+    if not staging_path.exists():
+        return {"ok": False, "error": "No staging file"}
+
+    with open(staging_path, "r", encoding="utf-8") as f:
+        candidates = json.load(f)
+
+    candidate = None
+    for c in candidates:
+        if c.get("id") == candidate_id:
+            candidate = c
+            break
+
+    if not candidate:
+        return {"ok": False, "error": f"Candidate '{candidate_id}' not found"}
+
+    ats = candidate.get("ats", "unknown")
+    board_url = candidate.get("board_url", "")
+
+    import requests as _req
+    from bs4 import BeautifulSoup as _BS
+    from utils.job_utils import classify_role
+
+    # Step 1: Try current ATS if known
+    jobs_found = 0
+    if board_url and ats != "unknown":
+        parser = ATS_PARSERS.get(ats)
+        if parser:
+            try:
+                print(f"[Discovery Retry] Trying current ATS {ats}: {board_url}")
+                jobs = parser(board_url)
+                jobs_found = len(jobs) if isinstance(jobs, list) else 0
+            except Exception as e:
+                print(f"[Discovery Retry] Current ATS failed: {e}")
+
+    # Step 2: If 0 jobs — try to re-detect ATS from company website
+    new_ats = ""
+    new_board = ""
+    if jobs_found == 0:
+        company_name = candidate.get("name", candidate_id)
+        print(f"[Discovery Retry] 0 jobs on {ats}, scanning for new ATS for {company_name}...")
+
+        # Build list of domains to try
+        slug = candidate_id.replace("-", "").lower()
+        domains_to_try = []
+
+        # Try website from builtin profile
+        builtin_url = candidate.get("builtin_url") or candidate.get("careers_url", "")
+        if builtin_url and "builtin.com" in builtin_url:
+            try:
+                prof_resp = _req.get(builtin_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+                if prof_resp.status_code == 200:
+                    for a in _BS(prof_resp.text, "html.parser").find_all("a", href=True):
+                        h = a["href"]
+                        if h.startswith("http") and "builtin.com" not in h and len(h) > 10:
+                            domains_to_try.append(h.rstrip("/"))
+                            break
+            except:
+                pass
+
+        # Common patterns
+        domains_to_try.extend([
+            f"https://www.{slug}.com",
+            f"https://{slug}.com",
+        ])
+
+        # Scan each domain's /careers page for ATS links
+        ats_domains = ["greenhouse.io", "lever.co", "myworkdayjobs.com", "smartrecruiters.com",
+                       "ashbyhq.com", "icims.com", "phenom.com"]
+        for base in domains_to_try[:3]:
+            for path in ["/careers", "/jobs", "/company/careers", ""]:
+                try:
+                    test_url = base + path
+                    resp = _req.get(test_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=8, allow_redirects=True)
+                    if resp.status_code != 200:
+                        continue
+                    # Scan page for ATS links
+                    for link_match in set(__import__('re').findall(r'https?://[^"\'<>\s]+', resp.text)):
+                        for ats_domain in ats_domains:
+                            if ats_domain in link_match:
+                                # Clean URL
+                                clean_url = link_match.split("&amp;")[0].split("\\u0026")[0].split("?")[0].rstrip("/\\")
+                                ats_info = detect_ats_from_url(clean_url)
+                                detected_ats = ats_info.get("ats", "")
+                                if detected_ats and detected_ats != "universal":
+                                    new_ats = detected_ats
+                                    new_board = ats_info.get("board_url", clean_url)
+                                    print(f"[Discovery Retry] Found new ATS: {new_ats} → {new_board}")
+                                    break
+                        if new_ats:
+                            break
+                    if new_ats:
+                        break
+                except:
+                    pass
+            if new_ats:
+                break
+
+        # If found new ATS, try parsing it
+        if new_ats:
+            new_parser = ATS_PARSERS.get(new_ats)
+            if new_parser:
+                try:
+                    jobs = new_parser(new_board)
+                    jobs_found = len(jobs) if isinstance(jobs, list) else 0
+                    if jobs_found > 0:
+                        candidate["ats"] = new_ats
+                        candidate["board_url"] = new_board
+                        candidate["previous_ats"] = ats
+                        print(f"[Discovery Retry] ✅ Migrated {company_name}: {ats}→{new_ats}, {jobs_found} jobs")
+                except Exception as e:
+                    print(f"[Discovery Retry] New ATS parse failed: {e}")
+
+    # Count relevant roles
+    relevant = 0
+    if jobs_found > 0:
+        try:
+            parser_to_use = ATS_PARSERS.get(candidate.get("ats", ats))
+            jobs_data = parser_to_use(candidate.get("board_url", board_url)) if parser_to_use else []
+            for j in (jobs_data or []):
+                role_info = classify_role(j.get("title", ""))
+                if role_info.get("role_category") in ("primary", "adjacent"):
+                    relevant += 1
+        except:
+            pass
+
+    # Update candidate
+    if jobs_found > 0:
+        candidate["status"] = "ready_to_approve"
+        candidate["relevant_roles_count"] = relevant
+        candidate["total_jobs"] = jobs_found
+        candidate["supported"] = True
+        candidate["retry_result"] = f"{jobs_found} total, {relevant} PM/TPM"
+    else:
+        candidate["status"] = "no_relevant_roles"
+        candidate["retry_result"] = f"0 jobs (checked {ats}" + (f" + scanned website → {new_ats or 'nothing found'}" if not jobs_found else "") + ")"
+
+    candidate["retried_at"] = datetime.now().isoformat()
+
+    with open(staging_path, "w", encoding="utf-8") as f:
+        json.dump(candidates, f, indent=2, ensure_ascii=False)
+
+    return {
+        "ok": True,
+        "jobs_found": jobs_found,
+        "relevant": relevant,
+        "new_status": candidate["status"],
+        "ats_migrated": bool(new_ats),
+        "new_ats": new_ats or None,
+        "new_board": new_board or None,
+    }
+
+
+@router.post("/discovery/auto")
+def discovery_auto():
+    """
+    Full discovery pipeline: search → validate → preview.
+    Combines all steps into a single endpoint.
+    """
+    from tools.company_discovery import (
+        load_companies, load_staging, save_staging,
+        get_existing_ids, discover_via_ai, discover_from_seed_list,
+        validate_candidates, preview_relevant_roles,
+    )
+
+    results = {"steps": []}
+
+    # Step 1: Search
+    existing_ids = get_existing_ids()
+    existing_names = {c.get("name", "") for c in load_companies()}
+    candidates = load_staging()
+
+    new_candidates = []
+    ai_candidates = discover_via_ai(existing_ids, existing_names)
+    new_candidates.extend(ai_candidates)
+    seed_candidates = discover_from_seed_list(existing_ids)
+    new_candidates.extend(seed_candidates)
+
+    staging_ids = {c.get("id") for c in candidates}
+    added = 0
+    for nc in new_candidates:
+        if nc["id"] not in staging_ids:
+            candidates.append(nc)
+            staging_ids.add(nc["id"])
+            added += 1
+
+    save_staging(candidates)
+    results["steps"].append({"search": {"ai": len(ai_candidates), "seed": len(seed_candidates), "added": added}})
+
+    # Step 2: Validate
+    validated = validate_candidates(candidates)
+    save_staging(candidates)
+    supported = sum(1 for c in candidates if c.get("supported"))
+    results["steps"].append({"validate": {"validated": validated, "supported": supported}})
+
+    # Step 3: Preview
+    previewed = preview_relevant_roles(candidates)
+    save_staging(candidates)
+    ready = sum(1 for c in candidates if c.get("status") == "ready_to_approve")
+    results["steps"].append({"preview": {"previewed": previewed, "ready_to_approve": ready}})
+
+    results["ok"] = True
+    results["ready_to_approve"] = ready
+    results["total_staging"] = len(candidates)
+
+    return results
+
+
+@router.post("/discovery/builtin")
+def discovery_builtin(pages: int = 3):
+    """
+    Scrape tech companies from Built In NC area, detect their ATS,
+    and add new ones to discovery staging.
+    """
+    import re as _re
+    import requests
+    from bs4 import BeautifulSoup
+
+    base_url = "https://builtin.com/companies?city=Wake+Forest&state=North+Carolina&country=USA&longitude=-78.52796&latitude=35.92348&page={}"
+
+    staging_path = Path("data/discovered_companies.json")
+    companies_path = Path("data/companies.json")
+
+    # Load existing data
+    existing_companies = []
+    if companies_path.exists():
+        with open(companies_path) as f:
+            existing_companies = json.load(f)
+    existing_ids = {c.get("id", "").lower() for c in existing_companies}
+    existing_names = {c.get("name", "").lower() for c in existing_companies}
+
+    staging = []
+    if staging_path.exists():
+        with open(staging_path) as f:
+            staging = json.load(f)
+    staging_ids = {c.get("id", "").lower() for c in staging}
+
+    scraped = 0
+    new_candidates = 0
+    with_ats = 0
+    errors = []
+
+    for page_num in range(1, min(pages + 1, 6)):  # Max 5 pages
+        try:
+            print(f"[BuiltIn] Fetching page {page_num}...")
+            resp = requests.get(base_url.format(page_num), headers={
+                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+                "Accept": "text/html"
+            }, timeout=15)
+            if resp.status_code != 200:
+                errors.append(f"Page {page_num}: HTTP {resp.status_code}")
+                continue
+
+            soup = BeautifulSoup(resp.text, "html.parser")
+
+            # Find company links — pattern: /company/{slug}
+            company_links = soup.find_all("a", href=_re.compile(r"^/company/[a-z0-9-]+$"))
+            seen_on_page = set()
+
+            for link in company_links:
+                href = link.get("href", "")
+                slug = href.replace("/company/", "").strip("/")
+                if not slug or slug in seen_on_page:
+                    continue
+                seen_on_page.add(slug)
+                scraped += 1
+
+                # Get company name from link text
+                name = link.get_text(strip=True)
+                if not name or len(name) < 2:
+                    name = slug.replace("-", " ").title()
+
+                # Skip if already known
+                slug_lower = slug.lower()
+                name_lower = name.lower()
+                if slug_lower in existing_ids or name_lower in existing_names or slug_lower in staging_ids:
+                    continue
+
+                # Try to find careers page for this company
+                careers_url = ""
+                ats_detected = ""
+                board_url = ""
+                supported = False
+
+                # Strategy: probe common ATS APIs to find real job boards
+                clean_slug = slug.replace("-", "").lower()
+                name_nospace = name.replace(" ", "").lower()
+                name_slug = slug  # builtin slug is usually good
+
+                # ATS probes: (url_to_test, ats_type, board_url_template)
+                # Use actual API endpoints that return errors for non-existent companies
+                ats_probes = [
+                    # Greenhouse: API returns 404 for invalid boards
+                    (f"https://boards-api.greenhouse.io/v1/boards/{slug}/jobs", "greenhouse", f"https://boards.greenhouse.io/{slug}"),
+                    (f"https://boards-api.greenhouse.io/v1/boards/{clean_slug}/jobs", "greenhouse", f"https://boards.greenhouse.io/{clean_slug}"),
+                    # Lever: API returns 404 for invalid companies
+                    (f"https://api.lever.co/v0/postings/{slug}?limit=1", "lever", f"https://jobs.lever.co/{slug}"),
+                    (f"https://api.lever.co/v0/postings/{clean_slug}?limit=1", "lever", f"https://jobs.lever.co/{clean_slug}"),
+                    # Ashby: API returns actual job data or empty
+                    (f"https://api.ashbyhq.com/posting-api/job-board/{slug}", "ashby", f"https://jobs.ashbyhq.com/{slug}"),
+                    (f"https://api.ashbyhq.com/posting-api/job-board/{clean_slug}", "ashby", f"https://jobs.ashbyhq.com/{clean_slug}"),
+                    # SmartRecruiters: API returns jobs or 404
+                    (f"https://api.smartrecruiters.com/v1/companies/{name_nospace}/postings?limit=1", "smartrecruiters", f"https://jobs.smartrecruiters.com/{name_nospace}"),
+                ]
+                try:
+                    for probe_url, probe_ats, probe_board in ats_probes:
+                        try:
+                            resp_probe = requests.get(probe_url, timeout=6, headers={"Accept": "application/json"})
+                            if resp_probe.status_code == 200:
+                                # Verify it has actual content (not empty board)
+                                try:
+                                    probe_data = resp_probe.json()
+                                    has_jobs = False
+                                    if probe_ats == "greenhouse":
+                                        has_jobs = len(probe_data.get("jobs", [])) > 0
+                                    elif probe_ats == "lever":
+                                        has_jobs = len(probe_data) > 0 if isinstance(probe_data, list) else False
+                                    elif probe_ats == "ashby":
+                                        has_jobs = len(probe_data.get("jobs", [])) > 0
+                                    elif probe_ats == "smartrecruiters":
+                                        has_jobs = len(probe_data.get("content", [])) > 0
+
+                                    if has_jobs:
+                                        careers_url = probe_board
+                                        ats_detected = probe_ats
+                                        board_url = probe_board
+                                        supported = True
+                                        break
+                                except:
+                                    pass
+                        except:
+                            pass
+
+                    # If no probe worked, try Built In profile for ATS links
+                    if not careers_url:
+                        try:
+                            profile_resp = requests.get(f"https://builtin.com/company/{slug}", headers={
+                                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
+                            }, timeout=10)
+                            if profile_resp.status_code == 200:
+                                profile_soup = BeautifulSoup(profile_resp.text, "html.parser")
+                                for a in profile_soup.find_all("a", href=True):
+                                    href_val = a.get("href", "")
+                                    if any(d in href_val for d in ["greenhouse.io", "lever.co", "myworkdayjobs.com", "smartrecruiters.com", "ashbyhq.com"]):
+                                        careers_url = href_val
+                                        ats_info = detect_ats_from_url(careers_url)
+                                        ats_detected = ats_info.get("ats", "unknown")
+                                        board_url = ats_info.get("board_url", "")
+                                        supported = ats_detected in list(ATS_PARSERS.keys())
+                                        break
+                        except:
+                            pass
+
+                except Exception as e:
+                    print(f"[BuiltIn] Error checking {name}: {e}")
+
+                # Create candidate
+                candidate = {
+                    "id": slug,
+                    "name": name,
+                    "careers_url": careers_url,
+                    "ats": ats_detected or "unknown",
+                    "board_url": board_url,
+                    "supported": supported,
+                    "industry": "",
+                    "tags": [],
+                    "hq_state": "NC",
+                    "discovery_source": "builtin",
+                    "builtin_url": f"https://builtin.com/company/{slug}",
+                    "status": "ready_to_approve" if supported else ("unsupported_ats" if ats_detected and ats_detected != "unknown" else "needs_careers_url"),
+                    "discovered_at": datetime.now().isoformat()
+                }
+                staging.append(candidate)
+                staging_ids.add(slug_lower)
+                new_candidates += 1
+                if supported:
+                    with_ats += 1
+                    print(f"[BuiltIn] ✅ {name}: {ats_detected} ({board_url})")
+                else:
+                    print(f"[BuiltIn] ⚪ {name}: {ats_detected or 'no ATS'}")
+
+        except Exception as e:
+            errors.append(f"Page {page_num}: {str(e)}")
+
+    # Save staging
+    with open(staging_path, "w", encoding="utf-8") as f:
+        json.dump(staging, f, ensure_ascii=False, indent=2)
+
+    print(f"[BuiltIn] Done: scraped={scraped}, new={new_candidates}, with_ats={with_ats}")
+    return {
+        "ok": True,
+        "scraped": scraped,
+        "new_candidates": new_candidates,
+        "with_ats": with_ats,
+        "errors": errors,
+        "total_staging": len(staging)
+    }
@@ -0,0 +1,402 @@
+"""
+Jobs router: /jobs (live ATS aggregation with geo/role filters) and
+/jobs/review (review of unknown / excluded roles from the cache).
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Query
+
+from company_storage import load_profile
+from storage.job_storage import (
+    add_jobs_bulk,
+    get_all_job_ids,
+    get_rejected_ids,
+    mark_missing_jobs,
+    update_last_seen_bulk,
+)
+from utils.ai_classifier import classify_unknown_jobs
+from utils.async_io import gather_blocking, run_blocking
+from utils.cache_manager import load_cache, save_cache
+from utils.metrics import JOBS_FILTER_SECONDS
+from utils.normalize import STATE_MAP
+
+# Лениво грузится после main → общие хелперы берём оттуда
+from main import _fetch_for_company, _is_us_location, _load_job_status_map, compute_job_key
+
+router = APIRouter(tags=["jobs"])
+
+# Тяжёлые зависимости handler-ов, импортируются заранее при ROUTERS_WARMUP=1
+WARMUP_IMPORTS = ("utils.ai_classifier",)
+
+
+@router.get("/jobs")
+async def get_jobs(
+    profile: str = Query("all", description="Имя профиля из папки profiles/*.json"),
+    ats_filter: str = Query("all", description="all / greenhouse / lever / smartrecruiters"),
+    role_filter: str = Query("all", description="all / product / tpm_program / project / other"),
+    location_filter: str = Query("all", description="all / us / nonus"),
+    company_filter: str = Query("", description="подстрока в названии компании"),
+    search: str = Query("", description="поиск по title+location"),
+    states: str = Query("", description="Comma-separated US state codes or full names, e.g. NC,VA,South Carolina"),
+    include_remote_usa: bool = Query(False, description="Include Remote-USA roles in addition to state selection"),
+    state: str = Query("", description="(deprecated) Filter by state substring"),
+    city: str = Query("", description="Filter by city substring"),
+    geo_mode: str = Query("all", description="all / nc_priority / local_only / neighbor_only / remote_usa"),
+    refresh: bool = Query(False, description="Force refresh from ATS, ignore cache"),
+):
+    """
+    Основной эндпоинт: собирает вакансии по профилю и фильтрам.
+    """
+    # NEW: Check cache first (unless refresh=True)
+    cache_key = profile
+    cached = None if refresh else await run_blocking(load_cache, cache_key, ignore_ttl=True)
+    
+    if cached:
+        print(f"✅ Using cached data ({cached['jobs_count']} jobs)")
+        all_jobs = cached["jobs"]
+    else:
+        # Parse from companies
+        companies_cfg = await run_blocking(load_profile, profile)
+        all_jobs: list[dict] = []
+        
+        # Filter companies first
+        companies_to_fetch = []
+        for cfg in companies_cfg:
+            if cfg.get("enabled") == False:
+                continue
+            ats = cfg.get("ats", "")
+            if ats_filter != "all" and ats_filter != ats:
+                continue
+            companies_to_fetch.append(cfg)
+        
+        # Parallel fetch in the shared I/O executor (event loop stays free)
+        def fetch_company(cfg):
+            return _fetch_for_company(profile, cfg)
+        
+        async for cfg, jobs, error in gather_blocking(fetch_company, companies_to_fetch, limit=8):
+            if error:
+                print(f"Error fetching {cfg.get('company', 'unknown')}: {error}")
+            else:
+                all_jobs.extend(jobs)
+        
+        # Batch AI classification for titles the rule engine left as "unknown"
+        await run_blocking(classify_unknown_jobs, all_jobs)
+
+        # NEW: Save to cache after parsing all companies
+        await run_blocking(save_cache, cache_key, all_jobs)
+    
+    # Load status map once
+    status_map = await run_blocking(_load_job_status_map, profile)
+
+    # --- фильтры на уровне вакансий ---
+
+    # parse states CSV to normalized list of 2-letter codes
+    raw_states = [s.strip() for s in states.split(",") if s.strip()]
+    normalized_states: list[str] = []
+    for s in raw_states:
+        s_low = s.lower()
+        if s.upper() in STATE_MAP.values():
+            normalized_states.append(s.upper())
+        elif s_low in STATE_MAP:
+            normalized_states.append(STATE_MAP[s_low])
+        else:
+            normalized_states.append(s.upper())
+
+    states_set_upper = set(ns.upper() for ns in normalized_states)
+    cities_set = set([city.lower()]) if city else set()
+
+    def match_role(job: dict) -> bool:
+        if role_filter == "all":
+            return True
+        return job.get("role_family") == role_filter
+
+    def match_location(loc: str | None) -> bool:
+        if location_filter == "all":
+            return True
+        is_us = _is_us_location(loc)
+        if location_filter == "us":
+            return is_us
+        if location_filter == "nonus":
+            return not is_us
+        return True
+
+    def match_company(name: str | None) -> bool:
+        if not company_filter:
+            return True
+        if not name:
+            return False
+        return company_filter.lower() in name.lower()
+
+    def match_search(job: dict) -> bool:
+        if not search:
+            return True
+        s = search.lower()
+        haystack = f"{job.get('title', '')} {job.get('location', '')} {job.get('company', '')}".lower()
+        return s in haystack
+
+    def match_states(job: dict) -> bool:
+        loc_norm = job.get("location_norm", {}) or {}
+        # Collect job states as 2-letter codes where possible
+        job_states = []
+        if isinstance(loc_norm.get("states"), list):
+            job_states.extend([str(st).upper() for st in loc_norm.get("states") if st])
+        if loc_norm.get("state"):
+            job_states.append(str(loc_norm.get("state")).upper())
+        if loc_norm.get("state_full"):
+            sf = str(loc_norm.get("state_full")).lower()
+            if sf in STATE_MAP:
+                job_states.append(STATE_MAP[sf])
+
+        # Remote-USA flag
+        remote_usa = bool(loc_norm.get("remote")) and (str(loc_norm.get("remote_scope") or "").lower() in ["usa", "us"])
+        state_matches = any(ns in job_states for ns in states_set_upper)
+
+        # New behavior: states selection and remote toggle are independent.
+        if normalized_states and include_remote_usa:
+            return state_matches or remote_usa
+        if normalized_states and not include_remote_usa:
+            return state_matches
+        if not normalized_states and include_remote_usa:
+            return remote_usa
+        return True
+
+    def match_old_state(job: dict) -> bool:
+        # fallback old state substring filter
+        if not state:
+            return True
+        loc = job.get("location", "") or ""
+        return state.lower() in loc.lower()
+
+    def match_city(job: dict) -> bool:
+        if not city:
+            return True
+        loc_norm = job.get("location_norm", {}) or {}
+        if loc_norm:
+            return city.lower() == str(loc_norm.get("city") or "").lower()
+        loc = job.get("location", "") or ""
+        return city.lower() in loc.lower()
+
+    def match_geo(job: dict) -> bool:
+        bucket = job.get("geo_bucket", "unknown")
+        if geo_mode == "all":
+            return True
+        elif geo_mode == "nc_priority":
+            return bucket in ["local", "nc", "neighbor", "remote_usa"]
+        elif geo_mode == "local_only":
+            return bucket == "local"
+        elif geo_mode == "neighbor_only":
+            return bucket == "neighbor"
+        elif geo_mode == "remote_usa":
+            return bucket == "remote_usa"
+        return True
+
+    # Filter out previously rejected/excluded jobs
+    rejected_ids = await run_blocking(get_rejected_ids)
+
+    filter_started = time.perf_counter()
+    filtered: list[dict] = []
+    for j in all_jobs:
+        ats_job_id = j.get("ats_job_id") or ""
+        if ats_job_id and str(ats_job_id) in rejected_ids:
+            continue
+        if not match_role(j):
+            continue
+        if not match_states(j):
+            continue
+        if not match_old_state(j):
+            continue
+        if not match_city(j):
+            continue
+        if not match_geo(j):
+            continue
+        if not match_location(j.get("location")):
+            continue
+        if not match_company(j.get("company")):
+            continue
+        if not match_search(j):
+            continue
+        filtered.append(j)
+
+    # compute score and sort
+    def parse_date(datestr: str | None):
+        if not datestr:
+            return None
+        try:
+            ds = datestr
+            if ds.endswith("Z"):
+                ds = ds[:-1] + "+00:00"
+            dt = datetime.fromisoformat(ds)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.astimezone(timezone.utc)
+        except Exception:
+            return None
+
+    now = datetime.now(timezone.utc)
+    for job in filtered:
+        score = 0
+        loc_norm = job.get("location_norm", {}) or {}
+
+        job_state_upper = (loc_norm.get("state") or "").upper()
+        job_city_lower = (loc_norm.get("city") or "").lower()
+        job_remote_scope = (loc_norm.get("remote_scope") or "").lower()
+        job_remote = bool(loc_norm.get("remote"))
+
+        # Prefer explicit states/cities selections
+        if states_set_upper and job_state_upper in states_set_upper:
+            score += 30
+        if cities_set and job_city_lower in cities_set:
+            score += 15
+
+        # If include_remote_usa requested, give a boost
+        if include_remote_usa and job_remote_scope == "usa":
+            score += 20
+        if not states_set_upper and not city and job_remote:
+            score += 5
+
+        # Company priority
+        company_data = job.get("company_data") or {}
+        score += int(company_data.get("priority") or 0)
+
+        # Freshness penalty
+        updated = parse_date(job.get("updated_at"))
+        if updated:
+            age_days = (now - updated).days
+            if age_days > 60:
+                score -= 20
+            elif age_days > 30:
+                score -= 10
+
+        # Add geo_score as primary weight
+        score += int(job.get("geo_score", 0))
+
+        job["score"] = score
+
+        # Attach job_key + status
+        job_key = compute_job_key(job)
+        job["job_key"] = job_key
+        job["application_status"] = status_map.get(job_key, "New")
+
+    filtered.sort(key=lambda j: (j.get("score", 0), str(j.get("updated_at") or "")), reverse=True)
+    JOBS_FILTER_SECONDS.observe(time.perf_counter() - filter_started)
+
+    await run_blocking(_sync_pipeline, filtered)
+
+    return {"count": len(filtered), "jobs": filtered}
+
+
+def _sync_pipeline(filtered: list[dict]):
+    """Sync relevant jobs with pipeline storage (blocking file I/O, runs in the I/O executor)."""
+    try:
+        known_ids = get_all_job_ids()
+        active_ids = set()
+        seen_ids = set()
+        new_jobs = []
+        
+        for job in filtered:
+            job_id = job.get("id")
+            if not job_id:
+                continue
+            
+            active_ids.add(job_id)
+            
+            # Only sync jobs with relevant roles
+            role_family = job.get("role_family", "other")
+            if role_family not in ["product", "tpm_program", "project"]:
+                continue
+            
+            # Skip if role was excluded
+            if job.get("role_excluded"):
+                continue
+            
+            if job_id in known_ids:
+                # Already known - update last_seen
+                seen_ids.add(job_id)
+            else:
+                # New job - add to inbox
+                new_jobs.append(job)
+        
+        # Одна перезапись jobs_new.json на пачку, а не на каждую вакансию
+        add_jobs_bulk(new_jobs)
+        update_last_seen_bulk(seen_ids)
+        
+        # Mark missing jobs as potentially closed
+        mark_missing_jobs(active_ids, days_threshold=3)
+        
+    except Exception as e:
+        print(f"Pipeline sync error: {e}")
+
+
+@router.get("/jobs/review")
+def get_review_jobs(
+    date: str = Query(None, description="Filter by date (YYYY-MM-DD)"),
+    category: str = Query("unknown", description="unknown / excluded / all"),
+    search: str = Query("", description="Search in title, company, location"),
+    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
+    limit: int = Query(100, ge=10, le=500, description="Jobs per page"),
+):
+    """
+    Get Unknown + Excluded jobs with server-side pagination.
+    Much faster than loading all 7500 jobs.
+    """
+    # Load from cache
+    cache_key = "all"
+    cached = load_cache(cache_key, ignore_ttl=True)
+    
+    if not cached:
+        return {"error": "Cache not loaded. Run /jobs?refresh=true first.", "jobs": [], "total": 0}
+    
+    all_jobs = cached.get("jobs", [])
+
+    # Apply date filter
+    if date:
+        all_jobs = [j for j in all_jobs if str(j.get("updated_at", ""))[:10] == date]
+    
+    # Filter by role_category (unknown or excluded)
+    def get_category(job):
+        if job.get("role_category"):
+            return job["role_category"]
+        if job.get("role_excluded"):
+            return "excluded"
+        if job.get("role_id"):
+            return "primary"
+        return "unknown"
+    
+    if category == "all":
+        filtered = [j for j in all_jobs if get_category(j) in ["unknown", "excluded"]]
+    else:
+        filtered = [j for j in all_jobs if get_category(j) == category]
+    
+    # Filter by search
+    if search:
+        search_lower = search.lower()
+        filtered = [
+            j for j in filtered
+            if search_lower in (j.get("title", "") + " " + j.get("company", "") + " " + j.get("location", "")).lower()
+        ]
+    
+    # Pagination
+    total = len(filtered)
+    total_pages = (total + limit - 1) // limit  # ceiling division
+    start = (page - 1) * limit
+    end = start + limit
+    page_jobs = filtered[start:end]
+    
+    # Check which jobs are already in pipeline
+    pipeline_ids = get_all_job_ids()
+    for job in page_jobs:
+        job["in_pipeline"] = job.get("id") in pipeline_ids
+    
+    return {
+        "jobs": page_jobs,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "total_pages": total_pages,
+        "has_next": page < total_pages,
+        "has_prev": page > 1,
+    }
@@ -0,0 +1,407 @@
+"""
+Knowledge base router: /answers (answer library) and /api/v5/* (profile,
+knowledge base, learned answers, form schemas).
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from fastapi import APIRouter
+
+router = APIRouter(tags=["knowledge-base"])
+
+# Тяжёлые зависимости handler-ов, импортируются заранее при ROUTERS_WARMUP=1
+WARMUP_IMPORTS = ("anthropic",)
+
+
+@router.get("/answers")
+def get_answer_library():
+    """Get the full answer library."""
+    path = Path("data/answer_library.json")
+    if not path.exists():
+        return {"personal": {}, "links": {}, "answers": {}, "cover_letter_template": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+@router.put("/answers")
+def update_answer_library(data: dict):
+    """Update the answer library."""
+    path = Path("data/answer_library.json")
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True}
+
+
+@router.get("/answers/{category}/{key}")
+def get_answer(category: str, key: str):
+    """Get a specific answer."""
+    path = Path("data/answer_library.json")
+    if not path.exists():
+        return {"error": "Answer library not found"}
+    with open(path) as f:
+        data = json.load(f)
+    
+    if category in data and key in data[category]:
+        return {"value": data[category][key]}
+    return {"error": f"Key {category}/{key} not found"}
+
+
+# ============= V5 PROFILE / KNOWLEDGE BASE / LEARNED DB =============
+
+@router.get("/api/v5/profile")
+def get_v5_profile():
+    """Get personal profile (read-only) from V5 profile file."""
+    profile_path = Path("browser/profiles/anton_tpm.json")
+    if not profile_path.exists():
+        return {"error": "Profile not found"}
+    with open(profile_path) as f:
+        data = json.load(f)
+    # Return structured sections
+    return {
+        "personal": data.get("personal", {}),
+        "links": data.get("links", {}),
+        "demographics": data.get("demographics", {}),
+        "education": data.get("education", []),
+        "work_experience": data.get("work_experience", []),
+        "certifications": data.get("certifications", []),
+        "common_answers": data.get("common_answers", {}),
+        "work_authorization": data.get("work_authorization", {}),
+        "salary": data.get("salary", {}),
+        "availability": data.get("availability", {}),
+        "summary": data.get("summary", ""),
+    }
+
+
+@router.put("/api/v5/profile/work-experience")
+def update_work_experience(payload: dict):
+    """Update the work experience list in profile."""
+    profile_path = Path("browser/profiles/anton_tpm.json")
+    if not profile_path.exists():
+        return {"error": "Profile not found"}
+    with open(profile_path) as f:
+        data = json.load(f)
+
+    if "work_experience" in payload:
+        data["work_experience"] = payload["work_experience"]
+    with open(profile_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "count": len(data["work_experience"])}
+
+
+@router.patch("/api/v5/profile/work-experience/{index}")
+def update_single_work_experience(index: int, payload: dict):
+    """Update a single work experience entry by index."""
+    profile_path = Path("browser/profiles/anton_tpm.json")
+    if not profile_path.exists():
+        return {"error": "Profile not found"}
+    with open(profile_path) as f:
+        data = json.load(f)
+
+    work_exp = data.get("work_experience", [])
+    if index < 0 or index >= len(work_exp):
+        return {"error": f"Index {index} out of range (0-{len(work_exp)-1})"}
+
+    # Update fields that are provided
+    for key in ["company", "title", "start_month", "start_year",
+                 "end_month", "end_year", "current", "description"]:
+        if key in payload:
+            work_exp[index][key] = payload[key]
+
+    data["work_experience"] = work_exp
+    with open(profile_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "updated_index": index}
+
+
+@router.post("/api/v5/profile/work-experience")
+def add_work_experience(payload: dict):
+    """Add a new work experience entry."""
+    profile_path = Path("browser/profiles/anton_tpm.json")
+    if not profile_path.exists():
+        return {"error": "Profile not found"}
+    with open(profile_path) as f:
+        data = json.load(f)
+
+    entry = {
+        "company": payload.get("company", ""),
+        "title": payload.get("title", ""),
+        "start_month": payload.get("start_month", ""),
+        "start_year": payload.get("start_year", ""),
+        "end_month": payload.get("end_month", ""),
+        "end_year": payload.get("end_year", ""),
+        "current": payload.get("current", False),
+        "description": payload.get("description", ""),
+    }
+
+    work_exp = data.get("work_experience", [])
+    work_exp.append(entry)
+    data["work_experience"] = work_exp
+
+    with open(profile_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "added_index": len(work_exp) - 1}
+
+
+@router.delete("/api/v5/profile/work-experience/{index}")
+def delete_work_experience(index: int):
+    """Delete a work experience entry by index."""
+    profile_path = Path("browser/profiles/anton_tpm.json")
+    if not profile_path.exists():
+        return {"error": "Profile not found"}
+    with open(profile_path) as f:
+        data = json.load(f)
+
+    work_exp = data.get("work_experience", [])
+    if index < 0 or index >= len(work_exp):
+        return {"error": f"Index {index} out of range"}
+
+    removed = work_exp.pop(index)
+    data["work_experience"] = work_exp
+
+    with open(profile_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "deleted": removed.get("company", "")}
+
+
+@router.get("/api/v5/knowledge-base")
+def get_knowledge_base():
+    """Get the full knowledge base."""
+    kb_path = Path("browser/knowledge_base.json")
+    if not kb_path.exists():
+        return {"error": "Knowledge base not found"}
+    with open(kb_path) as f:
+        return json.load(f)
+
+
+@router.put("/api/v5/knowledge-base")
+def update_knowledge_base(data: dict):
+    """Update the full knowledge base."""
+    kb_path = Path("browser/knowledge_base.json")
+    with open(kb_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True}
+
+
+@router.patch("/api/v5/knowledge-base/common-answer/{key}")
+def update_common_answer(key: str, payload: dict):
+    """Update a single common answer by key."""
+    kb_path = Path("browser/knowledge_base.json")
+    if not kb_path.exists():
+        return {"error": "Knowledge base not found"}
+    with open(kb_path) as f:
+        data = json.load(f)
+
+    ca = data.get("common_answers", {})
+    if key not in ca:
+        return {"error": f"Common answer '{key}' not found"}
+
+    # Update answer text (and optionally keywords)
+    if "answer" in payload:
+        ca[key]["answer"] = payload["answer"]
+    if "keywords" in payload:
+        ca[key]["keywords"] = payload["keywords"]
+
+    data["common_answers"] = ca
+    with open(kb_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "updated": key}
+
+
+@router.patch("/api/v5/knowledge-base/snippet/{key}")
+def update_snippet(key: str, payload: dict):
+    """Update a single experience snippet by key."""
+    kb_path = Path("browser/knowledge_base.json")
+    if not kb_path.exists():
+        return {"error": "Knowledge base not found"}
+    with open(kb_path) as f:
+        data = json.load(f)
+
+    snippets = data.get("experience_snippets", {})
+    if key not in snippets:
+        return {"error": f"Snippet '{key}' not found"}
+
+    if "text" in payload:
+        snippets[key] = payload["text"]
+
+    data["experience_snippets"] = snippets
+    with open(kb_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "updated": key}
+
+
+@router.post("/api/v5/knowledge-base/snippet")
+def add_snippet(payload: dict):
+    """Add a new experience snippet."""
+    kb_path = Path("browser/knowledge_base.json")
+    if not kb_path.exists():
+        return {"error": "Knowledge base not found"}
+
+    key = payload.get("key", "").strip()
+    text = payload.get("text", "").strip()
+    if not key or not text:
+        return {"error": "Both 'key' and 'text' are required"}
+
+    with open(kb_path) as f:
+        data = json.load(f)
+
+    snippets = data.get("experience_snippets", {})
+    if key in snippets:
+        return {"error": f"Snippet '{key}' already exists. Use PATCH to update."}
+
+    snippets[key] = text
+    data["experience_snippets"] = snippets
+    with open(kb_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "added": key}
+
+
+@router.delete("/api/v5/knowledge-base/snippet/{key}")
+def delete_snippet(key: str):
+    """Delete an experience snippet by key."""
+    kb_path = Path("browser/knowledge_base.json")
+    if not kb_path.exists():
+        return {"error": "Knowledge base not found"}
+    with open(kb_path) as f:
+        data = json.load(f)
+
+    snippets = data.get("experience_snippets", {})
+    if key not in snippets:
+        return {"error": f"Snippet '{key}' not found"}
+
+    del snippets[key]
+    data["experience_snippets"] = snippets
+    with open(kb_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "deleted": key}
+
+
+@router.get("/api/v5/learned")
+def get_learned_database():
+    """Get the learned database (answers + dropdown choices)."""
+    db_path = Path("browser/learned_database.json")
+    if not db_path.exists():
+        return {"answers": {}, "dropdown_choices": {}}
+    with open(db_path) as f:
+        return json.load(f)
+
+
+@router.patch("/api/v5/learned/{section}/{key:path}")
+def update_learned_answer(section: str, key: str, payload: dict):
+    """Update a single learned answer or dropdown choice.
+    section: 'answers' or 'dropdown_choices'
+    key: the question key (URL-encoded)
+    """
+    db_path = Path("browser/learned_database.json")
+    if not db_path.exists():
+        return {"error": "Learned database not found"}
+
+    if section not in ("answers", "dropdown_choices"):
+        return {"error": f"Invalid section '{section}'. Use 'answers' or 'dropdown_choices'."}
+
+    with open(db_path) as f:
+        data = json.load(f)
+
+    entries = data.get(section, {})
+    if key not in entries:
+        return {"error": f"Key not found in {section}"}
+
+    if "value" in payload:
+        entries[key] = payload["value"]
+
+    data[section] = entries
+    with open(db_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "updated": key[:50]}
+
+
+@router.delete("/api/v5/learned/{section}/{key:path}")
+def delete_learned_answer(section: str, key: str):
+    """Delete a learned answer or dropdown choice."""
+    db_path = Path("browser/learned_database.json")
+    if not db_path.exists():
+        return {"error": "Learned database not found"}
+
+    if section not in ("answers", "dropdown_choices"):
+        return {"error": f"Invalid section '{section}'"}
+
+    with open(db_path) as f:
+        data = json.load(f)
+
+    entries = data.get(section, {})
+    if key not in entries:
+        return {"error": f"Key not found in {section}"}
+
+    del entries[key]
+    data[section] = entries
+    with open(db_path, "w") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return {"ok": True, "deleted": key[:50]}
+
+
+@router.post("/api/v5/improve-answer")
+def improve_answer_with_ai(payload: dict):
+    """
+    Improve an answer using Claude AI.
+    Expects: {question, current_answer, user_comment}
+    Returns: {ok, improved_answer}
+    """
+    import anthropic
+
+    question = payload.get("question", "")
+    current_answer = payload.get("current_answer", "")
+    user_comment = payload.get("user_comment", "")
+
+    if not current_answer or not user_comment:
+        return {"error": "Both 'current_answer' and 'user_comment' are required"}
+
+    client = anthropic.Anthropic()
+
+    prompt = f"""You are improving a job application answer.
+
+Question: {question}
+
+Current answer:
+{current_answer}
+
+User's instruction for improvement:
+{user_comment}
+
+Rules:
+- Keep the answer professional and concise
+- Maintain the factual content — do NOT invent experience or credentials
+- Apply the user's instruction faithfully
+- Return ONLY the improved answer text, nothing else
+- No markdown formatting, no quotes — just the plain answer text"""
+
+    try:
+        response = client.messages.create(
+            model="claude-sonnet-4-20250514",
+            max_tokens=1000,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        improved = response.content[0].text.strip()
+        return {"ok": True, "improved_answer": improved}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+@router.get("/api/v5/form-schemas")
+def get_form_schemas():
+    """Get form schema stats for all ATS types."""
+    from browser.v5.engine import FormSchemaDB
+    db = FormSchemaDB()
+    return {"ok": True, "schemas": db.data, "stats": db.get_stats()}
+
+
+@router.get("/api/v5/form-schemas/{ats_type}")
+def get_form_schema(ats_type: str):
+    """Get form schema for a specific ATS type."""
+    from browser.v5.engine import FormSchemaDB
+    db = FormSchemaDB()
+    schema = db.get_schema(ats_type)
+    if not schema:
+        return {"ok": False, "error": f"No schema for {ats_type}"}
+    return {"ok": True, "ats_type": ats_type, "schema": schema}
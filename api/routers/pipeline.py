@@ -0,0 +1,821 @@
+"""
+Pipeline router: /pipeline/* (jobs.json pipeline, JD enrichment, scoring,
+match batch), /jd/* and /job/find-by-url.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from fastapi import APIRouter, BackgroundTasks, Query
+from pydantic import BaseModel
+
+from storage.job_storage import (
+    STATUS_APPLIED,
+    STATUS_CLOSED,
+    STATUS_INTERVIEW,
+    STATUS_NEW,
+    add_job,
+    get_all_jobs,
+    get_archive_jobs,
+    get_job_by_id,
+    get_jobs_by_status,
+    get_jobs_by_statuses,
+    get_stats as get_job_stats,
+    update_status as job_update_status,
+)
+
+router = APIRouter(tags=["pipeline"])
+
+# Тяжёлые зависимости handler-ов, импортируются заранее при ROUTERS_WARMUP=1
+WARMUP_IMPORTS = ("api.prepare_application", "utils.ai_executor", "utils.job_scorer", "utils.semantic_index", "parsers.jd_parser")
+
+
+@router.get("/pipeline/stats")
+def pipeline_stats_endpoint():
+    """Get pipeline statistics"""
+    return get_job_stats()
+
+
+@router.get("/pipeline/all")
+def pipeline_all_endpoint(
+    date: str = Query(None, description="Filter by first_seen date (YYYY-MM-DD)"),
+    category: str = Query(None, description="Filter by role_category (primary/adjacent)"),
+    location: str = Query(None, description="Filter by location (us/nc/neighbor/remote)")
+):
+    """Get ALL jobs from storage with optional filters"""
+    all_jobs = get_all_jobs()
+    
+    # Apply date filter (by first_seen - when job was added to pipeline)
+    if date:
+        all_jobs = [j for j in all_jobs if str(j.get("first_seen", ""))[:10] == date]
+    
+    # Apply category filter
+    if category:
+        all_jobs = [j for j in all_jobs if j.get("role_category") == category]
+    
+    # Apply location filter
+    if location:
+        neighbor_states = {"VA", "SC", "GA", "TN"}
+        filtered = []
+        for j in all_jobs:
+            ln = j.get("location_norm", {}) or {}
+            state = (ln.get("state") or "").upper()
+            is_remote = ln.get("remote", False)
+            
+            if location == "us" and (state or is_remote):
+                filtered.append(j)
+            elif location == "nc" and state == "NC":
+                filtered.append(j)
+            elif location == "neighbor" and state in neighbor_states:
+                filtered.append(j)
+            elif location == "remote" and is_remote:
+                filtered.append(j)
+        all_jobs = filtered
+    
+    # Normalize folder_path to use ~/ for portability
+    import os
+    home = os.path.expanduser("~")
+    for j in all_jobs:
+        fp = j.get("folder_path", "")
+        if fp:
+            # Replace any /Users/xxx/ with ~/
+            if fp.startswith("/Users/"):
+                parts = fp.split("/")
+                if len(parts) > 2:
+                    j["folder_path"] = "~/" + "/".join(parts[3:])
+    
+    stats = get_job_stats()
+    from fastapi.responses import JSONResponse
+    return JSONResponse(
+        content={
+            "count": len(all_jobs),
+            "jobs": all_jobs,
+            "breakdown": stats["status_breakdown"]
+        },
+        headers={"Cache-Control": "no-store, no-cache, must-revalidate, max-age=0"}
+    )
+
+
+
+@router.get("/pipeline/new")
+def pipeline_new_endpoint():
+    """Get new (inbox) jobs"""
+    jobs = get_jobs_by_status(STATUS_NEW)
+    return {"count": len(jobs), "jobs": jobs}
+
+
+@router.get("/pipeline/active")
+def pipeline_active_endpoint():
+    """Get active pipeline jobs (Applied, Interview)"""
+    jobs = get_jobs_by_statuses({STATUS_APPLIED, STATUS_INTERVIEW, STATUS_CLOSED})
+    return {"count": len(jobs), "jobs": jobs}
+
+
+@router.get("/pipeline/archive")
+def pipeline_archive_endpoint():
+    """Get archived jobs (Rejected, Offer, Withdrawn)"""
+    jobs = get_archive_jobs()
+    return {"count": len(jobs), "jobs": jobs}
+
+
+class PipelineAddJob(BaseModel):
+    job: dict
+
+
+@router.post("/pipeline/add")
+def pipeline_add_job_endpoint(payload: PipelineAddJob):
+    """
+    Manually add a job to pipeline (for Unknown/Excluded jobs).
+    """
+    job = payload.job.copy()  # Don't modify original
+    job_id = job.get("id")
+    
+    if not job_id:
+        return {"ok": False, "error": "Job must have an id"}
+    
+    # Check if already in pipeline
+    existing = get_job_by_id(job_id)
+    if existing:
+        return {"ok": False, "error": "Job already in pipeline"}
+    
+    # Mark as manually added
+    job["source"] = "manual"
+    
+    # Add to pipeline
+    added = add_job(job)
+    
+    if added:
+        return {"ok": True, "job": job}
+    else:
+        return {"ok": False, "error": "Job already exists"}
+
+
+@router.delete("/pipeline/remove/{job_id}")
+def pipeline_remove_job_endpoint(job_id: str):
+    """
+    Remove a job from pipeline (for manual jobs).
+    Only removes jobs with source='manual'.
+    """
+    job = get_job_by_id(job_id)
+    
+    if not job:
+        return {"ok": False, "error": "Job not found"}
+    
+    # Only allow removing manual jobs
+    if job.get("source") != "manual":
+        return {"ok": False, "error": "Can only remove manually added jobs"}
+    
+    # Remove from jobs_new.json
+    try:
+        jobs_new_path = Path("data/jobs_new.json")
+        with open(jobs_new_path, "r") as f:
+            jobs = json.load(f)
+        
+        original_len = len(jobs)
+        jobs = [j for j in jobs if j.get("id") != job_id]
+        
+        if len(jobs) == original_len:
+            return {"ok": False, "error": "Job not found in storage"}
+        
+        with open(jobs_new_path, "w") as f:
+            json.dump(jobs, f, indent=2)
+        
+        return {"ok": True, "removed": job_id}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+class PipelineStatusUpdate(BaseModel):
+    job_id: str
+    status: str
+    notes: str = ""
+    folder_path: str = ""
+
+
+@router.post("/pipeline/status")
+def pipeline_status_update_endpoint(payload: PipelineStatusUpdate):
+    """
+    Update job status in pipeline.
+    Valid statuses: New, Selected, Ready, Applied, Interview, Offer, Rejected, Withdrawn, Closed
+    """
+    # Accept both capitalized and lowercase status values
+    status_map = {
+        "new": "new", "New": "new",
+        "selected": "Selected", "Selected": "Selected",
+        "ready": "Ready", "Ready": "Ready",
+        "applied": "applied", "Applied": "applied",
+        "interview": "interview", "Interview": "interview",
+        "offer": "offer", "Offer": "offer",
+        "rejected": "rejected", "Rejected": "rejected",
+        "excluded": "excluded", "Excluded": "excluded",
+        "withdrawn": "withdrawn", "Withdrawn": "withdrawn",
+        "closed": "closed", "Closed": "closed",
+    }
+    
+    normalized_status = status_map.get(payload.status)
+    if not normalized_status:
+        return {"ok": False, "error": f"Invalid status: {payload.status}"}
+    
+    job = job_update_status(payload.job_id, normalized_status, payload.notes, payload.folder_path)
+    
+    if job:
+        # Auto-parse JD and run match scoring when status changes to Selected
+        if normalized_status == "Selected":
+            jd_text_for_scoring = None
+
+            # Step 1: Parse JD if not yet done
+            if not job.get("jd_summary"):
+                try:
+                    from parsers.jd_parser import parse_and_store_jd, has_jd
+                    job_url = job.get("job_url") or job.get("url") or ""
+                    if job_url and not has_jd(payload.job_id):
+                        print(f"[Pipeline] Auto-parsing JD for {job.get('company')} - {job.get('title')}")
+                        result = parse_and_store_jd(
+                            job_id=payload.job_id,
+                            url=job_url,
+                            title=job.get("title", ""),
+                            company=job.get("company", ""),
+                            ats=job.get("ats", "greenhouse")
+                        )
+                        if result.get("ok") and result.get("summary"):
+                            job["jd_summary"] = result["summary"]
+                            jd_text_for_scoring = result.get("jd_text", "")
+                            job_update_status(payload.job_id, normalized_status, payload.notes, payload.folder_path, jd_summary=result["summary"])
+                except Exception as e:
+                    print(f"[Pipeline] JD parsing failed: {e}")
+
+            # Step 2: Run match scoring if JD exists but no score yet
+            if not job.get("match_score") and job.get("jd_summary"):
+                try:
+                    from api.prepare_application import analyze_job_with_ai
+                    # Get JD text - either from fresh parse or from stored file
+                    if not jd_text_for_scoring:
+                        from parsers.jd_parser import get_stored_jd
+                        jd_text_for_scoring = get_stored_jd(payload.job_id) or ""
+                    if jd_text_for_scoring and len(jd_text_for_scoring) > 100:
+                        role_family = job.get("role_family", "tpm_program")
+                        print(f"[Pipeline] Auto-scoring match for {job.get('company')} - {job.get('title')}")
+                        analysis = analyze_job_with_ai(job.get("title", ""), job.get("company", ""), jd_text_for_scoring, role_family)
+                        if analysis and "match_score" in analysis:
+                            job["match_score"] = analysis["match_score"]
+                            job["analysis"] = analysis
+                            # Save match score
+                            from storage.job_storage import _load_jobs, _save_jobs
+                            all_jobs = _load_jobs()
+                            for j in all_jobs:
+                                if j.get("id") == payload.job_id:
+                                    j["match_score"] = analysis["match_score"]
+                                    j["analysis"] = analysis
+                                    break
+                            _save_jobs(all_jobs)
+                            print(f"[Pipeline] Match score: {analysis['match_score']}%")
+                except Exception as e:
+                    print(f"[Pipeline] Match scoring failed: {e}")
+        
+        return {"ok": True, "job": job}
+    else:
+        return {"ok": False, "error": "Job not found"}
+
+
+@router.get("/pipeline/job/{job_id}")
+def pipeline_get_job_endpoint(job_id: str):
+    """Get job by ID from any storage"""
+    job = get_job_by_id(job_id)
+    if job:
+        return {"ok": True, "job": job}
+    else:
+        return {"ok": False, "error": "Job not found"}
+
+
+@router.post("/pipeline/enrich/{job_id}")
+def enrich_job_endpoint(job_id: str):
+    """
+    Enrich a pipeline job with extra data from ATS job detail API.
+    Currently supports Workday: fetches deadline, salary, posted date.
+    """
+    from storage.job_storage import get_job_by_id, _load_jobs, _save_jobs
+
+    job = get_job_by_id(job_id)
+    if not job:
+        return {"ok": False, "error": "Job not found"}
+
+    ats = job.get("ats", "")
+    job_url = job.get("job_url") or job.get("url", "")
+
+    if ats == "workday" and "myworkdayjobs.com" in job_url:
+        from parsers.workday import fetch_workday_job_detail
+        detail = fetch_workday_job_detail(job_url)
+        if detail:
+            # Update job in storage
+            jobs = _load_jobs()
+            for j in jobs:
+                if j.get("id") == job_id:
+                    if detail.get("deadline"):
+                        j["deadline"] = detail["deadline"]
+                    if detail.get("start_date") and not j.get("updated_at"):
+                        j["updated_at"] = detail["start_date"]
+                        j["first_published"] = detail["start_date"]
+                    if detail.get("time_left"):
+                        j["time_left"] = detail["time_left"]
+                    if detail.get("salary_range"):
+                        j["salary_range"] = detail["salary_range"]
+                    if detail.get("posted_on"):
+                        j["posted_on_raw"] = detail["posted_on"]
+                    j["enriched"] = True
+                    _save_jobs(jobs)
+                    return {"ok": True, "enriched": detail, "job": j}
+            return {"ok": False, "error": "Job not found in storage"}
+        return {"ok": False, "error": "Could not fetch job details from Workday"}
+
+    return {"ok": False, "error": f"Enrichment not supported for ATS: {ats}"}
+
+
+@router.post("/pipeline/enrich-batch")
+def enrich_batch_endpoint(background_tasks: BackgroundTasks):
+    """
+    Batch enrich all unenriched Workday jobs in pipeline.
+    Runs in background to avoid timeout.
+    """
+    from storage.job_storage import _load_jobs, _save_jobs
+
+    jobs = _load_jobs()
+    to_enrich = [j for j in jobs if j.get("ats") == "workday"
+                 and not j.get("enriched")
+                 and "myworkdayjobs.com" in (j.get("job_url") or j.get("url", ""))]
+
+    if not to_enrich:
+        return {"ok": True, "message": "No jobs to enrich", "total": 0}
+
+    def _do_batch_enrich():
+        import time
+        from parsers.workday import fetch_workday_job_detail
+        from storage.job_storage import _load_jobs as load_j, _save_jobs as save_j
+
+        all_jobs = load_j()
+        job_map = {j.get("id"): j for j in all_jobs}
+        enriched_count = 0
+        error_count = 0
+
+        for target in to_enrich:
+            job_id = target.get("id")
+            job_url = target.get("job_url") or target.get("url", "")
+            try:
+                detail = fetch_workday_job_detail(job_url, timeout=10)
+                if detail and job_id in job_map:
+                    j = job_map[job_id]
+                    if detail.get("deadline"):
+                        j["deadline"] = detail["deadline"]
+                    if detail.get("start_date") and not j.get("updated_at"):
+                        j["updated_at"] = detail["start_date"]
+                        j["first_published"] = detail["start_date"]
+                    if detail.get("time_left"):
+                        j["time_left"] = detail["time_left"]
+                    if detail.get("salary_range"):
+                        j["salary_range"] = detail["salary_range"]
+                    j["enriched"] = True
+                    enriched_count += 1
+                else:
+                    error_count += 1
+            except Exception:
+                error_count += 1
+            time.sleep(0.5)
+
+            # Save every 20 jobs
+            if (enriched_count + error_count) % 20 == 0:
+                save_j(list(job_map.values()))
+                print(f"[Enrich] Progress: {enriched_count} enriched, {error_count} errors")
+
+        save_j(list(job_map.values()))
+        print(f"[Enrich] Done: {enriched_count} enriched, {error_count} errors out of {len(to_enrich)}")
+
+    background_tasks.add_task(_do_batch_enrich)
+    return {"ok": True, "message": f"Enriching {len(to_enrich)} Workday jobs in background", "total": len(to_enrich)}
+
+
+@router.post("/pipeline/fetch-jd-batch")
+def fetch_jd_batch_endpoint(background_tasks: BackgroundTasks, limit: int = Query(default=200)):
+    """
+    Batch fetch JD text from ATS APIs. FREE, no Claude API calls.
+    Downloads JD HTML/text and saves to data/jd/{job_id}.txt
+    """
+    from storage.job_storage import _load_jobs
+    from parsers.jd_parser import fetch_jd_from_url, save_jd_text
+
+    jd_dir = Path("data/jd")
+    jd_dir.mkdir(exist_ok=True)
+    cached = {f.stem for f in jd_dir.glob("*.txt")}
+
+    jobs = _load_jobs()
+    to_fetch = [
+        j for j in jobs
+        if j.get("id") and j["id"] not in cached
+        and (j.get("job_url") or j.get("url"))
+        and j.get("role_category") in ("primary", "adjacent")
+    ]
+    # Newest first
+    to_fetch.sort(key=lambda j: j.get("first_seen") or j.get("added_at") or "", reverse=True)
+    batch = to_fetch[:limit]
+
+    if not batch:
+        return {"ok": True, "message": "All JDs already cached", "total": 0, "cached": len(cached)}
+
+    def _do_fetch():
+        import time
+        success = 0
+        errors = 0
+        for job in batch:
+            job_id = job.get("id", "")
+            url = job.get("job_url") or job.get("url", "")
+            ats = job.get("ats", "")
+            try:
+                jd_text = fetch_jd_from_url(url, ats)
+                if jd_text and len(jd_text) > 50:
+                    save_jd_text(job_id, jd_text)
+                    success += 1
+                else:
+                    errors += 1
+            except Exception:
+                errors += 1
+            time.sleep(0.3)
+        print(f"[FetchJD] Done: {success} success, {errors} errors")
+
+    background_tasks.add_task(_do_fetch)
+    return {
+        "ok": True,
+        "message": f"Fetching {len(batch)} JDs in background (FREE)",
+        "total": len(batch),
+        "remaining": len(to_fetch) - len(batch),
+        "cached": len(cached),
+    }
+
+
+@router.post("/pipeline/kw-score")
+def kw_score_endpoint():
+    """
+    Run keyword scorer on all pipeline jobs. FREE, no API calls.
+    Uses cached JD text files if available, otherwise title+location only.
+    """
+    from utils.job_scorer import score_jobs_batch
+    from storage.job_storage import _load_jobs, _save_jobs
+
+    jobs = _load_jobs()
+    unscored = [j for j in jobs if not j.get("kw_score")]
+    if not unscored:
+        return {"ok": True, "message": "All jobs already scored", "total": 0}
+
+    score_jobs_batch(unscored)
+    scored = sum(1 for j in unscored if j.get("kw_score"))
+
+    # Merge back
+    job_map = {j["id"]: j for j in unscored if j.get("id")}
+    for j in jobs:
+        if j.get("id") in job_map:
+            j.update(job_map[j["id"]])
+    _save_jobs(jobs)
+
+    from collections import Counter
+    recs = Counter(j.get("kw_recommendation", "?") for j in unscored if j.get("kw_score"))
+    return {
+        "ok": True,
+        "message": f"Scored {scored} jobs",
+        "total": scored,
+        "apply": recs.get("APPLY", 0),
+        "consider": recs.get("CONSIDER", 0),
+        "skip": recs.get("SKIP", 0),
+    }
+
+
+@router.post("/pipeline/semantic-score")
+def semantic_score_endpoint(rebuild: bool = Query(False, description="Re-embed all of data/jd from scratch")):
+    """
+    Local semantic JD↔CV similarity for every pipeline job with a cached JD. FREE, no API calls.
+    Embeds new data/jd files incrementally, then scores all jobs in one vectorized pass.
+    match-batch spends the LLM on the highest semantic_score jobs first.
+    """
+    try:
+        from utils.semantic_index import get_index, score_jobs
+    except ImportError as e:
+        return {"ok": False, "error": f"Semantic matching unavailable: {e}"}
+    from storage.job_storage import _load_jobs, _save_jobs
+    import time
+
+    t0 = time.time()
+    index = get_index()
+    added = index.rebuild() if rebuild else index.sync_dir()
+    jobs = _load_jobs()
+    scores = score_jobs(jobs, sync=False)
+    if scores:
+        _save_jobs(jobs)
+
+    top = sorted((j for j in jobs if j.get("id") in scores), key=lambda j: j["semantic_score"], reverse=True)[:10]
+    return {
+        "ok": True,
+        "embedder": index.embedder.name,
+        "indexed_docs": len(index.meta["docs"]),
+        "newly_indexed": added,
+        "scored": len(scores),
+        "elapsed_sec": round(time.time() - t0, 2),
+        "top": [{"id": j["id"], "company": j.get("company"), "title": j.get("title"), "semantic_score": j["semantic_score"]} for j in top],
+    }
+
+
+# Progress of the last /pipeline/match-batch run (AIBatchExecutor.progress() snapshot)
+MATCH_BATCH_STATUS: dict = {"running": False}
+_match_batch_executor = None
+
+
+@router.post("/pipeline/match-batch")
+def match_batch_endpoint(
+    background_tasks: BackgroundTasks,
+    limit: int = Query(default=50),
+    days: int = Query(default=0),
+    workers: int = Query(default=4, ge=1, le=16),
+    budget_usd: float = Query(default=2.0, gt=0),
+    semantic_first: bool = Query(default=True),
+):
+    """
+    Batch compute match scores for pipeline jobs without scores.
+    Fetches JD (no AI) and runs ONE merged AI call per job (match analysis + JD summary)
+    through AIBatchExecutor: bounded concurrency, rpm/tpm token buckets,
+    retry with jitter on 429/529, hard cost budget.
+    limit: max jobs to process (default 50, each costs ~1 API call)
+    days: only score jobs added in last N days (0 = all)
+    workers: concurrent jobs in flight
+    budget_usd: hard cap on AI spend for this batch
+    semantic_first: order candidates by local semantic_score before applying limit
+    Progress: GET /pipeline/match-batch/status
+    """
+    global _match_batch_executor
+    from storage.job_storage import _load_jobs
+    from datetime import datetime, timedelta
+    from utils.ai_executor import AIBatchExecutor, estimate_cost, estimate_tokens
+
+    if _match_batch_executor and _match_batch_executor.stats.get("running"):
+        return {"ok": False, "error": "Match batch already running", "status": _match_batch_executor.progress()}
+
+    jobs = _load_jobs()
+    to_score = [j for j in jobs if j.get("status") == "new"
+                and not j.get("match_score")
+                and (j.get("job_url") or j.get("url"))
+                and j.get("role_category") in ["primary", "adjacent"]]
+
+    # Filter by recency if days specified
+    if days > 0:
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        to_score = [j for j in to_score if (j.get("added_at") or j.get("first_published") or "") >= cutoff]
+
+    # Spend the LLM on the best local semantic matches first (see /pipeline/semantic-score)
+    if semantic_first:
+        to_score.sort(key=lambda j: j.get("semantic_score", -1), reverse=True)
+
+    # Limit to prevent excessive API costs
+    batch = to_score[:limit]
+    if not batch:
+        return {"ok": True, "message": "No jobs to score", "total": 0, "remaining": 0}
+
+    executor = AIBatchExecutor(max_workers=workers, budget_usd=budget_usd)
+    executor.stats.update({"total": len(batch), "running": True})
+    _match_batch_executor = executor
+    # ~CV 4k + JD 6k + instructions 3k chars in, merged JSON out
+    est_per_job = estimate_cost(estimate_tokens("x" * 13000), 1200, executor.model)
+
+    def _do_batch_match():
+        import threading
+        from parsers.jd_parser import fetch_jd_from_url, save_jd_text
+        from api.prepare_application import analyze_job_with_ai
+        from storage.job_storage import _load_jobs as load_j, _save_jobs as save_j
+
+        all_jobs = load_j()
+        job_map = {j.get("id"): j for j in all_jobs}
+        lock = threading.Lock()
+
+        def _score_one(target: dict):
+            job_id = target.get("id")
+            job_url = target.get("job_url") or target.get("url", "")
+            title = target.get("title", "")
+            company = target.get("company", "")
+
+            # Step 1: Fetch JD (plain HTTP, no AI)
+            jd_text = fetch_jd_from_url(job_url, target.get("ats", ""))
+            if not jd_text or len(jd_text) < 100:
+                return None
+            save_jd_text(job_id, jd_text)
+
+            # Step 2: One AI call = match analysis + JD summary
+            role_family = target.get("role_family", "tpm_program")
+            analysis = analyze_job_with_ai(
+                title, company, jd_text, role_family,
+                include_jd_summary=True, call_fn=executor.call,
+            )
+            if not analysis or "match_score" not in analysis:
+                return None
+            return analysis
+
+        def _on_result(target: dict, analysis):
+            job_id = target.get("id")
+            with lock:
+                if analysis and job_id in job_map:
+                    jd_summary = analysis.pop("jd_summary", None) or {}
+                    if jd_summary:
+                        jd_summary["ai_analyzed"] = True
+                        jd_summary["parsed_at"] = datetime.now().isoformat()
+                        jd_summary["jd_file"] = f"{job_id}.txt"
+                        job_map[job_id]["jd_summary"] = jd_summary
+                    job_map[job_id]["match_score"] = analysis["match_score"]
+                    job_map[job_id]["analysis"] = analysis
+                    print(f"[Match] {target.get('company', '')} | {target.get('title', '')[:40]} → {analysis['match_score']}%")
+                MATCH_BATCH_STATUS.update(executor.progress())
+                # Save every 20 jobs
+                if MATCH_BATCH_STATUS["done"] % 20 == 0:
+                    save_j(list(job_map.values()))
+                    print(f"[Match] Progress: {MATCH_BATCH_STATUS['ok']} scored, {MATCH_BATCH_STATUS['errors']} errors")
+
+        executor.map(_score_one, batch, on_result=_on_result)
+
+        with lock:
+            save_j(list(job_map.values()))
+            MATCH_BATCH_STATUS.update(executor.progress())
+        p = MATCH_BATCH_STATUS
+        print(f"[Match] Done: {p['ok']} scored, {p['errors']} errors, "
+              f"{p['skipped_budget']} skipped (budget) out of {len(batch)}, cost ${p['cost_usd']:.4f}")
+
+    MATCH_BATCH_STATUS.clear()
+    MATCH_BATCH_STATUS.update(executor.progress())
+    background_tasks.add_task(_do_batch_match)
+    return {
+        "ok": True,
+        "message": f"Scoring {len(batch)} jobs in background ({workers} workers, budget ${budget_usd:.2f})",
+        "total": len(batch),
+        "remaining": len(to_score) - len(batch),
+        "estimated_cost_usd": round(min(est_per_job * len(batch), budget_usd), 4),
+    }
+
+
+@router.get("/pipeline/match-batch/status")
+def match_batch_status_endpoint():
+    """Progress, token usage and (projected) cost of the current/last match batch."""
+    if _match_batch_executor:
+        MATCH_BATCH_STATUS.update(_match_batch_executor.progress())
+    return MATCH_BATCH_STATUS
+
+
+class ParseJDRequest(BaseModel):
+    job_id: str
+    url: str
+    title: str
+    company: str
+    ats: str = "greenhouse"
+
+
+@router.post("/jd/parse")
+def parse_jd_endpoint(payload: ParseJDRequest):
+    """
+    Parse job description from URL and extract structured summary.
+    Saves full text to data/jd/{job_id}.txt and returns summary.
+    """
+    try:
+        from parsers.jd_parser import parse_and_store_jd
+        
+        result = parse_and_store_jd(
+            job_id=payload.job_id,
+            url=payload.url,
+            title=payload.title,
+            company=payload.company,
+            ats=payload.ats
+        )
+        
+        if result.get("ok"):
+            # Initialize variables
+            match_score = None
+            analysis = None
+
+            # Update job in storage with jd_summary
+            job = get_job_by_id(payload.job_id)
+            if job:
+                # Use storage function to save jd_summary
+                from storage.job_storage import update_jd_summary, _load_jobs, _save_jobs
+                update_jd_summary(payload.job_id, result["summary"])
+
+                jd_text = result.get("jd_text", "")
+                if jd_text and len(jd_text) > 100:
+                    try:
+                        from api.prepare_application import analyze_job_with_ai
+                        role_family = job.get("role_family", "tpm_program")
+                        analysis = analyze_job_with_ai(payload.title, payload.company, jd_text, role_family)
+                        if analysis and "match_score" in analysis:
+                            match_score = analysis["match_score"]
+                            # Save match_score to job
+                            jobs = _load_jobs()
+                            for j in jobs:
+                                if j.get("id") == payload.job_id:
+                                    j["match_score"] = match_score
+                                    j["analysis"] = analysis
+                                    break
+                            _save_jobs(jobs)
+                    except Exception as e:
+                        print(f"AI analysis error: {e}")
+
+            return {
+                "ok": True,
+                "summary": result["summary"],
+                "jd_preview": result.get("jd_text", "")[:500] + "...",
+                "match_score": match_score,
+                "analysis": analysis
+            }
+        else:
+            return {"ok": False, "error": result.get("error", "Unknown error")}
+            
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+@router.get("/jd/{job_id}")
+def get_jd_endpoint(job_id: str):
+    """Get stored JD for a job"""
+    try:
+        from parsers.jd_parser import get_stored_jd, has_jd
+        
+        if not has_jd(job_id):
+            return {"ok": False, "error": "JD not found"}
+        
+        jd_text = get_stored_jd(job_id)
+        job = get_job_by_id(job_id)
+        
+        return {
+            "ok": True,
+            "jd_text": jd_text,
+            "summary": job.get("jd_summary") if job else None
+        }
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+@router.get("/job/find-by-url")
+def find_job_by_url_endpoint(url: str = Query(..., description="Job URL to search")):
+    """
+    Search for a job by URL in all storages (pipeline, cache, etc.)
+    Returns job if found, or not_found status.
+    """
+    url = url.strip()
+    if not url:
+        return {"ok": False, "error": "URL is required"}
+    
+    # Normalize URL for comparison
+    from urllib.parse import urlparse, parse_qs
+    parsed = urlparse(url)
+    
+    # Extract job ID from URL based on ATS patterns
+    job_id = None
+    qs = parse_qs(parsed.query)
+    
+    # Greenhouse: gh_jid parameter, token parameter, or /jobs/NUMBER
+    if "gh_jid" in url:
+        job_id = qs.get("gh_jid", [None])[0]
+    elif "token" in qs:
+        # Greenhouse embed format: ?token=7404427&for=coinbase
+        job_id = qs.get("token", [None])[0]
+    elif "/jobs/" in parsed.path:
+        # Extract number from path like /jobs/12345
+        import re
+        match = re.search(r'/jobs/(\d+)', parsed.path)
+        if match:
+            job_id = match.group(1)
+    
+    # Lever: last segment of path
+    if "lever.co" in parsed.netloc:
+        job_id = parsed.path.rstrip('/').split('/')[-1]
+    
+    # SmartRecruiters: last segment
+    if "smartrecruiters.com" in parsed.netloc:
+        job_id = parsed.path.rstrip('/').split('/')[-1]
+    
+    # Search in all jobs
+    all_jobs = get_all_jobs()
+    
+    for job in all_jobs:
+        job_url = job.get("job_url", "") or job.get("url", "")
+        ats_job_id = str(job.get("ats_job_id", ""))
+        
+        # Skip jobs without URL
+        if not job_url:
+            continue
+        
+        # Match by exact URL
+        if url in job_url or job_url in url:
+            return {"ok": True, "found": True, "job": job}
+        
+        # Match by job ID
+        if job_id and ats_job_id == job_id:
+            return {"ok": True, "found": True, "job": job}
+    
+    return {"ok": True, "found": False, "message": "Job not found in database"}
+
+
+@router.get("/pipeline/attention")
+def pipeline_attention_endpoint():
+    """Get jobs that need attention (Closed, etc.)"""
+    all_jobs = get_all_jobs()
+    attention = [j for j in all_jobs if j.get("needs_attention")]
+    return {"count": len(attention), "jobs": attention}
@@ -5,11 +5,29 @@ ATS Detector - автоматическое обнаружение и ремон
 1. detect_ats(careers_url) - определить ATS по careers странице
 2. try_repair_company(company_data) - попытаться найти рабочий URL для компании с ошибкой
 3. repair_all_broken() - починить все компании с ошибками в companies.json
+4. get_repair_queue().submit(company, on_result) - ремонт в фоне, не на пути fetch
+
+Repair probes (careers_url, guessed careers pages, direct Greenhouse/Lever/
+Ashby API) run in parallel; the first verified hit wins and the rest are
+dropped. Failed probes are remembered per (company, URL) for
+PROBE_NEGATIVE_TTL seconds (data/ats_probe_cache.json), so dead URLs are not
+probed again on every daemon cycle.
+
+verify_ats_url / verify_and_count_jobs use the lightest request each ATS
+supports (HEAD, 1-item page with a total, streamed count with early abort)
+and cache results for ATS_VERIFY_TTL seconds; verify_many() checks a list
+in parallel.
 """
+import os
 import re
 import json
+import queue
+import threading
+import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
 from pathlib import Path
+from typing import Callable, Optional
 from urllib.parse import urlparse
 
 ATS_PATTERNS = {
@@ -90,6 +108,8 @@ def detect_ats(careers_url: str):
         
         return None
         
+    except requests.HTTPError as e:
+        return {"error": str(e), "status": e.response.status_code if e.response is not None else None}
     except Exception as e:
         return {"error": str(e)}
 
@@ -120,53 +140,220 @@ def build_api_url(ats: str, board_id: str) -> str:
     return urls.get(ats, "")
 
 
-def verify_ats_url(board_url: str) -> bool:
-    """Проверяет что ATS URL работает и возвращает данные"""
+# ===== Verification: lightest request each ATS supports + TTL cache =====
+#
+# Existence → HEAD (GET with stream=True if HEAD is rejected, body never read).
+# Job count → a total field from a 1-item page where the API has one
+# (SmartRecruiters totalFound, Workday total, Phenom totalHits, Jibe totalCount);
+# boards without a total (Greenhouse, Lever, Ashby) are streamed and a per-job
+# marker is counted in the raw bytes — no JSON parse, and with at_least the
+# download stops as soon as enough jobs have been seen.
+
+VERIFY_TTL = int(os.getenv("ATS_VERIFY_TTL", "3600"))
+VERIFY_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; JobTracker/1.0)"}
+STREAM_CHUNK = 16 * 1024
+VERIFY_WORKERS = 16
+
+# Один маркер на вакансию в JSON борда
+JOB_MARKERS = {
+    "greenhouse": b'"absolute_url"',
+    "lever": b'"hostedUrl"',
+    "ashby": b'"jobUrl"',
+}
+
+
+class VerifyCache:
+    """(kind, url) → result, valid for ttl seconds. In-memory, shared by all callers."""
+
+    def __init__(self, ttl: int = VERIFY_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and time.time() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time(), value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def info(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
+
+
+_verify_cache = VerifyCache()
+
+
+def get_verify_cache() -> VerifyCache:
+    return _verify_cache
+
+
+def _url_status(url: str, timeout: float = 10) -> int:
+    resp = requests.head(url, headers=VERIFY_HEADERS, timeout=timeout, allow_redirects=True)
+    if resp.status_code in (403, 405, 501):
+        # HEAD не поддерживается — GET, но тело не читаем
+        resp = requests.get(url, headers=VERIFY_HEADERS, timeout=timeout, stream=True)
+        resp.close()
+    return resp.status_code
+
+
+def _url_exists(url: str, timeout: float = 10) -> bool:
+    return _url_status(url, timeout) == 200
+
+
+def verify_ats_url(board_url: str, timeout: float = 10) -> bool:
+    """Проверяет что ATS URL отвечает 200 (HEAD, кэш VERIFY_TTL)"""
     if not board_url:
         return False
+    key = ("exists", board_url)
+    cached = _verify_cache.get(key)
+    if cached is not None:
+        return cached
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; JobTracker/1.0)"}
-        resp = requests.get(board_url, headers=headers, timeout=10)
-        return resp.status_code == 200
-    except:
-        return False
+        ok = _url_exists(board_url, timeout)
+    except Exception:
+        return False  # сетевые ошибки не кэшируем
+    _verify_cache.put(key, ok)
+    return ok
+
+
+def _stream_count(resp, marker: bytes, at_least: Optional[int] = None) -> int:
+    """Count marker occurrences in a streamed body; stop early once at_least is reached."""
+    count, tail = 0, b""
+    try:
+        for chunk in resp.iter_content(STREAM_CHUNK):
+            buf = tail + chunk
+            count += buf.count(marker)
+            tail = buf[-(len(marker) - 1):]
+            if at_least is not None and count >= at_least:
+                break
+    finally:
+        resp.close()
+    return count
+
+
+def _count_streamed(ats: str, board_url: str, at_least: Optional[int]) -> int:
+    api_url = build_api_url(ats, board_url.rstrip("/").split("/")[-1])
+    resp = requests.get(api_url, headers=VERIFY_HEADERS, timeout=15, stream=True)
+    if resp.status_code != 200:
+        resp.close()
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    return _stream_count(resp, JOB_MARKERS[ats], at_least)
+
+
+def _count_smartrecruiters(board_url: str) -> int:
+    api_url = build_api_url("smartrecruiters", board_url.rstrip("/").split("/")[-1])
+    resp = requests.get(api_url, params={"limit": 1}, headers=VERIFY_HEADERS, timeout=15)
+    if resp.status_code != 200:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    return int(resp.json().get("totalFound", 0))
+
 
+def _count_workday(board_url: str) -> int:
+    from parsers.workday import parse_workday_url
 
-def verify_and_count_jobs(ats: str, board_url: str) -> dict:
+    api_url, base_url, _ = parse_workday_url(board_url)
+    if not api_url:
+        raise RuntimeError("Invalid Workday URL")
+    session = requests.Session()
+    session.headers.update({**VERIFY_HEADERS, "Accept": "application/json", "Content-Type": "application/json"})
+    payload = {"appliedFacets": {}, "limit": 1, "offset": 0, "searchText": ""}
+    resp = session.post(api_url, json=payload, timeout=15)
+    if resp.status_code != 200:
+        # Некоторым tenant нужны cookies главной страницы — берём только заголовки
+        session.get(base_url, timeout=15, stream=True).close()
+        resp = session.post(api_url, json=payload, timeout=15)
+    if resp.status_code != 200:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    return int(resp.json().get("total", 0))
+
+
+def _count_phenom(board_url: str) -> int:
+    parsed = urlparse(board_url)
+    origin = f"{parsed.scheme or 'https'}://{parsed.netloc}"
+    us = parsed.path.strip("/").startswith("us/")
+    payload = {
+        "lang": "en_us" if us else "en_global", "country": "us" if us else "global",
+        "siteType": "external", "deviceType": "desktop", "ddoKey": "refineSearch",
+        "from": 0, "size": 1, "jobs": True, "counts": True, "clearAll": False,
+        "jdsource": "facets", "locationData": {},
+    }
+    headers = {**VERIFY_HEADERS, "Accept": "application/json", "Content-Type": "application/json", "Origin": origin}
+    resp = requests.post(f"{origin}/widgets", json=payload, headers=headers, timeout=15)
+    if resp.status_code != 200:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    return int(resp.json().get("refineSearch", {}).get("totalHits", 0))
+
+
+def _count_jibe(board_url: str) -> int:
+    parsed = urlparse(board_url)
+    api_url = f"{parsed.scheme or 'https'}://{parsed.netloc}/api/jobs"
+    resp = requests.get(api_url, params={"page": 1, "limit": 1},
+                        headers={**VERIFY_HEADERS, "Accept": "application/json"}, timeout=15)
+    if resp.status_code != 200:
+        raise RuntimeError(f"HTTP {resp.status_code}")
+    return int(resp.json().get("totalCount", 0))
+
+
+COUNTERS = {
+    "smartrecruiters": _count_smartrecruiters,
+    "workday": _count_workday,
+    "phenom": _count_phenom,
+    "jibe": _count_jibe,
+}
+
+
+def verify_and_count_jobs(ats: str, board_url: str, at_least: Optional[int] = None) -> dict:
     """
     Verify ATS URL works AND count jobs returned.
-    Returns: {"ok": bool, "jobs_count": int, "error": str}
+    at_least=N — для "есть ли вакансии": стриминг обрывается после N-й вакансии
+    (jobs_count тогда = N, а не полный размер борда).
+    Returns: {"ok": bool, "jobs_count": int, "error": str, "method": str}
     """
-    api_url = build_api_url(ats, board_url.split('/')[-1]) if board_url else ""
-    
-    if not api_url:
-        return {"ok": False, "jobs_count": 0, "error": "No API URL"}
-    
+    if not board_url:
+        return {"ok": False, "jobs_count": 0, "error": "No API URL", "method": ""}
+
+    key = ("count", ats, board_url, at_least)
+    cached = _verify_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (compatible; JobTracker/1.0)"}
-        resp = requests.get(api_url, headers=headers, timeout=15)
-        
-        if resp.status_code != 200:
-            return {"ok": False, "jobs_count": 0, "error": f"HTTP {resp.status_code}"}
-        
-        data = resp.json()
-        
-        # Count jobs based on ATS format
-        if ats == "greenhouse":
-            jobs_count = len(data.get("jobs", []))
-        elif ats == "lever":
-            jobs_count = len(data) if isinstance(data, list) else 0
-        elif ats == "ashby":
-            jobs_count = len(data.get("jobs", []))
-        elif ats == "smartrecruiters":
-            jobs_count = len(data.get("content", []))
+        if ats in JOB_MARKERS:
+            method, jobs_count = "stream", _count_streamed(ats, board_url, at_least)
+        elif ats in COUNTERS:
+            method, jobs_count = "total", COUNTERS[ats](board_url)
+        elif _url_exists(board_url):
+            method, jobs_count = "head", 0
         else:
-            jobs_count = 0
-        
-        return {"ok": True, "jobs_count": jobs_count, "error": None}
-        
+            return {"ok": False, "jobs_count": 0, "error": "URL not reachable", "method": "head"}
     except Exception as e:
-        return {"ok": False, "jobs_count": 0, "error": str(e)}
+        return {"ok": False, "jobs_count": 0, "error": str(e), "method": ""}
+
+    if at_least is not None:
+        jobs_count = min(jobs_count, at_least)
+    result = {"ok": True, "jobs_count": jobs_count, "error": None, "method": method}
+    _verify_cache.put(key, result)
+    return dict(result)
+
+
+def verify_many(items: list, workers: int = VERIFY_WORKERS, at_least: Optional[int] = None) -> list:
+    """[(ats, board_url), ...] → results in the same order, checked in parallel."""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(items) or 1))) as pool:
+        return list(pool.map(lambda item: verify_and_count_jobs(item[0], item[1], at_least), items))
 
 
 def guess_careers_urls(company_name: str, website: str = None) -> list:
@@ -192,9 +379,142 @@ def guess_careers_urls(company_name: str, website: str = None) -> list:
     return urls
 
 
-def try_repair_company(company: dict):
+# ===== Repair engine: parallel probes + negative cache =====
+
+PROBE_CACHE_PATH = Path(__file__).parent / "data" / "ats_probe_cache.json"
+PROBE_NEGATIVE_TTL = int(os.getenv("ATS_PROBE_NEGATIVE_TTL", str(24 * 3600)))
+PROBE_WORKERS = 12
+REPAIR_DEADLINE = 30  # seconds for all probes of one company
+
+
+class ProbeCache:
+    """Failed repair probes: "company|url" → failed_at (unix time), expire after ttl."""
+
+    def __init__(self, path: Path = PROBE_CACHE_PATH, ttl: int = PROBE_NEGATIVE_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._data = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _key(company: str, url: str) -> str:
+        return f"{company.lower().strip()}|{url}"
+
+    def is_dead(self, company: str, url: str) -> bool:
+        with self._lock:
+            failed_at = self._data.get(self._key(company, url))
+            return failed_at is not None and time.time() - failed_at < self.ttl
+
+    def mark_dead(self, company: str, url: str):
+        with self._lock:
+            self._data[self._key(company, url)] = time.time()
+            self._dirty = True
+
+    def forget(self, company: str):
+        prefix = f"{company.lower().strip()}|"
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+                self._dirty = True
+
+    def save(self):
+        """One write per repair (not per probe); expired entries are dropped."""
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            self._data = {k: v for k, v in self._data.items() if now - v < self.ttl}
+            data = dict(self._data)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=1))
+            tmp.replace(self.path)
+        except Exception as e:
+            print(f"  ⚠️ Probe cache save failed: {e}")
+
+
+_probe_cache: Optional[ProbeCache] = None
+
+
+def get_probe_cache() -> ProbeCache:
+    global _probe_cache
+    if _probe_cache is None:
+        _probe_cache = ProbeCache()
+    return _probe_cache
+
+
+def repair_candidates(company: dict) -> list:
+    """All probes for a company: ("careers", url, None) or ("direct", api_url, (ats, board_id))."""
+    company_name = company.get("name", "")
+    candidates = []
+    if company.get("careers_url"):
+        candidates.append(("careers", company["careers_url"], None))
+    for url in guess_careers_urls(company_name, company.get("website")):
+        candidates.append(("careers", url, None))
+    slug = company_name.lower().replace(" ", "").replace("-", "").replace(".", "")
+    if slug:
+        for ats in ("greenhouse", "lever", "ashby"):
+            candidates.append(("direct", build_api_url(ats, slug), (ats, slug)))
+    # unique URLs, order kept
+    seen = set()
+    return [c for c in candidates if not (c[1] in seen or seen.add(c[1]))]
+
+
+class ProbeError(Exception):
+    """Transient probe failure (timeout, DNS, reset, 5xx) — never negative-cached."""
+
+
+DEAD_STATUSES = (404, 410)  # the only HTTP answers that mean "no board here"
+
+
+def _run_probe(kind: str, url: str, target):
+    """Found → result dict; definitive miss (404 / no ATS on the page) → None; else ProbeError."""
+    if kind == "careers":
+        result = detect_ats(url)
+        if result and result.get("error"):
+            if result.get("status") in DEAD_STATUSES:
+                return None
+            raise ProbeError(result["error"])
+        return result if result and result.get("verified") else None
+    ats, board_id = target
+    cached = _verify_cache.get(("exists", url))
+    if cached is None:
+        try:
+            status = _url_status(url)
+        except requests.RequestException as e:
+            raise ProbeError(str(e)) from e
+        if status != 200 and status not in DEAD_STATUSES:
+            raise ProbeError(f"HTTP {status}")
+        cached = status == 200
+        _verify_cache.put(("exists", url), cached)
+    if cached:
+        return {
+            "ats": ats,
+            "board_id": board_id,
+            "board_url": build_board_url(ats, board_id),
+            "verified": True
+        }
+    return None
+
+
+def try_repair_company(company: dict, cache: Optional[ProbeCache] = None,
+                       deadline: float = REPAIR_DEADLINE):
     """
     Пытается найти рабочий ATS URL для компании.
+    Все пробы (careers_url, угаданные careers страницы, прямые API) идут
+    параллельно; первая подтверждённая побеждает. Однозначные промахи
+    (HTTP 404/410, ATS на странице не найден) попадают в negative cache и не
+    повторяются до истечения TTL; сетевые ошибки не кэшируются.
     
     Args:
         company: dict с полями name, ats, board_url, и опционально website, careers_url
@@ -203,46 +523,102 @@ def try_repair_company(company: dict):
         dict с новыми ats, board_url если нашли, или None
     """
     company_name = company.get("name", "")
-    print(f"🔧 Trying to repair: {company_name}")
-    
-    # 1. Если есть careers_url - пробуем его
-    if company.get("careers_url"):
-        result = detect_ats(company["careers_url"])
-        if result and result.get("verified"):
-            print(f"  ✅ Found via careers_url: {result['ats']}")
-            return result
-    
-    # 2. Пробуем угадать careers URL
-    guess_urls = guess_careers_urls(company_name, company.get("website"))
-    
-    for url in guess_urls:
-        result = detect_ats(url)
-        if result and result.get("verified"):
-            print(f"  ✅ Found via {url}: {result['ats']}")
-            return result
-    
-    # 3. Пробуем напрямую известные ATS с slug компании
-    slug = company_name.lower().replace(" ", "").replace("-", "").replace(".", "")
-    
-    direct_urls = [
-        ("greenhouse", slug),
-        ("lever", slug),
-        ("ashby", slug),
-    ]
-    
-    for ats, board_id in direct_urls:
-        api_url = build_api_url(ats, board_id)
-        if verify_ats_url(api_url):
-            print(f"  ✅ Found via direct probe: {ats}")
-            return {
-                "ats": ats,
-                "board_id": board_id,
-                "board_url": build_board_url(ats, board_id),
-                "verified": True
-            }
-    
-    print(f"  ❌ Could not find working ATS URL")
-    return None
+    cache = cache or get_probe_cache()
+    candidates = repair_candidates(company)
+    live = [c for c in candidates if not cache.is_dead(company_name, c[1])]
+    print(f"🔧 Trying to repair: {company_name} "
+          f"({len(live)} probes, {len(candidates) - len(live)} cached as dead)")
+    if not live:
+        print("  ❌ Could not find working ATS URL (all probes cached as dead)")
+        return None
+
+    pool = ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(live)), thread_name_prefix="ats-probe")
+    futures = {pool.submit(_run_probe, *c): c for c in live}
+    found = None
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            kind, url, _ = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # noqa: BLE001 — сеть/таймаут: не кэшируем, попробуем в следующий раз
+                print(f"  ⚠️ Probe {url} failed: {e}")
+                continue
+            if result:
+                found = result
+                print(f"  ✅ Found via {url}: {result['ats']}")
+                break
+            cache.mark_dead(company_name, url)
+    except FuturesTimeout:
+        print(f"  ⏱️ Repair deadline ({deadline}s) reached")
+    finally:
+        # Не ждём оставшиеся пробы: их результат уже не нужен
+        pool.shutdown(wait=False, cancel_futures=True)
+        cache.save()
+
+    if not found:
+        print(f"  ❌ Could not find working ATS URL")
+    return found
+
+
+class RepairQueue:
+    """
+    Background repairs: fetch paths submit a company and move on; one worker
+    thread runs try_repair_company() and calls on_result(result_or_None).
+    A company already queued or being repaired is not queued again.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"submitted": 0, "repaired": 0, "failed": 0, "deduped": 0}
+
+    def submit(self, company: dict, on_result: Optional[Callable[[Optional[dict]], None]] = None) -> bool:
+        key = (company.get("name") or company.get("id") or "").lower()
+        with self._lock:
+            if key in self._pending:
+                self.stats["deduped"] += 1
+                return False
+            self._pending.add(key)
+            self.stats["submitted"] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="ats-repair", daemon=True)
+                self._thread.start()
+        self._queue.put((key, company, on_result))
+        return True
+
+    def _run(self):
+        while True:
+            key, company, on_result = self._queue.get()
+            try:
+                result = try_repair_company(company)
+                self.stats["repaired" if result else "failed"] += 1
+                if on_result:
+                    on_result(result)
+            except Exception as e:
+                print(f"[Repair] {key}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+                self._queue.task_done()
+
+    def status(self) -> dict:
+        with self._lock:
+            pending = sorted(self._pending)
+        return {"pending": pending, **self.stats}
+
+
+_repair_queue: Optional[RepairQueue] = None
+_repair_queue_lock = threading.Lock()
+
+
+def get_repair_queue() -> RepairQueue:
+    global _repair_queue
+    with _repair_queue_lock:
+        if _repair_queue is None:
+            _repair_queue = RepairQueue()
+        return _repair_queue
 
 
 def repair_company_in_json(company_id: str, companies_path: str = "data/companies.json") -> bool:
@@ -378,18 +754,12 @@ if __name__ == "__main__":
             print("\nVerifying all companies...\n")
             results = {"working": [], "empty": [], "broken": [], "disabled": []}
             
-            for c in companies:
+            enabled = [c for c in companies if c.get("enabled", True)]
+            results["disabled"] = [c.get("name", "") for c in companies if not c.get("enabled", True)]
+            checks = verify_many([(c.get("ats", ""), c.get("board_url", "")) for c in enabled])
+
+            for c, check in zip(enabled, checks):
                 name = c.get("name", "")
-                ats = c.get("ats", "")
-                url = c.get("board_url", "")
-                enabled = c.get("enabled", True)
-                
-                if not enabled:
-                    results["disabled"].append(name)
-                    continue
-                
-                check = verify_and_count_jobs(ats, url)
-                
                 if check["ok"]:
                     if check["jobs_count"] > 0:
                         results["working"].append((name, check["jobs_count"]))
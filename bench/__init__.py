@@ -0,0 +1,13 @@
+"""
+Ingest benchmark: synthetic ATS corpus + mock ATS server + scenario runners.
+
+    python -m bench                                  # 1k,10k,100k × all scenarios
+    python -m bench --sizes 1k,10k --scenarios full_refresh,jobs_filter --out bench.json
+    python -m bench --sizes 10k --baseline bench.json   # exit 1 on regression
+    python -m bench --compare old.json new.json
+
+- bench.corpus     deterministic companies/jobs in every ATS wire format
+- bench.mock_ats   local HTTP server for those boards (latency, failures)
+- bench.scenarios  full refresh, daemon cycle, /jobs filtering, pipeline sync,
+                   kw-scoring, cache load — run inside a temp sandbox
+"""
@@ -0,0 +1,357 @@
+"""
+Synthetic job corpus: companies + job boards in every supported ATS format.
+
+Deterministic: the same (jobs, seed) always gives the same companies, jobs and
+wire payloads (fingerprint() proves it), so two benchmark runs on different
+commits parse exactly the same data. Dates are relative to REFERENCE_DATE,
+not to "now".
+
+- generate_corpus(jobs, seed) → Corpus with companies in data/companies.json
+  format (board_url points at the real ATS hostnames — mock_ats routes them)
+- <ats>_page(company, ...) → the JSON/HTML that ATS returns for one request,
+  with the same pagination the parser expects
+- jd_text(job_id) → synthetic JD for kw-scoring
+
+ATS: greenhouse, lever, ashby, smartrecruiters, workday, phenom, icims, jibe.
+"""
+
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+REFERENCE_DATE = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+
+# Доля вакансий по ATS (примерно как в data/companies.json)
+ATS_MIX = {
+    "greenhouse": 0.30,
+    "workday": 0.20,
+    "lever": 0.14,
+    "ashby": 0.10,
+    "smartrecruiters": 0.10,
+    "phenom": 0.06,
+    "icims": 0.05,
+    "jibe": 0.05,
+}
+# Parser limits: iCIMS stops after 20 pages × 50, Jibe after 2000 jobs
+MAX_JOBS_PER_BOARD = {"icims": 1000, "jibe": 2000}
+AVG_JOBS_PER_COMPANY = 100
+
+PAGE_SIZE = {"smartrecruiters": 100, "workday": 20, "phenom": 100, "icims": 50, "jibe": 100}
+
+ROLES = [
+    ("Product Manager", 12), ("Senior Product Manager", 8), ("Principal Product Manager", 3),
+    ("Technical Program Manager", 8), ("Senior Technical Program Manager", 5), ("Program Manager", 6),
+    ("Project Manager", 5), ("IT Project Manager", 2), ("Product Owner", 2),
+    ("Software Engineer", 14), ("Senior Software Engineer", 10), ("Staff Software Engineer", 4),
+    ("Engineering Manager", 4), ("Data Scientist", 5), ("Data Engineer", 4), ("Product Designer", 4),
+    ("Solutions Architect", 3), ("Account Executive", 6), ("Customer Success Manager", 4),
+    ("Financial Analyst", 3), ("Recruiter", 2), ("Marketing Manager", 3), ("Nurse Practitioner", 1),
+    ("Warehouse Associate", 1), ("Chief of Staff", 1),
+]
+AREAS = ["", "", "", ", Payments", ", Platform", " - Growth", ", Infrastructure", " II", ", AI/ML",
+         " - Risk & Compliance", ", Mobile", " (Contract)"]
+DEPARTMENTS = ["Product", "Engineering", "Program Management", "Data", "Design", "Sales",
+               "Customer Success", "Finance", "People", "Marketing", "Operations"]
+
+US_CITIES = [
+    ("Raleigh", "NC", 4), ("Durham", "NC", 3), ("Cary", "NC", 1), ("Charlotte", "NC", 3),
+    ("Richmond", "VA", 2), ("Reston", "VA", 2), ("Atlanta", "GA", 3), ("Nashville", "TN", 2),
+    ("Charleston", "SC", 1), ("New York", "NY", 8), ("San Francisco", "CA", 8), ("Seattle", "WA", 5),
+    ("Austin", "TX", 4), ("Chicago", "IL", 4), ("Boston", "MA", 4), ("Denver", "CO", 3),
+    ("Los Angeles", "CA", 3), ("Washington", "DC", 2),
+]
+REMOTE_US = ["Remote - US", "Remote (United States)", "United States - Remote", "Remote, USA"]
+INTERNATIONAL = [
+    ("London", "", "United Kingdom"), ("Toronto", "ON", "Canada"), ("Berlin", "", "Germany"),
+    ("Bengaluru", "", "India"), ("Dublin", "", "Ireland"), ("Singapore", "", "Singapore"),
+    ("Amsterdam", "", "Netherlands"), ("Sydney", "NSW", "Australia"),
+]
+INDUSTRIES = ["fintech", "banking", "saas", "security", "healthcare", "ai", "ecommerce", "devtools"]
+NAME_PARTS = (
+    ["Bright", "North", "Blue", "Iron", "Clear", "Swift", "Silver", "Open", "Prime", "Lumen", "Vector", "Atlas"],
+    ["Ledger", "Harbor", "Forge", "Pixel", "Stack", "Path", "Signal", "Field", "Works", "Labs", "Cloud", "Bank"],
+)
+
+JD_SKILLS = ["roadmap", "stakeholder management", "agile", "scrum", "SQL", "A/B testing", "payments",
+             "risk management", "Jira", "cross-functional", "program governance", "OKRs", "API",
+             "machine learning", "compliance", "budget", "vendor management", "data analysis"]
+
+
+class Corpus:
+    def __init__(self, jobs: int, seed: int, companies: List[dict], boards: Dict[str, List[dict]]):
+        self.jobs = jobs
+        self.seed = seed
+        self.companies = companies      # data/companies.json entries
+        self.boards = boards            # company id → job specs (ATS-neutral)
+        self._by_slug = {c["slug"]: c for c in companies}
+
+    def company(self, slug: str) -> Optional[dict]:
+        return self._by_slug.get(slug.lower())
+
+    def board(self, company: dict) -> List[dict]:
+        return self.boards.get(company["id"], [])
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha1()
+        for c in self.companies:
+            h.update(json.dumps(c, sort_keys=True).encode())
+            for job in self.board(c):
+                h.update(json.dumps(job, sort_keys=True).encode())
+        return h.hexdigest()[:16]
+
+    def summary(self) -> dict:
+        by_ats: Dict[str, int] = {}
+        for c in self.companies:
+            by_ats[c["ats"]] = by_ats.get(c["ats"], 0) + len(self.board(c))
+        return {"jobs": self.jobs, "companies": len(self.companies), "seed": self.seed,
+                "by_ats": by_ats, "fingerprint": self.fingerprint()}
+
+
+# ---------- generation ----------
+
+def _weighted(rng: random.Random, items: list):
+    return rng.choices(items, weights=[w for *_, w in items])[0]
+
+
+def _board_url(ats: str, slug: str) -> dict:
+    if ats == "greenhouse":
+        return {"board_url": f"https://boards.greenhouse.io/{slug}"}
+    if ats == "lever":
+        return {"board_url": f"https://jobs.lever.co/{slug}"}
+    if ats == "ashby":
+        return {"board_url": f"https://jobs.ashbyhq.com/{slug}"}
+    if ats == "smartrecruiters":
+        return {"board_url": f"https://jobs.smartrecruiters.com/{slug}",
+                "api_url": f"https://api.smartrecruiters.com/v1/companies/{slug}/postings"}
+    if ats == "workday":
+        return {"board_url": f"https://{slug}.wd5.myworkdayjobs.com/en-US/External"}
+    if ats == "phenom":
+        return {"board_url": f"https://careers.{slug}.example/us/en"}  # .example: никогда не резолвится
+    if ats == "icims":
+        return {"board_url": f"https://careers-{slug}.icims.com/jobs"}
+    if ats == "jibe":
+        return {"board_url": f"https://{slug}.jibeapply.com/jobs"}
+    raise ValueError(f"Unknown ATS: {ats}")
+
+
+def _split_jobs(rng: random.Random, total: int, companies: int) -> List[int]:
+    """Heavy-tailed board sizes summing to total (a few huge boards, many small ones)."""
+    weights = [min(rng.paretovariate(1.3), 40.0) for _ in range(companies)]
+    scale = total / sum(weights)
+    sizes = [int(w * scale) for w in weights]
+    for i in range(total - sum(sizes)):
+        sizes[i % companies] += 1
+    return sizes
+
+
+def _location(rng: random.Random) -> dict:
+    roll = rng.random()
+    if roll < 0.60:
+        city, state, _ = _weighted(rng, US_CITIES)
+        return {"city": city, "state": state, "country": "US", "remote": False, "text": f"{city}, {state}"}
+    if roll < 0.75:
+        return {"city": "", "state": "", "country": "US", "remote": True, "text": rng.choice(REMOTE_US)}
+    if roll < 0.80:
+        (c1, s1, _), (c2, s2, _) = rng.sample(US_CITIES, 2)
+        return {"city": c1, "state": s1, "country": "US", "remote": False, "text": f"{c1}, {s1}; {c2}, {s2}",
+                "locations": 2}
+    city, state, country = rng.choice(INTERNATIONAL)
+    return {"city": city, "state": state, "country": country, "remote": False,
+            "text": f"{city}, {country}"}
+
+
+def generate_corpus(jobs: int, seed: int = 42, mix: Dict[str, float] = ATS_MIX) -> Corpus:
+    rng = random.Random(seed)
+    count = max(len(mix), round(jobs / AVG_JOBS_PER_COMPANY))
+    ats_names = list(mix)
+    # Каждый ATS хотя бы один раз, остальное по весам
+    ats_list = ats_names + rng.choices(ats_names, weights=[mix[a] for a in ats_names], k=count - len(ats_names))
+    sizes = _split_jobs(rng, jobs, count)
+
+    # Boards above the parser limit give their excess to unlimited boards
+    overflow = 0
+    for i, ats in enumerate(ats_list):
+        cap = MAX_JOBS_PER_BOARD.get(ats)
+        if cap and sizes[i] > cap:
+            overflow += sizes[i] - cap
+            sizes[i] = cap
+    unlimited = [i for i, ats in enumerate(ats_list) if ats not in MAX_JOBS_PER_BOARD]
+    for n in range(overflow):
+        sizes[unlimited[n % len(unlimited)]] += 1
+
+    companies, boards = [], {}
+    for i, (ats, size) in enumerate(zip(ats_list, sizes)):
+        name = f"{NAME_PARTS[0][i % 12]}{NAME_PARTS[1][(i // 12) % 12]} {i}"
+        slug = f"{NAME_PARTS[0][i % 12]}{NAME_PARTS[1][(i // 12) % 12]}{i}".lower()
+        company = {
+            "id": slug,
+            "slug": slug,
+            "name": name,
+            "ats": ats,
+            **_board_url(ats, slug),
+            "industry": rng.choice(INDUSTRIES),
+            "tags": rng.sample(INDUSTRIES, 2),
+            "priority": rng.choice([0, 0, 0, 5, 10, 20]),
+            "hq_state": rng.choice(["NC", "CA", "NY", "VA", "WA", None]),
+            "region": "us",
+            "enabled": True,
+        }
+        companies.append(company)
+
+        board = []
+        for n in range(size):
+            title = _weighted(rng, ROLES)[0] + rng.choice(AREAS)
+            posted = REFERENCE_DATE - timedelta(days=rng.randint(0, 90), minutes=rng.randint(0, 1439))
+            board.append({
+                "req": f"{1000 + i}{n:05d}",
+                "title": title,
+                "department": rng.choice(DEPARTMENTS),
+                "posted": posted.isoformat().replace("+00:00", "Z"),
+                "location": _location(rng),
+            })
+        boards[slug] = board
+
+    return Corpus(jobs, seed, companies, boards)
+
+
+def jd_text(job_id: str, words: int = 350) -> str:
+    """Deterministic JD body (skills + location + salary) for kw-scoring."""
+    rng = random.Random(job_id)
+    skills = rng.sample(JD_SKILLS, 6)
+    low = rng.randrange(110, 200) * 1000
+    parts = [
+        f"About the role: you will own {skills[0]} and {skills[1]} for a {rng.choice(INDUSTRIES)} platform.",
+        f"Requirements: {rng.randint(3, 10)}+ years of experience with {', '.join(skills[2:])}.",
+        f"Location: {rng.choice(['Raleigh, NC (Hybrid)', 'Remote - US', 'New York, NY', 'Richmond, VA'])}.",
+        f"Salary range: ${low:,} - ${low + rng.randrange(20, 80) * 1000:,}.",
+    ]
+    filler = " ".join(rng.choice(JD_SKILLS) for _ in range(max(0, words - 60)))
+    return "\n".join(parts) + "\n" + filler
+
+
+# ---------- wire formats (one response per request) ----------
+
+def _days_ago(job: dict) -> int:
+    posted = datetime.fromisoformat(job["posted"].replace("Z", "+00:00"))
+    return (REFERENCE_DATE - posted).days
+
+
+def greenhouse_board(company: dict, board: List[dict]) -> dict:
+    return {"jobs": [{
+        "id": int(job["req"]),
+        "title": job["title"],
+        "location": {"name": job["location"]["text"]},
+        "departments": [{"name": job["department"]}],
+        "absolute_url": f"https://boards.greenhouse.io/{company['slug']}/jobs/{job['req']}",
+        "first_published": job["posted"],
+        "updated_at": job["posted"],
+    } for job in board], "meta": {"total": len(board)}}
+
+
+def lever_board(company: dict, board: List[dict]) -> list:
+    return [{
+        "id": f"{company['slug']}-{job['req']}",
+        "text": job["title"],
+        "categories": {"location": job["location"]["text"], "team": job["department"]},
+        "hostedUrl": f"https://jobs.lever.co/{company['slug']}/{job['req']}",
+        "createdAt": int(datetime.fromisoformat(job["posted"].replace("Z", "+00:00")).timestamp() * 1000),
+    } for job in board]
+
+
+def ashby_board(company: dict, board: List[dict]) -> dict:
+    return {"jobs": [{
+        "id": f"{company['slug']}-{job['req']}",
+        "title": job["title"],
+        "jobUrl": f"https://jobs.ashbyhq.com/{company['slug']}/{job['req']}",
+        "location": job["location"]["text"],
+        "department": job["department"],
+        "publishedAt": job["posted"],
+    } for job in board]}
+
+
+def smartrecruiters_page(company: dict, board: List[dict], offset: int, limit: int) -> dict:
+    page = board[offset:offset + limit]
+    return {"offset": offset, "limit": limit, "totalFound": len(board), "content": [{
+        "id": job["req"],
+        "name": job["title"],
+        "location": {"city": job["location"]["city"] or ("Remote" if job["location"]["remote"] else ""),
+                     "region": job["location"]["state"], "country": job["location"]["country"].lower()},
+        "department": job["department"],
+        "ref": f"https://api.smartrecruiters.com/v1/companies/{company['slug']}/postings/{job['req']}",
+        "releasedDate": job["posted"],
+    } for job in page]}
+
+
+def workday_page(company: dict, board: List[dict], offset: int, limit: int) -> dict:
+    def posted_on(job):
+        days = _days_ago(job)
+        if days == 0:
+            return "Posted Today"
+        if days == 1:
+            return "Posted Yesterday"
+        return "Posted 30+ Days Ago" if days > 30 else f"Posted {days} Days Ago"
+
+    page = board[offset:offset + limit]
+    return {"total": len(board), "jobPostings": [{
+        "title": job["title"],
+        "externalPath": f"/job/{job['req']}",
+        "locationsText": f"{job['location']['locations']} Locations" if job["location"].get("locations")
+        else job["location"]["text"],
+        "postedOn": posted_on(job),
+        "bulletFields": [f"R{job['req']}"],
+        "timeType": "Full time",
+    } for job in page]}
+
+
+def phenom_page(company: dict, board: List[dict], offset: int, size: int) -> dict:
+    page = board[offset:offset + size]
+    return {"refineSearch": {"totalHits": len(board), "data": {"jobs": [{
+        "reqId": job["req"],
+        "jobSeqNo": f"{company['slug'].upper()}{job['req']}",
+        "title": job["title"],
+        "location": job["location"]["text"],
+        "city": job["location"]["city"],
+        "state": job["location"]["state"],
+        "country": job["location"]["country"],
+        "category": job["department"],
+        "postedDate": job["posted"],
+        "dateCreated": job["posted"],
+        "type": "Full time",
+        "RemoteType": "Remote" if job["location"]["remote"] else "",
+    } for job in page]}}}
+
+
+def icims_page(company: dict, board: List[dict], page: int, size: int = PAGE_SIZE["icims"]) -> str:
+    items = board[page * size:(page + 1) * size]
+    impressions = [{
+        "idRaw": int(job["req"]),
+        "title": job["title"],
+        "location": {"city": job["location"]["city"] or "Remote", "state": job["location"]["state"] or "not set"},
+        "category": job["department"],
+        "postedDate": job["posted"],
+    } for job in items]
+    has_next = (page + 1) * size < len(board)
+    nav = f'<a class="glyph" href="?pr={page + 1}&amp;in_iframe=1">Next</a>' if has_next else ""
+    return (
+        "<html><head><script>\n"
+        f"var jobImpressions = {json.dumps(impressions)};\n"
+        "</script></head><body><div class=\"iCIMS_JobsTable\"></div>"
+        f"<div class=\"iCIMS_Paging\">{nav}</div></body></html>"
+    )
+
+
+def jibe_page(company: dict, board: List[dict], page: int, limit: int) -> dict:
+    items = board[(page - 1) * limit:page * limit]
+    return {"totalCount": len(board), "count": len(items), "jobs": [{"data": {
+        "slug": job["req"],
+        "req_id": job["req"],
+        "title": job["title"],
+        "full_location": job["location"]["text"],
+        "city": job["location"]["city"],
+        "state": job["location"]["state"],
+        "posted_date": job["posted"],
+        "update_date": job["posted"],
+        "categories": [{"name": job["department"]}],
+    }} for job in items]}
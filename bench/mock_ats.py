@@ -0,0 +1,187 @@
+"""
+Local mock ATS server for the benchmark corpus.
+
+MockATSServer serves every board of a Corpus over real HTTP (stdlib
+ThreadingHTTPServer on 127.0.0.1, one thread per connection) with:
+
+- latency_ms: base response delay, ±50% jitter derived from the request path
+  (deterministic, so runs are comparable)
+- failure_rate: share of companies whose board answers HTTP 503 — chosen by
+  hash(seed, company), the same companies fail on every run
+
+The parsers keep their real URLs (boards-api.greenhouse.io, *.myworkdayjobs.com,
+...). route_requests(server) patches requests' HTTPAdapter.send so that every
+outgoing request goes to the mock as http://127.0.0.1:<port>/<original host><path>.
+Nothing leaves the machine while it is active: unknown hosts get a 404.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from bench import corpus as fmt
+
+LOCAL_HOSTS = ("127.0.0.1", "localhost")
+
+
+def _unit(*parts) -> float:
+    """Stable pseudo-random number in [0, 1) for the given key."""
+    digest = hashlib.md5("|".join(str(p) for p in parts).encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+class MockATSServer:
+    def __init__(self, corpus: fmt.Corpus, latency_ms: float = 0.0, failure_rate: float = 0.0,
+                 seed: int = 42, port: int = 0):
+        self.corpus = corpus
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.failing = {c["slug"] for c in corpus.companies if _unit(seed, "fail", c["slug"]) < failure_rate}
+        self.stats = {"requests": 0, "failures": 0, "not_found": 0, "bytes": 0}
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def start(self) -> "MockATSServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-ats", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_stats(self):
+        with self._stats_lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # ---------- routing ----------
+
+    @staticmethod
+    def route(host: str, path: str, query: dict, body: dict) -> Optional[Tuple[str, str, Callable]]:
+        """(ats, company slug, render(company, board)) for one request to the original host/path."""
+        if host == "boards-api.greenhouse.io" and (m := re.match(r"^/v1/boards/([^/]+)/jobs$", path)):
+            return "greenhouse", m.group(1), fmt.greenhouse_board
+        if host == "api.lever.co" and (m := re.match(r"^/v0/postings/([^/]+)$", path)):
+            return "lever", m.group(1), fmt.lever_board
+        if host == "api.ashbyhq.com" and (m := re.match(r"^/posting-api/job-board/([^/]+)$", path)):
+            return "ashby", m.group(1), fmt.ashby_board
+        if host == "api.smartrecruiters.com" and (m := re.match(r"^/v1/companies/([^/]+)/postings$", path)):
+            offset, limit = int(query.get("offset", 0)), int(query.get("limit", 100))
+            return "smartrecruiters", m.group(1), lambda c, b: fmt.smartrecruiters_page(c, b, offset, limit)
+        if host.endswith(".myworkdayjobs.com") and (m := re.match(r"^/wday/cxs/([^/]+)/[^/]+/jobs$", path)):
+            offset, limit = int(body.get("offset", 0)), int(body.get("limit", 20))
+            return "workday", m.group(1), lambda c, b: fmt.workday_page(c, b, offset, limit)
+        if host.endswith(".example") and path == "/widgets":  # Phenom: careers.<slug>.example
+            offset, size = int(body.get("from", 0)), int(body.get("size", 100))
+            return "phenom", host.split(".")[1], lambda c, b: fmt.phenom_page(c, b, offset, size)
+        if host.endswith(".icims.com") and path == "/jobs/search":
+            page = int(query.get("pr", 0))
+            return "icims", host.split(".")[0].removeprefix("careers-"), lambda c, b: fmt.icims_page(c, b, page)
+        if host.endswith(".jibeapply.com") and path == "/api/jobs":
+            page, limit = int(query.get("page", 1)), int(query.get("limit", 100))
+            return "jibe", host.split(".")[0], lambda c, b: fmt.jibe_page(c, b, page, limit)
+        return None
+
+    def resolve(self, host: str, path: str, query: dict, body: dict) -> Tuple[int, str, bytes]:
+        """(status, content type, body) for one request."""
+        route = self.route(host, path, query, body)
+        company = self.corpus.company(route[1]) if route else None
+        if company is None or company["ats"] != route[0]:
+            self._count("not_found")
+            return 404, "application/json", b'{"error": "not found"}'
+        if company["slug"] in self.failing:
+            self._count("failures")
+            return 503, "application/json", b'{"error": "service unavailable"}'
+        payload = route[2](company, self.corpus.board(company))
+        if isinstance(payload, str):
+            return 200, "text/html; charset=utf-8", payload.encode()
+        return 200, "application/json", json.dumps(payload).encode()
+
+    def delay(self, key: str) -> float:
+        if not self.latency_ms:
+            return 0.0
+        return self.latency_ms / 1000 * (0.5 + _unit(self.seed, "latency", key))
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self):
+                parts = urlsplit(self.path)
+                host, _, path = parts.path.lstrip("/").partition("/")
+                query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    body = {}
+
+                wait = server.delay(self.path + raw.decode("utf-8", "replace"))
+                if wait:
+                    time.sleep(wait)
+                status, content_type, payload = server.resolve(host, "/" + path, query, body)
+                server._count("requests")
+                server._count("bytes", len(payload))
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = _serve
+            do_POST = _serve
+
+        return Handler
+
+
+@contextmanager
+def route_requests(server: MockATSServer):
+    """Send every `requests` call (module-level and Session) to the mock server."""
+    from requests.adapters import HTTPAdapter
+
+    original = HTTPAdapter.send
+    base = f"http://127.0.0.1:{server.port}"
+
+    def send(adapter, request, **kwargs):
+        parts = urlsplit(request.url)
+        if parts.hostname not in LOCAL_HOSTS:
+            request.url = f"{base}/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else "")
+            kwargs["proxies"] = {}
+        return original(adapter, request, **kwargs)
+
+    HTTPAdapter.send = send
+    try:
+        yield server
+    finally:
+        HTTPAdapter.send = original
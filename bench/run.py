@@ -0,0 +1,200 @@
+"""
+Ingest benchmark runner: corpus × mock ATS × scenarios → table + JSON
+
+Per size: generate the corpus, start the mock ATS server, route `requests`
+to it, open a sandbox and run the selected scenarios in order (full_refresh
+first, the rest reuse its cache/pipeline). Nothing touches real data or
+calls an LLM.
+
+Results JSON (--out) is one row per size × scenario with the median
+`seconds` of --repeat runs plus scenario details, and the corpus fingerprint
+so results from different corpora are never compared.
+
+Usage:
+    python -m bench
+    python -m bench --sizes 1k,10k --scenarios full_refresh,jobs_filter --out bench.json
+    python -m bench --sizes 10k --latency-ms 50 --failure-rate 0.05
+    python -m bench --baseline bench.json      # exit 1 on regression
+    python -m bench --compare old.json new.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench.corpus import generate_corpus
+from bench.mock_ats import MockATSServer, route_requests
+from bench.scenarios import SCENARIOS, BenchContext, Sandbox, run_scenario
+
+SCHEMA = 1
+DEFAULT_SIZES = "1k,10k,100k"
+
+# Regression thresholds for --baseline / --compare
+MAX_SLOWDOWN = 1.25     # median seconds
+MIN_DELTA = 0.05        # seconds; below this the difference is noise
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    if text.endswith("k"):
+        return int(float(text[:-1]) * 1000)
+    return int(text)
+
+
+def git_info() -> dict:
+    def git(*args) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+    }
+
+
+def run_bench(sizes: List[int], scenarios: List[str], seed: int = 42, latency_ms: float = 0.0,
+              failure_rate: float = 0.0, repeat: int = 1, daemon_companies: int = 10,
+              verbose: bool = False, keep: bool = False, on_row=None) -> dict:
+    """Run scenarios for every size → results document (see module docstring)."""
+    rows = []
+    for size in sizes:
+        corpus = generate_corpus(size, seed=seed)
+        summary = corpus.summary()
+        with MockATSServer(corpus, latency_ms=latency_ms, failure_rate=failure_rate, seed=seed) as server, \
+                route_requests(server), Sandbox(keep=keep) as sandbox:
+            sandbox.write_companies(corpus)
+            ctx = BenchContext(corpus, server, sandbox, repeat=repeat, daemon_companies=daemon_companies)
+            for name in scenarios:
+                try:
+                    row = run_scenario(ctx, name, verbose=verbose)
+                    row["error"] = ""
+                except Exception as e:
+                    row = {"seconds": 0.0, "runs": [], "error": f"{type(e).__name__}: {e}"}
+                row.update(size=size, scenario=name, fingerprint=summary["fingerprint"])
+                rows.append(row)
+                if on_row:
+                    on_row(row)
+    return {
+        "schema": SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_info(),
+        "env": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {
+            "sizes": sizes, "scenarios": scenarios, "seed": seed, "latency_ms": latency_ms,
+            "failure_rate": failure_rate, "repeat": repeat, "daemon_companies": daemon_companies,
+        },
+        "results": rows,
+    }
+
+
+def compare(results: dict, baseline: dict) -> List[str]:
+    """Regressions vs a previous --out file: slower median or a scenario that now fails."""
+    base = {(r["size"], r["scenario"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results.get("results", []):
+        old = base.get((r["size"], r["scenario"]))
+        if not old or old["error"] or old["fingerprint"] != r["fingerprint"]:
+            continue
+        label = f"{r['scenario']} @ {r['size']:,}"
+        if r["error"]:
+            regressions.append(f"{label}: now fails ({r['error'][:60]})")
+            continue
+        if old["seconds"] and r["seconds"] > old["seconds"] * MAX_SLOWDOWN and r["seconds"] - old["seconds"] > MIN_DELTA:
+            regressions.append(f"{label}: {old['seconds']:.3f}s → {r['seconds']:.3f}s "
+                               f"(×{r['seconds'] / old['seconds']:.2f})")
+    return regressions
+
+
+def _detail(row: dict) -> str:
+    if row["error"]:
+        return row["error"][:60]
+    keys = {
+        "full_refresh": ("jobs", "requests"),
+        "daemon_cycle": ("per_company_ms", "estimated_cycle_seconds"),
+        "pipeline_sync": ("cold_seconds", "warm_seconds"),
+        "kw_scoring": ("jobs", "jobs_per_sec"),
+        "cache_load": ("load_seconds", "bytes"),
+    }.get(row["scenario"], ())
+    if row["scenario"] == "jobs_filter" and row.get("queries_ms"):
+        return f"slowest_ms={max(row['queries_ms'].values())}"
+    return "  ".join(f"{k}={row[k]}" for k in keys if k in row)
+
+
+def print_row(row: dict):
+    seconds = "—" if row["error"] else f"{row['seconds']:.3f}"
+    print(f"{row['size']:>8,} {row['scenario']:<14} {seconds:>9}  {_detail(row)}")
+
+
+def report_regressions(regressions: List[str], against: str) -> int:
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) vs {against}:")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print(f"\n✅ No regressions vs {against}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated job counts, e.g. 1k,10k,100k")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated: " + ",".join(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mock ATS base latency (±50%% jitter)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of boards answering 503")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per scenario; the median is reported")
+    parser.add_argument("--daemon-companies", type=int, default=10, help="companies sampled for daemon_cycle")
+    parser.add_argument("--out", help="write results JSON")
+    parser.add_argument("--baseline", help="previous --out JSON; exit 1 on regression")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    parser.add_argument("--keep", action="store_true", help="keep the sandbox dirs")
+    parser.add_argument("--verbose", action="store_true", help="show app output")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (json.loads(Path(p).read_text()) for p in args.compare)
+        sys.exit(report_regressions(compare(new, old), args.compare[0]))
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        print(f"❌ Unknown scenario(s): {', '.join(unknown)} (have: {', '.join(SCENARIOS)})")
+        sys.exit(2)
+
+    print(f"🧪 Ingest bench: sizes {', '.join(f'{s:,}' for s in sizes)} × {len(scenarios)} scenarios "
+          f"(seed {args.seed}, latency {args.latency_ms:g}ms, failures {args.failure_rate:.0%})\n")
+    print(f"{'jobs':>8} {'scenario':<14} {'seconds':>9}  details")
+    print("-" * 78)
+    started = time.perf_counter()
+    results = run_bench(sizes, scenarios, seed=args.seed, latency_ms=args.latency_ms,
+                        failure_rate=args.failure_rate, repeat=args.repeat,
+                        daemon_companies=args.daemon_companies, verbose=args.verbose,
+                        keep=args.keep, on_row=print_row)
+    print(f"\n⏱️  Total: {time.perf_counter() - started:.1f}s")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"💾 Saved: {args.out}")
+
+    if args.baseline:
+        sys.exit(report_regressions(compare(results, json.loads(Path(args.baseline).read_text())), args.baseline))
+
+
+if __name__ == "__main__":
+    main()
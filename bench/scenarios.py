@@ -0,0 +1,324 @@
+"""
+Benchmark scenarios: the real ingest code paths against a synthetic corpus.
+
+Sandbox redirects everything the app reads/writes (data/, cache/,
+company_status.json, role AI cache, job_status.json, shared state) into a temp
+dir and turns AI classification off, so a run never touches real data and
+never calls an LLM. HTTP goes to MockATSServer via route_requests().
+
+Scenarios (each returns {"seconds": ..., **details}):
+
+- full_refresh   GET /jobs?profile=all&refresh=true in-process (ASGI): fetch
+                 every board through the parsers, normalize/classify, save
+                 cache, sync pipeline, filter + score + serialize the response
+- daemon_cycle   refresh_company_sync() for a sample of companies against the
+                 full-size cache (what one daemon cycle does per company);
+                 estimated_cycle_seconds extrapolates to all companies
+- jobs_filter    GET /jobs from cache with several filter combinations
+- pipeline_sync  sync_cache_to_pipeline(): cold (empty pipeline) + warm
+- kw_scoring     score_jobs_batch() over the pipeline, JD text for ~30% of jobs
+- cache_load     load_cache("all") / save_cache("all")
+
+Scenarios after full_refresh reuse the state it leaves; run alone, they seed
+it first (untimed).
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode
+
+from bench.corpus import Corpus, jd_text
+from bench.mock_ats import MockATSServer, _unit
+
+JOBS_QUERIES = [
+    {"profile": "all"},
+    {"profile": "all", "role_filter": "product", "location_filter": "us"},
+    {"profile": "all", "states": "NC,VA,South Carolina", "include_remote_usa": "true"},
+    {"profile": "all", "geo_mode": "nc_priority", "search": "manager"},
+    {"profile": "all", "company_filter": "ledger", "city": "Raleigh"},
+]
+JD_SHARE = 0.3
+
+
+class Sandbox:
+    """Temp project state + patched module paths; everything is restored on exit."""
+
+    def __init__(self, root: Optional[Path] = None, keep: bool = False):
+        self.root = Path(root or tempfile.mkdtemp(prefix="bench_ingest_"))
+        self.keep = keep
+        self.data = self.root / "data"
+        self.cache = self.root / "cache"
+        self.jd = self.data / "jd"
+        self._patches = []
+        self._env = {}
+        self._cwd = None
+
+    def _patch(self, owner, name: str, value):
+        self._patches.append((owner, name, getattr(owner, name)))
+        setattr(owner, name, value)
+
+    def _setenv(self, name: str, value: str):
+        self._env.setdefault(name, os.environ.get(name))
+        os.environ[name] = value
+
+    def __enter__(self) -> "Sandbox":
+        for d in (self.data, self.cache, self.jd):
+            d.mkdir(parents=True, exist_ok=True)
+        self._setenv("SHARED_STATE", "memory")
+        self._setenv("SHARED_STATE_DB", str(self.root / "shared_state.db"))
+        import company_storage
+        import utils.ai_classifier as ai_classifier
+        import utils.cache_manager as cache_manager
+        import utils.company_health as company_health
+        import storage.job_storage as job_storage
+
+        store = company_health.CompanyHealthStore(path=self.data / "company_status.json")
+        self._patch(company_health, "_store", store)  # до import main: get_health_store() вернёт его
+        import main  # из корня проекта: static/ монтируется при импорте
+
+        self._cwd = os.getcwd()
+        os.chdir(self.root)  # main: job_status.json, data/companies.json, data/daemon.lock
+        self._patch(main, "company_health", store)
+        self._patch(job_storage, "DATA_DIR", self.data)
+        self._patch(job_storage, "JOBS_FILE", self.data / "jobs_new.json")
+        self._patch(job_storage, "REJECTED_FILE", self.data / "rejected_jobs.json")
+        self._patch(cache_manager, "CACHE_DIR", self.cache)
+        self._patch(cache_manager, "STATS_FILE", self.cache / "stats.json")
+        self._patch(company_storage, "DATA_DIR", self.data)
+        self._patch(ai_classifier, "CACHE_FILE", self.data / "role_ai_cache.json")
+        self._patch(ai_classifier, "_cache", None)
+        self._patch(ai_classifier, "load_ai_settings", lambda: {"enabled": False})
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+        self._patches.clear()
+        for name, value in self._env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        if self._cwd:
+            os.chdir(self._cwd)
+        if not self.keep:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def write_companies(self, corpus: Corpus):
+        (self.data / "companies.json").write_text(json.dumps(corpus.companies, indent=1), encoding="utf-8")
+
+    def reset_state(self):
+        """Empty pipeline, cache and company health (before a full refresh)."""
+        for path in (self.data / "jobs_new.json", self.data / "rejected_jobs.json", self.root / "job_status.json"):
+            path.unlink(missing_ok=True)
+        for path in self.cache.glob("*.json"):
+            path.unlink()
+
+
+class BenchContext:
+    def __init__(self, corpus: Corpus, server: MockATSServer, sandbox: Sandbox,
+                 repeat: int = 1, daemon_companies: int = 10):
+        self.corpus = corpus
+        self.server = server
+        self.sandbox = sandbox
+        self.repeat = max(1, repeat)
+        self.daemon_companies = daemon_companies
+        self.seeded = False
+
+
+def asgi_request(app, path: str, params: Optional[dict] = None, method: str = "GET") -> tuple:
+    """In-process ASGI request → (status, body bytes); same event loop model as uvicorn."""
+    query = urlencode(params or {}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query, "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def run():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        status, chunks = None, []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await app(scope, receive, send)
+        return status, b"".join(chunks)
+
+    return asyncio.run(run())
+
+
+def _timed(fn: Callable, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+# ---------- scenarios ----------
+
+def full_refresh(ctx: BenchContext) -> dict:
+    import main
+
+    ctx.sandbox.reset_state()
+    ctx.server.reset_stats()
+    seconds, (status, body) = _timed(asgi_request, main.app, "/jobs", {"profile": "all", "refresh": "true"})
+    if status != 200:
+        raise RuntimeError(f"/jobs?refresh=true → HTTP {status}: {body[:200]!r}")
+    ctx.seeded = True
+    from utils.cache_manager import load_cache
+    cached = load_cache("all", ignore_ttl=True) or {}
+    return {
+        "seconds": seconds,
+        "jobs": cached.get("jobs_count", 0),
+        "companies": len(ctx.corpus.companies),
+        "requests": ctx.server.stats["requests"],
+        "failed_boards": len(ctx.server.failing),
+        "response_bytes": len(body),
+    }
+
+
+def daemon_cycle(ctx: BenchContext) -> dict:
+    import main
+
+    ensure_seeded(ctx)
+    companies = main._load_companies_json()
+    step = max(1, len(companies) // max(1, ctx.daemon_companies))
+    sample = companies[::step][:ctx.daemon_companies]
+    per_company, ok = [], 0
+    for company in sample:
+        seconds, result = _timed(main.refresh_company_sync, company)
+        per_company.append(seconds)
+        ok += bool(result["ok"])
+    total = sum(per_company)
+    mean = total / len(per_company) if per_company else 0.0
+    return {
+        "seconds": total,
+        "companies_sampled": len(sample),
+        "ok": ok,
+        "per_company_ms": round(mean * 1000, 1),
+        "per_company_max_ms": round(max(per_company, default=0) * 1000, 1),
+        "estimated_cycle_seconds": round(mean * len(companies), 2),
+    }
+
+
+def jobs_filter(ctx: BenchContext) -> dict:
+    import main
+
+    ensure_seeded(ctx)
+    timings: Dict[str, float] = {}
+    for params in JOBS_QUERIES:
+        seconds, (status, body) = _timed(asgi_request, main.app, "/jobs", params)
+        if status != 200:
+            raise RuntimeError(f"/jobs {params} → HTTP {status}")
+        timings[urlencode(params)] = seconds
+    return {
+        "seconds": sum(timings.values()),
+        "queries_ms": {q: round(s * 1000, 1) for q, s in timings.items()},
+    }
+
+
+def pipeline_sync(ctx: BenchContext) -> dict:
+    import main
+    from utils.cache_manager import load_cache
+
+    ensure_seeded(ctx)
+    jobs = (load_cache("all", ignore_ttl=True) or {}).get("jobs", [])
+    (ctx.sandbox.data / "jobs_new.json").unlink(missing_ok=True)
+    cold, cold_result = _timed(main.sync_cache_to_pipeline, jobs)
+    warm, warm_result = _timed(main.sync_cache_to_pipeline, jobs)
+    return {
+        "seconds": cold + warm,
+        "cold_seconds": cold,
+        "warm_seconds": warm,
+        "added": cold_result["added"],
+        "updated": warm_result["updated"],
+    }
+
+
+def kw_scoring(ctx: BenchContext) -> dict:
+    from storage.job_storage import _load_jobs
+    from utils.job_scorer import score_jobs_batch
+
+    ensure_seeded(ctx)
+    jobs = _load_jobs()
+    with_jd = 0
+    for job in jobs:
+        job_id = job.get("id", "")
+        if job_id and _unit(ctx.corpus.seed, "jd", job_id) < JD_SHARE:
+            path = ctx.sandbox.jd / f"{job_id}.txt"
+            if not path.exists():
+                path.write_text(jd_text(job_id), encoding="utf-8")
+            with_jd += 1
+    seconds, _ = _timed(score_jobs_batch, jobs, jd_dir=ctx.sandbox.jd)
+    return {
+        "seconds": seconds,
+        "jobs": len(jobs),
+        "with_jd": with_jd,
+        "jobs_per_sec": round(len(jobs) / seconds, 1) if seconds else 0.0,
+    }
+
+
+def cache_load(ctx: BenchContext) -> dict:
+    from utils.cache_manager import get_cache_path, load_cache, save_cache
+
+    ensure_seeded(ctx)
+    load_s, cached = _timed(load_cache, "all", ignore_ttl=True)
+    jobs = (cached or {}).get("jobs", [])
+    save_s, _ = _timed(save_cache, "all", jobs)
+    return {
+        "seconds": load_s + save_s,
+        "load_seconds": load_s,
+        "save_seconds": save_s,
+        "jobs": len(jobs),
+        "bytes": get_cache_path("all").stat().st_size,
+    }
+
+
+SCENARIOS: Dict[str, Callable[[BenchContext], dict]] = {
+    "full_refresh": full_refresh,
+    "daemon_cycle": daemon_cycle,
+    "jobs_filter": jobs_filter,
+    "pipeline_sync": pipeline_sync,
+    "kw_scoring": kw_scoring,
+    "cache_load": cache_load,
+}
+
+
+def ensure_seeded(ctx: BenchContext):
+    if not ctx.seeded:
+        full_refresh(ctx)
+
+
+def run_scenario(ctx: BenchContext, name: str, verbose: bool = False) -> dict:
+    """Run scenario `name` ctx.repeat times → median seconds + details of the median run."""
+    runs: List[dict] = []
+    for _ in range(ctx.repeat):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(sys.stdout if verbose else out):
+            runs.append(SCENARIOS[name](ctx))
+    median = statistics.median(r["seconds"] for r in runs)
+    best = min(runs, key=lambda r: abs(r["seconds"] - median))
+    row = {k: (round(v, 4) if isinstance(v, float) else v) for k, v in best.items()}
+    row["seconds"] = round(median, 4)
+    row["runs"] = [round(r["seconds"], 4) for r in runs]
+    return row
@@ -0,0 +1,352 @@
+"""
+Warm form-filling worker pool for /apply/v5, /apply/v6, /apply/v7
+
+Before: every apply request wrote a Python script to /tmp, started a new
+interpreter that re-imported Playwright + the 5,900-line v5 engine,
+reconnected over CDP and rebuilt Profile / LearnedDB / FormSchemaDB /
+KnowledgeBase from JSON before touching the page. Output went to
+/tmp/v*_apply.log via TeeWriter.
+
+Now the server keeps N long-lived worker threads. Each worker:
+- imports the engines once and keeps one CDP connection to the automation
+  Chrome (Playwright sync API objects stay on the thread that created them)
+- uses the pool's preloaded FormFillerV5: one Profile/LearnedDB/FormSchemaDB/
+  KB/AI set per process, shared by every per-job filler of every worker
+  (FormFillerV5(shared_from=...)). The stores are locked for writes and
+  re-read when their file changes (e.g. PATCH/DELETE /api/v5/learned).
+- takes ApplyJobs from a queue and runs each one in its own new tab,
+  so several applications can be prepared in parallel tabs
+
+print() output of a job is captured per thread into ApplyJob.log and can be
+streamed (/apply/jobs/{id}/stream). Jobs run in AUTONOMOUS mode: there is no
+terminal to answer prompts, unknown fields stay "needs input" in the report.
+Manual steps (login, captcha) are waited for on the page for a bounded time;
+if nobody completes them the job ends with status "needs_user".
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+ENGINES = ("v5", "v6", "v7")
+DEFAULT_WORKERS = int(os.getenv("APPLY_WORKERS", "2"))
+MAX_LOG_LINES = 5000
+MAX_FINISHED_JOBS = 50
+FINISHED_STATUSES = ("done", "needs_user", "error")
+
+
+class ApplyJob:
+    def __init__(self, engine: str, job_url: str, profile: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.engine = engine
+        self.job_url = job_url
+        self.profile = profile
+        self.status = "queued"  # queued | running | done | needs_user | error
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.worker: Optional[int] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.log: List[str] = []
+        self._partial = ""
+        self._cond = threading.Condition()
+
+    def append_log(self, text: str):
+        with self._cond:
+            self._partial += text
+            *lines, self._partial = self._partial.split("\n")
+            if lines:
+                self.log.extend(lines)
+                if len(self.log) > MAX_LOG_LINES:
+                    del self.log[:len(self.log) - MAX_LOG_LINES]
+                self._cond.notify_all()
+
+    def finish(self, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        with self._cond:
+            if self._partial:
+                self.log.append(self._partial)
+                self._partial = ""
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self._cond.notify_all()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def follow(self, poll: float = 15.0) -> Iterator[tuple]:
+        """Yield ("line", text) for every log line (history first), then ("end", None).
+        Yields ("ping", None) every `poll` seconds without output (SSE keep-alive)."""
+        pos = 0
+        while True:
+            with self._cond:
+                if pos >= len(self.log) and not self.finished:
+                    self._cond.wait(timeout=poll)
+                lines = self.log[pos:]
+                pos = len(self.log)
+                finished = self.finished
+            if not lines and not finished:
+                yield ("ping", None)
+            for line in lines:
+                yield ("line", line)
+            if finished:
+                yield ("end", None)
+                return
+
+    def to_dict(self, with_log: bool = False) -> dict:
+        data = {
+            "job_id": self.id,
+            "engine": self.engine,
+            "job_url": self.job_url,
+            "profile": self.profile,
+            "status": self.status,
+            "worker": self.worker,
+            "created_at": self.created_at,
+            "queued_seconds": round((self.started_at or time.time()) - self.created_at, 2),
+            "run_seconds": round((self.finished_at or time.time()) - self.started_at, 2) if self.started_at else None,
+            "result": self.result,
+            "error": self.error,
+            "log_lines": len(self.log),
+        }
+        if with_log:
+            data["log"] = "\n".join(self.log)
+        return data
+
+
+class _StdoutRouter:
+    """sys.stdout/stderr wrapper: writes from a worker thread also go to its job log."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def bind(self, job: Optional[ApplyJob]):
+        self._local.job = job
+
+    def write(self, text):
+        job = getattr(self._local, "job", None)
+        if job is not None:
+            job.append_log(text)
+        return self._stream.write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class _Worker(threading.Thread):
+    def __init__(self, pool: "ApplyWorkerPool", index: int):
+        super().__init__(name=f"apply-worker-{index}", daemon=True)
+        self.pool = pool
+        self.index = index
+        self.browser = None      # browser.v5.browser_manager.BrowserManager (CDP)
+        self.base_filler = None  # pool-wide warm FormFillerV5 with loaded DBs
+        self.current: Optional[ApplyJob] = None
+        self.jobs_done = 0
+
+    # ---------- warm state ----------
+
+    def _warm_up(self):
+        """Import engines; v5 state is loaded once per pool and shared by all workers."""
+        if self.base_filler is None:
+            self.base_filler = self.pool.shared_filler()
+
+    def _ensure_browser(self):
+        """One CDP connection per worker; reconnect if Chrome was closed."""
+        from browser.v5.browser_manager import BrowserManager, BrowserMode
+        if self.browser is not None:
+            try:
+                if self.browser.browser and self.browser.browser.is_connected():
+                    return self.browser
+            except Exception:
+                pass
+            try:
+                self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        self.browser = BrowserManager(mode=BrowserMode.CDP).start()
+        return self.browser
+
+    # ---------- engines ----------
+
+    def _run_v5(self, job: ApplyJob) -> dict:
+        from browser.v5.engine import FormFillerV5, FillMode
+        from browser.v5.browser_manager import BrowserMode
+        browser = self._ensure_browser()
+        browser.use_new_tab()
+        filler = FormFillerV5(browser_mode=BrowserMode.CDP, shared_from=self.base_filler)
+        report = filler.fill(job.job_url, mode=FillMode.AUTONOMOUS, browser=browser)
+        return {
+            "total_fields": report.total_fields,
+            "filled_fields": report.filled_fields,
+            "verified_fields": report.verified_fields,
+            "needs_input": report.needs_input,
+            "needs_user": report.needs_user,
+            "errors": report.errors,
+            "fill_seconds": report.fill_seconds,
+        }
+
+    def _run_v6(self, job: ApplyJob) -> dict:
+        from browser.v6.engine import FormFillerV6
+        browser = self._ensure_browser()
+        filler = FormFillerV6()
+        # Reuse the worker's CDP connection instead of FormFillerV6.connect()
+        filler.playwright, filler.browser, filler.context = None, browser.browser, browser.context
+        filler.page = browser.use_new_tab()
+        print(f"📍 Opening: {job.job_url[:60]}...")
+        filler.page.goto(job.job_url, wait_until="domcontentloaded", timeout=20000)
+        try:
+            filler.page.wait_for_selector('#grnhse_iframe', timeout=10000)
+        except Exception:
+            pass
+        if not filler.find_frame():
+            raise RuntimeError("No form found on page")
+        filler.fill_greenhouse()
+        return {"message": "Form filling complete"}
+
+    def _run_v7(self, job: ApplyJob) -> dict:
+        from browser.v7.agent import FormFillerAgent
+        browser = self._ensure_browser()
+        agent = FormFillerAgent()
+        agent.playwright, agent.browser = None, browser.browser
+        agent.page = browser.use_new_tab()
+        agent.fill_form(job.job_url)
+        return {"actions": len(agent.actions_log)}
+
+    # ---------- loop ----------
+
+    def run(self):
+        try:
+            self._warm_up()
+        except Exception as e:
+            print(f"[ApplyWorker {self.index}] Warm-up failed: {e}")
+
+        while True:
+            job = self.pool._queue.get()
+            if job is None:
+                break
+            self.current = job
+            job.worker = self.index
+            job.status = "running"
+            job.started_at = time.time()
+            self.pool._router_bind(job)
+            try:
+                print(f"[ApplyWorker {self.index}] {job.engine} {job.job_url}")
+                self._warm_up()
+                result = getattr(self, f"_run_{job.engine}")(job)
+                job.finish("needs_user" if result.get("needs_user") else "done", result=result)
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                job.finish("error", error=str(e))
+            finally:
+                self.pool._router_bind(None)
+                self.current = None
+                self.jobs_done += 1
+                self.pool._queue.task_done()
+                self.pool._trim_history()
+
+
+class ApplyWorkerPool:
+    def __init__(self, size: int = DEFAULT_WORKERS):
+        self.size = max(1, size)
+        self._queue: "queue.Queue[Optional[ApplyJob]]" = queue.Queue()
+        self._jobs: Dict[str, ApplyJob] = {}
+        self._lock = threading.Lock()
+        self._workers: List[_Worker] = []
+        self._stdout: Optional[_StdoutRouter] = None
+        self._stderr: Optional[_StdoutRouter] = None
+        self._base_filler = None
+        self._filler_lock = threading.Lock()
+
+    def shared_filler(self):
+        """The warm FormFillerV5 whose stores every worker shares (created on first use)."""
+        with self._filler_lock:
+            if self._base_filler is None:
+                from browser.v5.engine import FormFillerV5
+                from browser.v5.browser_manager import BrowserMode
+                self._base_filler = FormFillerV5(browser_mode=BrowserMode.CDP)
+            return self._base_filler
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._workers:
+                return
+            if str(PROJECT_ROOT) not in sys.path:
+                sys.path.insert(0, str(PROJECT_ROOT))
+            self._stdout = _StdoutRouter(sys.stdout)
+            self._stderr = _StdoutRouter(sys.stderr)
+            sys.stdout, sys.stderr = self._stdout, self._stderr
+            self._workers = [_Worker(self, i) for i in range(self.size)]
+            for w in self._workers:
+                w.start()
+            print(f"[ApplyWorker] Started {self.size} warm workers")
+
+    def _router_bind(self, job: Optional[ApplyJob]):
+        self._stdout.bind(job)
+        self._stderr.bind(job)
+
+    def _trim_history(self):
+        with self._lock:
+            finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.created_at)
+            for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                del self._jobs[job.id]
+
+    def submit(self, engine: str, job_url: str, profile: str = "anton_tpm") -> ApplyJob:
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        self._ensure_started()
+        job = ApplyJob(engine, job_url, profile)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ApplyJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def latest(self, engine: Optional[str] = None) -> Optional[ApplyJob]:
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if engine is None or j.engine == engine]
+        return max(jobs, key=lambda j: j.created_at) if jobs else None
+
+    def list_jobs(self) -> List[dict]:
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)
+        return [j.to_dict() for j in jobs]
+
+    def status(self) -> dict:
+        return {
+            "workers": self.size,
+            "started": bool(self._workers),
+            "queued": self._queue.qsize(),
+            "busy": sum(1 for w in self._workers if w.current is not None),
+            "jobs_done": sum(w.jobs_done for w in self._workers),
+            "connected": sum(1 for w in self._workers if w.browser is not None),
+        }
+
+
+_pool: Optional[ApplyWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ApplyWorkerPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ApplyWorkerPool()
+        return _pool
@@ -5,21 +5,48 @@ Usage:
     1. Start monitor server: python browser/live_monitor.py
     2. Open http://localhost:8765 in browser
     3. Run form filler - screenshots stream to browser automatically
+
+Frames:
+    send_screenshot(page) starts a CDP screencast (Page.startScreencast) on the
+    first call: Chrome pushes JPEG frames itself, capped at MONITOR_MAX_FPS,
+    so later calls cost nothing on the filler's side. Frames identical to the
+    previous one are skipped, a client still sending the previous frame gets
+    the next one instead (no queue build-up), and frames go out as binary
+    websocket messages (no base64 JSON).
+    Without CDP (non-Chromium) it falls back to one rate-limited capture per
+    call: CDP Page.captureScreenshot (jpeg/webp) or page.screenshot(jpeg).
 """
 
 import asyncio
 import base64
+import hashlib
 import json
+import os
 import threading
 import time
+import weakref
 from pathlib import Path
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 import websockets
 
+# Frame settings
+MAX_FPS = float(os.getenv("MONITOR_MAX_FPS", "5"))
+FRAME_FORMAT = os.getenv("MONITOR_FORMAT", "jpeg")   # jpeg | webp (webp: capture mode only)
+FRAME_QUALITY = int(os.getenv("MONITOR_QUALITY", "60"))
+MAX_WIDTH = 1280
+MAX_HEIGHT = 1600
+
 # Global state
 connected_clients = set()
-current_screenshot = None
+current_screenshot = None  # last frame bytes (sent to new clients)
 status_message = "Waiting for form filler..."
+_sending = set()           # clients with a frame send in progress
+_screencasts = weakref.WeakKeyDictionary()  # page → CDPSession (gone with the page)
+_last_hash = None
+_last_sent = 0.0
+_pending_frame = None      # newest frame held back by the fps cap
+_frame_lock = threading.Lock()
+stats = {"frames_sent": 0, "frames_unchanged": 0, "frames_dropped": 0, "bytes_sent": 0}
 
 HTML_PAGE = """
 <!DOCTYPE html>
@@ -61,11 +88,15 @@ HTML_PAGE = """
     
     <script>
         const ws = new WebSocket('ws://localhost:8766');
+        ws.binaryType = 'blob';
         const img = document.getElementById('screenshot');
         const status = document.getElementById('status');
         const fpsEl = document.getElementById('fps');
         let frameCount = 0;
+        let frameBytes = 0;
         let lastTime = Date.now();
+        let mime = 'image/jpeg';
+        let frameUrl = null;
         
         ws.onopen = () => {
             status.textContent = '✅ Connected - Waiting for form filler...';
@@ -73,19 +104,28 @@ HTML_PAGE = """
         };
         
         ws.onmessage = (event) => {
-            const data = JSON.parse(event.data);
-            if (data.type === 'screenshot') {
-                img.src = 'data:image/png;base64,' + data.data;
+            if (event.data instanceof Blob) {
+                // Binary frame
+                if (frameUrl) URL.revokeObjectURL(frameUrl);
+                frameUrl = URL.createObjectURL(new Blob([event.data], {type: mime}));
+                img.src = frameUrl;
                 frameCount++;
-            } else if (data.type === 'status') {
-                status.textContent = data.message;
+                frameBytes += event.data.size;
+            } else {
+                const data = JSON.parse(event.data);
+                if (data.type === 'format') {
+                    mime = data.mime;
+                } else if (data.type === 'status') {
+                    status.textContent = data.message;
+                }
             }
             
             // FPS counter
             const now = Date.now();
             if (now - lastTime > 1000) {
-                fpsEl.textContent = frameCount + ' fps';
+                fpsEl.textContent = frameCount + ' fps, ' + Math.round(frameBytes / 1024) + ' kB/s';
                 frameCount = 0;
+                frameBytes = 0;
                 lastTime = now;
             }
         };
@@ -99,26 +139,51 @@ HTML_PAGE = """
 </html>
 """
 
+def _mime() -> str:
+    return f"image/{FRAME_FORMAT}"
+
+
 async def websocket_handler(websocket, path):
     """Handle WebSocket connections."""
     connected_clients.add(websocket)
     print(f"Client connected. Total: {len(connected_clients)}")
     try:
+        await websocket.send(json.dumps({"type": "format", "mime": _mime()}))
+        await websocket.send(json.dumps({"type": "status", "message": status_message}))
+        if current_screenshot:
+            await websocket.send(current_screenshot)
         await websocket.wait_closed()
     finally:
         connected_clients.discard(websocket)
+        _sending.discard(websocket)
         print(f"Client disconnected. Total: {len(connected_clients)}")
 
 
-async def broadcast_screenshot(screenshot_base64: str):
-    """Send screenshot to all connected clients."""
-    if connected_clients:
-        message = json.dumps({"type": "screenshot", "data": screenshot_base64})
-        await asyncio.gather(*[client.send(message) for client in connected_clients])
+async def _send_frame(client, frame: bytes):
+    _sending.add(client)
+    try:
+        await client.send(frame)
+        stats["frames_sent"] += 1
+        stats["bytes_sent"] += len(frame)
+    except Exception:
+        pass
+    finally:
+        _sending.discard(client)
+
+
+async def broadcast_frame(frame: bytes):
+    """Send binary frame to all clients; a client still busy with the previous frame skips this one."""
+    for client in list(connected_clients):
+        if client in _sending:
+            stats["frames_dropped"] += 1
+            continue
+        asyncio.ensure_future(_send_frame(client, frame))
 
 
 async def broadcast_status(message: str):
     """Send status message to all clients."""
+    global status_message
+    status_message = message
     if connected_clients:
         msg = json.dumps({"type": "status", "message": message})
         await asyncio.gather(*[client.send(msg) for client in connected_clients])
@@ -145,7 +210,7 @@ _ws_server = None
 
 def start_monitor_server():
     """Start the monitor server (call from main thread)."""
-    global _loop, _ws_server
+    global _loop
     
     # HTTP server in thread
     http_thread = threading.Thread(target=run_http_server, daemon=True)
@@ -174,17 +239,111 @@ def start_monitor_server():
     print("   Then run form filler with send_to_monitor=True\n")
 
 
+def _publish_frame(frame: bytes) -> bool:
+    """Frame diffing + fps cap, then hand the frame to the websocket loop.
+
+    A frame arriving faster than MAX_FPS is parked and sent when the interval
+    ends (newer frames replace it), so the final state of a burst is never lost.
+    """
+    global current_screenshot, _last_hash, _last_sent, _pending_frame
+    with _frame_lock:
+        digest = hashlib.md5(frame).digest()
+        if digest == _last_hash:
+            stats["frames_unchanged"] += 1
+            return False
+        now = time.time()
+        wait = 1.0 / MAX_FPS - (now - _last_sent)
+        if wait > 0:
+            if _pending_frame is not None:
+                stats["frames_dropped"] += 1
+            else:
+                _loop.call_soon_threadsafe(_loop.call_later, wait, _flush_pending)
+            _pending_frame = frame
+            return False
+        _pending_frame = None
+        _last_hash, _last_sent = digest, now
+        current_screenshot = frame
+    asyncio.run_coroutine_threadsafe(broadcast_frame(frame), _loop)
+    return True
+
+
+def _flush_pending():
+    global _pending_frame
+    with _frame_lock:
+        frame, _pending_frame = _pending_frame, None
+    if frame is not None:
+        _publish_frame(frame)
+
+
+def start_screencast(page) -> bool:
+    """Start CDP screencast for page (Chromium only). Frames are pushed by Chrome."""
+    if page in _screencasts:
+        return True
+    try:
+        session = page.context.new_cdp_session(page)
+    except Exception:
+        return False
+
+    def on_frame(event):
+        try:
+            session.send("Page.screencastFrameAck", {"sessionId": event["sessionId"]})
+        except Exception:
+            pass
+        if _loop and connected_clients:
+            _publish_frame(base64.b64decode(event["data"]))
+
+    session.on("Page.screencastFrame", on_frame)
+    # Chrome paints at ~60 fps; everyNthFrame keeps the encoder near MAX_FPS
+    session.send("Page.startScreencast", {
+        "format": "jpeg",
+        "quality": FRAME_QUALITY,
+        "maxWidth": MAX_WIDTH,
+        "maxHeight": MAX_HEIGHT,
+        "everyNthFrame": max(1, int(60 // MAX_FPS)),
+    })
+    _screencasts[page] = session
+    page.on("close", stop_screencast)  # закрытая вкладка не остаётся «уже стримится»
+    return True
+
+
+def stop_screencast(page):
+    session = _screencasts.pop(page, None)
+    if session:
+        try:
+            session.send("Page.stopScreencast")
+            session.detach()
+        except Exception:
+            pass
+
+
+def _capture(page) -> bytes:
+    """Single frame: CDP captureScreenshot (jpeg/webp), else Playwright jpeg."""
+    try:
+        session = page.context.new_cdp_session(page)
+        try:
+            result = session.send("Page.captureScreenshot", {"format": FRAME_FORMAT, "quality": FRAME_QUALITY})
+            return base64.b64decode(result["data"])
+        finally:
+            session.detach()
+    except Exception:
+        return page.screenshot(type="jpeg", quality=FRAME_QUALITY)
+
+
 def send_screenshot(page) -> bool:
-    """Send current page screenshot to monitor (call from form filler)."""
-    global _loop
+    """Stream current page to monitor (call from form filler).
+
+    JPEG: first call starts the screencast, later calls return immediately.
+    Otherwise one rate-limited capture per call.
+    """
     if not _loop or not connected_clients:
         return False
     
     try:
-        screenshot_bytes = page.screenshot(type="png")
-        screenshot_b64 = base64.b64encode(screenshot_bytes).decode()
-        asyncio.run_coroutine_threadsafe(broadcast_screenshot(screenshot_b64), _loop)
-        return True
+        if FRAME_FORMAT == "jpeg" and start_screencast(page):
+            return True
+        if time.time() - _last_sent < 1.0 / MAX_FPS:
+            return False
+        return _publish_frame(_capture(page))
     except Exception as e:
         print(f"Screenshot error: {e}")
         return False
@@ -192,7 +351,6 @@ def send_screenshot(page) -> bool:
 
 def send_status(message: str):
     """Send status message to monitor."""
-    global _loop
     if _loop:
         asyncio.run_coroutine_threadsafe(broadcast_status(message), _loop)
 
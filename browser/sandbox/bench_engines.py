@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Engine benchmark: every form filler against the sandbox forms, offline
+
+Starts the sandbox server (server.py) on a local port and runs each engine
+headless against each template (recorded replay_* forms from recorder.py and
+the hand-written ones). Per engine × form:
+
+- wall time and fields/sec
+- fill rate: visible fillable fields with a value after the run, measured
+  in-page the same way for every engine
+- AI calls: Anthropic messages.create (sync + async) and Ollama requests,
+  counted by patching the clients for the duration of the run
+
+Learned answers, schemas, telemetry and application reports go to a temp dir,
+so benchmark runs never touch the real databases. Every engine starts each run
+from a fresh scratch copy of its own real answer DBs (_seeded), so all engines
+fill with the answers they have in real use and the numbers are comparable.
+
+Engines: v5 (FormFillerV5), v35 (SmartFillerV35), v6, v7, v8.
+v7/v8 are screenshot agents and need ANTHROPIC_API_KEY; skipped otherwise.
+
+Usage:
+    python browser/sandbox/bench_engines.py
+    python browser/sandbox/bench_engines.py --engines v5,v35 --forms replay_ --out bench.json
+    python browser/sandbox/bench_engines.py --baseline bench.json   # exit 1 on regression
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+BENCH_TMP = Path(tempfile.mkdtemp(prefix="bench_engines_"))
+os.environ.setdefault("FILL_TELEMETRY_DIR", str(BENCH_TMP / "form_fills"))
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+ENGINES = ("v5", "v35", "v6", "v7", "v8")
+DEFAULT_PORT = 8899
+
+# Regression thresholds for --baseline
+MAX_SLOWDOWN = 1.25     # wall time
+MAX_FILL_DROP = 0.05    # fill rate, absolute
+
+FILL_RATE_JS = '''() => {
+    const fields = Array.from(document.querySelectorAll('input, select, textarea')).filter(el => {
+        if (['hidden', 'submit', 'button', 'reset', 'image'].includes(el.type)) return false;
+        const r = el.getBoundingClientRect();
+        return r.width > 0 && r.height > 0 && !el.disabled;
+    });
+    const groups = new Set();
+    let total = 0, filled = 0;
+    for (const el of fields) {
+        if (el.type === 'radio' || el.type === 'checkbox') {
+            const key = el.name || el.id;
+            if (groups.has(key)) continue;
+            groups.add(key);
+            total++;
+            if (document.querySelector(`input[name="${CSS.escape(key)}"]:checked`) || el.checked) filled++;
+        } else if (el.type === 'file') {
+            total++;
+            if (el.files && el.files.length) filled++;
+        } else {
+            total++;
+            if ((el.value || '').trim()) filled++;
+        }
+    }
+    return {total, filled};
+}'''
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Sandbox server + AI call counting
+# ─────────────────────────────────────────────────────────────────────
+
+def start_sandbox(port: int) -> str:
+    import uvicorn
+    from browser.sandbox.server import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    if not server.started:
+        raise RuntimeError(f"Sandbox server didn't start on port {port}")
+    return f"http://127.0.0.1:{port}"
+
+
+class AICallCounter:
+    """Counts LLM requests made while active (Anthropic SDK + Ollama HTTP)."""
+
+    def __init__(self):
+        self.calls = 0
+        self._patches = []
+
+    def _wrap(self, owner, name, is_async=False):
+        original = getattr(owner, name)
+        counter = self
+
+        if is_async:
+            async def wrapper(*args, **kwargs):
+                counter.calls += 1
+                return await original(*args, **kwargs)
+        else:
+            def wrapper(*args, **kwargs):
+                counter.calls += 1
+                return original(*args, **kwargs)
+        setattr(owner, name, wrapper)
+        self._patches.append((owner, name, original))
+
+    def __enter__(self):
+        try:
+            from anthropic.resources.messages import Messages, AsyncMessages
+            self._wrap(Messages, "create")
+            self._wrap(AsyncMessages, "create", is_async=True)
+        except Exception:
+            pass
+        try:
+            from anthropic.resources.beta.messages import Messages as BetaMessages
+            self._wrap(BetaMessages, "create")
+        except Exception:
+            pass
+        try:
+            import requests
+            original_post = requests.post
+            counter = self
+
+            def post(url, *args, **kwargs):
+                if ":11434" in str(url):
+                    counter.calls += 1
+                return original_post(url, *args, **kwargs)
+            requests.post = post
+            self._patches.append((requests, "post", original_post))
+        except ImportError:
+            pass
+        return self
+
+    def __exit__(self, *exc):
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+        self._patches.clear()
+
+
+def measure_fill(page) -> dict:
+    """Fill rate over the main frame and child frames (Greenhouse iframe)."""
+    total = filled = 0
+    for frame in page.frames:
+        try:
+            res = frame.evaluate(FILL_RATE_JS)
+        except Exception:
+            continue
+        total += res["total"]
+        filled += res["filled"]
+    return {"total": total, "filled": filled}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Engine runners: run(url) → fill counts from the page after filling
+# ─────────────────────────────────────────────────────────────────────
+
+def _seeded(src, name: str) -> Path:
+    """Scratch copy of a real engine DB (same content the engine loaded at init)."""
+    dst = BENCH_TMP / name
+    if src and Path(src).exists():
+        shutil.copyfile(src, dst)
+    else:
+        dst.unlink(missing_ok=True)
+    return dst
+
+
+def run_v5(url: str) -> dict:
+    from browser.v5.engine import FormFillerV5, FillMode
+    from browser.v5.browser_manager import BrowserManager, BrowserMode, BrowserConfig
+
+    filler = FormFillerV5(browser_mode=BrowserMode.FRESH)
+    # Same content as loaded → _refresh_stores() reloads the copy, not an empty file
+    filler.learned_db.path = _seeded(filler.learned_db.path, "learned_answers.json")
+    filler.schema_db.path = _seeded(filler.schema_db.path, "form_schemas.json")
+    filler.logger.log_dir = BENCH_TMP / "form_fills"
+    filler.logger.log_dir.mkdir(parents=True, exist_ok=True)
+    filler._save_application_report = lambda report: None
+
+    config = BrowserConfig(mode=BrowserMode.FRESH, headless=True, slow_mo=0)
+    with BrowserManager(mode=BrowserMode.FRESH, config=config) as bm:
+        filler.fill(url, mode=FillMode.AUTONOMOUS, browser=bm)
+        return measure_fill(bm.page)
+
+
+def run_v35(url: str) -> dict:
+    from browser.smart_filler_v35 import SmartFillerV35
+
+    filler = SmartFillerV35(headless=True)
+    filler.learned_db.path = _seeded(filler.learned_db.path, "v35_learned.json")
+    # field_db is read-only (field_database.json), nothing to redirect
+    filler.start()
+    try:
+        filler.goto(url)
+        filler.multi_pass_fill(interactive=False)
+        return measure_fill(filler.page)
+    finally:
+        filler.stop()
+
+
+def run_v6(url: str) -> dict:
+    from playwright.sync_api import sync_playwright
+    from browser.v6.engine import FormFillerV6
+
+    filler = FormFillerV6()
+    filler.answers_db.path = str(_seeded(filler.answers_db.path, "v6_answers.json"))
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        filler.playwright, filler.browser = None, browser
+        filler.context = browser.new_context(viewport={"width": 1400, "height": 900})
+        filler.page = filler.context.new_page()
+        filler.page.goto(url, wait_until="networkidle")
+        if not filler.find_frame():
+            # Sandbox forms aren't on an ATS domain: the page itself is the form
+            filler.frame = filler.page.main_frame
+        filler.fill_greenhouse()
+        result = measure_fill(filler.page)
+        browser.close()
+        return result
+
+
+def run_v7(url: str) -> dict:
+    from playwright.sync_api import sync_playwright
+    from browser.v7.agent import FormFillerAgent
+
+    agent = FormFillerAgent()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        agent.playwright, agent.browser = None, browser
+        agent.page = browser.new_page(viewport={"width": 1400, "height": 900})
+        agent.fill_form(url)
+        result = measure_fill(agent.page)
+        browser.close()
+        return result
+
+
+def run_v8(url: str) -> dict:
+    from playwright.async_api import async_playwright
+    from browser.v8.agent import V8Agent, DISPLAY_WIDTH, DISPLAY_HEIGHT
+
+    async def run():
+        async with async_playwright() as p:
+            agent = V8Agent(debug=False)
+            agent.browser = await p.chromium.launch(headless=True)
+            agent.page = await agent.browser.new_page(viewport={"width": DISPLAY_WIDTH, "height": DISPLAY_HEIGHT})
+            # fill_form() only navigates to greenhouse URLs
+            await agent.page.goto(url, wait_until="networkidle")
+            await agent.fill_form(url)
+            total = filled = 0
+            for frame in agent.page.frames:
+                try:
+                    res = await frame.evaluate(FILL_RATE_JS)
+                except Exception:
+                    continue
+                total += res["total"]
+                filled += res["filled"]
+            await agent.close()
+            return {"total": total, "filled": filled}
+
+    return asyncio.run(run())
+
+
+RUNNERS = {"v5": run_v5, "v35": run_v35, "v6": run_v6, "v7": run_v7, "v8": run_v8}
+
+
+def needs_api_key(engine: str) -> bool:
+    return engine in ("v7", "v8")
+
+
+def bench_one(engine: str, url: str, verbose: bool) -> dict:
+    out = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with AICallCounter() as counter, \
+                contextlib.redirect_stdout(sys.stdout if verbose else out):
+            counts = RUNNERS[engine](url)
+        error = ""
+    except Exception as e:
+        counts, error = {"total": 0, "filled": 0}, f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start
+    return {
+        "engine": engine,
+        "wall_seconds": round(wall, 2),
+        "fields": counts["total"],
+        "filled": counts["filled"],
+        "fill_rate": round(counts["filled"] / counts["total"], 3) if counts["total"] else 0.0,
+        "fields_per_sec": round(counts["filled"] / wall, 2) if wall else 0.0,
+        "ai_calls": counter.calls,
+        "error": error[:200],
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Report
+# ─────────────────────────────────────────────────────────────────────
+
+def compare(results: list, baseline: list) -> list:
+    """Regressions vs a previous --out file: slower wall time or lower fill rate."""
+    base = {(r["form"], r["engine"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = base.get((r["form"], r["engine"]))
+        if not old or old["error"] or r["error"] == "skipped":
+            continue
+        if r["error"]:
+            regressions.append(f"{r['engine']} {r['form']}: now fails ({r['error'][:60]})")
+            continue
+        if old["wall_seconds"] and r["wall_seconds"] > old["wall_seconds"] * MAX_SLOWDOWN:
+            regressions.append(f"{r['engine']} {r['form']}: wall {old['wall_seconds']}s → {r['wall_seconds']}s")
+        if r["fill_rate"] < old["fill_rate"] - MAX_FILL_DROP:
+            regressions.append(f"{r['engine']} {r['form']}: fill rate {old['fill_rate']:.0%} → {r['fill_rate']:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", default="v5,v35,v6,v7,v8", help="comma-separated: " + ",".join(ENGINES))
+    parser.add_argument("--forms", default="", help="only templates whose name starts with this prefix")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--out", help="write results JSON")
+    parser.add_argument("--baseline", help="previous --out JSON; exit 1 on regression")
+    parser.add_argument("--verbose", action="store_true", help="show engine output")
+    args = parser.parse_args()
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip() in ENGINES]
+    forms = [p.stem for p in sorted(TEMPLATES_DIR.glob("*.html")) if p.stem.startswith(args.forms)]
+    if not forms:
+        print(f"❌ No templates matching '{args.forms}' in {TEMPLATES_DIR}")
+        sys.exit(2)
+
+    has_key = bool(os.getenv("ANTHROPIC_API_KEY"))
+    base_url = start_sandbox(args.port)
+    print(f"🧪 Sandbox: {base_url}  ({len(forms)} forms × {len(engines)} engines, scratch: {BENCH_TMP})\n")
+    print(f"{'form':<36} {'engine':<6} {'wall s':>7} {'fields':>6} {'fill %':>7} {'fld/s':>6} {'AI':>4}")
+    print("-" * 78)
+
+    results = []
+    for form in forms:
+        for engine in engines:
+            if needs_api_key(engine) and not has_key:
+                r = {"engine": engine, "wall_seconds": 0.0, "fields": 0, "filled": 0, "fill_rate": 0.0,
+                     "fields_per_sec": 0.0, "ai_calls": 0, "error": "skipped"}
+            else:
+                r = bench_one(engine, f"{base_url}/{form}", args.verbose)
+            r["form"] = form
+            results.append(r)
+            if r["error"]:
+                print(f"{form[:36]:<36} {engine:<6} {'—':>7}  {r['error'][:40]}")
+            else:
+                print(f"{form[:36]:<36} {engine:<6} {r['wall_seconds']:>7.1f} {r['fields']:>6} "
+                      f"{r['fill_rate']:>6.0%} {r['fields_per_sec']:>6.1f} {r['ai_calls']:>4}")
+
+    print("\n" + "=" * 78)
+    print(f"{'engine':<8} {'forms':>5} {'wall s':>8} {'fill %':>7} {'fld/s':>6} {'AI':>5}")
+    for engine in engines:
+        rows = [r for r in results if r["engine"] == engine and not r["error"]]
+        if not rows:
+            continue
+        wall = sum(r["wall_seconds"] for r in rows)
+        fields = sum(r["fields"] for r in rows)
+        filled = sum(r["filled"] for r in rows)
+        print(f"{engine:<8} {len(rows):>5} {wall:>8.1f} {(filled / fields if fields else 0):>6.0%} "
+              f"{(filled / wall if wall else 0):>6.1f} {sum(r['ai_calls'] for r in rows):>5}")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Saved: {args.out}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()))
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
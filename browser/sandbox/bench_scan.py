@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Scan latency benchmark: FormFillerV5 per-element scan vs DOM snapshot
+
+Loads every sandbox template (plus optional URLs) in headless Chromium and
+times FormFillerV5._scan_fields() with USE_DOM_SNAPSHOT off/on. Also diffs
+the detected fields (selector, type, label) so regressions show up.
+
+Usage:
+    python browser/sandbox/bench_scan.py
+    python browser/sandbox/bench_scan.py --runs 10 "https://job-boards.greenhouse.io/..."
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from playwright.sync_api import sync_playwright
+
+from browser.v5.engine import FormFillerV5
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+
+def time_scan(filler: FormFillerV5, use_snapshot: bool, runs: int):
+    filler.USE_DOM_SNAPSHOT = use_snapshot
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            filler._scan_fields()
+        timings.append((time.perf_counter() - start) * 1000)
+    fields = {(f.selector, f.field_type.value, f.label) for f in filler.fields}
+    return statistics.median(timings), fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", help="extra pages to benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    targets = [(p.stem, p.resolve().as_uri()) for p in sorted(TEMPLATES_DIR.glob("*.html"))]
+    targets += [(url[:40], url) for url in args.urls]
+
+    filler = FormFillerV5()
+    print(f"{'form':<42} {'fields':>6} {'legacy ms':>10} {'snapshot ms':>12} {'speedup':>8}")
+    print("-" * 82)
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        filler.page = page
+        for name, url in targets:
+            page.goto(url, wait_until="networkidle")
+            legacy_ms, legacy_fields = time_scan(filler, False, args.runs)
+            snap_ms, snap_fields = time_scan(filler, True, args.runs)
+            speedup = legacy_ms / snap_ms if snap_ms else 0
+            print(f"{name:<42} {len(snap_fields):>6} {legacy_ms:>10.1f} {snap_ms:>12.1f} {speedup:>7.1f}x")
+            for sel, ftype, label in sorted(legacy_fields ^ snap_fields):
+                side = "legacy" if (sel, ftype, label) in legacy_fields else "snapshot"
+                print(f"   ≠ only in {side}: {ftype:12} {sel[:30]:<30} {label[:40]}")
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Replay recorder: snapshot a live ATS application form into a sandbox template
+
+Opens the job page headless, finds the frame with the form (Greenhouse
+iframe, Workday/Lever/Ashby/iCIMS page), opens every combobox / autocomplete
+once to capture its options, then writes a self-contained static copy:
+
+- scripts, iframes, external stylesheets removed; readable CSS rules inlined
+- forms post to the sandbox /submit
+- captured options embedded as <script id="sandbox-options">, and
+  replay_mock.js recreates the dropdown behaviour offline
+  ("autocomplete" = filterable listbox, "search" = delayed API-like results)
+
+Output: templates/replay_<ats>_<slug>.html, served by server.py and picked up
+by bench_engines.py.
+
+Usage:
+    python browser/sandbox/recorder.py "https://job-boards.greenhouse.io/acme/jobs/123"
+    python browser/sandbox/recorder.py --name acme_tpm --no-apply-click URL
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from playwright.sync_api import sync_playwright
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+MOCK_JS_PATH = Path(__file__).parent / "replay_mock.js"
+
+ATS_PATTERNS = {
+    "greenhouse": ("greenhouse.io", "grnhse"),
+    "workday": ("myworkdayjobs.com", "workday"),
+    "lever": ("lever.co",),
+    "ashby": ("ashbyhq.com",),
+    "icims": ("icims.com",),
+}
+
+APPLY_SELECTORS = [
+    'a:has-text("Apply for this job")', 'button:has-text("Apply for this job")',
+    'a:has-text("Apply Now")', 'button:has-text("Apply Now")',
+    'a:has-text("Apply")', 'button:has-text("Apply")',
+]
+
+# Inputs whose options come from a dropdown rather than free text
+COMBOBOX_JS = '''() => Array.from(document.querySelectorAll(
+    'input[role="combobox"], input[aria-autocomplete], input[aria-haspopup="listbox"], .select__input input'
+)).filter(el => el.id && el.offsetParent !== null).map(el => el.id)'''
+
+OPTIONS_JS = '''() => Array.from(document.querySelectorAll('[role="option"], .select__option'))
+    .filter(o => o.offsetParent !== null)
+    .map(o => (o.textContent || '').trim())
+    .filter(t => t && t.length < 200)'''
+
+# Static copy of the frame: scripts and remote resources stripped, CSS inlined
+SNAPSHOT_JS = '''() => {
+    const css = [];
+    for (const sheet of Array.from(document.styleSheets)) {
+        try { for (const rule of Array.from(sheet.cssRules)) css.push(rule.cssText); }
+        catch (e) { /* cross-origin sheet, skip */ }
+    }
+    const root = document.documentElement.cloneNode(true);
+    root.querySelectorAll('script, noscript, iframe, link, style, [role="listbox"]').forEach(n => n.remove());
+    root.querySelectorAll('input, textarea').forEach(n => { n.removeAttribute('value'); n.value = ''; });
+    root.querySelectorAll('[src]').forEach(n => {
+        if (n.tagName !== 'IMG' || !n.src.startsWith('data:')) n.removeAttribute('src');
+    });
+    root.querySelectorAll('[srcset]').forEach(n => n.removeAttribute('srcset'));
+    const head = root.querySelector('head') || root.insertBefore(document.createElement('head'), root.firstChild);
+    const style = document.createElement('style');
+    style.textContent = css.join('\\n');
+    head.appendChild(style);
+    return '<!DOCTYPE html>\\n' + root.outerHTML;
+}'''
+
+
+def detect_ats(url: str) -> str:
+    url = url.lower()
+    for ats, needles in ATS_PATTERNS.items():
+        if any(n in url for n in needles):
+            return ats
+    return "generic"
+
+
+def slugify(url: str) -> str:
+    parsed = urlparse(url)
+    parts = [p for p in parsed.path.split("/") if p and p not in ("jobs", "job", "apply", "application")]
+    slug = "_".join(parts[-2:]) or parsed.netloc
+    return re.sub(r"[^a-z0-9]+", "_", slug.lower()).strip("_")[:50]
+
+
+def find_form_frame(page):
+    """Frame with the most form inputs (the application iframe if there is one)."""
+    best, best_count = page.main_frame, -1
+    for frame in page.frames:
+        try:
+            count = frame.evaluate("() => document.querySelectorAll('input, select, textarea').length")
+        except Exception:
+            continue
+        if count > best_count:
+            best, best_count = frame, count
+    return best
+
+
+def click_apply(page) -> bool:
+    for selector in APPLY_SELECTORS:
+        try:
+            btn = page.query_selector(selector)
+            if btn and btn.is_visible():
+                btn.click()
+                page.wait_for_load_state("networkidle", timeout=15000)
+                return True
+        except Exception:
+            continue
+    return False
+
+
+def capture_options(frame) -> dict:
+    """Open every combobox once; no options after opening → API-backed search field."""
+    fields = {}
+    for field_id in frame.evaluate(COMBOBOX_JS):
+        try:
+            el = frame.query_selector(f'[id="{field_id}"]')
+            el.scroll_into_view_if_needed()
+            el.click()
+            frame.wait_for_timeout(400)
+            options = list(dict.fromkeys(frame.evaluate(OPTIONS_JS)))
+            el.press("Escape")
+        except Exception as e:
+            print(f"   ⚠️ {field_id}: {e}")
+            continue
+        fields[field_id] = {"kind": "autocomplete" if options else "search", "options": options}
+        print(f"   ▾ {field_id[:40]:<40} {fields[field_id]['kind']:<12} {len(options)} options")
+    return fields
+
+
+def build_template(snapshot: str, fields: dict, source_url: str) -> str:
+    data = json.dumps({"source": source_url, "fields": fields}, ensure_ascii=False).replace("</", "<\\/")
+    injected = (
+        f'<script id="sandbox-options" type="application/json">{data}</script>\n'
+        f'<script>\n{MOCK_JS_PATH.read_text()}\n</script>\n'
+    )
+    if "</body>" in snapshot:
+        return snapshot.replace("</body>", injected + "</body>", 1)
+    return snapshot + injected
+
+
+def record(url: str, name: str = "", apply_click: bool = True, headless: bool = True) -> Path:
+    ats = detect_ats(url)
+    out = TEMPLATES_DIR / f"replay_{ats}_{name or slugify(url)}.html"
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless)
+        page = browser.new_page(viewport={"width": 1400, "height": 900})
+        print(f"🌐 Opening: {url[:70]}")
+        page.goto(url, wait_until="networkidle", timeout=45000)
+        if apply_click and click_apply(page):
+            print("   🖱️ Clicked Apply")
+        frame = find_form_frame(page)
+        print(f"📄 Form frame: {(frame.url or page.url)[:70]}")
+
+        fields = capture_options(frame)
+        snapshot = frame.evaluate(SNAPSHOT_JS)
+        browser.close()
+
+    out.write_text(build_template(snapshot, fields, url))
+    print(f"✅ Saved {out.relative_to(TEMPLATES_DIR.parent)} ({len(fields)} mocked dropdowns)")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="+", help="job application pages to record")
+    parser.add_argument("--name", default="", help="template suffix (single URL only)")
+    parser.add_argument("--no-apply-click", action="store_true", help="don't click 'Apply' before recording")
+    parser.add_argument("--headed", action="store_true")
+    args = parser.parse_args()
+
+    for url in args.urls:
+        try:
+            record(url, name=args.name if len(args.urls) == 1 else "",
+                   apply_click=not args.no_apply_click, headless=not args.headed)
+        except Exception as e:
+            print(f"❌ {url[:70]}: {e}")
+
+
+if __name__ == "__main__":
+    main()
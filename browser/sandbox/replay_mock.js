@@ -0,0 +1,122 @@
+// Replay mock for recorded ATS forms (browser/sandbox/recorder.py)
+//
+// Recreates dropdown / autocomplete behaviour offline from the option lists
+// captured at record time (<script id="sandbox-options">):
+//   {"fields": {"<input id>": {"kind": "autocomplete" | "search", "options": [...]}}}
+//
+// - "autocomplete": React Select-like. Listbox is rendered only while open
+//   (aria-controls → #<id>-listbox, [role=option].select__option), typing filters.
+//   Enter / click picks an option, Escape / blur closes.
+// - "search": API-driven (location, school). Options appear ~300ms after
+//   2+ typed characters: recorded options matching the text, else "<text>, United States".
+(() => {
+    const dataEl = document.getElementById('sandbox-options');
+    if (!dataEl) return;
+    const fields = (JSON.parse(dataEl.textContent || '{}').fields) || {};
+    const SEARCH_DELAY_MS = 300;
+
+    const style = document.createElement('style');
+    style.textContent = `
+        .sandbox-listbox { position: absolute; z-index: 9999; background: #fff; border: 1px solid #ccc;
+                           max-height: 240px; overflow-y: auto; min-width: 200px; box-shadow: 0 2px 8px rgba(0,0,0,.15); }
+        .sandbox-listbox .select__option { padding: 6px 10px; cursor: pointer; }
+        .sandbox-listbox .select__option:hover, .sandbox-listbox .select__option--is-focused { background: #deebff; }`;
+    document.head.appendChild(style);
+
+    const setValue = (input, text) => {
+        const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+        setter.call(input, text);
+        input.dispatchEvent(new Event('input', {bubbles: true}));
+        input.dispatchEvent(new Event('change', {bubbles: true}));
+    };
+
+    for (const [id, spec] of Object.entries(fields)) {
+        const input = document.getElementById(id);
+        if (!input || input.tagName !== 'INPUT') continue;
+        const listId = `${id}-listbox`;
+        let listbox = null;
+        let timer = null;
+
+        input.setAttribute('role', 'combobox');
+        input.setAttribute('aria-autocomplete', 'list');
+        input.setAttribute('aria-expanded', 'false');
+        input.setAttribute('aria-controls', listId);
+        input.setAttribute('autocomplete', 'off');
+
+        const close = () => {
+            clearTimeout(timer);
+            if (listbox) { listbox.remove(); listbox = null; }
+            input.setAttribute('aria-expanded', 'false');
+        };
+
+        const render = (options) => {
+            close();
+            listbox = document.createElement('div');
+            listbox.id = listId;
+            listbox.className = 'sandbox-listbox select__menu';
+            listbox.setAttribute('role', 'listbox');
+            const rect = input.getBoundingClientRect();
+            listbox.style.left = `${rect.left + window.scrollX}px`;
+            listbox.style.top = `${rect.bottom + window.scrollY}px`;
+            if (!options.length) {
+                const empty = document.createElement('div');
+                empty.className = 'select__menu-notice';
+                empty.textContent = 'No options';
+                listbox.appendChild(empty);
+            }
+            options.slice(0, 100).forEach((text, i) => {
+                const opt = document.createElement('div');
+                opt.setAttribute('role', 'option');
+                opt.id = `${listId}-option-${i}`;
+                opt.className = 'select__option' + (i === 0 ? ' select__option--is-focused' : '');
+                opt.textContent = text;
+                opt.addEventListener('mousedown', (e) => {
+                    e.preventDefault();
+                    setValue(input, text);
+                    close();
+                });
+                listbox.appendChild(opt);
+            });
+            document.body.appendChild(listbox);
+            input.setAttribute('aria-expanded', 'true');
+        };
+
+        const matching = (query) => {
+            const q = query.trim().toLowerCase();
+            const opts = spec.options || [];
+            return q ? opts.filter(o => o.toLowerCase().includes(q)) : opts;
+        };
+
+        const update = () => {
+            if (spec.kind === 'search') {
+                clearTimeout(timer);
+                const q = input.value.trim();
+                if (q.length < 2) { close(); return; }
+                timer = setTimeout(() => {
+                    const found = matching(q);
+                    render(found.length ? found : [`${q}, United States`]);
+                }, SEARCH_DELAY_MS);
+            } else {
+                render(matching(input.value));
+            }
+        };
+
+        input.addEventListener('focus', () => { if (spec.kind !== 'search') render(matching('')); });
+        input.addEventListener('click', () => { if (!listbox && spec.kind !== 'search') render(matching('')); });
+        input.addEventListener('input', (e) => { if (e.isTrusted) update(); });
+        input.addEventListener('keydown', (e) => {
+            if (e.key === 'Escape') close();
+            if (e.key === 'Enter' && listbox) {
+                const first = listbox.querySelector('[role="option"]');
+                if (first) { e.preventDefault(); setValue(input, first.textContent); close(); }
+            }
+        });
+        input.addEventListener('blur', () => setTimeout(close, 150));
+    }
+
+    // Keep submissions local
+    for (const form of document.querySelectorAll('form')) {
+        form.setAttribute('action', '/submit');
+        form.setAttribute('method', 'post');
+    }
+})();
@@ -65,6 +65,8 @@ async def index():
     
     for form in sorted(forms):
         desc = descriptions.get(form, "Test form")
+        if form.startswith("replay_") and form not in descriptions:
+            desc = f"Recorded {form.split('_')[1].title()} form, dropdowns mocked (recorder.py)"
         html += f'<li><a href="/{form}"><strong>{form}</strong><div class="desc">{desc}</div></a></li>'
     
     html += """
@@ -0,0 +1,150 @@
+"""
+Answer Index for V5 Form Filler
+
+In-memory search index over learned answers / KB keywords:
+- token inverted index: token → keys
+- trigram inverted index: character trigram → keys (typos, "lead" ~ "leadership")
+- ranked matches (key, value, score), ties broken by key → result no longer
+  depends on dict order
+
+Candidates come from the inverted indexes (only keys sharing a token or
+trigram with the query are scored), so lookup cost grows with the number of
+similar keys, not with the size of the database.
+
+score(query, key):
+    1.0                              exact key
+    0.5 + 0.5 * len(short)/len(long) one contains the other (old substring rule,
+                                     short fragments like "age" score low)
+    0.5 * token_jaccard + 0.5 * trigram_jaccard   otherwise
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+STOPWORDS = {
+    "the", "and", "for", "you", "your", "are", "with", "have", "this", "that",
+    "what", "please", "will", "from", "our", "any", "can", "who", "how", "why",
+}
+
+# find() threshold: below this a ranked match is not trusted as an answer
+MIN_MATCH_SCORE = 0.6
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in re.findall(r'[a-z0-9]+', text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def trigrams(text: str) -> Set[str]:
+    text = f" {re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def similarity(query: str, key: str, query_tokens: Optional[Set[str]] = None,
+               query_trigrams: Optional[Set[str]] = None, key_tokens: Optional[Set[str]] = None,
+               key_trigrams: Optional[Set[str]] = None) -> float:
+    if query == key:
+        return 1.0
+    if query and key and (key in query or query in key):
+        short, long = sorted((len(query), len(key)))
+        return 0.5 + 0.5 * short / long
+    q_tokens = query_tokens if query_tokens is not None else set(tokenize(query))
+    q_trigrams = query_trigrams if query_trigrams is not None else trigrams(query)
+    k_tokens = key_tokens if key_tokens is not None else set(tokenize(key))
+    k_trigrams = key_trigrams if key_trigrams is not None else trigrams(key)
+    return 0.5 * _jaccard(q_tokens, k_tokens) + 0.5 * _jaccard(q_trigrams, k_trigrams)
+
+
+class AnswerIndex:
+    """key → value store with token + trigram inverted indexes."""
+
+    # Key must share at least this fraction of the query's trigrams to be scored
+    MIN_TRIGRAM_OVERLAP = 0.3
+
+    def __init__(self, entries: Optional[Dict[str, Any]] = None):
+        self._values: Dict[str, Any] = {}
+        self._tokens: Dict[str, Set[str]] = {}      # token → keys
+        self._trigrams: Dict[str, Set[str]] = {}    # trigram → keys
+        self._key_tokens: Dict[str, Set[str]] = {}
+        self._key_trigrams: Dict[str, Set[str]] = {}
+        for key, value in (entries or {}).items():
+            self.add(key, value)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def get(self, key: str, default=None):
+        return self._values.get(key, default)
+
+    def add(self, key: str, value: Any):
+        if key in self._values:
+            self.remove(key)
+        self._values[key] = value
+        self._key_tokens[key] = set(tokenize(key))
+        self._key_trigrams[key] = trigrams(key)
+        for tok in self._key_tokens[key]:
+            self._tokens.setdefault(tok, set()).add(key)
+        for tri in self._key_trigrams[key]:
+            self._trigrams.setdefault(tri, set()).add(key)
+
+    def remove(self, key: str):
+        if key not in self._values:
+            return
+        del self._values[key]
+        for tok in self._key_tokens.pop(key):
+            keys = self._tokens.get(tok)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._tokens[tok]
+        for tri in self._key_trigrams.pop(key):
+            keys = self._trigrams.get(tri)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._trigrams[tri]
+
+    def candidates(self, query: str, query_tokens: Optional[Set[str]] = None,
+                   query_trigrams: Optional[Set[str]] = None) -> Set[str]:
+        """Keys sharing a token, or enough trigrams, with the query."""
+        q_tokens = query_tokens if query_tokens is not None else set(tokenize(query))
+        q_trigrams = query_trigrams if query_trigrams is not None else trigrams(query)
+        found: Set[str] = set()
+        for tok in q_tokens:
+            found |= self._tokens.get(tok, set())
+        counts: Dict[str, int] = {}
+        for tri in q_trigrams:
+            for key in self._trigrams.get(tri, ()):
+                counts[key] = counts.get(key, 0) + 1
+        for key, n in counts.items():
+            # overlap relative to the shorter side: short keys inside long questions still qualify
+            if n >= self.MIN_TRIGRAM_OVERLAP * min(len(q_trigrams), len(self._key_trigrams[key])):
+                found.add(key)
+        return found
+
+    def search(self, query: str, limit: int = 5, min_score: float = 0.0) -> List[Tuple[str, Any, float]]:
+        """Ranked (key, value, score), best first."""
+        if limit == 1 and query in self._values:
+            return [(query, self._values[query], 1.0)]
+        q_tokens = set(tokenize(query))
+        q_trigrams = trigrams(query)
+        scored = []
+        for key in self.candidates(query, q_tokens, q_trigrams):
+            score = similarity(query, key, q_tokens, q_trigrams,
+                               self._key_tokens[key], self._key_trigrams[key])
+            if score >= min_score:
+                scored.append((key, self._values[key], round(score, 4)))
+        scored.sort(key=lambda m: (-m[2], m[0]))
+        return scored[:limit]
+
+    def best(self, query: str, min_score: float = MIN_MATCH_SCORE) -> Optional[Tuple[str, Any, float]]:
+        matches = self.search(query, limit=1, min_score=min_score)
+        return matches[0] if matches else None
@@ -23,6 +23,8 @@ from enum import Enum
 
 from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page, Playwright
 
+from .page_stability import QUIET_PREDICATE, install_tracker
+
 
 class BrowserMode(Enum):
     """Browser connection modes"""
@@ -104,6 +106,8 @@ class BrowserManager:
             self._start_persistent()
         else:
             self._start_fresh()
+        # Stability tracker before any navigation: counts XHR/fetch from the first request
+        install_tracker(self.context)
         
         return self
     
@@ -333,6 +337,11 @@ class BrowserManager:
         if url:
             page.goto(url)
         return page
+
+    def use_new_tab(self) -> Page:
+        """Open a new tab and make it the active page (one tab per apply job)."""
+        self.page = self.context.new_page()
+        return self.page
     
     def current_url(self) -> str:
         """Get current URL."""
@@ -417,8 +426,19 @@ class BrowserManager:
         """Wait for navigation to complete."""
         self.page.wait_for_load_state("networkidle", timeout=timeout)
     
-    def wait_for_stable(self, timeout: float = 2.0):
-        """Wait for page to stabilize (no new elements appearing)."""
+    def wait_for_stable(self, timeout: float = 2.0, quiet_ms: int = 300):
+        """
+        Wait for page to stabilize: no DOM mutations and no XHR/fetch in flight
+        for quiet_ms (in-page MutationObserver, see page_stability.py).
+        Falls back to polling the element count if the page can't be evaluated.
+        """
+        try:
+            self.page.wait_for_function(QUIET_PREDICATE, arg=quiet_ms, polling=50, timeout=int(timeout * 1000))
+            return
+        except Exception as e:
+            if "Timeout" in type(e).__name__ or "Timeout" in str(e):
+                return
+
         prev_count = 0
         start = time.time()
         while time.time() - start < timeout:
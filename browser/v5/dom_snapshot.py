@@ -0,0 +1,299 @@
+"""
+DOM Snapshot Scanner for V5 Form Filler
+
+FormFillerV5._detect_field() costs 10+ Playwright round trips per element
+(is_visible, tagName, get_attribute x5+, _find_label strategies, value, options).
+This module injects ONE function per frame that walks every candidate field
+(including open Shadow DOM) and returns a plain JSON snapshot:
+
+- visibility (same rule as Playwright is_visible: non-empty box, not visibility:hidden)
+- attributes: tag, type, id, name, form id, role, aria-*, required, placeholder, maxlength, pattern
+- label resolved with the same strategy order as FormFillerV5._find_label
+  (label[for] → parent <label> → div.field > label → fieldset legend →
+   aria-label/placeholder → surrounding context → name/id)
+- current value and <select> option texts
+
+FormFillerV5._field_from_snapshot() turns each entry into a FormField.
+
+OPTIONS_HARVEST_SCRIPT is the same idea for the dropdown prescan: one pass
+collects every option list that is already in the DOM, so only lazy
+dropdowns (React Select renders its menu on open) have to be clicked.
+"""
+
+from typing import Dict, List
+
+
+SNAPSHOT_SCRIPT = '''
+() => {
+    // ── roots: document + open shadow roots (Playwright selectors pierce shadow DOM) ──
+    const roots = [document];
+    const walk = (root) => {
+        for (const el of root.querySelectorAll('*')) {
+            if (el.shadowRoot) { roots.push(el.shadowRoot); walk(el.shadowRoot); }
+        }
+    };
+    walk(document);
+
+    // label[for] index, built once per frame
+    const labelFor = {};
+    for (const root of roots) {
+        for (const lbl of root.querySelectorAll('label[for]')) {
+            if (!(lbl.htmlFor in labelFor)) labelFor[lbl.htmlFor] = (lbl.innerText || '').trim();
+        }
+    }
+
+    const directText = (node) => {
+        let text = '';
+        for (const child of node.childNodes) {
+            if (child.nodeType === 3) text += child.textContent.trim() + ' ';
+        }
+        return text.trim();
+    };
+
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (!rect.width || !rect.height) return false;
+        return getComputedStyle(el).visibility !== 'hidden';
+    };
+
+    // Strategy 1b: parent <label> direct text (Greenhouse wraps fields in <label>)
+    const parentLabel = (el) => {
+        const start = el.closest('.select2-container') || el;
+        let parent = start.parentElement;
+        for (let i = 0; i < 4 && parent; i++) {
+            if (parent.tagName === 'LABEL') {
+                const text = directText(parent);
+                if (text && text !== '*' && text.length > 3) return text;
+            }
+            parent = parent.parentElement;
+        }
+        return '';
+    };
+
+    // Strategy 1c: div.field > label sibling
+    const fieldSiblingLabel = (el) => {
+        let parent = el.parentElement;
+        for (let i = 0; i < 5 && parent; i++) {
+            if (parent.classList && parent.classList.contains('field')) {
+                for (const lbl of parent.querySelectorAll(':scope > label')) {
+                    if (!lbl.contains(el)) {
+                        const text = directText(lbl);
+                        if (text && text !== '*' && text.length > 3) return text;
+                    }
+                }
+                break;
+            }
+            parent = parent.parentElement;
+        }
+        return '';
+    };
+
+    // Strategy 1d: fieldset > legend (Greenhouse file uploads)
+    const fieldsetLegend = (el) => {
+        let parent = el.parentElement;
+        for (let i = 0; i < 6 && parent; i++) {
+            if (parent.tagName === 'FIELDSET') {
+                const legend = parent.querySelector('legend label, legend');
+                if (legend) return legend.textContent.trim();
+            }
+            parent = parent.parentElement;
+        }
+        return '';
+    };
+
+    // Strategy 3: context discovery - nearby text, crossing shadow hosts
+    const nearbyText = (input) => {
+        let container = input;
+        for (let i = 0; i < 10 && container; i++) {
+            container = container.parentElement ||
+                       (container.getRootNode && container.getRootNode().host);
+            if (!container || !container.querySelectorAll) continue;
+            for (const el of container.querySelectorAll('label, legend, p, span, h3, h4, div')) {
+                if (el.contains(input)) continue;
+                const txt = el.textContent.trim();
+                if (txt && txt.length > 3 && txt.length < 150) return txt;
+            }
+        }
+        return '';
+    };
+
+    const fields = [];
+    for (const root of roots) {
+        for (const el of root.querySelectorAll('input, select, textarea')) {
+            const tag = el.tagName.toLowerCase();
+            const type = el.getAttribute('type') || 'text';
+            const entry = {
+                visible: isVisible(el),
+                tag: tag,
+                type: type,
+                id: el.getAttribute('id') || '',
+                name: el.getAttribute('name') || '',
+                form_id: el.form ? el.form.id : '',
+                role: el.getAttribute('role') || '',
+                aria_haspopup: el.getAttribute('aria-haspopup') || '',
+                aria_label: el.getAttribute('aria-label') || '',
+                placeholder: el.getAttribute('placeholder') || '',
+                maxlength: el.getAttribute('maxlength') || '',
+                pattern: el.getAttribute('pattern') || '',
+                required: el.hasAttribute('required') || el.getAttribute('aria-required') === 'true',
+                value: '',
+                options: [],
+                labels: {},
+            };
+            fields.push(entry);
+            if (!entry.visible || ['hidden', 'submit', 'button'].includes(type)) continue;
+
+            try {
+                if (tag === 'select') {
+                    const opt = el.options[el.selectedIndex];
+                    entry.value = opt ? (opt.text || '') : '';
+                    entry.options = Array.from(el.options).map(o => o.text).filter(t => t && t !== 'Select...');
+                } else if (type === 'checkbox') {
+                    entry.value = el.checked ? 'checked' : '';
+                } else if (type !== 'file') {
+                    entry.value = el.value || '';
+                }
+            } catch (e) {}
+
+            entry.labels = {
+                for: entry.id ? (labelFor[entry.id] || '') : '',
+                parent: parentLabel(el),
+                sibling: fieldSiblingLabel(el),
+                fieldset: fieldsetLegend(el),
+                context: entry.id ? nearbyText(el) : '',
+            };
+        }
+    }
+    return fields;
+}
+'''
+
+# label[for] lookup in the top document for fields inside iframes
+# (FormFillerV5._find_label falls back to self.page when the frame has no match)
+LABELS_FOR_SCRIPT = '''
+(ids) => {
+    const out = {};
+    for (const lbl of document.querySelectorAll('label[for]')) {
+        if (ids.includes(lbl.htmlFor) && !(lbl.htmlFor in out)) out[lbl.htmlFor] = (lbl.innerText || '').trim();
+    }
+    return out;
+}
+'''
+
+
+# Option lists already present in the DOM, keyed by field id:
+# - <select> options
+# - aria-controls / aria-owns → rendered listbox [role="option"]
+# - <input list="..."> → <datalist>
+# - data-options / data-choices / data-values JSON (["A", "B"] or [{label: "A"}])
+OPTIONS_HARVEST_SCRIPT = '''
+(ids) => {
+    const roots = [document];
+    const walk = (root) => {
+        for (const el of root.querySelectorAll('*')) {
+            if (el.shadowRoot) { roots.push(el.shadowRoot); walk(el.shadowRoot); }
+        }
+    };
+    walk(document);
+
+    const byId = (id) => {
+        for (const root of roots) {
+            const el = root.getElementById ? root.getElementById(id) : root.querySelector('#' + CSS.escape(id));
+            if (el) return el;
+        }
+        return null;
+    };
+    const clean = (texts) => {
+        const out = [];
+        for (let t of texts) {
+            t = (t || '').trim();
+            if (t && t !== 'Select...' && t !== 'No options' && t !== 'No results' && !out.includes(t)) out.push(t);
+        }
+        return out.slice(0, 100);
+    };
+    const fromJson = (raw) => {
+        try {
+            const data = JSON.parse(raw);
+            if (!Array.isArray(data)) return [];
+            return data.map(o => typeof o === 'string' ? o : (o && (o.label || o.text || o.name || o.value)) || '');
+        } catch (e) { return []; }
+    };
+
+    const result = {};
+    for (const id of ids) {
+        const el = byId(id);
+        if (!el) continue;
+        let options = [];
+        if (el.tagName === 'SELECT') {
+            options = Array.from(el.options).map(o => o.text);
+        }
+        for (const attr of ['aria-controls', 'aria-owns']) {
+            if (options.length) break;
+            const target = el.getAttribute(attr) && byId(el.getAttribute(attr));
+            if (target) options = Array.from(target.querySelectorAll('[role="option"]')).map(o => o.innerText);
+        }
+        if (!options.length && el.list) {
+            options = Array.from(el.list.options).map(o => o.label || o.value);
+        }
+        if (!options.length) {
+            const holder = el.closest('[data-options], [data-choices], [data-values]');
+            if (holder) {
+                options = fromJson(holder.getAttribute('data-options') ||
+                                   holder.getAttribute('data-choices') ||
+                                   holder.getAttribute('data-values'));
+            }
+        }
+        options = clean(options);
+        if (options.length) result[id] = options;
+    }
+    return result;
+}
+'''
+
+
+def snapshot_frame(frame) -> List[Dict]:
+    """One evaluate() per frame → list of raw field entries (document order)."""
+    return frame.evaluate(SNAPSHOT_SCRIPT) or []
+
+
+def harvest_options(frame, ids: List[str]) -> Dict[str, List[str]]:
+    """One evaluate() per frame → {field_id: options} for option lists already in the DOM."""
+    if not ids:
+        return {}
+    return frame.evaluate(OPTIONS_HARVEST_SCRIPT, ids) or {}
+
+
+def resolve_label(entry: Dict) -> str:
+    """Pick the label from snapshot strategies in FormFillerV5._find_label order."""
+    labels = entry.get("labels") or {}
+    label = labels.get("for", "")
+
+    if not label:
+        parent = labels.get("parent", "")
+        if parent and len(parent) > 3:
+            label = parent
+    if not label:
+        sibling = labels.get("sibling", "")
+        if sibling and len(sibling) > 3:
+            label = sibling
+    if not label:
+        fieldset = labels.get("fieldset", "")
+        if fieldset and len(fieldset) > 2:
+            label = fieldset
+
+    if not label:
+        label = entry.get("aria_label") or entry.get("placeholder") or ""
+
+    if not label or len(label) < 5:
+        if labels.get("context"):
+            label = labels["context"]
+
+    el_name = entry.get("name", "")
+    if not label:
+        label = el_name or entry.get("id", "")
+
+    # Append name attribute if different (helps with mapping)
+    if el_name and el_name.lower() not in label.lower():
+        label = f"{label} [{el_name}]"
+
+    return label
@@ -12,10 +12,24 @@ Modes:
 - PRE_FLIGHT: Analyze form, generate readiness report (no actual fill)
 - INTERACTIVE: Fill with human confirmation for unknowns
 - AUTONOMOUS: Fill everything, skip unknowns
+
+Waits: every post-action pause on the fill path goes through StabilityWaiter
+(page_stability.py) — quiet() after navigation-like clicks, settle() after
+keypresses / option picks, options() / value() where there is something
+concrete to wait for. Fixed sleeps kept on purpose:
+- _fill(): 3× 0.3s between screenshot scrolls — paint/lazy images are not
+  DOM events, the screenshot needs the pixels
+- _wait_for_iframes(): 1s / 0.5s poll intervals of the iframe search loop
+- _wait_for_user(): USER_STEP_POLL between done() checks of a user step
 """
 
+import contextlib
+import hashlib
 import json
+import os
 import re
+import sys
+import threading
 import time
 import requests  # For Ollama API
 from pathlib import Path
@@ -27,6 +41,10 @@ from playwright.sync_api import Page, ElementHandle
 
 from .browser_manager import BrowserManager, BrowserMode
 from .form_logger import FormLogger
+from .dom_snapshot import snapshot_frame, resolve_label, harvest_options, LABELS_FOR_SCRIPT
+from .page_stability import StabilityWaiter
+from .telemetry import FillTelemetry
+from .answer_index import AnswerIndex
 
 # ═══════════════════════════════════════════════════════════════════════════
 # PATHS
@@ -44,6 +62,16 @@ KNOWLEDGE_BASE_PATH = BROWSER_DIR / "knowledge_base.json"
 FIELD_PATTERNS_PATH = DATA_DIR / "field_patterns.json"
 
 
+# Dropdown option selectors for readiness waits (React Select / ARIA, Select2)
+AUTOCOMPLETE_OPTIONS = '[role="option"], .select__option'
+SELECT2_OPTIONS = '.select2-drop:not(.select2-display-none) .select2-results li'
+
+# Manual steps (login, captcha) without a terminal: poll the page instead of input()
+USER_STEP_TIMEOUT = float(os.getenv("V5_USER_STEP_TIMEOUT", "180"))
+USER_STEP_POLL = 1.0
+REVIEW_HOLD_SECONDS = 300
+CAPTCHA_SELECTOR = "[class*='captcha'], [class*='hcaptcha'], [class*='recaptcha'], iframe[src*='captcha']"
+
 # ═══════════════════════════════════════════════════════════════════════════
 # ENUMS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -144,6 +172,9 @@ class FormField:
     maxlength: int = 0
     pattern: str = ""       # HTML5 pattern attribute
 
+    # Fill strategy (compiled plans): select2 | react | location | school | select | ...
+    fill_strategy: str = ""
+
 
 @dataclass
 class FillReport:
@@ -159,6 +190,16 @@ class FillReport:
     needs_input: int = 0
     skipped: int = 0
     errors: int = 0
+
+    # Timing (page_stability.StabilityWaiter stats)
+    fill_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    event_waits: int = 0
+    wait_timeouts: int = 0
+    fallback_sleeps: int = 0
+    phases: Dict[str, float] = dataclass_field(default_factory=dict)  # telemetry.PHASES → seconds
+    plan_fields: int = 0  # fields answered from a compiled fill plan (no scan/cascade)
+    needs_user: str = ""  # manual step (login/captcha) not completed → fill stopped
     
     fields: List[FormField] = dataclass_field(default_factory=list)
     
@@ -179,7 +220,15 @@ class FillReport:
             f"   ⚠️ Needs input: {self.needs_input}",
             f"   ⏭️ Skipped: {self.skipped}",
             f"   ❌ Errors: {self.errors}",
+            f"   ⏱️ Time: {self.fill_seconds:.1f}s (waiting {self.wait_seconds:.1f}s: "
+            f"{self.event_waits} event, {self.wait_timeouts} timeout, {self.fallback_sleeps} fixed)",
         ]
+        if self.phases:
+            lines.append("   ⏱️ Phases: " + ", ".join(f"{k} {v:.1f}s" for k, v in self.phases.items()))
+        if self.plan_fields:
+            lines.append(f"   ⚡ Compiled plan: {self.plan_fields} fields")
+        if self.needs_user:
+            lines.append(f"   🙋 Needs user: {self.needs_user}")
         
         if self.needs_input > 0:
             lines.append(f"\n⚠️ FIELDS NEEDING INPUT:")
@@ -239,6 +288,8 @@ class FillReport:
 
         # Summary
         lines.append(f"║  📊 RESULTS: {self.verified_fields} verified, {self.filled_fields} filled, {self.errors} errors, {self.skipped} skipped / {self.total_fields} total")
+        lines.append(f"║  ⏱️ TIME: {self.fill_seconds:.1f}s, waiting {self.wait_seconds:.1f}s "
+                     f"({self.event_waits} event waits, {self.wait_timeouts} timeouts, {self.fallback_sleeps} fixed sleeps)")
 
         # Source breakdown
         src_parts = [f"{src}: {cnt}" for src, cnt in sorted(source_counts.items(), key=lambda x: -x[1])]
@@ -262,11 +313,48 @@ class FillReport:
         return "\n".join(lines)
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# RELOADABLE STORES
+# ═══════════════════════════════════════════════════════════════════════════
+
+class _ReloadableStore:
+    """
+    JSON store shared by warm apply workers (one instance per process).
+
+    Remembers the file mtime after every load/save; refresh() re-reads the
+    file when it changed elsewhere (PATCH/DELETE /api/v5/learned, a CLI run,
+    another server process). Subclasses implement _reload().
+    """
+
+    path: Path
+    _mtime: Optional[int] = None
+
+    def _file_mtime(self) -> Optional[int]:
+        try:
+            return self.path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _remember_mtime(self):
+        self._mtime = self._file_mtime()
+
+    def refresh(self) -> bool:
+        """Reload if the file changed on disk since our last load/save. Returns True if reloaded."""
+        if self._file_mtime() == self._mtime:
+            return False
+        self._reload()
+        self._remember_mtime()
+        return True
+
+    def _reload(self):
+        raise NotImplementedError
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # PROFILE
 # ═══════════════════════════════════════════════════════════════════════════
 
-class Profile:
+class Profile(_ReloadableStore):
     """User profile data manager."""
     
     # Label patterns → profile keys
@@ -424,9 +512,14 @@ class Profile:
     }
     
     def __init__(self, path: Path = PROFILE_PATH):
+        self.path = path
         self.data = {}
-        if path.exists():
-            with open(path) as f:
+        self._reload()
+        self._remember_mtime()
+
+    def _reload(self):
+        if self.path.exists():
+            with open(self.path) as f:
                 self.data = json.load(f)
     
     def get(self, key: str) -> str:
@@ -575,12 +668,33 @@ class Profile:
 # LEARNED DATABASE
 # ═══════════════════════════════════════════════════════════════════════════
 
-class LearnedDB:
-    """Database of learned field answers."""
+class LearnedDB(_ReloadableStore):
+    """Database of learned field answers.
+
+    Lookups go through AnswerIndex (token + trigram index, ranked matches).
+    save_answer() only updates memory; flush() merges pending answers into
+    the file on disk once per session (FormFillerV5._browser_session).
+    refresh() picks up edits made through /api/v5/learned (pending answers
+    of the running session are kept on top).
+    """
     
+    STORES = ("answers", "dropdown_choices")
+
     def __init__(self, path: Path = LEARNED_DB_PATH):
         self.path = path
         self.data = self._load()
+        self._pending: Dict[str, Dict[str, str]] = {store: {} for store in self.STORES}
+        self._lock = threading.Lock()
+        self._build_indexes()
+        self._remember_mtime()
+
+    def _reload(self):
+        with self._lock:
+            data = self._load()
+            for store, updates in self._pending.items():
+                data.setdefault(store, {}).update(updates)
+            self.data = data
+            self._build_indexes()
     
     def _load(self) -> dict:
         if self.path.exists():
@@ -593,40 +707,72 @@ class LearnedDB:
                     "answers": data.get("field_answers", {}),
                     "dropdown_choices": data.get("dropdown_choices", {})
                 }
+            for store in self.STORES:
+                data.setdefault(store, {})
             return data
         return {"answers": {}, "dropdown_choices": {}}
+
+    def _build_indexes(self):
+        self.indexes = {store: AnswerIndex(self.data[store]) for store in self.STORES}
     
     def save(self):
         with open(self.path, "w") as f:
             json.dump(self.data, f, indent=2, ensure_ascii=False)
+        self._remember_mtime()
+
+    def flush(self) -> int:
+        """Write answers learned this session. Re-reads the file first so
+        answers saved meanwhile by another filler/worker are kept."""
+        with self._lock:
+            count = sum(len(p) for p in self._pending.values())
+            if not count:
+                return 0
+            try:
+                disk = self._load()
+            except Exception:
+                disk = {"answers": {}, "dropdown_choices": {}}
+            for store, updates in self._pending.items():
+                disk.setdefault(store, {}).update(updates)
+            self.data = disk
+            self.save()
+            self._pending = {store: {} for store in self.STORES}
+            self._build_indexes()
+        print(f"   💾 Learned DB saved: {count} new answers")
+        return count
     
     def _normalize_key(self, label: str) -> str:
         key = label.lower().strip()
         key = re.sub(r'[*?!:\-_()\"\']+', ' ', key)
         key = re.sub(r'\s+', ' ', key).strip()
         return key[:100]
+
+    def find_ranked(self, label: str, is_dropdown: bool = False, limit: int = 5) -> List[Tuple[str, str, float]]:
+        """Ranked matches (key, answer, score), best first."""
+        store = "dropdown_choices" if is_dropdown else "answers"
+        return self.indexes[store].search(self._normalize_key(label), limit=limit)
     
     def find(self, label: str, is_dropdown: bool = False) -> Optional[str]:
-        """Find saved answer for field label."""
-        key = self._normalize_key(label)
-        store = self.data["dropdown_choices" if is_dropdown else "answers"]
-        
-        if key in store:
-            return store[key]
-        
-        # Partial match
-        for k, v in store.items():
-            if k in key or key in k:
-                return v
-        
-        return None
+        """Find saved answer for field label (exact key, else best match ≥ MIN_MATCH_SCORE)."""
+        store = "dropdown_choices" if is_dropdown else "answers"
+        match = self.indexes[store].best(self._normalize_key(label))
+        return match[1] if match else None
+
+    def find_many(self, queries: List[Tuple[str, bool]]) -> Dict[Tuple[str, bool], Optional[str]]:
+        """Batch find for a whole form: {(label, is_dropdown): answer or None}."""
+        results = {}
+        for label, is_dropdown in queries:
+            if (label, is_dropdown) not in results:
+                results[(label, is_dropdown)] = self.find(label, is_dropdown)
+        return results
     
     def save_answer(self, label: str, answer: str, is_dropdown: bool = False):
-        """Save answer for future use."""
+        """Save answer for future use (written to disk by flush())."""
         key = self._normalize_key(label)
         store = "dropdown_choices" if is_dropdown else "answers"
-        self.data[store][key] = answer
-        self.save()
+        with self._lock:
+            self.data[store][key] = answer
+            self._pending[store][key] = answer
+            self.indexes[store].add(key, answer)
         print(f"   💾 Learned: '{label[:30]}' → '{answer[:25]}'")
 
 
@@ -636,7 +782,7 @@ class LearnedDB:
 
 FORM_SCHEMAS_PATH = BROWSER_DIR / "form_schemas.json"
 
-class FormSchemaDB:
+class FormSchemaDB(_ReloadableStore):
     """Database of form schemas per ATS type.
 
     After each successful fill, saves field mappings:
@@ -679,14 +825,73 @@ class FormSchemaDB:
           "education": ["school--{N}", "degree--{N}", "discipline--{N}",
                         "start-month--{N}", "start-year--{N}"],
           "work_experience": ["company-name-{N}", "title-{N}"]
+        },
+        "option_sets": {
+          "3f9a0c2b71de": {                  # form fingerprint (see plans)
+            "updated": "2026-02-14T...",
+            "fields": {
+              "question_11097818007": {
+                "label": "Are you 18 years of age or older?*",
+                "options": ["Yes", "No"]
+              }
+            }
+          }
         }
       }
     }
+
+    option_sets are written by the dropdown prescan (any fill, even failed
+    ones) so the next visit to the same form doesn't have to open dropdowns.
+    Keyed by form fingerprint, not ATS-wide: field ids like "gender" or
+    "question_1" repeat across companies with different options. Only FIXED
+    sets (<= MAX_FIXED_OPTIONS) are stored — longer lists are SEARCH
+    dropdowns whose prescan shows a partial, query-dependent list.
+
+    plans: compiled fill plans, keyed by form fingerprint (hash of ATS type +
+    the set of field ids found by the initial scan):
+        "plans": {
+          "3f9a0c2b71de": {
+            "field_count": 24,
+            "fill_count": 7,
+            "last_used": "2026-02-14T...",
+            "fields": {
+              "first_name": {"label": "First Name*", "field_type": "text",
+                             "strategy": "text", "profile_key": "personal.first_name",
+                             "learned_label": "", "source": "profile", "answer_hint": "",
+                             "options": [], "stable": true},
+              ...
+            }
+          }
+        }
+    Same fingerprint on the next visit → planned fields get their answer and
+    fill strategy straight from the plan (no prescan, no answer cascade, no
+    widget detection); only fields missing from the plan go the normal way.
+    No exact match (Greenhouse question ids are unique per job) → the plan of
+    this ATS sharing the most field ids is used; fields it doesn't know are
+    resolved normally.
+    A plan only holds fields with a reproducible answer that were filled
+    successfully last time: a profile key or learned label (resolved live on
+    every use), a default value, or an AI dropdown choice. AI choices are
+    replayed only when "stable": the same field id had the same option set
+    in another plan of this ATS, so the options don't vary per job.
     """
 
+    MAX_PLANS_PER_ATS = 20
+    MAX_OPTION_FORMS_PER_ATS = 50
+    MAX_FIXED_OPTIONS = 25
+    MIN_PLAN_OVERLAP = 3  # shared field ids for a fallback plan
+
     def __init__(self, path: Path = FORM_SCHEMAS_PATH):
         self.path = path
+        # One instance is shared by all warm workers: writers hold the lock and
+        # re-read the file first, so parallel fills don't drop each other's updates
+        self._lock = threading.RLock()
         self.data = self._load()
+        self._remember_mtime()
+
+    def _reload(self):
+        with self._lock:
+            self.data = self._load()
 
     def _load(self) -> dict:
         if self.path.exists():
@@ -698,8 +903,20 @@ class FormSchemaDB:
         return {}
 
     def save(self):
-        with open(self.path, "w") as f:
-            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        with self._lock:
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            tmp.replace(self.path)
+            self._remember_mtime()
+
+    @contextlib.contextmanager
+    def _updating(self):
+        """Read-modify-write section: lock, pick up changes from disk, save at the end."""
+        with self._lock:
+            self.refresh()
+            yield
+            self.save()
 
     def get_schema(self, ats_type: str) -> Optional[dict]:
         """Get form schema for an ATS type."""
@@ -712,6 +929,150 @@ class FormSchemaDB:
             return None
         return schema.get("fields", {}).get(field_id)
 
+    def get_option_set(self, ats_type: str, fingerprint: str, field_id: str,
+                       label: str) -> Optional[List[str]]:
+        """Cached FIXED dropdown options for a field of this form layout (None if unknown).
+
+        The saved label must match exactly — an empty label on either side
+        is not a match.
+        """
+        schema = self.data.get(ats_type)
+        if not schema or not fingerprint or not field_id:
+            return None
+        entry = schema.get("option_sets", {}).get(fingerprint, {}).get("fields", {}).get(field_id)
+        if not entry or not entry.get("options"):
+            return None
+        saved_label = (entry.get("label", "") or "").lower().strip()
+        if not saved_label or saved_label != (label or "")[:100].lower().strip():
+            return None
+        return list(entry["options"])
+
+    def save_option_sets(self, ats_type: str, fingerprint: str,
+                         option_sets: Dict[str, Tuple[str, List[str]]]):
+        """Store prescanned FIXED options for one form layout: {field_id: (label, options)}."""
+        fixed = {fid: (label, options) for fid, (label, options) in option_sets.items()
+                 if label and options and len(options) <= self.MAX_FIXED_OPTIONS}
+        if not fixed or not fingerprint:
+            return
+        from datetime import datetime as _dt
+        now = _dt.now().isoformat()
+
+        with self._updating():
+            schema = self.data.setdefault(ats_type, {
+                "last_updated": now,
+                "fill_count": 0,
+                "fields": {},
+                "repeatable_field_ids": {},
+            })
+            forms = schema.setdefault("option_sets", {})
+            # Старый формат (field_id → {label, options} на весь ATS) — выбрасываем
+            for key in [k for k, v in forms.items() if "fields" not in v]:
+                del forms[key]
+            form = forms.setdefault(fingerprint, {"fields": {}})
+            form["updated"] = now
+            for fid, (label, options) in fixed.items():
+                form["fields"][fid] = {"label": label[:100], "options": list(options)}
+            if len(forms) > self.MAX_OPTION_FORMS_PER_ATS:
+                for old in sorted(forms, key=lambda k: forms[k].get("updated", ""))[:len(forms) - self.MAX_OPTION_FORMS_PER_ATS]:
+                    del forms[old]
+
+    @staticmethod
+    def fingerprint(ats_type: str, field_ids: List[str]) -> str:
+        """Form identity: ATS type + set of field ids (order-independent)."""
+        ids = sorted({fid for fid in field_ids if fid})
+        return hashlib.sha1(f"{ats_type}|{'|'.join(ids)}".encode()).hexdigest()[:12]
+
+    def get_plan(self, ats_type: str, fingerprint: str,
+                 field_ids: Optional[List[str]] = None) -> Optional[dict]:
+        """Compiled fill plan for this form layout (None if nothing fits).
+
+        Exact fingerprint first; otherwise the plan sharing the most field ids
+        (at least MIN_PLAN_OVERLAP). The returned dict carries "fingerprint"
+        of the plan actually used.
+        """
+        plans = self.data.get(ats_type, {}).get("plans", {})
+        plan = plans.get(fingerprint)
+        if plan and plan.get("fields"):
+            return {**plan, "fingerprint": fingerprint}
+        ids = {fid for fid in field_ids or [] if fid}
+        best, best_overlap = None, self.MIN_PLAN_OVERLAP - 1
+        for fp, candidate in plans.items():
+            overlap = len(ids & set(candidate.get("fields", {})))
+            if overlap > best_overlap:
+                best, best_overlap = {**candidate, "fingerprint": fp}, overlap
+        return best
+
+    @staticmethod
+    def _same_options(a: List[str], b: List[str]) -> bool:
+        return bool(a) and sorted(o.strip().lower() for o in a) == sorted(o.strip().lower() for o in b)
+
+    def _stable_option_set(self, ats_type: str, fingerprint: str, fid: str, options: List[str]) -> bool:
+        """Same field id with the same options in another plan → the set doesn't vary per job."""
+        plans = self.data.get(ats_type, {}).get("plans", {})
+        return any(self._same_options(options, plan.get("fields", {}).get(fid, {}).get("options", []))
+                   for fp, plan in plans.items() if fp != fingerprint)
+
+    def save_plan(self, ats_type: str, fingerprint: str, fields: List['FormField']):
+        """Compile successfully filled, reproducible fields into a plan (replaces the old one)."""
+        from datetime import datetime as _dt
+        compiled = {}
+        for field in fields:
+            fid = field.element_id or field.name
+            if not fid or field.status not in (FillStatus.FILLED, FillStatus.VERIFIED) or not field.answer:
+                continue
+            source_str = field.answer_source.value if field.answer_source else "none"
+            is_dropdown = field.field_type in (FieldType.SELECT, FieldType.AUTOCOMPLETE)
+            # Only answers that come out the same next time. Profile values and learned
+            # answers are stored as references (edits in /api/v5/learned apply on the next
+            # fill); AI dropdown choices only for option sets that don't vary per job.
+            profile_key, learned_label, hint, stable = "", "", "", True
+            if field.profile_key and source_str == "profile":
+                profile_key = field.profile_key
+            elif source_str == "learned":
+                learned_label = field.label
+            elif source_str == "default":
+                hint = field.answer
+            elif source_str == "ai" and is_dropdown and field.options:
+                # Kept for comparison, replayed only once another plan has the same set
+                hint = field.answer
+                stable = self._stable_option_set(ats_type, fingerprint, fid, field.options)
+            else:
+                continue
+            compiled[fid] = {
+                "label": (field.label or "")[:100],
+                "field_type": field.field_type.value,
+                "strategy": field.fill_strategy,
+                "profile_key": profile_key,
+                "learned_label": learned_label,
+                "source": source_str,
+                "answer_hint": hint,
+                "options": field.options[:100] if is_dropdown else [],
+                "stable": stable,
+            }
+        if not compiled:
+            return
+
+        with self._updating():
+            schema = self.data.setdefault(ats_type, {
+                "last_updated": _dt.now().isoformat(),
+                "fill_count": 0,
+                "fields": {},
+                "repeatable_field_ids": {},
+            })
+            plans = schema.setdefault("plans", {})
+            previous = plans.get(fingerprint, {})
+            plans[fingerprint] = {
+                "field_count": len({f.element_id or f.name for f in fields if f.element_id or f.name}),
+                "fill_count": previous.get("fill_count", 0) + 1,
+                "last_used": _dt.now().isoformat(),
+                "fields": compiled,
+            }
+            # Keep the most recently used layouts only
+            if len(plans) > self.MAX_PLANS_PER_ATS:
+                for old in sorted(plans, key=lambda k: plans[k].get("last_used", ""))[:len(plans) - self.MAX_PLANS_PER_ATS]:
+                    del plans[old]
+        print(f"   ⚡ Plan compiled: {ats_type} [{fingerprint}] ({len(compiled)} fields)")
+
     def resolve_from_schema(self, ats_type: str, field: 'FormField',
                             profile: 'Profile') -> Optional[Tuple[str, 'AnswerSource', float]]:
         """Try to resolve a field answer using saved schema.
@@ -766,73 +1127,73 @@ class FormSchemaDB:
         from datetime import datetime as _dt
         now = _dt.now().isoformat()
 
-        if ats_type not in self.data:
-            self.data[ats_type] = {
-                "last_updated": now,
-                "fill_count": 0,
-                "fields": {},
-                "repeatable_field_ids": {},
-            }
-
-        schema = self.data[ats_type]
-        schema["last_updated"] = now
-        schema["fill_count"] = schema.get("fill_count", 0) + 1
-
-        saved_fields = schema.get("fields", {})
-        repeatable_ids = schema.get("repeatable_field_ids", {})
+        with self._updating():
+            if ats_type not in self.data:
+                self.data[ats_type] = {
+                    "last_updated": now,
+                    "fill_count": 0,
+                    "fields": {},
+                    "repeatable_field_ids": {},
+                }
 
-        for field in fields:
-            # Only learn from successful fills
-            if field.status not in (FillStatus.FILLED, FillStatus.VERIFIED):
-                continue
-            if not field.answer:
-                continue
+            schema = self.data[ats_type]
+            schema["last_updated"] = now
+            schema["fill_count"] = schema.get("fill_count", 0) + 1
 
-            # Determine the field key — use element_id (most stable)
-            fid = field.element_id or field.name or ""
-            if not fid:
-                continue
+            saved_fields = schema.get("fields", {})
+            repeatable_ids = schema.get("repeatable_field_ids", {})
 
-            # Skip repeatable section fields with numeric index — normalize them
-            # e.g., "school--0" → "school--{N}", "company-name-1" → "company-name-{N}"
-            normalized_fid, section_name = self._normalize_repeatable_id(fid)
-            if section_name:
-                # Track repeatable field patterns per section
-                if section_name not in repeatable_ids:
-                    repeatable_ids[section_name] = []
-                if normalized_fid not in repeatable_ids[section_name]:
-                    repeatable_ids[section_name].append(normalized_fid)
-                # Don't save individual repeatable entries (school--0, school--1, etc.)
-                # — they're handled by REPEATABLE_SECTIONS config
-                continue
+            for field in fields:
+                # Only learn from successful fills
+                if field.status not in (FillStatus.FILLED, FillStatus.VERIFIED):
+                    continue
+                if not field.answer:
+                    continue
 
-            # Build/update field mapping
-            existing = saved_fields.get(fid, {})
-            success_count = existing.get("success_count", 0) + 1
+                # Determine the field key — use element_id (most stable)
+                fid = field.element_id or field.name or ""
+                if not fid:
+                    continue
 
-            # Determine answer_hint — save static answers, skip dynamic ones
-            answer_hint = ""
-            source_str = field.answer_source.value if field.answer_source else "none"
-            if source_str in ("default", "learned"):
-                answer_hint = field.answer
-            elif source_str == "ai" and field.field_type in (FieldType.SELECT, FieldType.AUTOCOMPLETE):
-                # For dropdowns, AI choices are stable — save them
-                answer_hint = field.answer
+                # Skip repeatable section fields with numeric index — normalize them
+                # e.g., "school--0" → "school--{N}", "company-name-1" → "company-name-{N}"
+                normalized_fid, section_name = self._normalize_repeatable_id(fid)
+                if section_name:
+                    # Track repeatable field patterns per section
+                    if section_name not in repeatable_ids:
+                        repeatable_ids[section_name] = []
+                    if normalized_fid not in repeatable_ids[section_name]:
+                        repeatable_ids[section_name].append(normalized_fid)
+                    # Don't save individual repeatable entries (school--0, school--1, etc.)
+                    # — they're handled by REPEATABLE_SECTIONS config
+                    continue
 
-            saved_fields[fid] = {
-                "label": (field.label or "")[:100],
-                "field_type": field.field_type.value if field.field_type else "unknown",
-                "profile_key": field.profile_key or existing.get("profile_key", ""),
-                "source": source_str,
-                "answer_hint": answer_hint or existing.get("answer_hint", ""),
-                "options": field.options[:20] if field.options else existing.get("options", []),
-                "success_count": success_count,
-                "last_success": now,
-            }
+                # Build/update field mapping
+                existing = saved_fields.get(fid, {})
+                success_count = existing.get("success_count", 0) + 1
+
+                # Determine answer_hint — save static answers, skip dynamic ones
+                answer_hint = ""
+                source_str = field.answer_source.value if field.answer_source else "none"
+                if source_str in ("default", "learned"):
+                    answer_hint = field.answer
+                elif source_str == "ai" and field.field_type in (FieldType.SELECT, FieldType.AUTOCOMPLETE):
+                    # For dropdowns, AI choices are stable — save them
+                    answer_hint = field.answer
+
+                saved_fields[fid] = {
+                    "label": (field.label or "")[:100],
+                    "field_type": field.field_type.value if field.field_type else "unknown",
+                    "profile_key": field.profile_key or existing.get("profile_key", ""),
+                    "source": source_str,
+                    "answer_hint": answer_hint or existing.get("answer_hint", ""),
+                    "options": field.options[:20] if field.options else existing.get("options", []),
+                    "success_count": success_count,
+                    "last_success": now,
+                }
 
-        schema["fields"] = saved_fields
-        schema["repeatable_field_ids"] = repeatable_ids
-        self.save()
+            schema["fields"] = saved_fields
+            schema["repeatable_field_ids"] = repeatable_ids
 
         print(f"   📐 Schema saved: {ats_type} ({len(saved_fields)} fields, fill #{schema['fill_count']})")
 
@@ -871,6 +1232,8 @@ class FormSchemaDB:
                 "field_count": len(schema.get("fields", {})),
                 "last_updated": schema.get("last_updated", ""),
                 "repeatable_sections": list(schema.get("repeatable_field_ids", {}).keys()),
+                "option_sets": len(schema.get("option_sets", {})),
+                "plans": len(schema.get("plans", {})),
             }
         return stats
 
@@ -879,37 +1242,60 @@ class FormSchemaDB:
 # KNOWLEDGE BASE - Experience snippets + common answers for AI context
 # ═══════════════════════════════════════════════════════════════════════════
 
-class KnowledgeBase:
+class KnowledgeBase(_ReloadableStore):
     """Knowledge base with experience snippets and common answers."""
 
     def __init__(self, path: Path = KNOWLEDGE_BASE_PATH):
         self.path = path
+        self._reload()
+        self._remember_mtime()
+        print(f"   📚 KnowledgeBase loaded: {len(self.snippets)} snippets, {len(self.common_answers)} common answers")
+
+    def _reload(self):
         try:
-            self.data = json.loads(path.read_text())
+            self.data = json.loads(self.path.read_text())
         except Exception:
             self.data = {}
         self.snippets = self.data.get("experience_snippets", {})
         self.common_answers = self.data.get("common_answers", {})
         self.skills = self.data.get("skills", {})
         self.achievements = self.data.get("achievements", [])
-        print(f"   📚 KnowledgeBase loaded: {len(self.snippets)} snippets, {len(self.common_answers)} common answers")
+        self._build_indexes()
 
-    def find_relevant_snippets(self, question: str) -> List[str]:
-        """Find relevant experience snippets for a question."""
-        question_lower = question.lower()
-        found = []
+    def _build_indexes(self):
+        """Keyword indexes: snippet keywords and common-answer keywords → owners."""
+        self.snippet_index = AnswerIndex({kw.lower(): kw for kw in self.snippets})
+        self.common_index = AnswerIndex()
+        for answer_key, answer_data in self.common_answers.items():
+            for kw in answer_data.get("keywords", []):
+                if kw.lower() not in self.common_index:
+                    self.common_index.add(kw.lower(), answer_key)
 
-        for keyword, snippet in self.snippets.items():
-            # Check if keyword appears in question
-            if keyword.lower() in question_lower:
-                found.append(snippet)
-            # Also check individual words from multi-word keywords
-            elif len(keyword.split()) > 1:
-                words = keyword.lower().split()
-                if any(w in question_lower for w in words if len(w) > 3):
-                    found.append(snippet)
+    def rank_snippets(self, question: str) -> List[Tuple[str, float]]:
+        """Snippet keywords matching the question, best first.
 
-        return found[:3]  # Max 3 snippets
+        Whole keyword in question → 1.0; otherwise fraction of its words
+        (len > 3) found in the question. Only index candidates are checked.
+        """
+        question_lower = question.lower()
+        ranked = []
+        for kw_lower in self.snippet_index.candidates(question_lower):
+            if kw_lower in question_lower:
+                score = 1.0
+            elif len(kw_lower.split()) > 1:
+                words = [w for w in kw_lower.split() if len(w) > 3]
+                hits = sum(1 for w in words if w in question_lower)
+                score = 0.9 * hits / len(words) if hits else 0.0
+            else:
+                score = 0.0
+            if score:
+                ranked.append((self.snippet_index.get(kw_lower), score))
+        ranked.sort(key=lambda m: (-m[1], m[0]))
+        return ranked
+
+    def find_relevant_snippets(self, question: str) -> List[str]:
+        """Find relevant experience snippets for a question."""
+        return [self.snippets[kw] for kw, _ in self.rank_snippets(question)[:3]]  # Max 3 snippets
 
     def get_context_for_question(self, question: str) -> str:
         """Get formatted context with relevant snippets for AI prompt."""
@@ -919,16 +1305,18 @@ class KnowledgeBase:
         return ""
 
     def find_common_answer(self, question: str) -> Optional[str]:
-        """Find pre-written answer for common questions (salary, why interested, etc.)."""
+        """Find pre-written answer for common questions (salary, why interested, etc.).
+        Longest matching keyword wins (most specific), not the first in dict order."""
         question_lower = question.lower()
+        matches = [kw for kw in self.common_index.candidates(question_lower) if kw in question_lower]
+        if not matches:
+            return None
+        best = max(matches, key=lambda kw: (len(kw), kw))
+        return self.common_answers[self.common_index.get(best)].get("answer")
 
-        for answer_key, answer_data in self.common_answers.items():
-            keywords = answer_data.get("keywords", [])
-            for kw in keywords:
-                if kw.lower() in question_lower:
-                    return answer_data.get("answer")
-
-        return None
+    def find_common_answers(self, questions: List[str]) -> Dict[str, Optional[str]]:
+        """Batch find_common_answer for a whole form."""
+        return {q: self.find_common_answer(q) for q in dict.fromkeys(questions)}
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1008,6 +1396,28 @@ ANSWER:"""
             print(f"   ⚠️ Ollama error: {e}")
         return None
     
+    def generate_batch(self, prompt: str, count: int) -> Dict[str, Dict[str, Any]]:
+        """One call for a BATCH_PROMPT_TEMPLATE prompt → parse_batch_answers()."""
+        if not self.available:
+            return {}
+        try:
+            resp = requests.post(
+                self.OLLAMA_URL,
+                json={
+                    "model": self.MODEL,
+                    "prompt": prompt,
+                    "stream": False,
+                    "format": "json",
+                    "options": {"temperature": 0.1, "num_predict": min(4000, 120 * count)}
+                },
+                timeout=60 + 15 * count
+            )
+            if resp.status_code == 200:
+                return parse_batch_answers(resp.json().get("response", ""))
+        except Exception as e:
+            print(f"   ⚠️ Ollama batch error: {e}")
+        return {}
+
     def match_option(self, answer: str, options: List[str]) -> Optional[str]:
         if not options:
             return answer
@@ -1090,27 +1500,29 @@ Which option should be selected? Return ONLY the exact option text, nothing else
             
             answer = response.content[0].text.strip()
             
-            # Find matching option (exact match first)
-            for opt in options:
-                if opt.lower() == answer.lower():
-                    return opt
-            
-            # Partial match
-            for opt in options:
-                if opt.lower() in answer.lower() or answer.lower() in opt.lower():
-                    return opt
-            
-            # Word overlap match
-            answer_words = set(answer.lower().split())
-            for opt in options:
-                opt_words = set(opt.lower().split())
-                if answer_words & opt_words:
-                    return opt
+            # Find matching option (exact → partial → word overlap)
+            return match_option_text(answer, options)
                     
         except Exception as e:
             print(f"   ⚠️ Claude error: {e}")
         
         return None
+
+    def generate_batch(self, prompt: str, count: int) -> Dict[str, Dict[str, Any]]:
+        """One Claude call for a BATCH_PROMPT_TEMPLATE prompt → parse_batch_answers()."""
+        if not self.available:
+            return {}
+        try:
+            response = self.vision_ai.client.messages.create(
+                model=self.vision_ai.config.model,
+                max_tokens=min(4000, 200 * count),
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.1,
+            )
+            return parse_batch_answers(response.content[0].text)
+        except Exception as e:
+            print(f"   ⚠️ Claude batch error: {e}")
+        return {}
     
     def analyze_field_screenshot(self, screenshot_path: str, field_description: str = "") -> Dict[str, Any]:
         """Analyze form field from screenshot using Claude Vision."""
@@ -1130,6 +1542,90 @@ Which option should be selected? Return ONLY the exact option text, nothing else
             return {"success": False, "error": "Claude API not configured"}
         return self.vision_ai.analyze_form(screenshot_path)
 
+# ═══════════════════════════════════════════════════════════════════════════
+# AI BATCH - one structured prompt for all custom questions of a form
+# ═══════════════════════════════════════════════════════════════════════════
+
+BATCH_PROMPT_TEMPLATE = """Answer ALL job application questions below for this candidate.
+
+CANDIDATE:
+{profile_context}
+{kb_context}
+QUESTIONS (JSON):
+{questions}
+
+RULES:
+1. "How many years of experience" -> answer with a number like "15+"
+2. Questions about specific software (NetSuite, SAP, Salesforce, Oracle):
+   - Answer "No" unless that EXACT tool is mentioned in candidate profile above
+3. If "options" are given -> answer with the EXACT text of one option
+4. Yes/no -> "Yes" or "No" only
+5. Open questions -> professional, specific, max {max_words} words
+6. "confidence" 0.0-1.0: how sure you are the answer is correct for this candidate
+
+Return JSON only:
+{{"answers": [{{"id": "q1", "answer": "...", "confidence": 0.9}}]}}"""
+
+# Batch answers below this self-reported confidence are re-asked one by one
+MIN_BATCH_CONFIDENCE = 0.3
+
+
+def build_batch_prompt(items: List[Dict[str, Any]], profile_context: str,
+                       kb_context: str = "", max_words: int = 30) -> str:
+    """items: [{"id": "q1", "question": "...", "options": [...]}]"""
+    return BATCH_PROMPT_TEMPLATE.format(
+        profile_context=profile_context,
+        kb_context=f"\n{kb_context}\n" if kb_context else "",
+        questions=json.dumps(items, ensure_ascii=False, indent=1),
+        max_words=max_words,
+    )
+
+
+def parse_batch_answers(text: str) -> Dict[str, Dict[str, Any]]:
+    """Model output → {id: {"answer": str, "confidence": float}} (bad items dropped)."""
+    if "```" in text:
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except Exception:
+        return {}
+    items = data.get("answers", []) if isinstance(data, dict) else []
+    parsed = {}
+    for item in items:
+        if not isinstance(item, dict) or not item.get("id"):
+            continue
+        answer = str(item.get("answer") or "").strip()
+        try:
+            confidence = float(item.get("confidence", 0.5))
+        except (TypeError, ValueError):
+            confidence = 0.5
+        parsed[str(item["id"])] = {"answer": answer, "confidence": max(0.0, min(1.0, confidence))}
+    return parsed
+
+
+def match_option_text(answer: str, options: List[str]) -> Optional[str]:
+    """Map model answer to an option: exact → partial → word overlap. None if no match."""
+    answer_lower = answer.lower().strip()
+    if not answer_lower:
+        return None
+    for opt in options:
+        if opt.lower() == answer_lower:
+            return opt
+    for opt in options:
+        if opt.lower() in answer_lower or answer_lower in opt.lower():
+            return opt
+    answer_words = set(answer_lower.split())
+    for opt in options:
+        if answer_words & set(opt.lower().split()):
+            return opt
+    return None
+
+
 class FormFillerV5:
     """
     Universal Form Filler V5
@@ -1208,16 +1704,37 @@ class FormFillerV5:
             'skip_end_date_if_current': False,
         }
     }
+
+    # Field scan: one evaluate() per frame (dom_snapshot.py) instead of
+    # 10+ round trips per element. False → legacy per-element _detect_field().
+    USE_DOM_SNAPSHOT = True
     
-    def __init__(self, browser_mode: BrowserMode = BrowserMode.PERSISTENT):
+    def __init__(self, browser_mode: BrowserMode = BrowserMode.PERSISTENT,
+                 shared_from: Optional["FormFillerV5"] = None):
+        """
+        shared_from: reuse already loaded Profile / LearnedDB / FormSchemaDB /
+        KnowledgeBase / AI helpers of another filler (warm apply worker) instead
+        of rebuilding them from JSON. Per-form state is always fresh; the shared
+        stores are re-read at the start of every fill if their files changed.
+        """
         self.browser_mode = browser_mode
-        self.profile = Profile()
-        self.learned_db = LearnedDB()
-        self.schema_db = FormSchemaDB()
-        self.kb = KnowledgeBase()
-        self.ai = AIHelper()
-        self.ollama = OllamaHelper()
+        if shared_from is not None:
+            self.profile = shared_from.profile
+            self.learned_db = shared_from.learned_db
+            self.schema_db = shared_from.schema_db
+            self.kb = shared_from.kb
+            self.ai = shared_from.ai
+            self.ollama = shared_from.ollama
+        else:
+            self.profile = Profile()
+            self.learned_db = LearnedDB()
+            self.schema_db = FormSchemaDB()
+            self.kb = KnowledgeBase()
+            self.ai = AIHelper()
+            self.ollama = OllamaHelper()
         self.logger = FormLogger()
+        self.waiter = StabilityWaiter()  # event-driven waits instead of fixed sleeps
+        self.telemetry: Optional[FillTelemetry] = None  # per-phase timing, set by fill()
 
         self.browser: Optional[BrowserManager] = None
         self.page: Optional[Page] = None
@@ -1225,17 +1742,54 @@ class FormFillerV5:
         self._seen_selectors: set = set()
         self._ats_type: str = ""  # Detected ATS type for schema lookups
         self._section_filled_ids: set = set()  # Element IDs filled by repeatable section handler
+        self._fill_plan: Optional[dict] = None   # compiled plan for this form layout (FormSchemaDB.plans)
+        self._plan_fingerprint: str = ""
+        self._planned: set = set()               # selectors answered from the plan
+        self._mode: FillMode = FillMode.INTERACTIVE
+        self.needs_user: str = ""                # manual step that wasn't completed (worker mode)
     
     # ─────────────────────────────────────────────────────────────────────
     # PUBLIC API
     # ─────────────────────────────────────────────────────────────────────
     
-    def analyze(self, url: str) -> FillReport:
+    def _refresh_stores(self):
+        """Pick up edits made outside this filler (API, CLI, other process) since the last fill."""
+        for store in (self.profile, self.learned_db, self.schema_db, self.kb):
+            try:
+                if store.refresh():
+                    print(f"   🔄 Reloaded {type(store).__name__} ({store.path.name} changed)")
+            except Exception as e:
+                print(f"   ⚠️ {type(store).__name__} reload failed: {e}")
+
+    @contextlib.contextmanager
+    def _browser_session(self, browser: Optional[BrowserManager]):
+        """Own BrowserManager per call, or an already started one (warm worker, not closed).
+        Answers learned during the session are written to disk once, at the end."""
+        try:
+            if browser is not None:
+                yield browser
+            else:
+                with BrowserManager(mode=self.browser_mode) as own:
+                    yield own
+        except BaseException as e:
+            if self.telemetry and not self.telemetry.finished:
+                self.telemetry.finish(status="error", error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            try:
+                self.learned_db.flush()
+            except Exception as e:
+                print(f"   ⚠️ Learned DB save failed: {e}")
+
+    def analyze(self, url: str, browser: Optional[BrowserManager] = None) -> FillReport:
         """
         Pre-flight analysis: scan form, find answers, generate readiness report.
         Does NOT fill any fields.
         """
-        with BrowserManager(mode=self.browser_mode) as browser:
+        self._fill_started = time.time()
+        self.waiter.reset()
+        self._refresh_stores()
+        with self._browser_session(browser) as browser:
             self.browser = browser
             self.page = browser.page
             
@@ -1247,12 +1801,14 @@ class FormFillerV5:
 
             # Scan and analyze
             self._scan_fields()
+            self._load_fill_plan()
             self._resolve_all_answers()
 
             # Generate report
             return self._generate_report(url)
     
-    def fill(self, url: str, mode: FillMode = FillMode.INTERACTIVE, keep_open: bool = False) -> FillReport:
+    def fill(self, url: str, mode: FillMode = FillMode.INTERACTIVE, keep_open: bool = False,
+             browser: Optional[BrowserManager] = None) -> FillReport:
         """
         Fill form with specified mode.
         Includes re-scan logic for dynamic forms (fields that appear after selection).
@@ -1260,11 +1816,29 @@ class FormFillerV5:
         Args:
             keep_open: If True, keeps browser open for manual review (CDP: just disconnect,
                       PERSISTENT/FRESH: wait for ENTER)
+            browser: already started BrowserManager (warm worker); not closed afterwards
+
+        Sampled into logs/profiles/ when a "fill" profile was requested
+        (POST /debug/profiles/request/fill or --profile on the CLI).
         """
-        with BrowserManager(mode=self.browser_mode) as browser:
+        from utils.profiler import profiled_if_requested
+        # thread_only: other apply workers may be filling in parallel tabs
+        with profiled_if_requested("fill", url, thread_only=True):
+            return self._fill(url, mode, keep_open, browser)
+
+    def _fill(self, url: str, mode: FillMode, keep_open: bool,
+              browser: Optional[BrowserManager]) -> FillReport:
+        self._fill_started = time.time()
+        self.waiter.reset()
+        self._mode = mode
+        self.needs_user = ""
+        self._refresh_stores()
+        self.telemetry = FillTelemetry(url)
+        with self._browser_session(browser) as browser:
             self.browser = browser
             self.page = browser.page
 
+            self.telemetry.phase("navigation")
             browser.goto(url)
             browser.wait_for_stable()
 
@@ -1274,6 +1848,7 @@ class FormFillerV5:
 
             # Detect ATS type early for schema lookups
             self._ats_type = self._detect_ats(url)
+            self.telemetry.ats_type = self._ats_type
             schema = self.schema_db.get_schema(self._ats_type)
             if schema:
                 print(f"   📐 Schema loaded: {self._ats_type} ({len(schema.get('fields', {}))} fields, fill #{schema.get('fill_count', 0)})")
@@ -1281,9 +1856,11 @@ class FormFillerV5:
                 print(f"   📐 No schema yet for {self._ats_type} — will learn from this fill")
 
             # Wait for iframes to load (Greenhouse, Lever forms are in iframes)
+            self.telemetry.phase("iframe_wait")
             self._wait_for_iframes()
             
             # Extract job info BEFORE Apply click (full JD available on description page)
+            self.telemetry.phase("job_info")
             self._extract_job_info()
             jd_before_apply = getattr(self, 'job_description', '') or ''
 
@@ -1294,6 +1871,12 @@ class FormFillerV5:
             if self._handle_login_page():
                 # After login, wait and rescan
                 browser.wait_for_stable()
+            if self.needs_user:
+                # Логин/капча не пройдены — форму не заполнить, отдаём статус вместо блокировки
+                self.logger.end_session(status="needs_user")
+                report = self._generate_report(url)
+                self.telemetry.finish("needs_user", report)
+                return report
 
             # Re-extract job info after Apply (may get additional info from form page)
             self._extract_job_info()
@@ -1304,14 +1887,21 @@ class FormFillerV5:
                 print(f"   📄 Using pre-Apply JD: {len(self.job_description)} chars (form page had {len(jd_after_apply)})")
 
             # Initial scan, prescan dropdowns, resolve, fill
+            self.telemetry.phase("scan")
             self._scan_fields()
+            self._load_fill_plan()
+            self.telemetry.phase("prescan")
             self._prescan_all_options()
+            self.telemetry.phase("resolve")
             self._resolve_all_answers()
             
             if mode == FillMode.PRE_FLIGHT:
-                return self._generate_report(url)
+                report = self._generate_report(url)
+                self.telemetry.finish("pre_flight", report)
+                return report
             
             # Fill repeatable sections first (work experience, education)
+            self.telemetry.phase("fill")
             try:
                 self.fill_all_repeatable_sections()
             except Exception as e:
@@ -1330,7 +1920,7 @@ class FormFillerV5:
                 self._fill_all_fields(mode)
                 
                 # Wait for potential new fields to appear
-                time.sleep(0.5)
+                self.waiter.quiet(getattr(self, '_active_frame', self.page), fallback=0.5, quiet_ms=300)
                 browser.wait_for_stable()
                 
                 # Re-scan for new fields
@@ -1399,8 +1989,8 @@ class FormFillerV5:
                         for f in unfilled_new:
                             print(f"   + {f.label[:40]}")
 
-                        # Resolve answers for new fields
-                        for f in unfilled_new:
+                        # Resolve answers for new fields (compiled plan first)
+                        for f in self._apply_fill_plan(unfilled_new):
                             self._resolve_field_answer(f)
                     else:
                         print(f"\n✅ {len(new_fields)} dynamic fields already filled by section handler")
@@ -1412,15 +2002,19 @@ class FormFillerV5:
                     break
             
             # Blur all fields to trigger validation
+            self.telemetry.phase("validate")
             self._blur_all_fields()
             self._validate_all_fields()
             
             # Feedback loop: save verified AI answers to learned DB
+            self.telemetry.phase("learn")
             self._save_verified_ai_answers()
 
             # Save form schema for this ATS type
             if self._ats_type:
                 self.schema_db.save_schema_from_fill(self._ats_type, self.fields, url)
+                if self._plan_fingerprint:
+                    self.schema_db.save_plan(self._ats_type, self._plan_fingerprint, self.fields)
 
             # Save duration before end_session clears it
             self._fill_duration = 0.0
@@ -1429,6 +2023,7 @@ class FormFillerV5:
                 self._fill_duration = (_dt.now() - self.logger.start_time).total_seconds()
 
             # End logging session
+            self.telemetry.phase("report")
             log_path = self.logger.end_session(status="completed")
             if log_path:
                 print(f"   📄 Log saved: {log_path}")
@@ -1436,6 +2031,7 @@ class FormFillerV5:
             # Generate report + save JSON/PDF (before browser might close)
             report = self._generate_report(url)
             self._save_application_report(report)
+            self.telemetry.finish("completed", report)  # before review wait, not counted
 
             # Keep browser open for review
             if keep_open or mode == FillMode.INTERACTIVE:
@@ -1460,13 +2056,8 @@ class FormFillerV5:
                     except:
                         pass
                     print("\n👀 Review the form in browser.")
-                    print("   Press ENTER when done...")
-                    try:
-                        input()
-                    except:
-                        # Fallback: keep open for 5 minutes when input() not available
-                        print("   (Browser will stay open for 5 minutes)")
-                        time.sleep(300)
+                    self._wait_for_user("review", self.page.is_closed,
+                                        timeout=REVIEW_HOLD_SECONDS, required=False)
 
             print(report.detailed_report())
             return report
@@ -1477,11 +2068,9 @@ class FormFillerV5:
         Returns list of new fields not seen before.
         """
         new_fields = []
-        elements = self.page.query_selector_all("input, select, textarea")
         
-        for el in elements:
-            field = self._detect_field(el)
-            if field and field.selector not in self._seen_selectors:
+        for field in self._frame_fields(self.page.main_frame):
+            if field.selector not in self._seen_selectors:
                 self._seen_selectors.add(field.selector)
                 self.fields.append(field)
                 new_fields.append(field)
@@ -1510,7 +2099,7 @@ class FormFillerV5:
             for frame in self.page.frames:
                 if frame.url and any(ats in frame.url for ats in ['greenhouse', 'lever', 'workday', 'icims']):
                     print(f"   \u2705 Found ATS iframe: {frame.url[:50]}")
-                    time.sleep(1)  # Extra wait for iframe content
+                    self.waiter.quiet(frame, fallback=1, quiet_ms=300)
                     return
             
             # If frames increased, wait a bit more
@@ -1529,7 +2118,6 @@ class FormFillerV5:
         then require clicking Apply to open the form.
         Supports both main page and iframes.
         """
-        import time
         
         # Check if we're on a job description page (no form fields visible)
         initial_fields = self.page.query_selector_all("input[type='text'], input[type='email'], select, textarea")
@@ -1577,7 +2165,6 @@ class FormFillerV5:
     
     def _try_click_apply_in_context(self, context, selectors, context_name):
         """Try to find and click Apply button in a given context (page or frame)."""
-        import time
         
         for selector in selectors:
             try:
@@ -1587,7 +2174,7 @@ class FormFillerV5:
                     print(f"   ✅ Found Apply button in {context_name}: '{btn_text}'")
                     btn.click()
                     print(f"   🖱️ Clicked Apply button")
-                    time.sleep(2)
+                    self.waiter.quiet(self.page, fallback=2, quiet_ms=300)
                     self.browser.wait_for_stable()
                     print(f"   📄 Current URL: {self.page.url[:80]}...")
                     return True
@@ -1607,7 +2194,7 @@ class FormFillerV5:
                             print(f"   ✅ Found Apply button in {context_name} (text): '{text[:50]}'")
                             el.click()
                             print(f"   🖱️ Clicked Apply button")
-                            time.sleep(2)
+                            self.waiter.quiet(self.page, fallback=2, quiet_ms=300)
                             self.browser.wait_for_stable()
                             return True
                 except:
@@ -1617,16 +2204,64 @@ class FormFillerV5:
         
         return False
 
+    def _can_prompt(self) -> bool:
+        """ENTER prompts only for a person at a terminal: not AUTONOMOUS (warm worker), stdin is a tty."""
+        if self._mode == FillMode.AUTONOMOUS:
+            return False
+        try:
+            return bool(sys.stdin) and sys.stdin.isatty()
+        except (ValueError, OSError):
+            return False
+
+    def _wait_for_user(self, step: str, done, timeout: float = USER_STEP_TIMEOUT, required: bool = True) -> bool:
+        """
+        Manual step in the browser (login, captcha, review).
+        At a terminal: wait for ENTER, as before. Otherwise poll done() (page
+        condition) for up to `timeout` seconds; a required step that isn't
+        completed sets self.needs_user and the fill stops with that status.
+        """
+        if self._can_prompt():
+            print("   Press ENTER when done...")
+            input()
+            return True
+        print(f"   🙋 Needs user: {step} — waiting up to {timeout:.0f}s in the browser tab")
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                if done():
+                    print(f"   ✅ {step}: done")
+                    return True
+            except Exception:
+                pass  # страница навигирует — проверим на следующем шаге
+            time.sleep(USER_STEP_POLL)
+        if required:
+            self.needs_user = step
+            print(f"   ⏸️ {step}: not completed in {timeout:.0f}s — job needs user")
+        return False
+
+    @staticmethod
+    def _is_login_url(url: str) -> bool:
+        url = (url or "").lower()
+        return 'login' in url or 'signin' in url or 'auth' in url
+
+    def _left_login_page(self) -> bool:
+        return not self._is_login_url(self.page.url)
+
+    @staticmethod
+    def _captcha_gone(frame) -> bool:
+        if frame.is_detached():
+            return True
+        captcha = frame.query_selector(CAPTCHA_SELECTOR)
+        return captcha is None or not captcha.is_visible()
+
     def _handle_login_page(self):
         """
         Handle login/authentication pages.
         Supports: Google OAuth, LinkedIn OAuth, Email login.
         """
-        import time
         
         # Check if we're on a login page
-        url = self.page.url.lower()
-        if 'login' not in url and 'signin' not in url and 'auth' not in url:
+        if not self._is_login_url(self.page.url):
             return False
         
         print("\n🔐 Login page detected...")
@@ -1646,17 +2281,12 @@ class FormFillerV5:
                     print("   🔵 Found Google login button")
                     print("   👉 Clicking Google login...")
                     google_btn.click()
-                    time.sleep(3)
+                    self.waiter.quiet(self.page, fallback=3, quiet_ms=300)
                     self.browser.wait_for_stable()
                     
                     # Wait for Google OAuth popup or redirect
                     print("   👉 Please complete Google sign-in in the browser...")
-                    print("   Press ENTER when logged in...")
-                    try:
-                        input()
-                    except:
-                        time.sleep(30)
-                    
+                    self._wait_for_user("Google sign-in", self._left_login_page)
                     self.browser.wait_for_stable()
                     return True
                 
@@ -1670,16 +2300,11 @@ class FormFillerV5:
                     print("   🔵 Found LinkedIn login button")
                     print("   👉 Clicking LinkedIn login...")
                     linkedin_btn.click()
-                    time.sleep(3)
+                    self.waiter.quiet(self.page, fallback=3, quiet_ms=300)
                     self.browser.wait_for_stable()
                     
                     print("   👉 Please complete LinkedIn sign-in...")
-                    print("   Press ENTER when logged in...")
-                    try:
-                        input()
-                    except:
-                        time.sleep(30)
-                    
+                    self._wait_for_user("LinkedIn sign-in", self._left_login_page)
                     self.browser.wait_for_stable()
                     return True
             except:
@@ -1697,27 +2322,22 @@ class FormFillerV5:
                 if email_input and email_input.is_visible():
                     print(f"   📧 Found email field, entering: {email_value}")
                     email_input.fill(email_value)
-                    time.sleep(0.5)
+                    self.waiter.value(frame, email_input, fallback=0.5, timeout=0.5)
                     
                     # Look for submit button
                     submit_btn = frame.query_selector("input[type='submit'], button[type='submit'], button:has-text('Continue'), button:has-text('Next')")
                     if submit_btn and submit_btn.is_visible():
                         print("   👉 Clicking submit...")
                         submit_btn.click()
-                        time.sleep(2)
+                        self.waiter.quiet(self.page, fallback=2, quiet_ms=300)
                         self.browser.wait_for_stable()
                     
                     # Check for captcha
-                    captcha = frame.query_selector("[class*='captcha'], [class*='hcaptcha'], [class*='recaptcha'], iframe[src*='captcha']")
+                    captcha = frame.query_selector(CAPTCHA_SELECTOR)
                     if captcha:
                         print("\n   🧩 CAPTCHA detected!")
                         print("   👉 Please solve the captcha in the browser...")
-                        print("   Press ENTER when done...")
-                        try:
-                            input()
-                        except:
-                            time.sleep(30)
-                        
+                        self._wait_for_user("captcha", lambda: self._captcha_gone(frame))
                         self.browser.wait_for_stable()
                     
                     return True
@@ -1740,8 +2360,7 @@ class FormFillerV5:
 
         # Scan main page first
         print("   Scanning main page...", flush=True)
-        elements = self.page.query_selector_all("input, select, textarea")
-        main_count = self._scan_elements(elements, "main")
+        main_count = self._add_scanned_fields(self._frame_fields(self.page.main_frame))
         print(f"   Main page: {main_count} fields", flush=True)
 
         # Scan all iframes (important for Greenhouse, Lever embedded forms)
@@ -1756,8 +2375,7 @@ class FormFillerV5:
                 try:
                     frame_url = frame.url[:40] if frame.url else "(empty)"
                     print(f"      Frame {i}: {frame_url}...", flush=True)
-                    elements = frame.query_selector_all("input, select, textarea")
-                    count = self._scan_elements(elements, f"frame[{i}]")
+                    count = self._add_scanned_fields(self._frame_fields(frame))
 
                     if count > 0:
                         print(f"      ✅ Frame {i}: {count} fields")
@@ -1883,23 +2501,100 @@ class FormFillerV5:
             except Exception as e:
                 print(f"      ⚠️ Fieldset scan error ({fieldset_id}): {e}")
 
-    def _scan_elements(self, elements, source):
-        """Scan elements from a specific source (main or frame)."""
+    def _add_scanned_fields(self, fields: List[FormField]) -> int:
+        """Add fields from one source (main or frame), skipping seen selectors."""
         count = 0
-        for el in elements:
-            field = self._detect_field(el)
-            if field and field.selector not in self._seen_selectors:
+        for field in fields:
+            if field.selector not in self._seen_selectors:
                 self._seen_selectors.add(field.selector)
                 self.fields.append(field)
                 count += 1
         return count
-        
-        # Print summary by type
-        type_counts = {}
-        for f in self.fields:
-            type_counts[f.field_type.value] = type_counts.get(f.field_type.value, 0) + 1
-        
-        print(f"   Found {len(self.fields)} fields: {type_counts}")
+
+    def _frame_fields(self, frame) -> List[FormField]:
+        """Detect all fields in one frame: DOM snapshot, per-element scan as fallback."""
+        if self.USE_DOM_SNAPSHOT:
+            try:
+                return self._snapshot_fields(frame)
+            except Exception as e:
+                print(f"      ⚠️ DOM snapshot failed ({e}), falling back to per-element scan", flush=True)
+
+        fields = []
+        for el in frame.query_selector_all("input, select, textarea"):
+            field = self._detect_field(el)
+            if field:
+                fields.append(field)
+        return fields
+
+    def _snapshot_fields(self, frame) -> List[FormField]:
+        """Single-evaluate scan of a frame → FormField list (see dom_snapshot.py)."""
+        entries = [e for e in snapshot_frame(frame)
+                   if e.get("visible") and e.get("type") not in ("hidden", "submit", "button")]
+
+        # label[for] fallback to the top document for fields inside iframes
+        if frame != self.page.main_frame:
+            missing = [e["id"] for e in entries if e.get("id") and not e["labels"].get("for")]
+            if missing:
+                try:
+                    found = self.page.evaluate(LABELS_FOR_SCRIPT, missing)
+                    for e in entries:
+                        if e.get("id") in found:
+                            e["labels"]["for"] = found[e["id"]]
+                except Exception:
+                    pass
+
+        fields = []
+        for entry in entries:
+            field = self._field_from_snapshot(entry)
+            if field:
+                fields.append(field)
+        return fields
+
+    def _field_from_snapshot(self, entry: Dict[str, Any]) -> Optional[FormField]:
+        """Build FormField from one dom_snapshot entry (same rules as _detect_field)."""
+        tag = entry.get("tag", "")
+        input_type = entry.get("type") or "text"
+        el_id = entry.get("id", "")
+        el_name = entry.get("name", "")
+
+        selector = self._field_selector(el_id, el_name, input_type, entry.get("form_id", ""))
+        if not selector:
+            return None
+
+        field_type, detection_method = self._classify_type(
+            tag, input_type, lambda attr: entry.get(attr.replace("-", "_"), ""))
+        maxlength_str = entry.get("maxlength") or ""
+
+        return FormField(
+            selector=selector,
+            element_id=el_id,
+            name=el_name,
+            label=resolve_label(entry),
+            field_type=field_type,
+            detection_method=detection_method,
+            html_tag=tag,
+            input_type=input_type,
+            options=entry.get("options", []) if field_type == FieldType.SELECT else [],
+            required=bool(entry.get("required")),
+            current_value=entry.get("value", ""),
+            placeholder=entry.get("placeholder", ""),
+            maxlength=int(maxlength_str) if maxlength_str.isdigit() else 0,
+            pattern=entry.get("pattern", ""),
+        )
+
+    @staticmethod
+    def _field_selector(el_id: str, el_name: str, input_type: str, form_id: str = "") -> str:
+        """CSS selector for a field: #id, #form input[type='file'] or [name=...]; '' if none."""
+        # Escape special CSS chars in IDs like question_123[]
+        if el_id:
+            escaped_id = re.sub(r'([\[\](){}!@#$%^&*+=|~`<>?,/\\])', r'\\\1', el_id)
+            return f"#{escaped_id}"
+        if el_name:
+            # For file inputs, use parent form ID to disambiguate (Resume vs Cover Letter)
+            if input_type == "file" and form_id:
+                return f"#{form_id} input[type='file']"
+            return f"[name='{el_name}']"
+        return ""
     
     def _detect_field(self, el: ElementHandle) -> Optional[FormField]:
         """Detect field type and metadata."""
@@ -1918,21 +2613,12 @@ class FormFillerV5:
             if input_type in ("hidden", "submit", "button"):
                 return None
             
-            # Build selector (escape special CSS chars in IDs like question_123[])
-            if el_id:
-                escaped_id = re.sub(r'([\[\](){}!@#$%^&*+=|~`<>?,/\\])', r'\\\1', el_id)
-                selector = f"#{escaped_id}"
-            elif el_name:
-                # For file inputs, use parent form ID to disambiguate (Resume vs Cover Letter)
-                if input_type == "file":
-                    form_id = el.evaluate("e => e.form ? e.form.id : ''")
-                    if form_id:
-                        selector = f"#{form_id} input[type='file']"
-                    else:
-                        selector = f"[name='{el_name}']"
-                else:
-                    selector = f"[name='{el_name}']"
-            else:
+            # Build selector
+            form_id = ""
+            if not el_id and el_name and input_type == "file":
+                form_id = el.evaluate("e => e.form ? e.form.id : ''")
+            selector = self._field_selector(el_id, el_name, input_type, form_id)
+            if not selector:
                 return None
             
             # Get label
@@ -2192,6 +2878,11 @@ class FormFillerV5:
     
     def _detect_type(self, el: ElementHandle, tag: str, input_type: str) -> Tuple[FieldType, DetectionMethod]:
         """Detect field type using cascade."""
+        return self._classify_type(tag, input_type, el.get_attribute)
+
+    @staticmethod
+    def _classify_type(tag: str, input_type: str, get_attr) -> Tuple[FieldType, DetectionMethod]:
+        """Type cascade; get_attr(name) is only called for ARIA layer (lazy for ElementHandle)."""
         
         # Layer 1: HTML standard
         if tag == "select":
@@ -2210,8 +2901,8 @@ class FormFillerV5:
             return FieldType.DATE, DetectionMethod.HTML
         
         # Layer 2: ARIA
-        role = el.get_attribute("role") or ""
-        aria_haspopup = el.get_attribute("aria-haspopup") or ""
+        role = get_attr("role") or ""
+        aria_haspopup = get_attr("aria-haspopup") or ""
         
         if role == "combobox" or aria_haspopup in ("true", "listbox"):
             return FieldType.AUTOCOMPLETE, DetectionMethod.ARIA
@@ -2226,12 +2917,9 @@ class FormFillerV5:
         options = []
         try:
             el.click()
-            time.sleep(0.4)
-            
-            # Wait for menu
-            try:
-                self.page.wait_for_selector('.select__menu', timeout=1000)
-            except:
+            # Меню уже дождались через options() — второй wait_for_selector не нужен
+            opened = self.waiter.options(el.owner_frame() or self.page, '.select__option', fallback=0.4)
+            if not opened and not self.page.query_selector('.select__menu'):
                 self.page.keyboard.press("Escape")
                 return []
             
@@ -2244,7 +2932,7 @@ class FormFillerV5:
             
             # Close menu
             self.page.keyboard.press("Escape")
-            time.sleep(0.1)
+            self.waiter.settle(self.page, fallback=0.1)
             
         except:
             pass
@@ -2260,24 +2948,37 @@ class FormFillerV5:
         Pre-scan all autocomplete/select fields to discover options BEFORE filling.
         Ported from V3.5's prescan_options() — key to higher fill rates.
 
-        Opens each dropdown, reads options, finds exact matches, then closes.
-        This prevents the issue of typing wrong text and getting no results.
+        Three passes, cheapest first:
+          1. FormSchemaDB option_sets cached for this form layout (no page access)
+          2. one in-page harvest per frame (dom_snapshot.OPTIONS_HARVEST_SCRIPT):
+             <select>, rendered aria-controls listboxes, datalists, data-options
+          3. only the remaining lazy dropdowns are opened, read and closed
+        Newly discovered option sets are saved to FormSchemaDB.
         """
         print("\n🔍 Pre-scanning dropdown options...")
         # Search in active frame AND all frames
         context = getattr(self, '_active_frame', self.page)
-        prescan_count = 0
+        ats_type = getattr(self, '_ats_type', '') or ''
+        fingerprint = self._plan_fingerprint or FormSchemaDB.fingerprint(
+            ats_type, [f.element_id or f.name for f in self.fields])
+        counts = {"scan": 0, "cached": 0, "harvested": 0, "opened": 0}
+        discovered = {}  # field_id → (label, options) for FormSchemaDB
 
         # Build lookup of field selectors to frames for fill later
         self._field_frames = {}
 
+        pending = []
         for field in self.fields:
             if field.field_type not in (FieldType.AUTOCOMPLETE, FieldType.SELECT):
                 continue
 
+            # Answer + options already known from the compiled plan
+            if field.selector in self._planned:
+                continue
+
             # Skip if already has options (from initial scan)
             if field.options:
-                prescan_count += 1
+                counts["scan"] += 1
                 continue
 
             # Skip location/school - these are SEARCH type, don't prescan
@@ -2291,89 +2992,135 @@ class FormFillerV5:
                 print(f"   [SELECT2] {field.label[:35]}: will use Select2 handler")
                 continue
 
+            # Pass 1: FIXED options seen on a previous visit to this form layout
+            cached = self.schema_db.get_option_set(ats_type, fingerprint, field.element_id, field.label)
+            if cached:
+                field.options = cached
+                counts["cached"] += 1
+                continue
+
+            pending.append(field)
+
+        # Pass 2: option lists already in the DOM — one evaluate() per frame
+        if pending:
+            ids = [f.element_id for f in pending if f.element_id]
+            harvested = {}
+            for frame in self.page.frames:
+                try:
+                    for fid, options in harvest_options(frame, ids).items():
+                        harvested.setdefault(fid, options)
+                except Exception:
+                    continue
+            still_pending = []
+            for field in pending:
+                options = harvested.get(field.element_id or "")
+                if options:
+                    field.options = options
+                    discovered[field.element_id] = (field.label, options)
+                    counts["harvested"] += 1
+                else:
+                    still_pending.append(field)
+            pending = still_pending
+
+        # Pass 3: lazy dropdowns — open / read / close
+        for field in pending:
             print(f"   Prescanning: {field.label[:35]}...", flush=True)
+            options = self._prescan_open_dropdown(field, context)
+            if options:
+                field.options = options
+                if field.element_id:
+                    discovered[field.element_id] = (field.label, options)
+                is_fixed = len(options) <= FormSchemaDB.MAX_FIXED_OPTIONS
+                status = "FIXED" if is_fixed else "SEARCH"
+                print(f"      [{status}] {len(options)} options found")
+                counts["opened"] += 1
+            else:
+                print(f"      No options found")
 
+        if discovered and ats_type:
             try:
-                el = context.query_selector(field.selector)
-                if not el:
-                    # Try all frames
+                self.schema_db.save_option_sets(ats_type, fingerprint, discovered)  # FIXED sets only
+            except Exception as e:
+                print(f"   ⚠️ Option cache save failed: {e}")
+
+        total = sum(counts.values())
+        print(f"   📊 Pre-scanned {total} dropdowns "
+              f"(scan {counts['scan']}, cached {counts['cached']}, "
+              f"in-page {counts['harvested']}, opened {counts['opened']})")
+
+    def _prescan_open_dropdown(self, field: FormField, context) -> List[str]:
+        """Open one dropdown, read its options via aria-controls (or global menu), close it."""
+        options = []
+        try:
+            el = context.query_selector(field.selector)
+            if not el:
+                # Try all frames
+                for frame in self.page.frames:
+                    try:
+                        el = frame.query_selector(field.selector)
+                        if el:
+                            break
+                    except:
+                        continue
+            if not el or not el.is_visible():
+                print(f"      ⚠️ Not visible, skipping")
+                return options
+
+            # Close any open dropdowns
+            self.page.keyboard.press('Escape')
+            self.waiter.settle(context, fallback=0.1)
+
+            try:
+                el.scroll_into_view_if_needed(timeout=3000)
+            except:
+                pass
+            el.click(timeout=3000)  # Short timeout for prescan clicks
+            self.waiter.options(el.owner_frame() or context, AUTOCOMPLETE_OPTIONS, fallback=0.5)
+
+            # Read options via aria-controls (V5 method)
+            controls_id = el.get_attribute('aria-controls')
+
+            if controls_id:
+                listbox = context.query_selector(f'#{controls_id}')
+                if not listbox:
+                    # Try in all frames
                     for frame in self.page.frames:
                         try:
-                            el = frame.query_selector(field.selector)
-                            if el:
+                            listbox = frame.query_selector(f'#{controls_id}')
+                            if listbox:
                                 break
                         except:
                             continue
-                if not el or not el.is_visible():
-                    print(f"      ⚠️ Not visible, skipping")
-                    continue
-
-                # Close any open dropdowns
-                self.page.keyboard.press('Escape')
-                time.sleep(0.1)
+                if listbox:
+                    opt_els = listbox.query_selector_all('[role="option"]')
+                    for opt in opt_els[:100]:
+                        text = opt.inner_text().strip()
+                        if text and text not in ('No options', 'No results'):
+                            options.append(text)
 
+            # Fallback: global selectors with SHORT timeout
+            if not options:
                 try:
-                    el.scroll_into_view_if_needed(timeout=3000)
+                    opt_els = self.page.query_selector_all('.select__option, [role="option"]')
+                    for opt in opt_els[:100]:
+                        text = opt.inner_text().strip()
+                        if text and text not in ('No options', 'No results'):
+                            options.append(text)
                 except:
                     pass
-                el.click(timeout=3000)  # Short timeout for prescan clicks
-                time.sleep(0.5)
-
-                # Read options via aria-controls (V5 method)
-                controls_id = el.get_attribute('aria-controls')
-                options = []
-
-                if controls_id:
-                    listbox = context.query_selector(f'#{controls_id}')
-                    if not listbox:
-                        # Try in all frames
-                        for frame in self.page.frames:
-                            try:
-                                listbox = frame.query_selector(f'#{controls_id}')
-                                if listbox:
-                                    break
-                            except:
-                                continue
-                    if listbox:
-                        opt_els = listbox.query_selector_all('[role="option"]')
-                        for opt in opt_els[:100]:
-                            text = opt.inner_text().strip()
-                            if text and text not in ('No options', 'No results'):
-                                options.append(text)
 
-                # Fallback: global selectors with SHORT timeout
-                if not options:
-                    try:
-                        self.page.wait_for_selector('.select__menu, [role="listbox"]', timeout=1000)
-                        opt_els = self.page.query_selector_all('.select__option, [role="option"]')
-                        for opt in opt_els[:100]:
-                            text = opt.inner_text().strip()
-                            if text and text not in ('No options', 'No results'):
-                                options.append(text)
-                    except:
-                        pass
+            # Close dropdown
+            self.page.keyboard.press('Escape')
+            self.waiter.settle(context, fallback=0.1)
 
-                # Close dropdown
+        except Exception as e:
+            print(f"      ⚠️ Error: {str(e)[:50]}")
+            try:
                 self.page.keyboard.press('Escape')
-                time.sleep(0.1)
-
-                if options:
-                    field.options = options
-                    is_fixed = len(options) <= 25
-                    status = "FIXED" if is_fixed else "SEARCH"
-                    print(f"      [{status}] {len(options)} options found")
-                    prescan_count += 1
-                else:
-                    print(f"      No options found")
-
-            except Exception as e:
-                print(f"      ⚠️ Error: {str(e)[:50]}")
-                try:
-                    self.page.keyboard.press('Escape')
-                except:
-                    pass
+            except:
+                pass
 
-        print(f"   📊 Pre-scanned {prescan_count} dropdowns")
+        return options
 
     # ─────────────────────────────────────────────────────────────────────
     # LAYER 2: RESOLUTION
@@ -2382,25 +3129,124 @@ class FormFillerV5:
     def _resolve_all_answers(self):
         """Find answers for all fields."""
         print("\n📋 Resolving answers...")
+        unplanned = [f for f in self.fields if f.selector not in self._planned]
+        if self._planned:
+            print(f"   ⚡ {len(self.fields) - len(unplanned)} fields from compiled plan, resolving {len(unplanned)}")
+
+        # One batch query per store for the whole form (see _prefetch_answers)
+        self._prefetch_answers(unplanned)
         
-        for field in self.fields:
+        # Deterministic passes first; fields that need an LLM are collected
+        # and answered by ONE batch prompt (_resolve_ai_batch)
+        ai_pending = []
+        for field in unplanned:
             if field.field_type == FieldType.FILE:
                 self._resolve_file_field(field)
-            else:
-                self._resolve_field_answer(field)
+            elif self._resolve_field_answer(field, defer_ai=True):
+                ai_pending.append(field)
+        self._learned_batch, self._common_batch = {}, {}  # answers learned later must be visible
+
+        if ai_pending:
+            self._resolve_ai_batch(ai_pending)
         
         # Summary
         ready = sum(1 for f in self.fields if f.status == FillStatus.READY)
         needs = sum(1 for f in self.fields if f.status == FillStatus.NEEDS_INPUT)
         print(f"   ✅ Ready: {ready}, ⚠️ Needs input: {needs}")
     
-    def _resolve_field_answer(self, field: FormField):
-        """Find answer for a field using cascade."""
+    def _load_fill_plan(self):
+        """Look up the compiled plan for this form layout and apply it to the scanned fields."""
+        self._fill_plan, self._planned = None, set()
+        self._plan_fingerprint = ""
+        if not self._ats_type:
+            return
+        field_ids = [f.element_id or f.name for f in self.fields]
+        self._plan_fingerprint = FormSchemaDB.fingerprint(self._ats_type, field_ids)
+        self._fill_plan = self.schema_db.get_plan(self._ats_type, self._plan_fingerprint, field_ids)
+        if not self._fill_plan:
+            print(f"   ⚡ No compiled plan for [{self._plan_fingerprint}] — full resolve")
+            return
+        used = self._fill_plan["fingerprint"]
+        remaining = self._apply_fill_plan(self.fields)
+        print(f"   ⚡ Compiled plan [{used}]{'' if used == self._plan_fingerprint else ' (closest layout)'} "
+              f"(fill #{self._fill_plan.get('fill_count', 0)}): "
+              f"{len(self._planned)} planned, {len(remaining)} to resolve")
+
+    def _apply_fill_plan(self, fields: List[FormField]) -> List[FormField]:
+        """Answer fields straight from the compiled plan; returns the fields it doesn't cover.
+
+        A planned field must still look the same (label, type) — otherwise it
+        goes through the normal cascade like any new field.
+        """
+        if not self._fill_plan:
+            return list(fields)
+        planned = self._fill_plan.get("fields", {})
+        remaining = []
+        for field in fields:
+            entry = planned.get(field.element_id or field.name or "")
+            if (not entry or field.current_value
+                    or entry.get("field_type") != field.field_type.value
+                    or entry.get("label", "").lower().strip() != (field.label or "")[:100].lower().strip()):
+                remaining.append(field)
+                continue
+            is_dropdown = field.field_type in (FieldType.SELECT, FieldType.AUTOCOMPLETE)
+            if entry.get("source") == "ai" and (
+                    not entry.get("stable")
+                    or (field.options and not FormSchemaDB._same_options(field.options, entry.get("options", [])))):
+                remaining.append(field)  # набор опций меняется от вакансии к вакансии → AI заново
+                continue
+            answer = entry.get("answer_hint", "")
+            if entry.get("profile_key"):
+                answer = self.profile.get_by_dotpath(entry["profile_key"])
+                field.profile_key = entry["profile_key"]
+            elif entry.get("learned_label"):
+                answer = self.learned_db.find(entry["learned_label"], is_dropdown)
+            elif entry.get("source") == "learned":
+                answer = ""  # план старого формата: ответ заморожен — спрашиваем LearnedDB заново
+            if not answer:
+                remaining.append(field)
+                continue
+            if entry.get("options") and not field.options:
+                field.options = list(entry["options"])
+            field.fill_strategy = entry.get("strategy", "")
+            try:
+                source = AnswerSource(entry.get("source", "default"))
+            except ValueError:
+                source = AnswerSource.DEFAULT
+            self._set_answer(field, str(answer), source, 0.97)
+            self._planned.add(field.selector)
+        return remaining
+
+    def _prefetch_answers(self, fields: List[FormField]):
+        """Batch LearnedDB / KnowledgeBase lookups for all fields of the form."""
+        queries = [(f.label, f.field_type in (FieldType.SELECT, FieldType.AUTOCOMPLETE))
+                   for f in fields if f.field_type != FieldType.FILE]
+        self._learned_batch = self.learned_db.find_many(queries)
+        self._common_batch = self.kb.find_common_answers([label for label, is_dd in queries if not is_dd])
+
+    def _learned_answer(self, label: str, is_dropdown: bool) -> Optional[str]:
+        batch = getattr(self, '_learned_batch', {})
+        if (label, is_dropdown) in batch:
+            return batch[(label, is_dropdown)]
+        return self.learned_db.find(label, is_dropdown)
+
+    def _common_answer(self, label: str) -> Optional[str]:
+        batch = getattr(self, '_common_batch', {})
+        if label in batch:
+            return batch[label]
+        return self.kb.find_common_answer(label)
+
+    def _resolve_field_answer(self, field: FormField, defer_ai: bool = False) -> bool:
+        """Find answer for a field using cascade.
+
+        defer_ai=True stops before the LLM steps and returns True if the field
+        still needs an AI answer (collected by _resolve_all_answers for the batch).
+        """
         
         # Skip if already filled
         if field.current_value and field.current_value not in ("", "Select...", "Select"):
             field.status = FillStatus.FILLED
-            return
+            return False
         
         label_lower = field.label.lower()
         
@@ -2413,7 +3259,7 @@ class FormFillerV5:
                 field.status = FillStatus.SKIPPED
                 field.answer = ""
                 field.error_message = "Skipped - current role"
-                return
+                return False
         
         # Cascade resolution
         answer, source, confidence = None, AnswerSource.NONE, 0.0
@@ -2434,7 +3280,7 @@ class FormFillerV5:
 
         # 1. Learned database
         if not answer:
-            saved = self.learned_db.find(field.label, is_dropdown)
+            saved = self._learned_answer(field.label, is_dropdown)
             if saved:
                 answer, source, confidence = saved, AnswerSource.LEARNED, 0.95
         
@@ -2454,7 +3300,7 @@ class FormFillerV5:
 
         # 3.5 Common answers from KnowledgeBase (salary, why interested, etc.)
         if not answer and not is_dropdown:
-            common = self.kb.find_common_answer(field.label)
+            common = self._common_answer(field.label)
             if common:
                 answer, source, confidence = common, AnswerSource.DEFAULT, 0.88
                 print(f"   📚 KB common: '{field.label[:30]}' → '{common[:40]}...'")
@@ -2483,13 +3329,20 @@ class FormFillerV5:
             if text_default:
                 answer, source, confidence = text_default, AnswerSource.DEFAULT, 0.75
 
+        if not answer and defer_ai and (self.ollama.available or self.ai.available):
+            field.status = FillStatus.NEEDS_INPUT
+            return True
+
         # 8. Ollama for custom questions (with KB context)
         if not answer and self.ollama.available:
             profile_context = self._get_profile_context_for_ai()
             kb_context = self.kb.get_context_for_question(field.label)
             if kb_context:
                 profile_context += f"\n\n{kb_context}"
+            ai_start = time.time()
             ollama_answer = self.ollama.generate(field.label, profile_context, field.options)
+            if self.telemetry:
+                self.telemetry.ai_call("ollama", time.time() - ai_start, ok=bool(ollama_answer))
             if ollama_answer:
                 if field.options:
                     ollama_answer = self.ollama.match_option(ollama_answer, field.options)
@@ -2503,17 +3356,24 @@ class FormFillerV5:
             if kb_context:
                 profile_context += f"\n\n{kb_context}"
             try:
+                ai_start = time.time()
                 if field.options:
                     claude_answer = self.ai.choose_option(field.label, field.options, profile_context)
                 else:
                     claude_answer = self.ai.generate(field.label, profile_context)
+                if self.telemetry:
+                    self.telemetry.ai_call("claude", time.time() - ai_start, ok=bool(claude_answer))
                 if claude_answer:
                     answer, source, confidence = claude_answer, AnswerSource.AI, 0.55
                     print(f"   🧠 Claude: '{field.label[:30]}' → '{claude_answer[:30]}'")
             except Exception as e:
                 print(f"   ⚠️ Claude fallback error: {e}")
 
-        # Set result — apply DOM-aware format adaptation
+        self._set_answer(field, answer, source, confidence)
+        return False
+
+    def _set_answer(self, field: FormField, answer: Optional[str], source: AnswerSource, confidence: float):
+        """Set result — apply DOM-aware format adaptation."""
         if answer:
             # DOM-aware: adapt value to field's placeholder/maxlength/type
             # e.g., "September" → "09" if placeholder="MM" or maxlength=2
@@ -2528,6 +3388,61 @@ class FormFillerV5:
             field.status = FillStatus.READY
         else:
             field.status = FillStatus.NEEDS_INPUT
+
+    def _resolve_ai_batch(self, fields: List[FormField]):
+        """
+        Answer all custom questions of the form with ONE LLM call.
+
+        Shared profile/JD context is built once; KB snippets for all questions
+        are merged. Ollama is used if running (same preference as the single
+        cascade), otherwise Claude. Answers that fail validation (missing,
+        not one of the options, low confidence) fall back to the old
+        per-field calls.
+        """
+        engine = "Ollama" if self.ollama.available else "Claude"
+        helper = self.ollama if self.ollama.available else self.ai
+        base_confidence = 0.6 if helper is self.ollama else 0.55
+        print(f"\n🤖 AI batch: {len(fields)} questions → 1 {engine} call")
+
+        profile_context = self._get_profile_context_for_ai()
+        snippets = []
+        for field in fields:
+            for snippet in self.kb.find_relevant_snippets(field.label):
+                if snippet not in snippets:
+                    snippets.append(snippet)
+        kb_context = "Relevant experience:\n" + "\n".join(f"- {s}" for s in snippets[:8]) if snippets else ""
+
+        items = []
+        for i, field in enumerate(fields, 1):
+            item = {"id": f"q{i}", "question": field.label}
+            if field.options:
+                item["options"] = field.options[:50]
+            items.append(item)
+
+        start = time.time()
+        answers = helper.generate_batch(build_batch_prompt(items, profile_context, kb_context), len(items))
+        print(f"   ⏱️ Batch answered {len(answers)}/{len(items)} in {time.time() - start:.1f}s")
+        if self.telemetry:
+            self.telemetry.ai_call(f"{engine.lower()}_batch", time.time() - start, len(items), ok=bool(answers))
+
+        failed = []
+        for item, field in zip(items, fields):
+            result = answers.get(item["id"])
+            answer = result["answer"] if result else ""
+            if answer and field.options:
+                answer = match_option_text(answer, field.options) or ""
+            if not answer or result["confidence"] < MIN_BATCH_CONFIDENCE:
+                failed.append(field)
+                continue
+            confidence = round(min(base_confidence, result["confidence"]), 2)
+            print(f"   🤖 {engine}: '{field.label[:30]}' → '{answer[:30]}' ({result['confidence']:.0%})")
+            self._set_answer(field, answer, AnswerSource.AI, confidence)
+
+        # Fallback: single calls only for items that failed validation
+        if failed:
+            print(f"   🔁 {len(failed)} answers failed validation → single calls")
+            for field in failed:
+                self._resolve_field_answer(field)
     
     def _get_profile_context_for_ai(self) -> str:
         """Get rich profile context for AI questions."""
@@ -2791,8 +3706,19 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 field.status = FillStatus.SKIPPED
             # Don't overwrite FILLED/VERIFIED/ERROR status from previous iteration
     
+    def _record_field_time(self, field: FormField, started: float, success: bool):
+        if self.telemetry:
+            self.telemetry.field(
+                field.element_id or field.selector,
+                field.field_type.value,
+                field.answer_source.value if field.answer_source else "none",
+                time.time() - started,
+                success,
+            )
+
     def _fill_field(self, field: FormField) -> bool:
         """Fill single field. Uses _active_frame to support iframes. Timeout protected."""
+        started = time.time()
         try:
             # Use active frame (main page or iframe with form)
             context = getattr(self, '_active_frame', self.page)
@@ -2818,7 +3744,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 el.scroll_into_view_if_needed(timeout=3000)
             except:
                 pass
-            time.sleep(0.1)
+            self.waiter.settle(el.owner_frame() or context, fallback=0.1)
 
             success = False
 
@@ -2852,6 +3778,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 success=success,
                 error=field.error_message
             )
+            self._record_field_time(field, started, success)
 
             return success
 
@@ -2868,6 +3795,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 success=False,
                 error=str(e)[:100]
             )
+            self._record_field_time(field, started, False)
             return False
     
     def _fill_text(self, el: ElementHandle, field: FormField) -> bool:
@@ -2883,7 +3811,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         # Fallback: click and type (for React forms)
         try:
             el.click(click_count=3)  # Select all
-            time.sleep(0.1)
+            self.waiter.settle(self.page, fallback=0.1)
             self.page.keyboard.type(field.answer, delay=5)
             el.evaluate("e => e.blur()")
             return True
@@ -2897,10 +3825,10 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         """
         try:
             el.click()
-            time.sleep(0.2)
+            self.waiter.settle(self.page, fallback=0.2)
             # Use slower delay (30ms) for phone input formatting
             self.page.keyboard.type(field.answer, delay=30)
-            time.sleep(0.2)
+            self.waiter.settle(self.page, fallback=0.2)
             el.evaluate("e => e.blur()")
             return True
         except:
@@ -2970,8 +3898,9 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         # Select2 uses hidden inputs like #s2id_autogen1
         # BUT on newer forms, the input may have a regular ID (e.g. question_11097823007)
         # while still being wrapped in a .select2-container
-        is_select2 = 's2id' in (field.element_id or '') or 's2id' in field.selector
-        if not is_select2:
+        is_select2 = 's2id' in (field.element_id or '') or 's2id' in field.selector \
+            or field.fill_strategy == "select2"
+        if not is_select2 and field.fill_strategy not in ("react", "location", "school"):
             # Check DOM: is this element inside a .select2-container?
             try:
                 is_select2 = frame.evaluate(f'''() => {{
@@ -2988,26 +3917,28 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
             except:
                 is_select2 = False
         if is_select2:
+            field.fill_strategy = "select2"
             return self._fill_select2(el, field, frame)
+        field.fill_strategy = "location" if is_location else "school" if is_school else "react"
 
         # Close any open dropdowns first
         self.page.keyboard.press('Escape')
-        time.sleep(0.1)
+        self.waiter.settle(frame, fallback=0.1)
 
         # Scroll into view
         try:
             el.scroll_into_view_if_needed()
         except:
             pass
-        time.sleep(0.1)
+        self.waiter.settle(frame, fallback=0.1)
 
         # For Location: type first, then wait for API
         if is_location:
             print(f"      📍 Location: typing '{field.answer[:30]}'...")
             el.click()
-            time.sleep(0.3)
+            self.waiter.settle(frame, fallback=0.3)
             self.page.keyboard.type(field.answer[:30], delay=30)
-            time.sleep(2.0)  # Wait for API response
+            self.waiter.options(frame, '[role="option"]', fallback=2.0)  # Wait for API response
             
             # Get options via aria-controls
             controls_id = el.get_attribute('aria-controls')
@@ -3017,7 +3948,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                     options = listbox.query_selector_all('[role="option"]')
                     if options:
                         options[0].click()
-                        time.sleep(0.2)
+                        self.waiter.settle(frame, fallback=0.2)
                         return True
             
             # Fallback: just click away to confirm text
@@ -3049,7 +3980,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                     }}''')
                 except:
                     pass
-            time.sleep(0.4)
+            self.waiter.options(frame, AUTOCOMPLETE_OPTIONS, fallback=0.4)
 
             # Read live options
             controls_id = el.get_attribute('aria-controls')
@@ -3058,10 +3989,9 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 listbox = frame.query_selector(f'#{controls_id}')
                 if listbox:
                     live_options = listbox.query_selector_all('[role="option"]')
-            if not live_options:
+            if not live_options:  # options() выше уже ждал рендера — просто читаем
                 try:
-                    frame.wait_for_selector('[role="listbox"], .select__menu', timeout=1500)
-                    live_options = frame.query_selector_all('[role="option"], .select__option')
+                    live_options = frame.query_selector_all(AUTOCOMPLETE_OPTIONS)
                 except:
                     pass
 
@@ -3111,14 +4041,14 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                         best_opt.evaluate("e => e.click()")
                     except:
                         pass
-                time.sleep(0.2)
+                self.waiter.quiet(frame, fallback=0.2)
                 return True
 
             # No good match in live options — type answer as filter to narrow down
             # (React Select virtualizes options, so not all may be visible)
             print(f"      🔎 Typing filter '{field.answer[:30]}' (best_score={best_score}, {len(live_options)} live opts)")
             el.type(field.answer[:30], delay=20)
-            time.sleep(0.5)
+            self.waiter.quiet(frame, fallback=0.5)
 
             # Re-read filtered options
             filtered = []
@@ -3136,7 +4066,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                         filtered[0].click(force=True, timeout=5000)
                     except:
                         filtered[0].evaluate("e => e.click()")
-                    time.sleep(0.2)
+                    self.waiter.settle(frame, fallback=0.2)
                     return True
 
             self.page.keyboard.press('Escape')
@@ -3146,7 +4076,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         print(f"      🔎 Search path: typing '{field.answer[:30]}' into {field.selector}")
         # Close any previously open dropdowns
         self.page.keyboard.press('Escape')
-        time.sleep(0.2)
+        self.waiter.settle(frame, fallback=0.2)
         # Use JavaScript click to avoid Playwright actionability timeouts on hidden/overlay elements
         try:
             frame.evaluate(f'''() => {{
@@ -3164,13 +4094,13 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 el.click(force=True, timeout=5000)
             except:
                 pass
-        time.sleep(0.4)
+        self.waiter.quiet(frame, fallback=0.4)
         controls_id = el.get_attribute('aria-controls')
         print(f"      🔎 controls_id={controls_id}")
 
         # Type to filter — use el.type() to ensure typing goes to the right input in iframe
         el.type(field.answer[:30], delay=20)
-        time.sleep(0.8)
+        self.waiter.options(frame, AUTOCOMPLETE_OPTIONS, fallback=0.8)
 
         # Re-read controls_id (React Select sets it after interaction)
         if not controls_id:
@@ -3206,16 +4136,16 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 # Fallback: keyboard — ArrowDown selects first, Enter confirms
                 if not clicked or not controls_id:
                     self.page.keyboard.press('ArrowDown')
-                    time.sleep(0.1)
+                    self.waiter.settle(frame, fallback=0.1)
                     self.page.keyboard.press('Enter')
                     print(f"      🔎 Used keyboard fallback (ArrowDown+Enter)")
-                time.sleep(0.2)
+                self.waiter.settle(frame, fallback=0.2)
                 return True
 
         # Fallback: keyboard navigation
         self.page.keyboard.press('ArrowDown')
         self.page.keyboard.press('Tab')
-        time.sleep(0.2)
+        self.waiter.settle(frame, fallback=0.2)
         return True
 
     def _fill_select2(self, el: ElementHandle, field: FormField, frame) -> bool:
@@ -3266,14 +4196,8 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 print(f"      ⚠️ Could not find Select2 container")
                 return False
 
-            time.sleep(0.5)
-
             # Wait for and read options from .select2-drop
-            try:
-                frame.wait_for_selector('.select2-drop:not(.select2-display-none) .select2-results', timeout=2000)
-            except:
-                # Try alternative: just check if results exist
-                pass
+            self.waiter.options(frame, SELECT2_OPTIONS, fallback=0.5)
 
             options = frame.query_selector_all('.select2-drop:not(.select2-display-none) .select2-results li.select2-result')
             if not options:
@@ -3314,7 +4238,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                     best_opt.click(force=True, timeout=5000)
                 except:
                     best_opt.evaluate("e => e.click()")
-                time.sleep(0.3)
+                self.waiter.settle(frame, fallback=0.3)
                 print(f"      ✅ Select2 matched (score={best_score})")
                 return True
 
@@ -3332,7 +4256,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                             best_opt2.click(force=True, timeout=5000)
                         except:
                             best_opt2.evaluate("e => e.click()")
-                        time.sleep(0.3)
+                        self.waiter.settle(frame, fallback=0.3)
                         field.answer = new_answer
                         print(f"      ✅ Select2 re-resolved: '{best_text2[:30]}' (score={best_score2})")
                         return True
@@ -3341,7 +4265,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
             if is_school_field:
                 print(f"      🎓 School not matched — searching for 'Other'...")
                 self.page.keyboard.press('Escape')
-                time.sleep(0.2)
+                self.waiter.settle(frame, fallback=0.2)
 
                 # Re-open and search for "Other"
                 opened2 = frame.evaluate(f'''() => {{
@@ -3368,7 +4292,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 }}''')
 
                 if opened2:
-                    time.sleep(0.5)
+                    self.waiter.options(frame, SELECT2_OPTIONS, fallback=0.5)
                     search_input = frame.query_selector('.select2-drop:not(.select2-display-none) .select2-input')
                     if not search_input:
                         search_input = frame.query_selector('.select2-search input')
@@ -3378,7 +4302,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                         except:
                             pass
                         self.page.keyboard.type('Other', delay=20)
-                        time.sleep(0.8)
+                        self.waiter.options(frame, SELECT2_OPTIONS, fallback=0.8)
 
                     fb_opts = frame.query_selector_all('.select2-drop:not(.select2-display-none) .select2-results li.select2-result')
                     if not fb_opts:
@@ -3392,7 +4316,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                                     opt.click(force=True, timeout=5000)
                                 except:
                                     opt.evaluate("e => e.click()")
-                                time.sleep(0.3)
+                                self.waiter.settle(frame, fallback=0.3)
                                 print(f"      ✅ School fallback: 'Other'")
                                 return True
                         except:
@@ -3407,7 +4331,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                                     opt.click(force=True, timeout=5000)
                                 except:
                                     opt.evaluate("e => e.click()")
-                                time.sleep(0.3)
+                                self.waiter.settle(frame, fallback=0.3)
                                 print(f"      ✅ School fallback: '{text[:30]}'")
                                 return True
                         except:
@@ -3423,7 +4347,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                             opt_el.click(force=True, timeout=5000)
                         except:
                             opt_el.evaluate("e => e.click()")
-                        time.sleep(0.3)
+                        self.waiter.settle(frame, fallback=0.3)
                         field.answer = rule_answer
                         print(f"      ✅ Select2 rule-based: '{opt_text[:30]}'")
                         return True
@@ -3439,7 +4363,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 valid_options[fallback_idx][0].click(force=True, timeout=5000)
             except:
                 valid_options[fallback_idx][0].evaluate("e => e.click()")
-            time.sleep(0.3)
+            self.waiter.settle(frame, fallback=0.3)
             print(f"      ⚠️ Select2 fallback: '{valid_options[fallback_idx][1][:30]}'")
             return True
 
@@ -3717,7 +4641,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
 
         # Close any open dropdowns
         self.page.keyboard.press('Escape')
-        time.sleep(0.1)
+        self.waiter.settle(frame, fallback=0.1)
 
         # Open school dropdown — JS-first to avoid Playwright actionability timeouts
         try:
@@ -3735,12 +4659,12 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 el.click(force=True, timeout=5000)
             except:
                 return False
-        time.sleep(0.3)
+        self.waiter.quiet(frame, fallback=0.3)
 
         # Type search - use shorter text for better matches
         search_text = field.answer[:30] if len(field.answer) > 30 else field.answer
         self.page.keyboard.type(search_text, delay=20)
-        time.sleep(1.0)  # Wait for search API
+        self.waiter.options(frame, AUTOCOMPLETE_OPTIONS, fallback=1.0)  # Wait for search API
 
         # Get options via aria-controls
         controls_id = el.get_attribute('aria-controls')
@@ -3771,7 +4695,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                             opt.click(force=True, timeout=5000)
                         except:
                             opt.evaluate("e => e.click()")
-                        time.sleep(0.2)
+                        self.waiter.settle(frame, fallback=0.2)
                         print(f"      🎓 School matched: {opt_text[:40]}")
                         return True
                 # No exact match but results exist - take first
@@ -3779,13 +4703,13 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                     options[0].click(force=True, timeout=5000)
                 except:
                     options[0].evaluate("e => e.click()")
-                time.sleep(0.2)
+                self.waiter.settle(frame, fallback=0.2)
                 return True
 
         # No results from search - try fallback options
         print(f"      ⚠️ School not found, trying fallback...")
         self.page.keyboard.press('Escape')
-        time.sleep(0.1)
+        self.waiter.settle(frame, fallback=0.1)
         try:
             frame.evaluate(f'''() => {{
                 const el = document.querySelector('{field.selector}');
@@ -3796,14 +4720,14 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 el.click(force=True, timeout=5000)
             except:
                 pass
-        time.sleep(0.2)
+        self.waiter.settle(frame, fallback=0.2)
 
         # Clear and try each fallback
         for fallback in FALLBACK_OPTIONS:
             self.page.keyboard.press('Control+a')
             self.page.keyboard.press('Backspace')
             self.page.keyboard.type(fallback, delay=20)
-            time.sleep(0.8)
+            self.waiter.options(frame, AUTOCOMPLETE_OPTIONS, fallback=0.8)
 
             if controls_id:
                 listbox = frame.query_selector(f'#{controls_id}')
@@ -3816,7 +4740,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                                 options[0].click(force=True, timeout=5000)
                             except:
                                 options[0].evaluate("e => e.click()")
-                            time.sleep(0.2)
+                            self.waiter.settle(frame, fallback=0.2)
                             print(f"      🎓 School fallback: {first_text[:40]}")
                             return True
 
@@ -3865,7 +4789,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                             attach_btn.click(timeout=3000)
                         file_chooser = fc_info.value
                         file_chooser.set_files(field.answer)
-                        time.sleep(1.0)
+                        self.waiter.quiet(self.page, fallback=1.0, quiet_ms=300)
                         print(f"      📎 Uploaded via Attach button (fieldset: {fieldset_id})")
                         return True
                     except Exception as e:
@@ -3894,7 +4818,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                             attach_btn.click(timeout=3000)
                         file_chooser = fc_info.value
                         file_chooser.set_files(field.answer)
-                        time.sleep(1.0)
+                        self.waiter.quiet(self.page, fallback=1.0, quiet_ms=300)
                         print(f"      📎 Uploaded via Attach button (hint: {fieldset_hint})")
                         return True
                     except Exception as e:
@@ -3905,7 +4829,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         # Strategy 3: Direct set_input_files (works for standard file inputs)
         try:
             el.set_input_files(field.answer)
-            time.sleep(0.5)
+            self.waiter.quiet(self.page, fallback=0.5, quiet_ms=300)
             print(f"      📎 Uploaded via direct set_input_files")
             return True
         except Exception as e:
@@ -3963,7 +4887,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 context.click('body', position={'x': 10, 'y': 10})
             except:
                 self.page.click('body', position={'x': 10, 'y': 10})
-            time.sleep(0.3)
+            self.waiter.quiet(context, fallback=0.3)
 
             # Also blur each field explicitly
             for field in self.fields:
@@ -3976,7 +4900,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                             el.evaluate("e => e.blur()")
                         except:
                             pass
-            time.sleep(0.3)
+            self.waiter.quiet(context, fallback=0.3)
         except:
             pass
     
@@ -4199,7 +5123,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                             leg_id = leg_pat.replace('{N}', str(form_index))
                             self._section_filled_ids.add(leg_id)
                             self._section_filled_ids.add(f's2id_{leg_id}')
-                time.sleep(0.1)
+                self.waiter.settle(self.page, fallback=0.1)
             except Exception as e:
                 print(f"      ❌ {field_name}: {e}")
 
@@ -4233,7 +5157,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                         el_id = el.get_attribute('id')
                         if el_id:
                             self._section_filled_ids.add(el_id)
-                        time.sleep(0.1)
+                        self.waiter.settle(self.page, fallback=0.1)
                     except Exception as e:
                         print(f"      ❌ {field_name}: {e}")
                 else:
@@ -4298,7 +5222,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
             except:
                 return False
 
-        time.sleep(0.5)
+        self.waiter.options(frame, SELECT2_OPTIONS, fallback=0.5)
 
         # Type search text
         search_text = str(search_value or value)[:40]
@@ -4317,7 +5241,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         else:
             self.page.keyboard.type(search_text, delay=20)
 
-        time.sleep(0.8)
+        self.waiter.options(frame, SELECT2_OPTIONS, fallback=0.8)
 
         # Read options
         opts = frame.query_selector_all('.select2-drop:not(.select2-display-none) .select2-results li.select2-result')
@@ -4374,13 +5298,13 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         if best_match and best_score >= 70:
             best_match.click()
             print(f"      ✅ Select2 matched (score={best_score})")
-            time.sleep(0.2)
+            self.waiter.settle(frame, fallback=0.2)
             return True
 
         # No confident match → fallback (e.g., "Other" for schools)
         if fallback_value:
             self.page.keyboard.press('Escape')
-            time.sleep(0.2)
+            self.waiter.settle(frame, fallback=0.2)
 
             # Re-open dropdown
             try:
@@ -4390,7 +5314,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 }''')
             except:
                 container.click()
-            time.sleep(0.5)
+            self.waiter.options(frame, SELECT2_OPTIONS, fallback=0.5)
 
             # Type fallback
             search_input = frame.query_selector('.select2-drop:not(.select2-display-none) .select2-input')
@@ -4404,7 +5328,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 self.page.keyboard.type(fallback_value, delay=20)
             else:
                 self.page.keyboard.type(fallback_value, delay=20)
-            time.sleep(0.8)
+            self.waiter.options(frame, SELECT2_OPTIONS, fallback=0.8)
 
             # Find exact "Other" match
             fb_opts = frame.query_selector_all('.select2-drop:not(.select2-display-none) .select2-results li.select2-result')
@@ -4417,7 +5341,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                     if text.lower() == fallback_value.lower():
                         opt.click()
                         print(f"      ✅ Used fallback: '{fallback_value}'")
-                        time.sleep(0.2)
+                        self.waiter.settle(frame, fallback=0.2)
                         return True
                 except:
                     continue
@@ -4429,7 +5353,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                     if text and 'no result' not in text.lower():
                         opt.click()
                         print(f"      ✅ Used fallback (first match): '{text[:30]}'")
-                        time.sleep(0.2)
+                        self.waiter.settle(frame, fallback=0.2)
                         return True
                 except:
                     continue
@@ -4438,7 +5362,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         if valid_opts:
             valid_opts[0][0].click()
             print(f"      ⚠️ No match, using first: '{valid_opts[0][1][:30]}'")
-            time.sleep(0.2)
+            self.waiter.settle(frame, fallback=0.2)
             return True
 
         self.page.keyboard.press('Escape')
@@ -4450,7 +5374,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         frame = el.owner_frame() or self.page
 
         self.page.keyboard.press('Escape')
-        time.sleep(0.1)
+        self.waiter.settle(frame, fallback=0.1)
 
         try:
             el.scroll_into_view_if_needed(timeout=3000)
@@ -4464,7 +5388,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 el.evaluate("e => { e.focus(); e.dispatchEvent(new MouseEvent('mousedown', {bubbles:true})); }")
             except:
                 return False
-        time.sleep(0.3)
+        self.waiter.quiet(frame, fallback=0.3)
 
         search_text = str(search_value or value)[:40]
         try:
@@ -4472,7 +5396,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         except:
             pass
         self.page.keyboard.type(search_text, delay=15)
-        time.sleep(0.5)
+        self.waiter.options(frame, AUTOCOMPLETE_OPTIONS, fallback=0.5)
 
         controls_id = el.get_attribute('aria-controls')
         opts = []
@@ -4518,19 +5442,19 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
         if best_match and best_score >= 70:
             best_match.click()
             print(f"      ✅ Autocomplete matched (score={best_score})")
-            time.sleep(0.2)
+            self.waiter.settle(frame, fallback=0.2)
             return True
 
         # Fallback
         if fallback_value:
             self.page.keyboard.press('Escape')
-            time.sleep(0.1)
+            self.waiter.settle(frame, fallback=0.1)
             try:
                 el.fill('', timeout=3000)
             except:
                 pass
             self.page.keyboard.type(fallback_value, delay=15)
-            time.sleep(0.5)
+            self.waiter.options(frame, AUTOCOMPLETE_OPTIONS, fallback=0.5)
             new_opts = []
             if controls_id:
                 listbox = frame.query_selector(f'#{controls_id}')
@@ -4542,18 +5466,18 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 if opt.inner_text().strip().lower() == fallback_value.lower():
                     opt.click()
                     print(f"      ✅ Used fallback: '{fallback_value}'")
-                    time.sleep(0.2)
+                    self.waiter.settle(frame, fallback=0.2)
                     return True
             if new_opts:
                 new_opts[-1].click()
                 print(f"      ✅ Used fallback (last option)")
-                time.sleep(0.2)
+                self.waiter.settle(frame, fallback=0.2)
                 return True
 
         if opts:
             opts[0].click()
             print(f"      ⚠️ No match — using first option")
-            time.sleep(0.2)
+            self.waiter.settle(frame, fallback=0.2)
             return True
 
         self.page.keyboard.press('Tab')
@@ -4575,7 +5499,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                     btn = context.query_selector(selector)
                     if btn and btn.is_visible():
                         btn.click()
-                        time.sleep(0.5)
+                        self.waiter.quiet(self.page, fallback=0.5, quiet_ms=300)
                         self.browser.wait_for_stable()
                         return True
                 except:
@@ -4592,7 +5516,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                         if ('add another' in text or 'add a' in text) and \
                            section_text.lower() in text:
                             link.click()
-                            time.sleep(0.5)
+                            self.waiter.quiet(self.page, fallback=0.5, quiet_ms=300)
                             self.browser.wait_for_stable()
                             return True
                     except:
@@ -4640,7 +5564,8 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 if not slot_exists:
                     # Try clicking "Add another" button
                     if self.click_add_another(section_name):
-                        time.sleep(1.0)  # Wait for React to render new fields
+                        # Wait for React to render new fields
+                        self.waiter.rendered(self.page, f'#{new_id}, #s2id_{new_id}', fallback=1.0)
                     else:
                         print(f"   ⚠️ Could not add entry {i+1} and slot not pre-rendered")
                         break
@@ -4655,7 +5580,7 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                         new_el.scroll_into_view_if_needed(timeout=3000)
                     except:
                         pass
-                    time.sleep(0.3)
+                    self.waiter.settle(self.page, fallback=0.3)
 
                 self.fill_section_entry(section_name, entry_index=i, form_index=i)
             except Exception as e:
@@ -4843,6 +5768,14 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
             ats_type=self._detect_ats(url),
             total_fields=len(self.fields),
             fields=self.fields,
+            fill_seconds=round(time.time() - getattr(self, '_fill_started', time.time()), 2),
+            wait_seconds=round(self.waiter.stats["wait_seconds"], 2),
+            event_waits=self.waiter.stats["event_waits"],
+            wait_timeouts=self.waiter.stats["timeouts"],
+            fallback_sleeps=self.waiter.stats["fallback_sleeps"],
+            phases=dict(self.telemetry.phases) if self.telemetry else {},
+            plan_fields=len(getattr(self, '_planned', ())),
+            needs_user=getattr(self, 'needs_user', ''),
         )
         
         for f in self.fields:
@@ -4922,6 +5855,12 @@ Disability: {demo.get('disability_status', 'Prefer not to answer')}{job_context}
                 "company": cn,
                 "status": "completed" if report.errors == 0 else "with_errors",
                 "duration_seconds": round(getattr(self, '_fill_duration', 0), 1),
+                "fill_seconds": report.fill_seconds,
+                "wait_seconds": report.wait_seconds,
+                "event_waits": report.event_waits,
+                "wait_timeouts": report.wait_timeouts,
+                "fallback_sleeps": report.fallback_sleeps,
+                "phase_seconds": report.phases,
                 "fields_total": report.total_fields,
                 "fields_filled": report.verified_fields + report.filled_fields,
                 "fields_skipped": report.skipped,
@@ -5854,6 +6793,9 @@ def main():
     
     mode_arg = sys.argv[2] if len(sys.argv) > 2 else "interactive"
     keep_open = "--keep-open" in sys.argv or "-k" in sys.argv
+    if "--profile" in sys.argv:
+        from utils.profiler import request_profile
+        request_profile("fill")  # → logs/profiles/*_fill_*.collapsed
 
     mode_map = {
         "preflight": FillMode.PRE_FLIGHT,
@@ -169,7 +169,25 @@ class FormLogger:
         return logs
     
     def get_log_summary(self) -> Dict:
-        """Get summary statistics from all logs."""
+        """Get summary statistics from all logs.
+
+        Uses telemetry_rollup.json (updated per session, see telemetry.py)
+        when it exists; rescans the last 100 log files only as a fallback.
+        """
+        from .telemetry import load_rollup
+        rollup = load_rollup(self.log_dir)
+        if rollup:
+            total_forms = sum(a.get("sessions", 0) for a in rollup.values())
+            completed = sum(a.get("status", {}).get("completed", 0) for a in rollup.values())
+            return {
+                'total_forms': total_forms,
+                'completed': completed,
+                'success_rate': completed / total_forms if total_forms > 0 else 0,
+                'total_fields_filled': sum(a.get("results", {}).get("filled_fields", 0) +
+                                           a.get("results", {}).get("verified_fields", 0) for a in rollup.values()),
+                'total_errors': sum(a.get("status", {}).get("error", 0) for a in rollup.values()),
+            }
+
         logs = self.get_recent_logs(100)
         
         total_forms = len(logs)
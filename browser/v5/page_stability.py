@@ -0,0 +1,167 @@
+"""
+Event-driven page stability for V5 Form Filler
+
+Replaces fixed time.sleep() waits with in-page readiness predicates:
+- a MutationObserver records the time of the last DOM change
+- fetch / XMLHttpRequest are wrapped to count in-flight requests
+- Playwright wait_for_function() polls the predicate INSIDE the page,
+  so there are no Python round trips while waiting
+
+BrowserManager installs the tracker once per browser context with
+add_init_script (install_tracker), so it runs before any page script and
+counts requests started during page load. The predicates only read it.
+
+Readiness predicates:
+- quiet:    no DOM mutations for quiet_ms and no requests in flight
+- options:  dropdown options matching a selector are rendered (and DOM quiet)
+- value:    element value is committed (non-empty / contains expected text)
+
+A fixed sleep is used ONLY when the in-page wait can't run at all
+(detached frame, CSP blocking evaluation, closed page), and then only for
+what is left of the old delay — a wait never costs more than
+max(timeout, fallback).
+
+settle() is the drop-in for the short post-action sleeps (click, keypress,
+option pick): returns once the DOM has been quiet for SETTLE_QUIET_MS and
+never waits longer than the sleep it replaces.
+"""
+
+import time
+from typing import Optional
+
+# Tracker: installed once per context via add_init_script (install_tracker), so it
+# runs before any page script and counts the very first XHR/fetch of every document
+TRACKER_INIT_SCRIPT = '''
+(() => {
+    if (window.__v5Stab) return;
+    const s = {lastMutation: performance.now(), inflight: 0};
+    window.__v5Stab = s;
+    new MutationObserver(() => { s.lastMutation = performance.now(); })
+        .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    if (window.fetch) {
+        const origFetch = window.fetch;
+        window.fetch = function(...args) {
+            s.inflight++;
+            return origFetch.apply(this, args).finally(() => {
+                s.inflight--;
+                s.lastMutation = performance.now();
+            });
+        };
+    }
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function(...args) {
+        s.inflight++;
+        this.addEventListener('loadend', () => {
+            s.inflight--;
+            s.lastMutation = performance.now();
+        }, {once: true});
+        return origSend.apply(this, args);
+    };
+})();
+'''
+
+# Predicates only read the tracker. No tracker (document loaded before install_tracker)
+# → quiet == document fully loaded; in-flight requests of such a page are unknown.
+_READ_TRACKER_JS = '''
+    const stab = window.__v5Stab;
+    const quiet = (ms) => stab
+        ? stab.inflight <= 0 && performance.now() - stab.lastMutation >= ms
+        : document.readyState === 'complete';
+'''
+
+
+def install_tracker(context) -> None:
+    """Register the tracker for every new document of `context`; also add it to already open frames."""
+    context.add_init_script(TRACKER_INIT_SCRIPT)
+    for page in context.pages:
+        for frame in page.frames:
+            try:
+                frame.evaluate(TRACKER_INIT_SCRIPT)
+            except Exception:
+                pass  # detached / CSP — predicates fall back to readyState
+
+
+QUIET_PREDICATE = '(quietMs) => {' + _READ_TRACKER_JS + '''
+    return quiet(quietMs);
+}'''
+
+OPTIONS_PREDICATE = '([selector, quietMs]) => {' + _READ_TRACKER_JS + '''
+    const visible = Array.from(document.querySelectorAll(selector)).filter(o => {
+        const r = o.getBoundingClientRect();
+        return r.width > 0 && r.height > 0;
+    });
+    return visible.length > 0 && quiet(quietMs);
+}'''
+
+VALUE_PREDICATE = '([el, expected, quietMs]) => {' + _READ_TRACKER_JS + '''
+    if (!el || !el.isConnected) return true;
+    const v = ((el.value !== undefined ? el.value : el.textContent) || '').trim().toLowerCase();
+    const ok = expected ? v.includes(expected.toLowerCase()) : v.length > 0;
+    return ok && quiet(quietMs);
+}'''
+
+DEFAULT_QUIET_MS = 150
+SETTLE_QUIET_MS = 50
+POLL_MS = 50
+
+
+class StabilityWaiter:
+    """
+    Readiness waits with a fixed-sleep fallback; keeps timing stats for FillReport.
+
+    Every wait takes `fallback` (the old fixed sleep, seconds). quiet() never
+    waits longer than that; options()/value() give up after `timeout`
+    (default: 2 x fallback, at least 1s) since missing options break the fill.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.stats = {
+            "event_waits": 0,      # predicate satisfied
+            "timeouts": 0,         # predicate not satisfied within timeout
+            "fallback_sleeps": 0,  # in-page wait impossible → fixed sleep
+            "wait_seconds": 0.0,
+        }
+
+    def _wait(self, frame, predicate: str, arg, fallback: float, timeout: Optional[float]) -> bool:
+        timeout = timeout if timeout is not None else max(2 * fallback, 1.0)
+        start = time.time()
+        try:
+            frame.wait_for_function(predicate, arg=arg, polling=POLL_MS, timeout=int(timeout * 1000))
+            self.stats["event_waits"] += 1
+            return True
+        except Exception as e:
+            if "Timeout" in type(e).__name__ or "Timeout" in str(e):
+                self.stats["timeouts"] += 1
+                return False
+            # Can't evaluate in this frame — fall back to the rest of the old fixed sleep
+            self.stats["fallback_sleeps"] += 1
+            time.sleep(max(0.0, fallback - (time.time() - start)))
+            return False
+        finally:
+            self.stats["wait_seconds"] += time.time() - start
+
+    def quiet(self, frame, fallback: float, quiet_ms: int = DEFAULT_QUIET_MS,
+              timeout: Optional[float] = None) -> bool:
+        """DOM stopped changing and no XHR/fetch in flight."""
+        return self._wait(frame, QUIET_PREDICATE, quiet_ms, fallback, timeout if timeout is not None else fallback)
+
+    def settle(self, frame, fallback: float, quiet_ms: int = SETTLE_QUIET_MS) -> bool:
+        """After a click / keypress / option pick: DOM quiet briefly, at most `fallback` seconds."""
+        return self._wait(frame, QUIET_PREDICATE, min(quiet_ms, int(fallback * 1000)), fallback, fallback)
+
+    def rendered(self, frame, selector: str, fallback: float, quiet_ms: int = 100,
+                 timeout: Optional[float] = None) -> bool:
+        """At least one visible element matches selector (and DOM quiet)."""
+        return self._wait(frame, OPTIONS_PREDICATE, [selector, quiet_ms], fallback, timeout)
+
+    def options(self, frame, selector: str, fallback: float, timeout: Optional[float] = None) -> bool:
+        """Dropdown options rendered (e.g. '[role="option"]', '.select2-results li')."""
+        return self.rendered(frame, selector, fallback, timeout=timeout)
+
+    def value(self, frame, element, fallback: float, expected: str = "", quiet_ms: int = 50,
+              timeout: Optional[float] = None) -> bool:
+        """Element value committed: non-empty, or contains `expected`."""
+        return self._wait(frame, VALUE_PREDICATE, [element, expected, quiet_ms], fallback, timeout)
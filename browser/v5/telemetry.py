@@ -0,0 +1,231 @@
+"""
+Form Fill Telemetry for V5
+
+Per-session instrumentation, append-only storage, rolled-up aggregates:
+
+- phases: navigation → iframe_wait → job_info → scan → prescan → resolve →
+  fill → validate → learn → report (FillTelemetry.phase() closes the
+  previous phase, so the engine marks boundaries instead of wrapping blocks)
+- per-field fill time (field id, type, answer source, success)
+- AI latency per call (engine, batch size)
+
+Storage (logs/form_fills/):
+- telemetry.jsonl        one JSON line per session, never rewritten
+- telemetry_rollup.json  aggregates by ATS type, updated on every session end
+                         (count/total/max per phase, field + AI latency,
+                         last RECENT_TOTALS session durations for p50/p90)
+
+Summaries (/apply/v5/log, FormLogger.get_log_summary) read the rollup only,
+no rescanning of per-session log files.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# FILL_TELEMETRY_DIR: keep benchmark / test sessions out of the real rollup
+TELEMETRY_DIR = Path(os.getenv("FILL_TELEMETRY_DIR") or Path(__file__).parent.parent.parent / "logs" / "form_fills")
+EVENTS_FILE = "telemetry.jsonl"
+ROLLUP_FILE = "telemetry_rollup.json"
+RECENT_TOTALS = 200
+
+PHASES = ("navigation", "iframe_wait", "job_info", "scan", "prescan", "resolve",
+          "fill", "validate", "learn", "report")
+
+_rollup_lock = threading.Lock()
+
+
+def _stat(bucket: dict, seconds: float):
+    bucket["count"] = bucket.get("count", 0) + 1
+    bucket["total"] = round(bucket.get("total", 0.0) + seconds, 3)
+    bucket["max"] = round(max(bucket.get("max", 0.0), seconds), 3)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct * len(ordered)))]
+
+
+class FillTelemetry:
+    """Spans and counters for one form fill session."""
+
+    def __init__(self, url: str, ats_type: str = "", log_dir: Path = TELEMETRY_DIR):
+        self.log_dir = Path(log_dir)
+        self.url = url
+        self.ats_type = ats_type
+        self.started_at = time.time()
+        self.phases: Dict[str, float] = {}
+        self.fields: List[dict] = []
+        self.ai_calls: List[dict] = []
+        self.finished = False
+        self._phase: Optional[str] = None
+        self._phase_start = 0.0
+
+    # ---------- recording ----------
+
+    def phase(self, name: Optional[str]):
+        """End the current phase (if any) and start `name` (None = just end)."""
+        now = time.time()
+        if self._phase:
+            self.phases[self._phase] = round(self.phases.get(self._phase, 0.0) + now - self._phase_start, 3)
+        self._phase, self._phase_start = name, now
+
+    @contextmanager
+    def span(self, name: str):
+        """Nested timing block, added to phases[name]; doesn't touch the current phase."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(self.phases.get(name, 0.0) + time.time() - start, 3)
+
+    def field(self, field_id: str, field_type: str, source: str, seconds: float, success: bool):
+        self.fields.append({
+            "id": field_id[:80],
+            "type": field_type,
+            "source": source,
+            "seconds": round(seconds, 3),
+            "success": success,
+        })
+
+    def ai_call(self, engine: str, seconds: float, questions: int = 1, ok: bool = True):
+        self.ai_calls.append({
+            "engine": engine,
+            "seconds": round(seconds, 3),
+            "questions": questions,
+            "ok": ok,
+        })
+
+    # ---------- storage ----------
+
+    def finish(self, status: str = "completed", report=None, error: str = "") -> dict:
+        """Close the session: append JSONL event + update rollup. Idempotent."""
+        if self.finished:
+            return {}
+        self.phase(None)
+        self.finished = True
+
+        event = {
+            "timestamp": datetime.now().isoformat(),
+            "url": self.url,
+            "ats_type": self.ats_type or "Unknown",
+            "status": status,
+            "error": error[:200],
+            "total_seconds": round(time.time() - self.started_at, 3),
+            "phases": self.phases,
+            "fields": self.fields,
+            "ai_calls": self.ai_calls,
+        }
+        if report is not None:
+            event["result"] = {
+                "total_fields": report.total_fields,
+                "filled_fields": report.filled_fields,
+                "verified_fields": report.verified_fields,
+                "needs_input": report.needs_input,
+                "errors": report.errors,
+                "wait_seconds": report.wait_seconds,
+            }
+
+        try:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.log_dir / EVENTS_FILE, "a") as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            update_rollup(event, self.log_dir)
+        except Exception as e:
+            print(f"   ⚠️ Telemetry write failed: {e}")
+        return event
+
+
+# ---------- rollup ----------
+
+def load_rollup(log_dir: Path = TELEMETRY_DIR) -> dict:
+    path = Path(log_dir) / ROLLUP_FILE
+    if path.exists():
+        try:
+            return json.loads(path.read_text())
+        except Exception:
+            return {}
+    return {}
+
+
+def update_rollup(event: dict, log_dir: Path = TELEMETRY_DIR) -> dict:
+    """Fold one session event into telemetry_rollup.json (by ATS type)."""
+    with _rollup_lock:
+        rollup = load_rollup(log_dir)
+        ats = rollup.setdefault(event["ats_type"], {})
+        ats["sessions"] = ats.get("sessions", 0) + 1
+        statuses = ats.setdefault("status", {})
+        statuses[event["status"]] = statuses.get(event["status"], 0) + 1
+        _stat(ats.setdefault("total", {}), event["total_seconds"])
+        recent = ats.setdefault("recent_totals", [])
+        recent.append(event["total_seconds"])
+        del recent[:-RECENT_TOTALS]
+
+        phases = ats.setdefault("phases", {})
+        for name, seconds in event["phases"].items():
+            _stat(phases.setdefault(name, {}), seconds)
+
+        fields = ats.setdefault("fields", {})
+        for fld in event["fields"]:
+            _stat(fields.setdefault(fld["type"], {}), fld["seconds"])
+            if not fld["success"]:
+                fields[fld["type"]]["failed"] = fields[fld["type"]].get("failed", 0) + 1
+
+        ai = ats.setdefault("ai", {})
+        for call in event["ai_calls"]:
+            bucket = ai.setdefault(call["engine"], {})
+            _stat(bucket, call["seconds"])
+            bucket["questions"] = bucket.get("questions", 0) + call["questions"]
+
+        result = event.get("result") or {}
+        totals = ats.setdefault("results", {})
+        for key in ("total_fields", "filled_fields", "verified_fields", "needs_input", "errors"):
+            totals[key] = totals.get(key, 0) + result.get(key, 0)
+        ats["last_session"] = event["timestamp"]
+
+        path = Path(log_dir) / ROLLUP_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(rollup, indent=2, ensure_ascii=False))
+        tmp.replace(path)
+        return rollup
+
+
+def summarize(rollup: Optional[dict] = None, log_dir: Path = TELEMETRY_DIR) -> dict:
+    """Averages per ATS: where does fill time go."""
+    rollup = load_rollup(log_dir) if rollup is None else rollup
+    summary = {}
+    for ats, data in rollup.items():
+        sessions = data.get("sessions", 0) or 1
+        phases = {
+            name: round(p["total"] / sessions, 2)
+            for name, p in sorted(data.get("phases", {}).items(), key=lambda kv: -kv[1]["total"])
+        }
+        fields = {
+            ftype: {"avg": round(f["total"] / f["count"], 3), "count": f["count"], "failed": f.get("failed", 0)}
+            for ftype, f in data.get("fields", {}).items() if f.get("count")
+        }
+        ai = {
+            engine: {"avg": round(a["total"] / a["count"], 2), "calls": a["count"], "questions": a.get("questions", 0)}
+            for engine, a in data.get("ai", {}).items() if a.get("count")
+        }
+        recent = data.get("recent_totals", [])
+        summary[ats] = {
+            "sessions": data.get("sessions", 0),
+            "status": data.get("status", {}),
+            "avg_seconds": round(data.get("total", {}).get("total", 0.0) / sessions, 2),
+            "p50_seconds": round(_percentile(recent, 0.5), 2),
+            "p90_seconds": round(_percentile(recent, 0.9), 2),
+            "avg_phase_seconds": phases,
+            "field_fill": fields,
+            "ai_latency": ai,
+            "results": data.get("results", {}),
+            "last_session": data.get("last_session", ""),
+        }
+    return summary
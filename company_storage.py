@@ -1,4 +1,6 @@
 import json
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 
@@ -32,6 +34,30 @@ def load_companies_master():
     return by_id, by_name
 
 
+# Все writers companies.json (daemon repair / auto-disable, /companies, /onboard,
+# discovery approve) идут через companies_update() — один lock, атомарная запись
+_companies_lock = threading.RLock()
+
+
+@contextmanager
+def companies_update(path: Path = None):
+    """
+    Read-modify-write data/companies.json under one process-wide lock.
+    Yields the list; on exit it is written via tmp + replace (only if changed),
+    so a crash never leaves a truncated file and concurrent writers don't
+    drop each other's updates.
+    """
+    path = Path(path) if path else DATA_DIR / "companies.json"
+    with _companies_lock:
+        companies = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+        before = json.dumps(companies, sort_keys=True)
+        yield companies
+        if json.dumps(companies, sort_keys=True) != before:
+            tmp = path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(companies, indent=2, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(path)
+
+
 def load_profile(profile_name: str):
     """
     Загружает компании из data/companies.json
@@ -188,28 +214,13 @@ def hide_job(job_url: str, reason: str = "manual_hide"):
 
 def update_company_status(company_id: str, ok: bool = True, jobs_count: int = 0, error: str = None):
     """
-    Update company status in data/company_status.json
+    Record company fetch status in the shared company health store
+    (utils/company_health.py flushes data/company_status.json in background).
     """
-    status_path = DATA_DIR / "company_status.json"
-    
-    # Load existing statuses
-    if status_path.exists():
-        with status_path.open("r", encoding="utf-8") as f:
-            try:
-                statuses = json.load(f)
-            except json.JSONDecodeError:
-                statuses = {}
+    from utils.company_health import get_health_store
+
+    store = get_health_store()
+    if ok:
+        store.record_ok(company_id, jobs_count=jobs_count)
     else:
-        statuses = {}
-    
-    now = datetime.utcnow().isoformat() + "Z"
-    
-    statuses[company_id] = {
-        "ok": ok,
-        "jobs_count": jobs_count,
-        "error": error,
-        "updated_at": now
-    }
-    
-    with status_path.open("w", encoding="utf-8") as f:
-        json.dump(statuses, f, ensure_ascii=False, indent=2)
+        store.record_error(company_id, error or "")
@@ -20,9 +20,11 @@ load_dotenv(_env_path)
 import asyncio
 from datetime import datetime, timezone, timedelta
 import json
+import threading
+import time
 from collections import Counter
+from contextlib import nullcontext
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any, Optional
 
 # ========== UNIVERSAL PATHS (work on any machine via iCloud) ==========
@@ -52,8 +54,8 @@ APPLICATIONS_PATH = get_applications_path()
 _current_dir = Path(__file__).parent.name
 ENV = os.getenv("JOB_TRACKER_ENV", "DEV" if "dev" in _current_dir.lower() else "PROD")
 
-from fastapi import FastAPI, Query, BackgroundTasks
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -66,11 +68,20 @@ from parsers.ashby import fetch_ashby_jobs
 from parsers.workday_v2 import fetch_workday_v2
 from parsers.atlassian import fetch_atlassian
 from parsers.phenom import fetch_phenom_jobs
-from ats_detector import try_repair_company, verify_ats_url
-from company_storage import load_profile
-from utils.normalize import normalize_location, STATE_MAP
+from ats_detector import get_repair_queue, verify_ats_url
+from company_storage import companies_update, load_profile
+from utils.normalize import normalize_location
 from utils.cache_manager import load_cache, save_cache, clear_cache, get_cache_info, load_stats
 from utils.job_utils import generate_job_id, classify_role, find_similar_jobs
+from utils.ai_classifier import classify_unknown_jobs
+from utils import async_io
+from utils.async_io import gather_blocking, iterate_blocking, run_blocking
+from utils.shared_state import LeaderElector, get_shared_state
+from utils import profiler
+from utils.metrics import (
+    REGISTRY, FETCH_SECONDS, PARSER_FETCH_SECONDS, FETCH_TOTAL, COMPANY_JOBS, UPDATE_CACHE_SECONDS,
+    DAEMON_CYCLE_SECONDS, DAEMON_COMPANIES, render as render_metrics, timed,
+)
 
 # ATS parser mapping - these ATS support automatic job fetching
 from parsers.icims import fetch_icims
@@ -92,14 +103,11 @@ ATS_PARSERS = {
 SUPPORTED_ATS = list(ATS_PARSERS.keys())
 
 from storage.job_storage import (
-    get_all_jobs, get_jobs_by_status, get_jobs_by_statuses,
-    get_active_jobs, get_archive_jobs, get_all_job_ids,
-    add_job, add_jobs_bulk, update_status as job_update_status,
-    update_last_seen, update_last_seen_bulk, mark_missing_jobs,
-    get_stats as get_job_stats, get_job_by_id, job_exists,
-    get_rejected_ids,
+    get_all_jobs, get_active_jobs, get_all_job_ids,
+    add_job, add_jobs_bulk, update_last_seen_bulk,
+    get_job_by_id, job_exists,
     STATUS_NEW, STATUS_APPLIED, STATUS_INTERVIEW, STATUS_OFFER,
-    STATUS_REJECTED, STATUS_WITHDRAWN, STATUS_CLOSED, STATUS_EXCLUDED,
+    STATUS_REJECTED, STATUS_WITHDRAWN, STATUS_EXCLUDED,
     ACTIVE_STATUSES, ARCHIVE_STATUSES,
 )
 
@@ -228,29 +236,10 @@ def compute_job_key(job: dict) -> str:
     return f"{company}|{title}|{location}".strip("|")
 
 
-# Кэш статуса по компаниям: "profile:company" -> {ok, error, checked_at, ats, url}
-COMPANY_STATUS_FILE = Path("data/company_status.json")
-
-def load_company_status() -> dict:
-    """Load company fetch status from file"""
-    if COMPANY_STATUS_FILE.exists():
-        try:
-            with open(COMPANY_STATUS_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return {}
-    return {}
-
-def save_company_status(status: dict):
-    """Save company fetch status to file"""
-    try:
-        with open(COMPANY_STATUS_FILE, "w") as f:
-            json.dump(status, f, indent=2)
-    except Exception as e:
-        print(f"Failed to save company status: {e}")
-
-# Load on startup
-company_fetch_status: dict[str, dict] = load_company_status()
+# Здоровье компаний (ok/error, consecutive errors, latency, jobs, payload hash):
+# в памяти, data/company_status.json пишется только фоновым flush (utils/company_health.py)
+from utils.company_health import get_health_store
+company_health = get_health_store()
 
 # Geo scoring/bucketing configuration
 TARGET_STATE = "NC"
@@ -298,6 +287,15 @@ app.add_middleware(
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+# Endpoint groups (jobs, pipeline, discovery, apply, cv, knowledge base) live in
+# api/routers/ and are included on the first request to their prefix
+from api.routers import LazyRouters, LazyRouterMiddleware
+lazy_routers = LazyRouters(app)
+app.add_middleware(LazyRouterMiddleware, routers=lazy_routers)
+
+# Opt-in: stacks of requests slower than PROFILE_SLOW_MS → logs/profiles/ (see /debug/profiles)
+app.add_middleware(profiler.SlowRequestProfiler)
+
 # ========== BACKGROUND REFRESH DAEMON ==========
 
 # Lock file path (in data/ folder, synced via iCloud)
@@ -354,19 +352,6 @@ def release_daemon_lock():
         except:
             pass
 
-def update_daemon_lock():
-    """Update lock timestamp (heartbeat)."""
-    machine_id = get_machine_id()
-    existing_lock = check_daemon_lock()
-    
-    if existing_lock and existing_lock.get("machine") == machine_id:
-        lock_data = {
-            "machine": machine_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "pid": os.getpid()
-        }
-        DAEMON_LOCK_FILE.write_text(json.dumps(lock_data, indent=2))
-
 # Daemon status (global)
 # NOTE: Daemon disabled by default to avoid conflicts when running on multiple machines via iCloud
 DAEMON_STATUS = {
@@ -389,17 +374,51 @@ DAEMON_STATUS = {
     "refresh_log": []  # List of {company, status, jobs_count, time, error}
 }
 
-async def refresh_company_async(company: dict) -> dict:
-    """Parse a single company (runs in thread pool to not block async)"""
-    import concurrent.futures
-    
-    loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor() as pool:
-        result = await loop.run_in_executor(pool, refresh_company_sync, company)
-    return result
+# dev (:8001) и prod (:8000) из одного checkout: daemon крутит только держатель lease
+# "daemon" в общей SQLite (utils/shared_state.py). enabled и опубликованный статус тоже там.
+# data/daemon.lock остаётся для исключения между машинами (iCloud).
+# Каждый сервер — один процесс: uvicorn --workers N не поддерживается (apply pool, matching).
+daemon_leader = LeaderElector("daemon")
+DAEMON_POLL_SECONDS = 10
+
+
+def _daemon_may_run() -> bool:
+    """Daemon enabled (shared flag) and this process still holds the daemon lease (checked in the DB)."""
+    state = get_shared_state()
+    DAEMON_STATUS["enabled"] = state.get("daemon", "enabled", True)
+    fence = daemon_leader.fence
+    return DAEMON_STATUS["enabled"] and fence is not None and state.check_fence(*fence)
+
+
+def _publish_daemon_status() -> bool:
+    """Leader → shared DB, so /daemon/status is the same in every process (dev and prod). False if fenced out."""
+    fence = daemon_leader.fence
+    if fence is None:
+        return False
+    snapshot = {**DAEMON_STATUS, "repairs": get_repair_queue().status(),
+                "published_at": datetime.now(timezone.utc).isoformat()}
+    return get_shared_state().put("daemon", "status", snapshot, fence=fence)
+
+
+def _fenced_write(fence):
+    """
+    Context for a daemon file write: yields False if this process no longer holds
+    the daemon lease. fence=None (manual refresh, /onboard) → unfenced, always True.
+    """
+    if fence is None:
+        return nullcontext(True)
+    return get_shared_state().fenced(fence)
+
+
+async def refresh_company_async(company: dict, fence=None) -> dict:
+    """Parse a single company (runs in the shared I/O executor to not block async)"""
+    return await run_blocking(refresh_company_sync, company, fence)
 
-def refresh_company_sync(company: dict) -> dict:
-    """Synchronous company refresh (called from thread pool)"""
+def refresh_company_sync(company: dict, fence=None) -> dict:
+    """
+    Synchronous company refresh (called from thread pool).
+    fence=daemon_leader.fence: cache and pipeline writes are skipped once the lease is lost.
+    """
     company_id = company.get("id", company.get("name", "unknown"))
     ats = company.get("ats", "unknown")
     board_url = company.get("board_url", "")
@@ -415,33 +434,43 @@ def refresh_company_sync(company: dict) -> dict:
     try:
         fetcher = ATS_PARSERS.get(ats)
         if not fetcher:
-            result["error"] = f"Unknown ATS: {ats}"
-            return result
+            # через except: ошибка попадает в health → repair / авто-отключение
+            raise ValueError(f"Unknown ATS: {ats}")
         
-        jobs = fetcher(board_url)
+        started = time.time()
+        try:
+            jobs = fetcher(board_url)
+        finally:
+            PARSER_FETCH_SECONDS.observe(time.time() - started, ats=ats)
         result["jobs"] = len(jobs) if jobs else 0
         result["ok"] = True
+        _observe_fetch(ats, True, jobs)
         print(f"[refresh_company_sync] {company_id}: fetched {len(jobs) if jobs else 0} jobs")
 
-        # Update company status in storage
-        from company_storage import update_company_status
-        update_company_status(company_id, ok=True, jobs_count=len(jobs) if jobs else 0)
+        company_health.record_ok(company_id, ats=ats, url=board_url, jobs=jobs or [],
+                                 latency_ms=(time.time() - started) * 1000)
 
         # Update cache with new jobs and track added count
         print(f"[refresh_company_sync] {company_id}: calling update_cache_for_company...")
-        added = update_cache_for_company(company_id, jobs or [])
+        added = update_cache_for_company(company_id, jobs or [], fence=fence)
         print(f"[refresh_company_sync] {company_id}: update_cache returned {added}")
         result["jobs_added"] = added or 0
         
     except Exception as e:
         result["error"] = str(e)
-        from company_storage import update_company_status
-        update_company_status(company_id, ok=False, error=str(e))
+        if not result["ok"]:
+            _observe_fetch(ats, False)
+        # Counts towards consecutive_errors (_track_company_error reads it)
+        company_health.record_error(company_id, str(e), ats=ats, url=board_url)
     
     return result
 
-def update_cache_for_company(company_id: str, new_jobs: list) -> int:
-    """Update jobs_all.json cache for a specific company. Returns count of new jobs added to pipeline."""
+@timed(UPDATE_CACHE_SECONDS)
+def update_cache_for_company(company_id: str, new_jobs: list, fence=None) -> int:
+    """
+    Update jobs_all.json cache for a specific company. Returns count of new jobs added to pipeline.
+    With fence the rename and the pipeline writes happen only while the lease still holds.
+    """
     from utils.cache_manager import get_cache_path
     from utils.job_utils import classify_role, generate_job_id
     from utils.normalize import normalize_location
@@ -514,6 +543,9 @@ def update_cache_for_company(company_id: str, new_jobs: list) -> int:
             if not job.get("id"):
                 job["id"] = generate_job_id(job)
 
+        # Batch AI classification for "unknown" titles (cached titles are free)
+        classify_unknown_jobs(new_jobs)
+
         # Add new jobs
         all_jobs.extend(new_jobs)
         print(f"[Daemon] Cache update: {company_id} - adding {len(new_jobs)} jobs, total will be {len(all_jobs)}")
@@ -526,11 +558,16 @@ def update_cache_for_company(company_id: str, new_jobs: list) -> int:
         temp_path = cache_path.with_suffix('.tmp')
         with open(temp_path, "w") as f:
             json.dump(cache_data, f)
-        temp_path.rename(cache_path)  # Atomic on most filesystems
+        with _fenced_write(fence) as still_leader:
+            if not still_leader:
+                temp_path.unlink(missing_ok=True)
+                print(f"[Daemon] 🔻 {company_id}: lost daemon lease, cache not written")
+                return 0
+            temp_path.rename(cache_path)  # Atomic on most filesystems
         print(f"[Daemon] Cache saved successfully for {company_id}")
 
         # Also update pipeline (jobs.json) with relevant jobs
-        added = update_pipeline_for_company(company_id, new_jobs)
+        added = update_pipeline_for_company(company_id, new_jobs, fence=fence)
         return added
 
     except Exception as e:
@@ -539,92 +576,99 @@ def update_cache_for_company(company_id: str, new_jobs: list) -> int:
         traceback.print_exc()
         return 0
 
-def update_pipeline_for_company(company_id: str, new_jobs: list) -> int:
+def update_pipeline_for_company(company_id: str, new_jobs: list, fence=None) -> int:
     """Update pipeline jobs.json with new relevant jobs from company. Returns count added."""
-    from storage.job_storage import get_all_jobs, add_job
+    from storage.job_storage import get_all_jobs, add_jobs_bulk
     
     # Get existing pipeline jobs
     existing = get_all_jobs()
     existing_urls = {j.get("job_url") or j.get("url") for j in existing}
     
-    # Add new relevant jobs (primary/adjacent only)
-    added = 0
+    # New relevant jobs (primary/adjacent only)
+    to_add = []
     for job in new_jobs:
         if job.get("role_category") in ["primary", "adjacent"]:
             job_url = job.get("job_url") or job.get("url")
             if job_url and job_url not in existing_urls:
-                if add_job(job):
-                    added += 1
+                to_add.append(job)
+    if not to_add:
+        return 0
     
-    return added
+    # Один load/save jobs.json — write lock общей БД держим недолго
+    with _fenced_write(fence) as still_leader:
+        if not still_leader:
+            print(f"[Daemon] 🔻 {company_id}: lost daemon lease, pipeline not updated")
+            return 0
+        return add_jobs_bulk(to_add)
     
     if added > 0:
         print(f"[Daemon] Added {added} new jobs to pipeline from {company_id}")
 
-# Self-healing: consecutive error tracking per company
-_COMPANY_ERRORS: dict[str, int] = {}  # company_id → consecutive error count
+# Self-healing: consecutive errors live in company_health (survive restarts)
 _MAX_CONSECUTIVE_ERRORS = 3  # disable company after this many consecutive failures
 
 
 def _track_company_error(company: dict, error: str):
     """
-    Track consecutive errors for a company.
+    React to consecutive errors of a company (counted by company_health.record_error).
     After _MAX_CONSECUTIVE_ERRORS consecutive failures → try repair first, then auto-disable.
     """
     company_id = company.get("id", "")
     if not company_id:
         return
 
-    _COMPANY_ERRORS[company_id] = _COMPANY_ERRORS.get(company_id, 0) + 1
-    count = _COMPANY_ERRORS[company_id]
+    count = company_health.consecutive_errors(company_id)
 
     if count >= _MAX_CONSECUTIVE_ERRORS:
-        print(f"[Daemon] ⚠️ {company_id}: {count} consecutive errors → attempting repair...")
+        print(f"[Daemon] ⚠️ {company_id}: {count} consecutive errors → queueing repair...")
+
+        def on_repair(repair_result):
+            if repair_result and _save_company_repair(repair_result, company_id=company_id):
+                print(f"[Daemon] ✅ Repaired {company_id} → {repair_result['ats']}")
+                company_health.reset_errors(company_id)  # reset errors after repair
+                return  # Don't disable — repaired successfully
+
+            # Repair failed → auto-disable
+            print(f"[Daemon] ❌ Repair failed for {company_id} → auto-disabling")
+            _auto_disable_company(company_id, error, count)
+            company_health.reset_errors(company_id)  # cleanup
 
-        # Try repair before disabling
-        repair_result = try_repair_company({
+        # Repair runs in the background (ats_detector.RepairQueue), not in the daemon loop
+        get_repair_queue().submit({
             "name": company.get("name", company_id),
             "ats": company.get("ats", ""),
             "board_url": company.get("board_url", ""),
-        })
-
-        if repair_result and repair_result.get("verified"):
-            new_ats = repair_result["ats"]
-            new_url = repair_result["board_url"]
-            print(f"[Daemon] 🔧 Repair found new URL for {company_id}: {new_ats} → {new_url}")
-
-            # Update companies.json with repaired data
-            try:
-                companies_path = Path("data/companies.json")
-                with open(companies_path, "r", encoding="utf-8") as f:
-                    companies = json.load(f)
-
-                for c in companies:
-                    if c.get("id") == company_id:
-                        c["ats"] = new_ats
-                        c["board_url"] = new_url
-                        c["repaired_at"] = datetime.now(timezone.utc).isoformat()
-                        break
+            "careers_url": company.get("careers_url", ""),
+            "website": company.get("website", ""),
+        }, on_repair)
 
-                with open(companies_path, "w", encoding="utf-8") as f:
-                    json.dump(companies, f, indent=2, ensure_ascii=False)
 
-                print(f"[Daemon] ✅ Repaired {company_id} → {new_ats}")
-                _COMPANY_ERRORS.pop(company_id, None)  # reset errors after repair
-                return  # Don't disable — repaired successfully
-            except Exception as e:
-                print(f"[Daemon] ❌ Failed to save repair for {company_id}: {e}")
-
-        # Repair failed → auto-disable
-        print(f"[Daemon] ❌ Repair failed for {company_id} → auto-disabling")
-        _auto_disable_company(company_id, error, count)
-        _COMPANY_ERRORS.pop(company_id, None)  # cleanup
+def _save_company_repair(repair_result: dict, company_id: str = "", company_name: str = "") -> bool:
+    """Write repaired ats/board_url into companies.json (match by id, else by name)."""
+    new_ats = repair_result["ats"]
+    new_url = repair_result["board_url"]
+    try:
+        # Runs on the ats-repair thread: same lock + atomic write as every other companies.json writer
+        with companies_update(Path("data/companies.json")) as companies:
+            for c in companies:
+                if (company_id and c.get("id") == company_id) or \
+                        (not company_id and c.get("name", "").lower() == company_name.lower()):
+                    c["ats"] = new_ats
+                    c["board_url"] = new_url
+                    c["repaired_at"] = datetime.now(timezone.utc).isoformat()
+                    break
+            else:
+                return False
+        print(f"  ✅ Updated companies.json for {company_id or company_name}: {new_ats} → {new_url}")
+        return True
+    except Exception as e:
+        print(f"  ❌ Failed to save repair for {company_id or company_name}: {e}")
+        return False
 
 
 def _reset_company_errors(company_id: str):
     """Reset consecutive error counter on successful parse."""
-    if company_id in _COMPANY_ERRORS:
-        del _COMPANY_ERRORS[company_id]
+    company_health.reset_errors(company_id)
 
 
 def _auto_disable_company(company_id: str, last_error: str, error_count: int):
@@ -637,48 +681,61 @@ def _auto_disable_company(company_id: str, last_error: str, error_count: int):
         return
 
     try:
-        with open(companies_path, "r", encoding="utf-8") as f:
-            companies = json.load(f)
-
-        for c in companies:
-            if c.get("id") == company_id:
-                c["enabled"] = False
-                c["status"] = "auto_disabled"
-                c["auto_disabled_at"] = datetime.now(timezone.utc).isoformat()
-                c["auto_disabled_reason"] = f"{error_count} consecutive errors: {last_error[:200]}"
-                break
-        else:
-            return  # company not found
-
-        with open(companies_path, "w", encoding="utf-8") as f:
-            json.dump(companies, f, indent=2, ensure_ascii=False)
+        with companies_update(companies_path) as companies:
+            for c in companies:
+                if c.get("id") == company_id:
+                    c["enabled"] = False
+                    c["status"] = "auto_disabled"
+                    c["auto_disabled_at"] = datetime.now(timezone.utc).isoformat()
+                    c["auto_disabled_reason"] = f"{error_count} consecutive errors: {last_error[:200]}"
+                    break
+            else:
+                return  # company not found
 
         print(f"[Daemon] 🔒 Auto-disabled company: {company_id}")
     except Exception as e:
         print(f"[Daemon] Error auto-disabling {company_id}: {e}")
 
 
+def _load_companies_json() -> list:
+    companies_path = Path("data/companies.json")
+    if companies_path.exists():
+        return json.loads(companies_path.read_text())
+    return []
+
+
 async def background_refresh_daemon():
-    """Background task that continuously refreshes companies"""
+    """Background task that continuously refreshes companies (runs cycles only in the leader process)"""
     global DAEMON_STATUS
     
     # Wait for app to fully start
     await asyncio.sleep(5)
     
-    print("[Daemon] Background refresh daemon started")
-    DAEMON_STATUS["running"] = True
+    print(f"[Daemon] Background refresh daemon started (worker {daemon_leader.holder})")
     
-    while DAEMON_STATUS["enabled"]:
-        # Update lock heartbeat every iteration
-        update_daemon_lock()
+    while True:
+        if not await run_blocking(_daemon_may_run):
+            if DAEMON_STATUS["running"]:
+                DAEMON_STATUS["running"] = False
+                DAEMON_STATUS["current_company"] = None
+                print("[Daemon] Background refresh daemon paused (disabled or not the leader)")
+            await asyncio.sleep(DAEMON_POLL_SECONDS)
+            continue
+        
+        # Machine-level lock (data/daemon.lock) + heartbeat
+        acquired, message = await run_blocking(acquire_daemon_lock)
+        if not acquired:
+            DAEMON_STATUS["locked_by"] = (check_daemon_lock() or {}).get("machine")
+            print(f"[Daemon] {message}")
+            await asyncio.sleep(60)
+            continue
+        DAEMON_STATUS["locked_by"] = get_machine_id()
+        DAEMON_STATUS["running"] = True
+        cycle_profile = None
         
         try:
             # Load all companies from JSON
-            companies_path = Path("data/companies.json")
-            if companies_path.exists():
-                companies = json.loads(companies_path.read_text())
-            else:
-                companies = []
+            companies = await run_blocking(_load_companies_json)
             
             # Filter to enabled companies only
             companies = [c for c in companies if c.get("enabled", True)]
@@ -694,18 +751,23 @@ async def background_refresh_daemon():
             DAEMON_STATUS["refresh_log"] = []  # Clear log for new cycle
             
             print(f"[Daemon] Starting cycle #{DAEMON_STATUS['cycle_count']} with {len(companies)} companies")
+            cycle_started = time.perf_counter()
+            if await run_blocking(profiler.take_request, "daemon"):
+                cycle_profile = profiler.begin("daemon", f"cycle {DAEMON_STATUS['cycle_count']}")
+            await run_blocking(_publish_daemon_status)
             
             # Process in batches
             batch_size = DAEMON_STATUS["batch_size"]
             for i in range(0, len(companies), batch_size):
-                if not DAEMON_STATUS["enabled"]:
+                if not DAEMON_STATUS["running"]:
                     break
                 
                 batch = companies[i:i+batch_size]
                 DAEMON_STATUS["current_index"] = i
                 
                 for company in batch:
-                    if not DAEMON_STATUS["enabled"]:
+                    if not await run_blocking(_daemon_may_run):
+                        DAEMON_STATUS["running"] = False
                         break
                     
                     company_name = company.get("name", company.get("id", "unknown"))
@@ -720,11 +782,13 @@ async def background_refresh_daemon():
                     
                     print(f"[Daemon] Refreshing: {company_name}")
                     
-                    result = await refresh_company_async(company)
+                    # Fence: если lease ушёл к другому процессу пока мы фетчили — cache/pipeline не пишем
+                    result = await refresh_company_async(company, fence=daemon_leader.fence)
                     
                     DAEMON_STATUS["last_company"] = company_name
                     DAEMON_STATUS["last_updated"] = datetime.now(timezone.utc).isoformat()
                     DAEMON_STATUS["companies_refreshed_this_cycle"] += 1
+                    DAEMON_COMPANIES.inc(outcome="ok" if result["ok"] else "error")
                     
                     # Track jobs added
                     jobs_added = result.get("jobs_added", 0)
@@ -749,6 +813,12 @@ async def background_refresh_daemon():
                     if len(DAEMON_STATUS["refresh_log"]) > 100:
                         DAEMON_STATUS["refresh_log"] = DAEMON_STATUS["refresh_log"][-100:]
                     
+                    # Fenced: if another process took over meanwhile, stop before touching companies.json
+                    if not await run_blocking(_publish_daemon_status):
+                        print(f"[Daemon] 🔻 Lost leadership after {company_name}, stopping cycle")
+                        DAEMON_STATUS["running"] = False
+                        break
+                    
                     if result["ok"]:
                         added_str = f" (+{jobs_added} new)" if jobs_added > 0 else ""
                         print(f"[Daemon] ✓ {company_name}: {result['jobs']} jobs{added_str}")
@@ -757,38 +827,67 @@ async def background_refresh_daemon():
                     else:
                         print(f"[Daemon] ✗ {company_name}: {result['error']}")
                         # Track consecutive errors, auto-disable after threshold
-                        _track_company_error(company, result.get("error", ""))
+                        await run_blocking(_track_company_error, company, result.get("error", ""))
                 
                 DAEMON_STATUS["current_company"] = None
                 
                 # Pause between batches
-                if DAEMON_STATUS["enabled"] and i + batch_size < len(companies):
+                if DAEMON_STATUS["running"] and i + batch_size < len(companies):
                     await asyncio.sleep(DAEMON_STATUS["pause_seconds"])
             
+            if cycle_profile:
+                await run_blocking(profiler.finish, cycle_profile, companies=len(companies),
+                                   completed=DAEMON_STATUS["running"])
+                cycle_profile = None
+            
+            if not DAEMON_STATUS["running"]:
+                continue
+            
+            DAEMON_CYCLE_SECONDS.observe(time.perf_counter() - cycle_started)
             # Pause before next cycle (5 minutes)
             print(f"[Daemon] Cycle #{DAEMON_STATUS['cycle_count']} complete. Waiting 5 minutes...")
             await asyncio.sleep(300)
             
         except Exception as e:
             print(f"[Daemon] Error: {e}")
+            if cycle_profile:
+                await run_blocking(profiler.finish, cycle_profile, completed=False, error=str(e))
             await asyncio.sleep(60)  # Wait on error
-    
-    DAEMON_STATUS["running"] = False
-    release_daemon_lock()  # Release lock when stopping
-    print("[Daemon] Background refresh daemon stopped")
 
 # Start daemon on app startup
 @app.on_event("startup")
 async def startup_event():
+    company_health.start()
+    daemon_leader.start()  # every process competes for the daemon lease
     asyncio.create_task(background_refresh_daemon())
+    if os.getenv("ROUTERS_WARMUP", "").lower() in ("1", "true", "yes"):
+        # Routers + тяжёлые импорты (bs4, docx, anthropic) в фоне — первый запрос без задержки
+        threading.Thread(target=lazy_routers.warmup, name="routers-warmup", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    company_health.stop()  # final flush of data/company_status.json
+    daemon_leader.stop()  # release the lease → another process takes over within DAEMON_POLL_SECONDS
+    async_io.shutdown()
 
 @app.get("/daemon/status")
 def get_daemon_status():
-    """Get background refresh daemon status"""
+    """Get background refresh daemon status (same answer from every server process)"""
     # Check lock status
     lock = check_daemon_lock()
     DAEMON_STATUS["locked_by"] = lock.get("machine") if lock else None
-    return DAEMON_STATUS
+    state = get_shared_state()
+    lease = state.lease("daemon") or {}
+    if lease.get("live") and not daemon_leader.is_leader:
+        # Daemon runs in another process → its last published status
+        status = state.get("daemon", "status") or {**DAEMON_STATUS, "running": False}
+    else:
+        status = {**DAEMON_STATUS, "repairs": get_repair_queue().status()}
+    status["enabled"] = state.get("daemon", "enabled", True)
+    status["locked_by"] = DAEMON_STATUS["locked_by"]
+    status["leader"] = {**lease, "this_worker": daemon_leader.holder, "is_leader": daemon_leader.is_leader}
+    return status
 
 @app.post("/daemon/toggle")
 def toggle_daemon(enabled: bool = Query(...)):
@@ -806,6 +905,7 @@ def toggle_daemon(enabled: bool = Query(...)):
         release_daemon_lock()
         DAEMON_STATUS["locked_by"] = None
     
+    get_shared_state().put("daemon", "enabled", enabled)  # seen by the leader process on its next check
     DAEMON_STATUS["enabled"] = enabled
     return {"ok": True, "enabled": enabled}
 
@@ -831,28 +931,37 @@ def _is_us_location(location: str | None) -> bool:
     return any(m in loc for m in us_markers)
 
 
-def _mark_company_status(profile: str, cfg: dict, ok: bool, error: str | None = None):
-    key = f"{profile}:{cfg.get('company', '')}"
-    company_fetch_status[key] = {
-        "ok": ok,
-        "error": error or "",
-        "checked_at": datetime.utcnow().isoformat() + "Z",
-        "ats": cfg.get("ats", ""),
-        "url": cfg.get("url", ""),
-    }
-    # Save to file for persistence
-    save_company_status(company_fetch_status)
+def _mark_company_status(profile: str, cfg: dict, ok: bool, error: str | None = None,
+                         jobs: list | None = None, latency_ms: float | None = None):
+    """Record fetch result in company_health (memory only; flushed in background)."""
+    company_id = cfg.get("id") or cfg.get("company", "")
+    _observe_fetch(cfg.get("ats", ""), ok, jobs)
+    if ok:
+        company_health.record_ok(company_id, ats=cfg.get("ats", ""), url=cfg.get("url", ""),
+                                 jobs=jobs, latency_ms=latency_ms)
+    else:
+        company_health.record_error(company_id, error or "", ats=cfg.get("ats", ""),
+                                    url=cfg.get("url", ""), latency_ms=latency_ms)
+
 
+def _observe_fetch(ats: str, ok: bool, jobs: list | None = None):
+    FETCH_TOTAL.inc(ats=ats, outcome="ok" if ok else "error")
+    if ok:
+        COMPANY_JOBS.observe(len(jobs or []), ats=ats)
 
-def _fetch_for_company(profile: str, cfg: dict, _retry: bool = False) -> list[dict]:
+
+@timed(FETCH_SECONDS, labels=lambda profile, cfg: {"ats": cfg.get("ats", "")})
+def _fetch_for_company(profile: str, cfg: dict) -> list[dict]:
     """
     Унифицированный вызов парсеров + запись статуса компании.
     Также добавляет нормализованную локацию, классификацию роли, geo bucket/score, company_data.
-    _retry: internal flag to prevent infinite recursion
+    404 → ремонт ставится в фоновую очередь (ats_detector.RepairQueue),
+    новый URL будет использован при следующем fetch.
     """
     company = cfg.get("company", "")
     ats = cfg.get("ats", "")
     url = cfg.get("url", "")
+    started = time.time()
 
     try:
         if ats == "greenhouse":
@@ -879,7 +988,7 @@ def _fetch_for_company(profile: str, cfg: dict, _retry: bool = False) -> list[di
             jobs = []
 
         # записываем успех
-        _mark_company_status(profile, cfg, ok=True)
+        _mark_company_status(profile, cfg, ok=True, jobs=jobs, latency_ms=(time.time() - started) * 1000)
 
         # добавляем мета-инфу к каждой вакансии
         for j in jobs:
@@ -924,55 +1033,73 @@ def _fetch_for_company(profile: str, cfg: dict, _retry: bool = False) -> list[di
         error_str = str(e)
         print(f"Error for {company}: {error_str}")
         
-        # Try auto-repair for 404 errors (only on first attempt, not retry)
-        if "404" in error_str and not _retry:
-            print(f"  🔧 Attempting auto-repair for {company}...")
-            repair_result = try_repair_company({
-                "name": company,
-                "ats": ats,
-                "board_url": url,
-            })
-            
-            if repair_result and repair_result.get("verified"):
-                new_ats = repair_result["ats"]
-                new_url = repair_result["board_url"]
-                print(f"  ✅ Found new URL: {new_ats} → {new_url}")
-                
-                # Update companies.json
-                try:
-                    companies_path = Path("data/companies.json")
-                    with open(companies_path, "r") as f:
-                        companies = json.load(f)
-                    
-                    for c in companies:
-                        if c.get("name", "").lower() == company.lower():
-                            c["ats"] = new_ats
-                            c["board_url"] = new_url
-                            print(f"  ✅ Updated companies.json for {company}")
-                            break
-                    
-                    with open(companies_path, "w") as f:
-                        json.dump(companies, f, indent=2, ensure_ascii=False)
-                    
-                    # Retry fetch with new URL (with _retry=True to prevent loop)
-                    new_cfg = cfg.copy()
-                    new_cfg["ats"] = new_ats
-                    new_cfg["url"] = new_url
-                    return _fetch_for_company(profile, new_cfg, _retry=True)
-                    
-                except Exception as update_err:
-                    print(f"  ❌ Failed to update companies.json: {update_err}")
-            else:
-                print(f"  ❌ Auto-repair failed for {company}")
+        # Auto-repair for 404 errors — in the background, this request doesn't wait
+        if "404" in error_str:
+            if get_repair_queue().submit({"name": company, "ats": ats, "board_url": url},
+                                         lambda result: result and _save_company_repair(result, company_name=company)):
+                print(f"  🔧 Auto-repair queued for {company}")
         
         # Mark as failed
-        _mark_company_status(profile, cfg, ok=False, error=error_str)
+        _mark_company_status(profile, cfg, ok=False, error=error_str, latency_ms=(time.time() - started) * 1000)
         return []
 
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    # async: answered on the event loop, never queued behind blocking handlers
+    return {"status": "ok", "io": async_io.info()}
+
+
+REGISTRY.gauge("io_executor_active", "Blocking calls running in the shared I/O executor",
+               fn=lambda: async_io.info()["active"])
+REGISTRY.gauge("daemon_running", "1 while this process runs daemon cycles",
+               fn=lambda: int(bool(DAEMON_STATUS["running"])))
+REGISTRY.gauge("companies_failing", "Companies with consecutive fetch errors",
+               fn=lambda: company_health.info().get("failing", 0))
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition (per process)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/debug/profiles")
+def get_profiles(kind: str = Query("", description="request / daemon / fill"), limit: int = Query(100)):
+    """Saved sampling profiles (logs/profiles/*.collapsed), newest first."""
+    return {
+        "ok": True,
+        "dir": str(profiler.PROFILE_DIR),
+        "slow_ms": profiler.slow_ms(),
+        "pending": profiler.pending(),
+        "sampler": profiler.get_sampler().info(),
+        "profiles": profiler.list_profiles(limit=limit, kind=kind or None),
+    }
+
+
+@app.get("/debug/profiles/{name}")
+def get_profile(name: str):
+    """Collapsed stacks of one profile (flamegraph.pl / speedscope input)."""
+    path = profiler.profile_path(name)
+    if path is None:
+        return {"ok": False, "error": f"Profile not found: {name}"}
+    return PlainTextResponse(path.read_text(encoding="utf-8"))
+
+
+@app.post("/debug/profiles/config")
+def set_profiles_config(slow_ms: float = Query(..., description="Profile requests slower than this; 0 = off")):
+    """Slow-request threshold for all workers (applied within a few seconds, no restart)."""
+    profiler.set_slow_ms(slow_ms)
+    return {"ok": True, "slow_ms": profiler.slow_ms()}
+
+
+@app.post("/debug/profiles/request/{target}")
+def request_profile_run(target: str):
+    """Profile the next daemon cycle ("daemon") or the next v5 fill run ("fill")."""
+    if target not in profiler.TARGETS:
+        return {"ok": False, "error": f"Unknown target: {target}. Use one of {', '.join(profiler.TARGETS)}"}
+    profiler.request_profile(target)
+    return {"ok": True, "target": target, "pending": profiler.pending()}
 
 
 @app.get("/env")
@@ -1007,295 +1134,6 @@ def update_job_status(payload: StatusUpdate):
     return {"ok": True, "profile": payload.profile, "job_key": payload.job_key, "status": status}
 
 
-@app.get("/jobs")
-async def get_jobs(
-    profile: str = Query("all", description="Имя профиля из папки profiles/*.json"),
-    ats_filter: str = Query("all", description="all / greenhouse / lever / smartrecruiters"),
-    role_filter: str = Query("all", description="all / product / tpm_program / project / other"),
-    location_filter: str = Query("all", description="all / us / nonus"),
-    company_filter: str = Query("", description="подстрока в названии компании"),
-    search: str = Query("", description="поиск по title+location"),
-    states: str = Query("", description="Comma-separated US state codes or full names, e.g. NC,VA,South Carolina"),
-    include_remote_usa: bool = Query(False, description="Include Remote-USA roles in addition to state selection"),
-    state: str = Query("", description="(deprecated) Filter by state substring"),
-    city: str = Query("", description="Filter by city substring"),
-    geo_mode: str = Query("all", description="all / nc_priority / local_only / neighbor_only / remote_usa"),
-    refresh: bool = Query(False, description="Force refresh from ATS, ignore cache"),
-):
-    """
-    Основной эндпоинт: собирает вакансии по профилю и фильтрам.
-    """
-    # NEW: Check cache first (unless refresh=True)
-    cache_key = profile
-    cached = None if refresh else load_cache(cache_key, ignore_ttl=True)
-    
-    if cached:
-        print(f"✅ Using cached data ({cached['jobs_count']} jobs)")
-        all_jobs = cached["jobs"]
-    else:
-        # Parse from companies
-        companies_cfg = load_profile(profile)
-        all_jobs: list[dict] = []
-        
-        # Filter companies first
-        companies_to_fetch = []
-        for cfg in companies_cfg:
-            if cfg.get("enabled") == False:
-                continue
-            ats = cfg.get("ats", "")
-            if ats_filter != "all" and ats_filter != ats:
-                continue
-            companies_to_fetch.append(cfg)
-        
-        # Parallel fetch with ThreadPoolExecutor
-        def fetch_company(cfg):
-            return _fetch_for_company(profile, cfg)
-        
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = {executor.submit(fetch_company, cfg): cfg for cfg in companies_to_fetch}
-            for future in as_completed(futures):
-                try:
-                    jobs = future.result()
-                    all_jobs.extend(jobs)
-                except Exception as e:
-                    cfg = futures[future]
-                    print(f"Error fetching {cfg.get('company', 'unknown')}: {e}")
-        
-        # NEW: Save to cache after parsing all companies
-        save_cache(cache_key, all_jobs)
-    
-    # Load status map once
-    status_map = _load_job_status_map(profile)
-
-    # --- фильтры на уровне вакансий ---
-
-    # parse states CSV to normalized list of 2-letter codes
-    raw_states = [s.strip() for s in states.split(",") if s.strip()]
-    normalized_states: list[str] = []
-    for s in raw_states:
-        s_low = s.lower()
-        if s.upper() in STATE_MAP.values():
-            normalized_states.append(s.upper())
-        elif s_low in STATE_MAP:
-            normalized_states.append(STATE_MAP[s_low])
-        else:
-            normalized_states.append(s.upper())
-
-    states_set_upper = set(ns.upper() for ns in normalized_states)
-    cities_set = set([city.lower()]) if city else set()
-
-    def match_role(job: dict) -> bool:
-        if role_filter == "all":
-            return True
-        return job.get("role_family") == role_filter
-
-    def match_location(loc: str | None) -> bool:
-        if location_filter == "all":
-            return True
-        is_us = _is_us_location(loc)
-        if location_filter == "us":
-            return is_us
-        if location_filter == "nonus":
-            return not is_us
-        return True
-
-    def match_company(name: str | None) -> bool:
-        if not company_filter:
-            return True
-        if not name:
-            return False
-        return company_filter.lower() in name.lower()
-
-    def match_search(job: dict) -> bool:
-        if not search:
-            return True
-        s = search.lower()
-        haystack = f"{job.get('title', '')} {job.get('location', '')} {job.get('company', '')}".lower()
-        return s in haystack
-
-    def match_states(job: dict) -> bool:
-        loc_norm = job.get("location_norm", {}) or {}
-        # Collect job states as 2-letter codes where possible
-        job_states = []
-        if isinstance(loc_norm.get("states"), list):
-            job_states.extend([str(st).upper() for st in loc_norm.get("states") if st])
-        if loc_norm.get("state"):
-            job_states.append(str(loc_norm.get("state")).upper())
-        if loc_norm.get("state_full"):
-            sf = str(loc_norm.get("state_full")).lower()
-            if sf in STATE_MAP:
-                job_states.append(STATE_MAP[sf])
-
-        # Remote-USA flag
-        remote_usa = bool(loc_norm.get("remote")) and (str(loc_norm.get("remote_scope") or "").lower() in ["usa", "us"])
-        state_matches = any(ns in job_states for ns in states_set_upper)
-
-        # New behavior: states selection and remote toggle are independent.
-        if normalized_states and include_remote_usa:
-            return state_matches or remote_usa
-        if normalized_states and not include_remote_usa:
-            return state_matches
-        if not normalized_states and include_remote_usa:
-            return remote_usa
-        return True
-
-    def match_old_state(job: dict) -> bool:
-        # fallback old state substring filter
-        if not state:
-            return True
-        loc = job.get("location", "") or ""
-        return state.lower() in loc.lower()
-
-    def match_city(job: dict) -> bool:
-        if not city:
-            return True
-        loc_norm = job.get("location_norm", {}) or {}
-        if loc_norm:
-            return city.lower() == str(loc_norm.get("city") or "").lower()
-        loc = job.get("location", "") or ""
-        return city.lower() in loc.lower()
-
-    def match_geo(job: dict) -> bool:
-        bucket = job.get("geo_bucket", "unknown")
-        if geo_mode == "all":
-            return True
-        elif geo_mode == "nc_priority":
-            return bucket in ["local", "nc", "neighbor", "remote_usa"]
-        elif geo_mode == "local_only":
-            return bucket == "local"
-        elif geo_mode == "neighbor_only":
-            return bucket == "neighbor"
-        elif geo_mode == "remote_usa":
-            return bucket == "remote_usa"
-        return True
-
-    # Filter out previously rejected/excluded jobs
-    rejected_ids = get_rejected_ids()
-
-    filtered: list[dict] = []
-    for j in all_jobs:
-        ats_job_id = j.get("ats_job_id") or ""
-        if ats_job_id and str(ats_job_id) in rejected_ids:
-            continue
-        if not match_role(j):
-            continue
-        if not match_states(j):
-            continue
-        if not match_old_state(j):
-            continue
-        if not match_city(j):
-            continue
-        if not match_geo(j):
-            continue
-        if not match_location(j.get("location")):
-            continue
-        if not match_company(j.get("company")):
-            continue
-        if not match_search(j):
-            continue
-        filtered.append(j)
-
-    # compute score and sort
-    def parse_date(datestr: str | None):
-        if not datestr:
-            return None
-        try:
-            ds = datestr
-            if ds.endswith("Z"):
-                ds = ds[:-1] + "+00:00"
-            dt = datetime.fromisoformat(ds)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=timezone.utc)
-            return dt.astimezone(timezone.utc)
-        except Exception:
-            return None
-
-    now = datetime.now(timezone.utc)
-    for job in filtered:
-        score = 0
-        loc_norm = job.get("location_norm", {}) or {}
-
-        job_state_upper = (loc_norm.get("state") or "").upper()
-        job_city_lower = (loc_norm.get("city") or "").lower()
-        job_remote_scope = (loc_norm.get("remote_scope") or "").lower()
-        job_remote = bool(loc_norm.get("remote"))
-
-        # Prefer explicit states/cities selections
-        if states_set_upper and job_state_upper in states_set_upper:
-            score += 30
-        if cities_set and job_city_lower in cities_set:
-            score += 15
-
-        # If include_remote_usa requested, give a boost
-        if include_remote_usa and job_remote_scope == "usa":
-            score += 20
-        if not states_set_upper and not city and job_remote:
-            score += 5
-
-        # Company priority
-        company_data = job.get("company_data") or {}
-        score += int(company_data.get("priority") or 0)
-
-        # Freshness penalty
-        updated = parse_date(job.get("updated_at"))
-        if updated:
-            age_days = (now - updated).days
-            if age_days > 60:
-                score -= 20
-            elif age_days > 30:
-                score -= 10
-
-        # Add geo_score as primary weight
-        score += int(job.get("geo_score", 0))
-
-        job["score"] = score
-
-        # Attach job_key + status
-        job_key = compute_job_key(job)
-        job["job_key"] = job_key
-        job["application_status"] = status_map.get(job_key, "New")
-
-    filtered.sort(key=lambda j: (j.get("score", 0), str(j.get("updated_at") or "")), reverse=True)
-
-    # ========== PIPELINE SYNC ==========
-    # Sync relevant jobs with pipeline storage
-    try:
-        known_ids = get_all_job_ids()
-        active_ids = set()
-        
-        for job in filtered:
-            job_id = job.get("id")
-            if not job_id:
-                continue
-            
-            active_ids.add(job_id)
-            
-            # Only sync jobs with relevant roles
-            role_family = job.get("role_family", "other")
-            if role_family not in ["product", "tpm_program", "project"]:
-                continue
-            
-            # Skip if role was excluded
-            if job.get("role_excluded"):
-                continue
-            
-            if job_id in known_ids:
-                # Already known - update last_seen
-                update_last_seen(job_id, is_active=True)
-            else:
-                # New job - add to inbox
-                add_job(job)
-        
-        # Mark missing jobs as potentially closed
-        mark_missing_jobs(active_ids, days_threshold=3)
-        
-    except Exception as e:
-        print(f"Pipeline sync error: {e}")
-    # ========== END PIPELINE SYNC ==========
-
-    return {"count": len(filtered), "jobs": filtered}
-
-
 @app.get("/companies")
 def get_companies(
     profile: str = Query("all", description="Имя профиля из profiles/*.json"),
@@ -1395,8 +1233,7 @@ def get_companies(
 
     for cfg in companies_cfg:
         company_name = cfg.get("company", "") or cfg.get("name", "")
-        key = f"{profile}:{company_name}"
-        st = company_fetch_status.get(key, {})
+        st = company_health.get(cfg.get("id", ""), company_name)
         
         # For disabled companies, override status
         is_disabled = cfg.get("enabled") == False
@@ -1426,6 +1263,8 @@ def get_companies(
                 "last_ok": "disabled" if is_disabled else st.get("ok", None),
                 "last_error": cfg.get("status", "") if is_disabled else st.get("error", ""),
                 "last_checked": st.get("checked_at", ""),
+                "consecutive_errors": st.get("consecutive_errors", 0),
+                "latency_ms": st.get("latency_ms"),
                 # Total jobs from cache (all jobs from ATS)
                 "total_jobs": total_jobs_by_company.get(company_name, 0),
                 # Stats from pipeline (filtered PM/TPM jobs)
@@ -1682,71 +1521,62 @@ def add_company(company: CompanyCreate):
     """
     companies_path = Path("data/companies.json")
 
-    # Load existing
-    if companies_path.exists():
-        with open(companies_path, "r") as f:
-            companies = json.load(f)
-    else:
-        companies = []
-
-    # Generate id from name
-    company_id = company.name.lower().replace(" ", "_").replace("-", "_")
-
-    # Normalize board_url (strip trailing slash, whitespace)
-    board_url = company.board_url.strip().rstrip("/") if company.board_url else ""
+    # Load existing → validate → append, under the companies.json lock
+    with companies_update(companies_path) as companies:
+        # Generate id from name
+        company_id = company.name.lower().replace(" ", "_").replace("-", "_")
 
-    # Check if already exists by name/id
-    for c in companies:
-        if c.get("id") == company_id or c.get("name", "").lower() == company.name.lower():
-            return {"error": f"Company '{company.name}' already exists (by name/id)", "status": "exists"}
+        # Normalize board_url (strip trailing slash, whitespace)
+        board_url = company.board_url.strip().rstrip("/") if company.board_url else ""
 
-    # Check duplicate by board_url (normalized comparison)
-    if board_url:
-        norm_url = board_url.lower().rstrip("/")
+        # Check if already exists by name/id
         for c in companies:
-            existing_url = (c.get("board_url") or "").lower().rstrip("/")
-            if existing_url and existing_url == norm_url:
-                return {
-                    "error": f"Company with board_url '{board_url}' already exists as '{c.get('name')}' (id={c.get('id')})",
-                    "status": "exists"
-                }
+            if c.get("id") == company_id or c.get("name", "").lower() == company.name.lower():
+                return {"error": f"Company '{company.name}' already exists (by name/id)", "status": "exists"}
+
+        # Check duplicate by board_url (normalized comparison)
+        if board_url:
+            norm_url = board_url.lower().rstrip("/")
+            for c in companies:
+                existing_url = (c.get("board_url") or "").lower().rstrip("/")
+                if existing_url and existing_url == norm_url:
+                    return {
+                        "error": f"Company with board_url '{board_url}' already exists as '{c.get('name')}' (id={c.get('id')})",
+                        "status": "exists"
+                    }
 
-    # Auto-detect ATS if universal or empty
-    ats_type = (company.ats or "").lower().strip()
-    auto_detected = False
-    if ats_type in ("", "universal", "other", "unknown") and board_url:
-        detected = detect_ats_from_url(board_url)
-        detected_ats = detected.get("ats", "universal")
-        if detected_ats in SUPPORTED_ATS:
-            ats_type = detected_ats
-            # Use the normalized board_url from detection
-            if detected.get("board_url"):
-                board_url = detected["board_url"]
-            auto_detected = True
-            print(f"[AddCompany] Auto-detected ATS: {ats_type} for {board_url}")
-        else:
-            ats_type = detected_ats  # Keep detected ATS even if unsupported
-
-    # Create new company entry
-    new_company = {
-        "id": company_id,
-        "name": company.name,
-        "ats": ats_type,
-        "board_url": board_url,
-        "api_url": None,
-        "tags": company.tags,
-        "industry": company.industry,
-        "priority": 0,
-        "hq_state": None,
-        "region": "us",
-        "enabled": ats_type in SUPPORTED_ATS,
-    }
+        # Auto-detect ATS if universal or empty
+        ats_type = (company.ats or "").lower().strip()
+        auto_detected = False
+        if ats_type in ("", "universal", "other", "unknown") and board_url:
+            detected = detect_ats_from_url(board_url)
+            detected_ats = detected.get("ats", "universal")
+            if detected_ats in SUPPORTED_ATS:
+                ats_type = detected_ats
+                # Use the normalized board_url from detection
+                if detected.get("board_url"):
+                    board_url = detected["board_url"]
+                auto_detected = True
+                print(f"[AddCompany] Auto-detected ATS: {ats_type} for {board_url}")
+            else:
+                ats_type = detected_ats  # Keep detected ATS even if unsupported
 
-    companies.append(new_company)
+        # Create new company entry
+        new_company = {
+            "id": company_id,
+            "name": company.name,
+            "ats": ats_type,
+            "board_url": board_url,
+            "api_url": None,
+            "tags": company.tags,
+            "industry": company.industry,
+            "priority": 0,
+            "hq_state": None,
+            "region": "us",
+            "enabled": ats_type in SUPPORTED_ATS,
+        }
 
-    # Save
-    with open(companies_path, "w", encoding="utf-8") as f:
-        json.dump(companies, f, indent=2, ensure_ascii=False)
+        companies.append(new_company)  # saved atomically when the block exits
 
     # Trigger ATS discovery if unsupported ATS
     if ats_type not in SUPPORTED_ATS and board_url:
@@ -1771,19 +1601,13 @@ def remove_company(company_id: str):
     if not companies_path.exists():
         return {"error": "No companies file", "status": "error"}
     
-    with open(companies_path, "r") as f:
-        companies = json.load(f)
-    
-    # Find and remove
-    original_len = len(companies)
-    companies = [c for c in companies if c.get("id") != company_id]
-    
-    if len(companies) == original_len:
-        return {"error": f"Company '{company_id}' not found", "status": "not_found"}
-    
-    # Save
-    with open(companies_path, "w") as f:
-        json.dump(companies, f, indent=2)
+    with companies_update(companies_path) as companies:
+        # Find and remove (in place — saved when the block exits)
+        original_len = len(companies)
+        companies[:] = [c for c in companies if c.get("id") != company_id]
+        
+        if len(companies) == original_len:
+            return {"error": f"Company '{company_id}' not found", "status": "not_found"}
     
     return {"status": "ok", "removed": company_id}
 
@@ -1839,11 +1663,9 @@ async def refresh_single_company_stream(company_id: str, profile: str = Query("a
     Streaming refresh for a single company.
     Sends progress events as jobs are parsed.
     """
-    import asyncio
-    
     async def generate():
         # Find company config
-        companies_cfg = load_profile(profile)
+        companies_cfg = await run_blocking(load_profile, profile)
         cfg = None
         for c in companies_cfg:
             cid = c.get("id", "") or ""
@@ -1868,7 +1690,7 @@ async def refresh_single_company_stream(company_id: str, profile: str = Query("a
                 from parsers.workday_v2 import fetch_workday_v2_streaming
                 
                 raw_jobs = []
-                for event in fetch_workday_v2_streaming(company_name, url):
+                async for event in iterate_blocking(fetch_workday_v2_streaming(company_name, url)):
                     if event.get("type") == "progress":
                         yield f"data: {json.dumps({'type': 'progress', 'jobs': event['jobs']})}\n\n"
                     elif event.get("type") == "done":
@@ -1877,50 +1699,53 @@ async def refresh_single_company_stream(company_id: str, profile: str = Query("a
                         yield f"data: {json.dumps({'type': 'error', 'error': event['error']})}\n\n"
                         return
                 
-                # Enrich jobs (same as _fetch_for_company)
-                jobs = []
-                for j in raw_jobs:
-                    j["company"] = company_name
-                    j["industry"] = cfg.get("industry", "")
-                    if not j.get("ats"):
-                        j["ats"] = ats
-                    j["id"] = generate_job_id(j)
-                    loc_norm = normalize_location(j.get("location"))
-                    j["location_norm"] = loc_norm
-                    role = classify_role(j.get("title"), j.get("description") or "")
-                    j["role_family"] = role.get("role_family")
-                    j["role_category"] = role.get("role_category")
-                    j["role_id"] = role.get("role_id")
-                    j["role_confidence"] = role.get("confidence")
-                    j["role_reason"] = role.get("reason")
-                    j["role_excluded"] = role.get("excluded", False)
-                    j["role_exclude_reason"] = role.get("exclude_reason")
-                    j["company_data"] = {
-                        "priority": cfg.get("priority", 0),
-                        "hq_state": cfg.get("hq_state"),
-                        "region": cfg.get("region"),
-                        "tags": cfg.get("tags", []),
-                    }
-                    bucket, score = compute_geo_bucket_and_score(loc_norm)
-                    j["geo_bucket"] = bucket
-                    j["geo_score"] = score
-                    jobs.append(j)
+                # Enrich jobs (same as _fetch_for_company) + mark status — blocking, off the loop
+                def enrich():
+                    jobs = []
+                    for j in raw_jobs:
+                        j["company"] = company_name
+                        j["industry"] = cfg.get("industry", "")
+                        if not j.get("ats"):
+                            j["ats"] = ats
+                        j["id"] = generate_job_id(j)
+                        loc_norm = normalize_location(j.get("location"))
+                        j["location_norm"] = loc_norm
+                        role = classify_role(j.get("title"), j.get("description") or "")
+                        j["role_family"] = role.get("role_family")
+                        j["role_category"] = role.get("role_category")
+                        j["role_id"] = role.get("role_id")
+                        j["role_confidence"] = role.get("confidence")
+                        j["role_reason"] = role.get("reason")
+                        j["role_excluded"] = role.get("excluded", False)
+                        j["role_exclude_reason"] = role.get("exclude_reason")
+                        j["company_data"] = {
+                            "priority": cfg.get("priority", 0),
+                            "hq_state": cfg.get("hq_state"),
+                            "region": cfg.get("region"),
+                            "tags": cfg.get("tags", []),
+                        }
+                        bucket, score = compute_geo_bucket_and_score(loc_norm)
+                        j["geo_bucket"] = bucket
+                        j["geo_score"] = score
+                        jobs.append(j)
                 
-                # Mark company status
-                _mark_company_status(profile, cfg, ok=True)
+                    # Mark company status
+                    _mark_company_status(profile, cfg, ok=True, jobs=jobs)
+                    return jobs
+
+                jobs = await run_blocking(enrich)
             else:
                 # Other ATS: single fetch
                 yield f"data: {json.dumps({'type': 'progress', 'jobs': 0, 'message': 'Fetching...'})}\n\n"
-                loop = asyncio.get_event_loop()
-                jobs = await loop.run_in_executor(None, lambda: _fetch_for_company(profile, cfg))
+                jobs = await run_blocking(_fetch_for_company, profile, cfg)
             
             jobs_count = len(jobs)
             
             # Update cache
-            cached = load_cache(profile, ignore_ttl=True) or {"jobs": []}
+            cached = await run_blocking(load_cache, profile, ignore_ttl=True) or {"jobs": []}
             other_jobs = [j for j in cached.get("jobs", []) if j.get("company") != company_name]
             all_jobs = other_jobs + jobs
-            save_cache(profile, all_jobs)
+            await run_blocking(save_cache, profile, all_jobs)
             
             yield f"data: {json.dumps({'type': 'done', 'jobs': jobs_count, 'total_cache': len(all_jobs)})}\n\n"
             
@@ -1937,704 +1762,55 @@ async def refresh_single_company_stream(company_id: str, profile: str = Query("a
     )
 
 
-# ===== Discovery endpoints =====
-# Auto-discovery of companies with relevant PM/TPM roles
+@app.get("/profiles/{name}")
+async def get_profile_companies(name: str):
+    companies = await run_blocking(load_profile, name)
+    result_companies = []
+    for c in companies:
+        result_companies.append({
+            "id": c.get("id"),
+            "name": c.get("name"),
+            "ats": c.get("ats", ""),
+            "board_url": c.get("board_url", ""),
+            "tags": c.get("tags", []),
+            "priority": c.get("priority", 0),
+            "hq_state": c.get("hq_state", None),
+            "region": c.get("region", None)
+        })
+    return {"count": len(result_companies), "companies": result_companies}
+
 
-@app.post("/discovery/search")
-def discovery_search(ai: bool = True, seed: bool = True):
+@app.get("/debug/location_stats")
+async def location_stats(profile: str = Query("all")):
     """
-    Run company discovery pipeline: AI search + seed list.
-    Found companies go to data/discovered_companies.json staging area.
+    Возвращает статистику по нормализованным локациям вакансий для указанного профиля.
     """
-    from tools.company_discovery import (
-        load_companies, load_staging, save_staging,
-        get_existing_ids, get_staging_ids,
-        discover_via_ai, discover_from_seed_list,
-    )
-
-    existing_ids = get_existing_ids()
-    existing_names = {c.get("name", "") for c in load_companies()}
-    candidates = load_staging()
-    initial_count = len(candidates)
+    companies_cfg = await run_blocking(load_profile, profile)
 
-    new_candidates = []
-    ai_count = 0
-    seed_count = 0
+    all_jobs: list[dict] = []
+    async for _cfg, jobs, error in gather_blocking(lambda cfg: _fetch_for_company(profile, cfg), companies_cfg, limit=8):
+        if not error:
+            all_jobs.extend(jobs)
 
-    if ai:
-        ai_candidates = discover_via_ai(existing_ids, existing_names)
-        new_candidates.extend(ai_candidates)
-        ai_count = len(ai_candidates)
+    total_jobs = len(all_jobs)
+    remote_usa_count = 0
+    remote_global_count = 0
+    jobs_with_states_count = 0
+    states_counter = Counter()
 
-    if seed:
-        seed_candidates = discover_from_seed_list(existing_ids)
-        new_candidates.extend(seed_candidates)
-        seed_count = len(seed_candidates)
+    for job in all_jobs:
+        loc_norm = job.get("location_norm", {}) or {}
+        if loc_norm.get("remote") and str(loc_norm.get("remote_scope")).lower() == "usa":
+            remote_usa_count += 1
+        if loc_norm.get("remote") and str(loc_norm.get("remote_scope")).lower() == "global":
+            remote_global_count += 1
 
-    # Deduplicate with staging
-    staging_ids = {c.get("id") for c in candidates}
-    added = 0
-    for nc in new_candidates:
-        if nc["id"] not in staging_ids:
-            candidates.append(nc)
-            staging_ids.add(nc["id"])
-            added += 1
+        states = loc_norm.get("states") or []
+        if states:
+            jobs_with_states_count += 1
+            states_counter.update([str(s).upper() for s in states if s])
 
-    save_staging(candidates)
-
-    return {
-        "ok": True,
-        "ai_suggested": ai_count,
-        "seed_suggested": seed_count,
-        "added_to_staging": added,
-        "total_staging": len(candidates),
-    }
-
-
-@app.get("/discovery/candidates")
-def discovery_candidates(status: str = None):
-    """
-    List discovered companies from staging area.
-    Optional filter by status: pending_validation, validated, ready_to_approve, etc.
-    """
-    staging_path = Path("data/discovered_companies.json")
-    if not staging_path.exists():
-        return {"candidates": [], "total": 0}
-
-    with open(staging_path, "r", encoding="utf-8") as f:
-        candidates = json.load(f)
-
-    if status:
-        candidates = [c for c in candidates if c.get("status") == status]
-
-    # Group counts by status
-    all_candidates = json.load(open(staging_path, "r", encoding="utf-8"))
-    status_counts = {}
-    for c in all_candidates:
-        s = c.get("status", "unknown")
-        status_counts[s] = status_counts.get(s, 0) + 1
-
-    return {
-        "candidates": candidates,
-        "total": len(candidates),
-        "status_counts": status_counts,
-    }
-
-
-@app.post("/discovery/validate")
-def discovery_validate():
-    """
-    Validate ATS for pending candidates in staging.
-    Detects ATS via URL patterns and HTTP checks.
-    """
-    from tools.company_discovery import load_staging, save_staging, validate_candidates
-
-    candidates = load_staging()
-    if not candidates:
-        return {"ok": True, "validated": 0, "message": "Staging is empty"}
-
-    changes = validate_candidates(candidates)
-    save_staging(candidates)
-
-    supported = sum(1 for c in candidates if c.get("supported"))
-    unsupported = sum(1 for c in candidates if c.get("status") == "unsupported_ats")
-    no_ats = sum(1 for c in candidates if c.get("status") == "no_ats_detected")
-
-    return {
-        "ok": True,
-        "validated": changes,
-        "supported_ats": supported,
-        "unsupported_ats": unsupported,
-        "no_ats": no_ats,
-    }
-
-
-@app.post("/discovery/preview")
-def discovery_preview():
-    """
-    Preview relevant PM/TPM roles for validated candidates.
-    Parses jobs from ATS and counts matching role titles.
-    """
-    from tools.company_discovery import load_staging, save_staging, preview_relevant_roles
-
-    candidates = load_staging()
-    if not candidates:
-        return {"ok": True, "previewed": 0, "message": "Staging is empty"}
-
-    changes = preview_relevant_roles(candidates)
-    save_staging(candidates)
-
-    ready = sum(1 for c in candidates if c.get("status") == "ready_to_approve")
-    no_roles = sum(1 for c in candidates if c.get("status") == "no_relevant_roles")
-
-    return {
-        "ok": True,
-        "previewed": changes,
-        "ready_to_approve": ready,
-        "no_relevant_roles": no_roles,
-    }
-
-
-@app.post("/discovery/approve/{candidate_id}")
-def discovery_approve(candidate_id: str):
-    """
-    Approve a discovered company — move from staging to companies.json.
-    Triggers initial parsing via refresh_company_sync() (same as /onboard auto-add).
-    """
-    staging_path = Path("data/discovered_companies.json")
-    companies_path = Path("data/companies.json")
-
-    # Load staging
-    if not staging_path.exists():
-        return {"ok": False, "error": "No staging file"}
-
-    with open(staging_path, "r", encoding="utf-8") as f:
-        candidates = json.load(f)
-
-    # Find candidate
-    candidate = None
-    for c in candidates:
-        if c.get("id") == candidate_id:
-            candidate = c
-            break
-
-    if not candidate:
-        return {"ok": False, "error": f"Candidate '{candidate_id}' not found in staging"}
-
-    if not candidate.get("supported"):
-        return {"ok": False, "error": f"Candidate has unsupported ATS: {candidate.get('ats')}"}
-
-    # Check not already in companies.json
-    companies = json.load(open(companies_path, "r", encoding="utf-8")) if companies_path.exists() else []
-    for c in companies:
-        if c.get("id") == candidate_id or c.get("name", "").lower() == candidate.get("name", "").lower():
-            return {"ok": False, "error": f"Company '{candidate_id}' already exists"}
-
-    # Create company entry (same format as /onboard auto-add: main.py:3004-3015)
-    new_company = {
-        "id": candidate_id,
-        "name": candidate.get("name", candidate_id),
-        "ats": candidate.get("ats"),
-        "board_url": candidate.get("board_url"),
-        "industry": candidate.get("industry", ""),
-        "tags": candidate.get("tags", []),
-        "priority": 0,
-        "hq_state": candidate.get("hq_state"),
-        "region": "us",
-        "enabled": True,
-    }
-
-    companies.append(new_company)
-    with open(companies_path, "w", encoding="utf-8") as f:
-        json.dump(companies, f, indent=2, ensure_ascii=False)
-
-    # Trigger initial parsing (same as /onboard: main.py:3021-3033)
-    parsing_result = {"ok": False, "jobs": 0}
-    try:
-        fetch_result = refresh_company_sync(new_company)
-        parsing_result = {
-            "ok": fetch_result.get("ok", False),
-            "jobs": fetch_result.get("jobs", 0),
-            "jobs_added": fetch_result.get("jobs_added", 0),
-        }
-    except Exception as e:
-        parsing_result["error"] = str(e)
-
-    # Update staging status
-    candidate["status"] = "approved"
-    candidate["approved_at"] = datetime.now().isoformat()
-    with open(staging_path, "w", encoding="utf-8") as f:
-        json.dump(candidates, f, indent=2, ensure_ascii=False)
-
-    return {
-        "ok": True,
-        "company": new_company,
-        "parsing": parsing_result,
-    }
-
-
-@app.post("/discovery/reject/{candidate_id}")
-def discovery_reject(candidate_id: str):
-    """Reject a discovered company — mark as rejected in staging."""
-    staging_path = Path("data/discovered_companies.json")
-
-    if not staging_path.exists():
-        return {"ok": False, "error": "No staging file"}
-
-    with open(staging_path, "r", encoding="utf-8") as f:
-        candidates = json.load(f)
-
-    found = False
-    for c in candidates:
-        if c.get("id") == candidate_id:
-            c["status"] = "rejected"
-            c["rejected_at"] = datetime.now().isoformat()
-            found = True
-            break
-
-    if not found:
-        return {"ok": False, "error": f"Candidate '{candidate_id}' not found"}
-
-    with open(staging_path, "w", encoding="utf-8") as f:
-        json.dump(candidates, f, indent=2, ensure_ascii=False)
-
-    return {"ok": True, "rejected": candidate_id}
-
-
-@app.post("/discovery/retry/{candidate_id}")
-def discovery_retry(candidate_id: str):
-    """
-    Retry parsing for a parse_error candidate.
-    Tries refresh_company_sync to re-fetch jobs.
-    """
-    staging_path = Path("data/discovered_companies.json")
-    if not staging_path.exists():
-        return {"ok": False, "error": "No staging file"}
-
-    with open(staging_path, "r", encoding="utf-8") as f:
-        candidates = json.load(f)
-
-    candidate = None
-    for c in candidates:
-        if c.get("id") == candidate_id:
-            candidate = c
-            break
-
-    if not candidate:
-        return {"ok": False, "error": f"Candidate '{candidate_id}' not found"}
-
-    ats = candidate.get("ats", "unknown")
-    board_url = candidate.get("board_url", "")
-
-    import requests as _req
-    from bs4 import BeautifulSoup as _BS
-    from utils.job_utils import classify_role
-
-    # Step 1: Try current ATS if known
-    jobs_found = 0
-    if board_url and ats != "unknown":
-        parser = ATS_PARSERS.get(ats)
-        if parser:
-            try:
-                print(f"[Discovery Retry] Trying current ATS {ats}: {board_url}")
-                jobs = parser(board_url)
-                jobs_found = len(jobs) if isinstance(jobs, list) else 0
-            except Exception as e:
-                print(f"[Discovery Retry] Current ATS failed: {e}")
-
-    # Step 2: If 0 jobs — try to re-detect ATS from company website
-    new_ats = ""
-    new_board = ""
-    if jobs_found == 0:
-        company_name = candidate.get("name", candidate_id)
-        print(f"[Discovery Retry] 0 jobs on {ats}, scanning for new ATS for {company_name}...")
-
-        # Build list of domains to try
-        slug = candidate_id.replace("-", "").lower()
-        domains_to_try = []
-
-        # Try website from builtin profile
-        builtin_url = candidate.get("builtin_url") or candidate.get("careers_url", "")
-        if builtin_url and "builtin.com" in builtin_url:
-            try:
-                prof_resp = _req.get(builtin_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-                if prof_resp.status_code == 200:
-                    for a in _BS(prof_resp.text, "html.parser").find_all("a", href=True):
-                        h = a["href"]
-                        if h.startswith("http") and "builtin.com" not in h and len(h) > 10:
-                            domains_to_try.append(h.rstrip("/"))
-                            break
-            except:
-                pass
-
-        # Common patterns
-        domains_to_try.extend([
-            f"https://www.{slug}.com",
-            f"https://{slug}.com",
-        ])
-
-        # Scan each domain's /careers page for ATS links
-        ats_domains = ["greenhouse.io", "lever.co", "myworkdayjobs.com", "smartrecruiters.com",
-                       "ashbyhq.com", "icims.com", "phenom.com"]
-        for base in domains_to_try[:3]:
-            for path in ["/careers", "/jobs", "/company/careers", ""]:
-                try:
-                    test_url = base + path
-                    resp = _req.get(test_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=8, allow_redirects=True)
-                    if resp.status_code != 200:
-                        continue
-                    # Scan page for ATS links
-                    for link_match in set(__import__('re').findall(r'https?://[^"\'<>\s]+', resp.text)):
-                        for ats_domain in ats_domains:
-                            if ats_domain in link_match:
-                                # Clean URL
-                                clean_url = link_match.split("&amp;")[0].split("\\u0026")[0].split("?")[0].rstrip("/\\")
-                                ats_info = detect_ats_from_url(clean_url)
-                                detected_ats = ats_info.get("ats", "")
-                                if detected_ats and detected_ats != "universal":
-                                    new_ats = detected_ats
-                                    new_board = ats_info.get("board_url", clean_url)
-                                    print(f"[Discovery Retry] Found new ATS: {new_ats} → {new_board}")
-                                    break
-                        if new_ats:
-                            break
-                    if new_ats:
-                        break
-                except:
-                    pass
-            if new_ats:
-                break
-
-        # If found new ATS, try parsing it
-        if new_ats:
-            new_parser = ATS_PARSERS.get(new_ats)
-            if new_parser:
-                try:
-                    jobs = new_parser(new_board)
-                    jobs_found = len(jobs) if isinstance(jobs, list) else 0
-                    if jobs_found > 0:
-                        candidate["ats"] = new_ats
-                        candidate["board_url"] = new_board
-                        candidate["previous_ats"] = ats
-                        print(f"[Discovery Retry] ✅ Migrated {company_name}: {ats}→{new_ats}, {jobs_found} jobs")
-                except Exception as e:
-                    print(f"[Discovery Retry] New ATS parse failed: {e}")
-
-    # Count relevant roles
-    relevant = 0
-    if jobs_found > 0:
-        try:
-            parser_to_use = ATS_PARSERS.get(candidate.get("ats", ats))
-            jobs_data = parser_to_use(candidate.get("board_url", board_url)) if parser_to_use else []
-            for j in (jobs_data or []):
-                role_info = classify_role(j.get("title", ""))
-                if role_info.get("category") in ("primary", "adjacent"):
-                    relevant += 1
-        except:
-            pass
-
-    # Update candidate
-    if jobs_found > 0:
-        candidate["status"] = "ready_to_approve"
-        candidate["relevant_roles_count"] = relevant
-        candidate["total_jobs"] = jobs_found
-        candidate["supported"] = True
-        candidate["retry_result"] = f"{jobs_found} total, {relevant} PM/TPM"
-    else:
-        candidate["status"] = "no_relevant_roles"
-        candidate["retry_result"] = f"0 jobs (checked {ats}" + (f" + scanned website → {new_ats or 'nothing found'}" if not jobs_found else "") + ")"
-
-    candidate["retried_at"] = datetime.now().isoformat()
-
-    with open(staging_path, "w", encoding="utf-8") as f:
-        json.dump(candidates, f, indent=2, ensure_ascii=False)
-
-    return {
-        "ok": True,
-        "jobs_found": jobs_found,
-        "relevant": relevant,
-        "new_status": candidate["status"],
-        "ats_migrated": bool(new_ats),
-        "new_ats": new_ats or None,
-        "new_board": new_board or None,
-    }
-
-
-@app.post("/discovery/auto")
-def discovery_auto():
-    """
-    Full discovery pipeline: search → validate → preview.
-    Combines all steps into a single endpoint.
-    """
-    from tools.company_discovery import (
-        load_companies, load_staging, save_staging,
-        get_existing_ids, discover_via_ai, discover_from_seed_list,
-        validate_candidates, preview_relevant_roles,
-    )
-
-    results = {"steps": []}
-
-    # Step 1: Search
-    existing_ids = get_existing_ids()
-    existing_names = {c.get("name", "") for c in load_companies()}
-    candidates = load_staging()
-
-    new_candidates = []
-    ai_candidates = discover_via_ai(existing_ids, existing_names)
-    new_candidates.extend(ai_candidates)
-    seed_candidates = discover_from_seed_list(existing_ids)
-    new_candidates.extend(seed_candidates)
-
-    staging_ids = {c.get("id") for c in candidates}
-    added = 0
-    for nc in new_candidates:
-        if nc["id"] not in staging_ids:
-            candidates.append(nc)
-            staging_ids.add(nc["id"])
-            added += 1
-
-    save_staging(candidates)
-    results["steps"].append({"search": {"ai": len(ai_candidates), "seed": len(seed_candidates), "added": added}})
-
-    # Step 2: Validate
-    validated = validate_candidates(candidates)
-    save_staging(candidates)
-    supported = sum(1 for c in candidates if c.get("supported"))
-    results["steps"].append({"validate": {"validated": validated, "supported": supported}})
-
-    # Step 3: Preview
-    previewed = preview_relevant_roles(candidates)
-    save_staging(candidates)
-    ready = sum(1 for c in candidates if c.get("status") == "ready_to_approve")
-    results["steps"].append({"preview": {"previewed": previewed, "ready_to_approve": ready}})
-
-    results["ok"] = True
-    results["ready_to_approve"] = ready
-    results["total_staging"] = len(candidates)
-
-    return results
-
-
-@app.post("/discovery/builtin")
-def discovery_builtin(pages: int = 3):
-    """
-    Scrape tech companies from Built In NC area, detect their ATS,
-    and add new ones to discovery staging.
-    """
-    import re as _re
-    import requests
-    from bs4 import BeautifulSoup
-
-    base_url = "https://builtin.com/companies?city=Wake+Forest&state=North+Carolina&country=USA&longitude=-78.52796&latitude=35.92348&page={}"
-
-    staging_path = Path("data/discovered_companies.json")
-    companies_path = Path("data/companies.json")
-
-    # Load existing data
-    existing_companies = []
-    if companies_path.exists():
-        with open(companies_path) as f:
-            existing_companies = json.load(f)
-    existing_ids = {c.get("id", "").lower() for c in existing_companies}
-    existing_names = {c.get("name", "").lower() for c in existing_companies}
-
-    staging = []
-    if staging_path.exists():
-        with open(staging_path) as f:
-            staging = json.load(f)
-    staging_ids = {c.get("id", "").lower() for c in staging}
-
-    scraped = 0
-    new_candidates = 0
-    with_ats = 0
-    errors = []
-
-    for page_num in range(1, min(pages + 1, 6)):  # Max 5 pages
-        try:
-            print(f"[BuiltIn] Fetching page {page_num}...")
-            resp = requests.get(base_url.format(page_num), headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-                "Accept": "text/html"
-            }, timeout=15)
-            if resp.status_code != 200:
-                errors.append(f"Page {page_num}: HTTP {resp.status_code}")
-                continue
-
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # Find company links — pattern: /company/{slug}
-            company_links = soup.find_all("a", href=_re.compile(r"^/company/[a-z0-9-]+$"))
-            seen_on_page = set()
-
-            for link in company_links:
-                href = link.get("href", "")
-                slug = href.replace("/company/", "").strip("/")
-                if not slug or slug in seen_on_page:
-                    continue
-                seen_on_page.add(slug)
-                scraped += 1
-
-                # Get company name from link text
-                name = link.get_text(strip=True)
-                if not name or len(name) < 2:
-                    name = slug.replace("-", " ").title()
-
-                # Skip if already known
-                slug_lower = slug.lower()
-                name_lower = name.lower()
-                if slug_lower in existing_ids or name_lower in existing_names or slug_lower in staging_ids:
-                    continue
-
-                # Try to find careers page for this company
-                careers_url = ""
-                ats_detected = ""
-                board_url = ""
-                supported = False
-
-                # Strategy: probe common ATS APIs to find real job boards
-                clean_slug = slug.replace("-", "").lower()
-                name_nospace = name.replace(" ", "").lower()
-                name_slug = slug  # builtin slug is usually good
-
-                # ATS probes: (url_to_test, ats_type, board_url_template)
-                # Use actual API endpoints that return errors for non-existent companies
-                ats_probes = [
-                    # Greenhouse: API returns 404 for invalid boards
-                    (f"https://boards-api.greenhouse.io/v1/boards/{slug}/jobs", "greenhouse", f"https://boards.greenhouse.io/{slug}"),
-                    (f"https://boards-api.greenhouse.io/v1/boards/{clean_slug}/jobs", "greenhouse", f"https://boards.greenhouse.io/{clean_slug}"),
-                    # Lever: API returns 404 for invalid companies
-                    (f"https://api.lever.co/v0/postings/{slug}?limit=1", "lever", f"https://jobs.lever.co/{slug}"),
-                    (f"https://api.lever.co/v0/postings/{clean_slug}?limit=1", "lever", f"https://jobs.lever.co/{clean_slug}"),
-                    # Ashby: API returns actual job data or empty
-                    (f"https://api.ashbyhq.com/posting-api/job-board/{slug}", "ashby", f"https://jobs.ashbyhq.com/{slug}"),
-                    (f"https://api.ashbyhq.com/posting-api/job-board/{clean_slug}", "ashby", f"https://jobs.ashbyhq.com/{clean_slug}"),
-                    # SmartRecruiters: API returns jobs or 404
-                    (f"https://api.smartrecruiters.com/v1/companies/{name_nospace}/postings?limit=1", "smartrecruiters", f"https://jobs.smartrecruiters.com/{name_nospace}"),
-                ]
-                try:
-                    for probe_url, probe_ats, probe_board in ats_probes:
-                        try:
-                            resp_probe = requests.get(probe_url, timeout=6, headers={"Accept": "application/json"})
-                            if resp_probe.status_code == 200:
-                                # Verify it has actual content (not empty board)
-                                try:
-                                    probe_data = resp_probe.json()
-                                    has_jobs = False
-                                    if probe_ats == "greenhouse":
-                                        has_jobs = len(probe_data.get("jobs", [])) > 0
-                                    elif probe_ats == "lever":
-                                        has_jobs = len(probe_data) > 0 if isinstance(probe_data, list) else False
-                                    elif probe_ats == "ashby":
-                                        has_jobs = len(probe_data.get("jobs", [])) > 0
-                                    elif probe_ats == "smartrecruiters":
-                                        has_jobs = len(probe_data.get("content", [])) > 0
-
-                                    if has_jobs:
-                                        careers_url = probe_board
-                                        ats_detected = probe_ats
-                                        board_url = probe_board
-                                        supported = True
-                                        break
-                                except:
-                                    pass
-                        except:
-                            pass
-
-                    # If no probe worked, try Built In profile for ATS links
-                    if not careers_url:
-                        try:
-                            profile_resp = requests.get(f"https://builtin.com/company/{slug}", headers={
-                                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-                            }, timeout=10)
-                            if profile_resp.status_code == 200:
-                                profile_soup = BeautifulSoup(profile_resp.text, "html.parser")
-                                for a in profile_soup.find_all("a", href=True):
-                                    href_val = a.get("href", "")
-                                    if any(d in href_val for d in ["greenhouse.io", "lever.co", "myworkdayjobs.com", "smartrecruiters.com", "ashbyhq.com"]):
-                                        careers_url = href_val
-                                        ats_info = detect_ats_from_url(careers_url)
-                                        ats_detected = ats_info.get("ats", "unknown")
-                                        board_url = ats_info.get("board_url", "")
-                                        supported = ats_detected in list(ATS_PARSERS.keys())
-                                        break
-                        except:
-                            pass
-
-                except Exception as e:
-                    print(f"[BuiltIn] Error checking {name}: {e}")
-
-                # Create candidate
-                candidate = {
-                    "id": slug,
-                    "name": name,
-                    "careers_url": careers_url,
-                    "ats": ats_detected or "unknown",
-                    "board_url": board_url,
-                    "supported": supported,
-                    "industry": "",
-                    "tags": [],
-                    "hq_state": "NC",
-                    "discovery_source": "builtin",
-                    "builtin_url": f"https://builtin.com/company/{slug}",
-                    "status": "ready_to_approve" if supported else ("unsupported_ats" if ats_detected and ats_detected != "unknown" else "needs_careers_url"),
-                    "discovered_at": datetime.now().isoformat()
-                }
-                staging.append(candidate)
-                staging_ids.add(slug_lower)
-                new_candidates += 1
-                if supported:
-                    with_ats += 1
-                    print(f"[BuiltIn] ✅ {name}: {ats_detected} ({board_url})")
-                else:
-                    print(f"[BuiltIn] ⚪ {name}: {ats_detected or 'no ATS'}")
-
-        except Exception as e:
-            errors.append(f"Page {page_num}: {str(e)}")
-
-    # Save staging
-    with open(staging_path, "w", encoding="utf-8") as f:
-        json.dump(staging, f, ensure_ascii=False, indent=2)
-
-    print(f"[BuiltIn] Done: scraped={scraped}, new={new_candidates}, with_ats={with_ats}")
-    return {
-        "ok": True,
-        "scraped": scraped,
-        "new_candidates": new_candidates,
-        "with_ats": with_ats,
-        "errors": errors,
-        "total_staging": len(staging)
-    }
-
-
-@app.get("/profiles/{name}")
-async def get_profile_companies(name: str):
-    companies = load_profile(name)
-    result_companies = []
-    for c in companies:
-        result_companies.append({
-            "id": c.get("id"),
-            "name": c.get("name"),
-            "ats": c.get("ats", ""),
-            "board_url": c.get("board_url", ""),
-            "tags": c.get("tags", []),
-            "priority": c.get("priority", 0),
-            "hq_state": c.get("hq_state", None),
-            "region": c.get("region", None)
-        })
-    return {"count": len(result_companies), "companies": result_companies}
-
-
-@app.get("/debug/location_stats")
-async def location_stats(profile: str = Query("all")):
-    """
-    Возвращает статистику по нормализованным локациям вакансий для указанного профиля.
-    """
-    companies_cfg = load_profile(profile)
-
-    all_jobs: list[dict] = []
-    for cfg in companies_cfg:
-        jobs = _fetch_for_company(profile, cfg)
-        all_jobs.extend(jobs)
-
-    total_jobs = len(all_jobs)
-    remote_usa_count = 0
-    remote_global_count = 0
-    jobs_with_states_count = 0
-    states_counter = Counter()
-
-    for job in all_jobs:
-        loc_norm = job.get("location_norm", {}) or {}
-        if loc_norm.get("remote") and str(loc_norm.get("remote_scope")).lower() == "usa":
-            remote_usa_count += 1
-        if loc_norm.get("remote") and str(loc_norm.get("remote_scope")).lower() == "global":
-            remote_global_count += 1
-
-        states = loc_norm.get("states") or []
-        if states:
-            jobs_with_states_count += 1
-            states_counter.update([str(s).upper() for s in states if s])
-
-    top_20_states = states_counter.most_common(20)
+    top_20_states = states_counter.most_common(20)
 
     return {
         "total_jobs": total_jobs,
@@ -2675,14 +1851,11 @@ async def refresh_stream(profile: str = Query("all")):
     Wave 1: Fast ATS (greenhouse, lever, ashby, smartrecruiters) - quick results
     Wave 2: Slow ATS (workday) - parallel in background
     """
-    import asyncio
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    
     FAST_ATS = {"greenhouse", "lever", "ashby", "smartrecruiters"}
     SLOW_ATS = {"workday"}
     
     async def generate():
-        companies_cfg = load_profile(profile)
+        companies_cfg = await run_blocking(load_profile, profile)
         companies_cfg = [c for c in companies_cfg if c.get("enabled", True) != False]
         
         # Split into waves
@@ -2704,20 +1877,19 @@ async def refresh_stream(profile: str = Query("all")):
             yield f"data: {json.dumps({'type': 'loading', 'company': company_name, 'index': idx, 'total': total})}\n\n"
             
             try:
-                jobs = _fetch_for_company(profile, cfg)
+                jobs = await run_blocking(_fetch_for_company, profile, cfg)
                 all_jobs.extend(jobs)
                 yield f"data: {json.dumps({'type': 'ok', 'company': company_name, 'jobs': len(jobs), 'index': idx, 'total': total})}\n\n"
             except Exception as e:
                 yield f"data: {json.dumps({'type': 'error', 'company': company_name, 'error': str(e)[:100], 'index': idx, 'total': total})}\n\n"
             
             idx += 1
-            await asyncio.sleep(0.01)
         
         # Save intermediate cache (Wave 1 complete)
-        save_cache(profile, all_jobs)
+        await run_blocking(save_cache, profile, all_jobs)
         
         # Sync wave 1 to pipeline
-        sync_result = sync_cache_to_pipeline(all_jobs)
+        sync_result = await run_blocking(sync_cache_to_pipeline, all_jobs)
         yield f"data: {json.dumps({'type': 'wave_complete', 'wave': 1, 'jobs': len(all_jobs), 'pipeline_added': sync_result['added']})}"
         yield "\n\n"
         
@@ -2726,38 +1898,27 @@ async def refresh_stream(profile: str = Query("all")):
             yield f"data: {json.dumps({'type': 'wave', 'wave': 2, 'message': 'Slow ATS (Workday) - parallel'})}\n\n"
             
             def fetch_slow(cfg):
-                return cfg, _fetch_for_company(profile, cfg)
+                return _fetch_for_company(profile, cfg)
             
-            # Process in parallel with ThreadPoolExecutor
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                futures = {executor.submit(fetch_slow, cfg): cfg for cfg in wave2}
+            # Process in parallel (4 at a time) in the shared I/O executor
+            async for cfg, jobs, error in gather_blocking(fetch_slow, wave2, limit=4):
+                company_name = cfg.get("company", "") or cfg.get("name", "")
                 
-                for future in as_completed(futures):
-                    cfg = futures[future]
-                    company_name = cfg.get("company", "") or cfg.get("name", "")
-                    
-                    try:
-                        _, jobs = future.result()
-                        all_jobs.extend(jobs)
-                        yield f"data: {json.dumps({'type': 'ok', 'company': company_name, 'jobs': len(jobs), 'index': idx, 'total': total})}\n\n"
-                    except Exception as e:
-                        yield f"data: {json.dumps({'type': 'error', 'company': company_name, 'error': str(e)[:100], 'index': idx, 'total': total})}\n\n"
-                    
-                    idx += 1
+                if error is None:
+                    all_jobs.extend(jobs)
+                    yield f"data: {json.dumps({'type': 'ok', 'company': company_name, 'jobs': len(jobs), 'index': idx, 'total': total})}\n\n"
+                else:
+                    yield f"data: {json.dumps({'type': 'error', 'company': company_name, 'error': str(error)[:100], 'index': idx, 'total': total})}\n\n"
+                
+                idx += 1
             
             # Save final cache
-            save_cache(profile, all_jobs)
+            await run_blocking(save_cache, profile, all_jobs)
         
-        # Save stats
-        from utils.cache_manager import save_stats
-        role_jobs = [j for j in all_jobs if j.get("role_family") in ["product", "tpm_program", "project"]]
-        us_jobs = [j for j in role_jobs if j.get("location_norm", {}).get("state") or j.get("location_norm", {}).get("remote")]
-        my_area_jobs = [j for j in us_jobs if j.get("geo_bucket") in ["local", "nc_other", "neighbor", "remote_usa"]]
-        save_stats(len(all_jobs), len(role_jobs), len(us_jobs), len(my_area_jobs))
+        # Stats: save_cache() above already recomputes stats.json (compute_and_save_stats)
         
         # Sync to pipeline (jobs.json)
-        sync_result = sync_cache_to_pipeline(all_jobs)
+        sync_result = await run_blocking(sync_cache_to_pipeline, all_jobs)
         yield f"data: {json.dumps({'type': 'sync', 'added': sync_result['added'], 'updated': sync_result['updated']})}"
         yield "\n\n"
         
@@ -2964,820 +2125,35 @@ def browse_cache_jobs(
         "has_next": end < total
     }
 
-@app.get("/pipeline/stats")
-def pipeline_stats_endpoint():
-    """Get pipeline statistics"""
-    return get_job_stats()
 
+# ============= SYNC DEV->PROD ENDPOINT =============
 
-@app.get("/jobs/review")
-def get_review_jobs(
-    date: str = Query(None, description="Filter by date (YYYY-MM-DD)"),
-    category: str = Query("unknown", description="unknown / excluded / all"),
-    search: str = Query("", description="Search in title, company, location"),
-    page: int = Query(1, ge=1, description="Page number (1-indexed)"),
-    limit: int = Query(100, ge=10, le=500, description="Jobs per page"),
-):
+@app.post("/sync-to-prod")
+def sync_to_prod_endpoint():
     """
-    Get Unknown + Excluded jobs with server-side pagination.
-    Much faster than loading all 7500 jobs.
+    Sync data from DEV to PROD.
+    Only available in DEV environment.
     """
-    # Load from cache
-    cache_key = "all"
-    cached = load_cache(cache_key, ignore_ttl=True)
-    
-    if not cached:
-        return {"error": "Cache not loaded. Run /jobs?refresh=true first.", "jobs": [], "total": 0}
+    if ENV != "DEV":
+        return {"ok": False, "error": "Only available in DEV environment"}
     
-    all_jobs = cached.get("jobs", [])
+    try:
+        from sync_to_prod import sync_companies, sync_jobs
+        
+        companies_result = sync_companies()
+        jobs_result = sync_jobs()
+        
+        return {
+            "ok": True,
+            "companies": companies_result,
+            "jobs": jobs_result,
+            "synced_at": datetime.now(timezone.utc).isoformat()
+        }
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
 
-    # Apply date filter
-    if date:
-        all_jobs = [j for j in all_jobs if str(j.get("updated_at", ""))[:10] == date]
-    
-    # Filter by role_category (unknown or excluded)
-    def get_category(job):
-        if job.get("role_category"):
-            return job["role_category"]
-        if job.get("role_excluded"):
-            return "excluded"
-        if job.get("role_id"):
-            return "primary"
-        return "unknown"
-    
-    if category == "all":
-        filtered = [j for j in all_jobs if get_category(j) in ["unknown", "excluded"]]
-    else:
-        filtered = [j for j in all_jobs if get_category(j) == category]
-    
-    # Filter by search
-    if search:
-        search_lower = search.lower()
-        filtered = [
-            j for j in filtered
-            if search_lower in (j.get("title", "") + " " + j.get("company", "") + " " + j.get("location", "")).lower()
-        ]
-    
-    # Pagination
-    total = len(filtered)
-    total_pages = (total + limit - 1) // limit  # ceiling division
-    start = (page - 1) * limit
-    end = start + limit
-    page_jobs = filtered[start:end]
-    
-    # Check which jobs are already in pipeline
-    pipeline_ids = get_all_job_ids()
-    for job in page_jobs:
-        job["in_pipeline"] = job.get("id") in pipeline_ids
-    
-    return {
-        "jobs": page_jobs,
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "total_pages": total_pages,
-        "has_next": page < total_pages,
-        "has_prev": page > 1,
-    }
 
-
-@app.get("/pipeline/all")
-def pipeline_all_endpoint(
-    date: str = Query(None, description="Filter by first_seen date (YYYY-MM-DD)"),
-    category: str = Query(None, description="Filter by role_category (primary/adjacent)"),
-    location: str = Query(None, description="Filter by location (us/nc/neighbor/remote)")
-):
-    """Get ALL jobs from storage with optional filters"""
-    all_jobs = get_all_jobs()
-    
-    # Apply date filter (by first_seen - when job was added to pipeline)
-    if date:
-        all_jobs = [j for j in all_jobs if str(j.get("first_seen", ""))[:10] == date]
-    
-    # Apply category filter
-    if category:
-        all_jobs = [j for j in all_jobs if j.get("role_category") == category]
-    
-    # Apply location filter
-    if location:
-        neighbor_states = {"VA", "SC", "GA", "TN"}
-        filtered = []
-        for j in all_jobs:
-            ln = j.get("location_norm", {}) or {}
-            state = (ln.get("state") or "").upper()
-            is_remote = ln.get("remote", False)
-            
-            if location == "us" and (state or is_remote):
-                filtered.append(j)
-            elif location == "nc" and state == "NC":
-                filtered.append(j)
-            elif location == "neighbor" and state in neighbor_states:
-                filtered.append(j)
-            elif location == "remote" and is_remote:
-                filtered.append(j)
-        all_jobs = filtered
-    
-    # Normalize folder_path to use ~/ for portability
-    import os
-    home = os.path.expanduser("~")
-    for j in all_jobs:
-        fp = j.get("folder_path", "")
-        if fp:
-            # Replace any /Users/xxx/ with ~/
-            if fp.startswith("/Users/"):
-                parts = fp.split("/")
-                if len(parts) > 2:
-                    j["folder_path"] = "~/" + "/".join(parts[3:])
-    
-    stats = get_job_stats()
-    from fastapi.responses import JSONResponse
-    return JSONResponse(
-        content={
-            "count": len(all_jobs),
-            "jobs": all_jobs,
-            "breakdown": stats["status_breakdown"]
-        },
-        headers={"Cache-Control": "no-store, no-cache, must-revalidate, max-age=0"}
-    )
-
-
-
-@app.get("/pipeline/new")
-def pipeline_new_endpoint():
-    """Get new (inbox) jobs"""
-    jobs = get_jobs_by_status(STATUS_NEW)
-    return {"count": len(jobs), "jobs": jobs}
-
-
-@app.get("/pipeline/active")
-def pipeline_active_endpoint():
-    """Get active pipeline jobs (Applied, Interview)"""
-    jobs = get_jobs_by_statuses({STATUS_APPLIED, STATUS_INTERVIEW, STATUS_CLOSED})
-    return {"count": len(jobs), "jobs": jobs}
-
-
-@app.get("/pipeline/archive")
-def pipeline_archive_endpoint():
-    """Get archived jobs (Rejected, Offer, Withdrawn)"""
-    jobs = get_archive_jobs()
-    return {"count": len(jobs), "jobs": jobs}
-
-
-class PipelineAddJob(BaseModel):
-    job: dict
-
-
-@app.post("/pipeline/add")
-def pipeline_add_job_endpoint(payload: PipelineAddJob):
-    """
-    Manually add a job to pipeline (for Unknown/Excluded jobs).
-    """
-    job = payload.job.copy()  # Don't modify original
-    job_id = job.get("id")
-    
-    if not job_id:
-        return {"ok": False, "error": "Job must have an id"}
-    
-    # Check if already in pipeline
-    existing = get_job_by_id(job_id)
-    if existing:
-        return {"ok": False, "error": "Job already in pipeline"}
-    
-    # Mark as manually added
-    job["source"] = "manual"
-    
-    # Add to pipeline
-    added = add_job(job)
-    
-    if added:
-        return {"ok": True, "job": job}
-    else:
-        return {"ok": False, "error": "Job already exists"}
-
-
-@app.delete("/pipeline/remove/{job_id}")
-def pipeline_remove_job_endpoint(job_id: str):
-    """
-    Remove a job from pipeline (for manual jobs).
-    Only removes jobs with source='manual'.
-    """
-    job = get_job_by_id(job_id)
-    
-    if not job:
-        return {"ok": False, "error": "Job not found"}
-    
-    # Only allow removing manual jobs
-    if job.get("source") != "manual":
-        return {"ok": False, "error": "Can only remove manually added jobs"}
-    
-    # Remove from jobs_new.json
-    try:
-        jobs_new_path = Path("data/jobs_new.json")
-        with open(jobs_new_path, "r") as f:
-            jobs = json.load(f)
-        
-        original_len = len(jobs)
-        jobs = [j for j in jobs if j.get("id") != job_id]
-        
-        if len(jobs) == original_len:
-            return {"ok": False, "error": "Job not found in storage"}
-        
-        with open(jobs_new_path, "w") as f:
-            json.dump(jobs, f, indent=2)
-        
-        return {"ok": True, "removed": job_id}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-
-class PipelineStatusUpdate(BaseModel):
-    job_id: str
-    status: str
-    notes: str = ""
-    folder_path: str = ""
-
-
-@app.post("/pipeline/status")
-def pipeline_status_update_endpoint(payload: PipelineStatusUpdate):
-    """
-    Update job status in pipeline.
-    Valid statuses: New, Selected, Ready, Applied, Interview, Offer, Rejected, Withdrawn, Closed
-    """
-    # Accept both capitalized and lowercase status values
-    status_map = {
-        "new": "new", "New": "new",
-        "selected": "Selected", "Selected": "Selected",
-        "ready": "Ready", "Ready": "Ready",
-        "applied": "applied", "Applied": "applied",
-        "interview": "interview", "Interview": "interview",
-        "offer": "offer", "Offer": "offer",
-        "rejected": "rejected", "Rejected": "rejected",
-        "excluded": "excluded", "Excluded": "excluded",
-        "withdrawn": "withdrawn", "Withdrawn": "withdrawn",
-        "closed": "closed", "Closed": "closed",
-    }
-    
-    normalized_status = status_map.get(payload.status)
-    if not normalized_status:
-        return {"ok": False, "error": f"Invalid status: {payload.status}"}
-    
-    job = job_update_status(payload.job_id, normalized_status, payload.notes, payload.folder_path)
-    
-    if job:
-        # Auto-parse JD and run match scoring when status changes to Selected
-        if normalized_status == "Selected":
-            jd_text_for_scoring = None
-
-            # Step 1: Parse JD if not yet done
-            if not job.get("jd_summary"):
-                try:
-                    from parsers.jd_parser import parse_and_store_jd, has_jd
-                    job_url = job.get("job_url") or job.get("url") or ""
-                    if job_url and not has_jd(payload.job_id):
-                        print(f"[Pipeline] Auto-parsing JD for {job.get('company')} - {job.get('title')}")
-                        result = parse_and_store_jd(
-                            job_id=payload.job_id,
-                            url=job_url,
-                            title=job.get("title", ""),
-                            company=job.get("company", ""),
-                            ats=job.get("ats", "greenhouse")
-                        )
-                        if result.get("ok") and result.get("summary"):
-                            job["jd_summary"] = result["summary"]
-                            jd_text_for_scoring = result.get("jd_text", "")
-                            job_update_status(payload.job_id, normalized_status, payload.notes, payload.folder_path, jd_summary=result["summary"])
-                except Exception as e:
-                    print(f"[Pipeline] JD parsing failed: {e}")
-
-            # Step 2: Run match scoring if JD exists but no score yet
-            if not job.get("match_score") and job.get("jd_summary"):
-                try:
-                    from api.prepare_application import analyze_job_with_ai
-                    # Get JD text - either from fresh parse or from stored file
-                    if not jd_text_for_scoring:
-                        from parsers.jd_parser import get_stored_jd
-                        jd_text_for_scoring = get_stored_jd(payload.job_id) or ""
-                    if jd_text_for_scoring and len(jd_text_for_scoring) > 100:
-                        role_family = job.get("role_family", "tpm_program")
-                        print(f"[Pipeline] Auto-scoring match for {job.get('company')} - {job.get('title')}")
-                        analysis = analyze_job_with_ai(job.get("title", ""), job.get("company", ""), jd_text_for_scoring, role_family)
-                        if analysis and "match_score" in analysis:
-                            job["match_score"] = analysis["match_score"]
-                            job["analysis"] = analysis
-                            # Save match score
-                            from storage.job_storage import _load_jobs, _save_jobs
-                            all_jobs = _load_jobs()
-                            for j in all_jobs:
-                                if j.get("id") == payload.job_id:
-                                    j["match_score"] = analysis["match_score"]
-                                    j["analysis"] = analysis
-                                    break
-                            _save_jobs(all_jobs)
-                            print(f"[Pipeline] Match score: {analysis['match_score']}%")
-                except Exception as e:
-                    print(f"[Pipeline] Match scoring failed: {e}")
-        
-        return {"ok": True, "job": job}
-    else:
-        return {"ok": False, "error": "Job not found"}
-
-
-@app.get("/pipeline/job/{job_id}")
-def pipeline_get_job_endpoint(job_id: str):
-    """Get job by ID from any storage"""
-    job = get_job_by_id(job_id)
-    if job:
-        return {"ok": True, "job": job}
-    else:
-        return {"ok": False, "error": "Job not found"}
-
-
-@app.post("/pipeline/enrich/{job_id}")
-def enrich_job_endpoint(job_id: str):
-    """
-    Enrich a pipeline job with extra data from ATS job detail API.
-    Currently supports Workday: fetches deadline, salary, posted date.
-    """
-    from storage.job_storage import get_job_by_id, _load_jobs, _save_jobs
-
-    job = get_job_by_id(job_id)
-    if not job:
-        return {"ok": False, "error": "Job not found"}
-
-    ats = job.get("ats", "")
-    job_url = job.get("job_url") or job.get("url", "")
-
-    if ats == "workday" and "myworkdayjobs.com" in job_url:
-        from parsers.workday import fetch_workday_job_detail
-        detail = fetch_workday_job_detail(job_url)
-        if detail:
-            # Update job in storage
-            jobs = _load_jobs()
-            for j in jobs:
-                if j.get("id") == job_id:
-                    if detail.get("deadline"):
-                        j["deadline"] = detail["deadline"]
-                    if detail.get("start_date") and not j.get("updated_at"):
-                        j["updated_at"] = detail["start_date"]
-                        j["first_published"] = detail["start_date"]
-                    if detail.get("time_left"):
-                        j["time_left"] = detail["time_left"]
-                    if detail.get("salary_range"):
-                        j["salary_range"] = detail["salary_range"]
-                    if detail.get("posted_on"):
-                        j["posted_on_raw"] = detail["posted_on"]
-                    j["enriched"] = True
-                    _save_jobs(jobs)
-                    return {"ok": True, "enriched": detail, "job": j}
-            return {"ok": False, "error": "Job not found in storage"}
-        return {"ok": False, "error": "Could not fetch job details from Workday"}
-
-    return {"ok": False, "error": f"Enrichment not supported for ATS: {ats}"}
-
-
-@app.post("/pipeline/enrich-batch")
-def enrich_batch_endpoint(background_tasks: BackgroundTasks):
-    """
-    Batch enrich all unenriched Workday jobs in pipeline.
-    Runs in background to avoid timeout.
-    """
-    from storage.job_storage import _load_jobs, _save_jobs
-
-    jobs = _load_jobs()
-    to_enrich = [j for j in jobs if j.get("ats") == "workday"
-                 and not j.get("enriched")
-                 and "myworkdayjobs.com" in (j.get("job_url") or j.get("url", ""))]
-
-    if not to_enrich:
-        return {"ok": True, "message": "No jobs to enrich", "total": 0}
-
-    def _do_batch_enrich():
-        import time
-        from parsers.workday import fetch_workday_job_detail
-        from storage.job_storage import _load_jobs as load_j, _save_jobs as save_j
-
-        all_jobs = load_j()
-        job_map = {j.get("id"): j for j in all_jobs}
-        enriched_count = 0
-        error_count = 0
-
-        for target in to_enrich:
-            job_id = target.get("id")
-            job_url = target.get("job_url") or target.get("url", "")
-            try:
-                detail = fetch_workday_job_detail(job_url, timeout=10)
-                if detail and job_id in job_map:
-                    j = job_map[job_id]
-                    if detail.get("deadline"):
-                        j["deadline"] = detail["deadline"]
-                    if detail.get("start_date") and not j.get("updated_at"):
-                        j["updated_at"] = detail["start_date"]
-                        j["first_published"] = detail["start_date"]
-                    if detail.get("time_left"):
-                        j["time_left"] = detail["time_left"]
-                    if detail.get("salary_range"):
-                        j["salary_range"] = detail["salary_range"]
-                    j["enriched"] = True
-                    enriched_count += 1
-                else:
-                    error_count += 1
-            except Exception:
-                error_count += 1
-            time.sleep(0.5)
-
-            # Save every 20 jobs
-            if (enriched_count + error_count) % 20 == 0:
-                save_j(list(job_map.values()))
-                print(f"[Enrich] Progress: {enriched_count} enriched, {error_count} errors")
-
-        save_j(list(job_map.values()))
-        print(f"[Enrich] Done: {enriched_count} enriched, {error_count} errors out of {len(to_enrich)}")
-
-    background_tasks.add_task(_do_batch_enrich)
-    return {"ok": True, "message": f"Enriching {len(to_enrich)} Workday jobs in background", "total": len(to_enrich)}
-
-
-@app.post("/pipeline/fetch-jd-batch")
-def fetch_jd_batch_endpoint(background_tasks: BackgroundTasks, limit: int = Query(default=200)):
-    """
-    Batch fetch JD text from ATS APIs. FREE, no Claude API calls.
-    Downloads JD HTML/text and saves to data/jd/{job_id}.txt
-    """
-    from storage.job_storage import _load_jobs
-    from parsers.jd_parser import fetch_jd_from_url
-
-    jd_dir = Path("data/jd")
-    jd_dir.mkdir(exist_ok=True)
-    cached = {f.stem for f in jd_dir.glob("*.txt")}
-
-    jobs = _load_jobs()
-    to_fetch = [
-        j for j in jobs
-        if j.get("id") and j["id"] not in cached
-        and (j.get("job_url") or j.get("url"))
-        and j.get("role_category") in ("primary", "adjacent")
-    ]
-    # Newest first
-    to_fetch.sort(key=lambda j: j.get("first_seen") or j.get("added_at") or "", reverse=True)
-    batch = to_fetch[:limit]
-
-    if not batch:
-        return {"ok": True, "message": "All JDs already cached", "total": 0, "cached": len(cached)}
-
-    def _do_fetch():
-        import time
-        success = 0
-        errors = 0
-        for job in batch:
-            job_id = job.get("id", "")
-            url = job.get("job_url") or job.get("url", "")
-            ats = job.get("ats", "")
-            try:
-                jd_text = fetch_jd_from_url(url, ats)
-                if jd_text and len(jd_text) > 50:
-                    (jd_dir / f"{job_id}.txt").write_text(jd_text, encoding="utf-8")
-                    success += 1
-                else:
-                    errors += 1
-            except Exception:
-                errors += 1
-            time.sleep(0.3)
-        print(f"[FetchJD] Done: {success} success, {errors} errors")
-
-    background_tasks.add_task(_do_fetch)
-    return {
-        "ok": True,
-        "message": f"Fetching {len(batch)} JDs in background (FREE)",
-        "total": len(batch),
-        "remaining": len(to_fetch) - len(batch),
-        "cached": len(cached),
-    }
-
-
-@app.post("/pipeline/kw-score")
-def kw_score_endpoint():
-    """
-    Run keyword scorer on all pipeline jobs. FREE, no API calls.
-    Uses cached JD text files if available, otherwise title+location only.
-    """
-    from utils.job_scorer import score_jobs_batch
-    from storage.job_storage import _load_jobs, _save_jobs
-
-    jobs = _load_jobs()
-    unscored = [j for j in jobs if not j.get("kw_score")]
-    if not unscored:
-        return {"ok": True, "message": "All jobs already scored", "total": 0}
-
-    score_jobs_batch(unscored)
-    scored = sum(1 for j in unscored if j.get("kw_score"))
-
-    # Merge back
-    job_map = {j["id"]: j for j in unscored if j.get("id")}
-    for j in jobs:
-        if j.get("id") in job_map:
-            j.update(job_map[j["id"]])
-    _save_jobs(jobs)
-
-    from collections import Counter
-    recs = Counter(j.get("kw_recommendation", "?") for j in unscored if j.get("kw_score"))
-    return {
-        "ok": True,
-        "message": f"Scored {scored} jobs",
-        "total": scored,
-        "apply": recs.get("APPLY", 0),
-        "consider": recs.get("CONSIDER", 0),
-        "skip": recs.get("SKIP", 0),
-    }
-
-
-@app.post("/pipeline/match-batch")
-def match_batch_endpoint(background_tasks: BackgroundTasks, limit: int = Query(default=50), days: int = Query(default=0)):
-    """
-    Batch compute match scores for pipeline jobs without scores.
-    Parses JD from URL and runs AI analysis against CV.
-    limit: max jobs to process (default 50, each costs ~1 API call)
-    days: only score jobs added in last N days (0 = all)
-    """
-    from storage.job_storage import _load_jobs
-    from datetime import datetime, timedelta
-
-    jobs = _load_jobs()
-    to_score = [j for j in jobs if j.get("status") == "new"
-                and not j.get("match_score")
-                and (j.get("job_url") or j.get("url"))
-                and j.get("role_category") in ["primary", "adjacent"]]
-
-    # Filter by recency if days specified
-    if days > 0:
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-        to_score = [j for j in to_score if (j.get("added_at") or j.get("first_published") or "") >= cutoff]
-
-    # Limit to prevent excessive API costs
-    batch = to_score[:limit]
-    if not batch:
-        return {"ok": True, "message": "No jobs to score", "total": 0, "remaining": 0}
-
-    def _do_batch_match():
-        import time
-        from parsers.jd_parser import parse_and_store_jd
-        from api.prepare_application import analyze_job_with_ai
-        from storage.job_storage import _load_jobs as load_j, _save_jobs as save_j
-
-        all_jobs = load_j()
-        job_map = {j.get("id"): j for j in all_jobs}
-        scored = 0
-        errors = 0
-
-        for target in batch:
-            job_id = target.get("id")
-            job_url = target.get("job_url") or target.get("url", "")
-            title = target.get("title", "")
-            company = target.get("company", "")
-            ats = target.get("ats", "")
-
-            try:
-                # Step 1: Parse JD
-                result = parse_and_store_jd(
-                    job_id=job_id, url=job_url,
-                    title=title, company=company, ats=ats
-                )
-                if not result.get("ok"):
-                    errors += 1
-                    continue
-
-                jd_text = result.get("jd_text", "")
-                if not jd_text or len(jd_text) < 100:
-                    errors += 1
-                    continue
-
-                # Save jd_summary
-                if job_id in job_map:
-                    job_map[job_id]["jd_summary"] = result.get("summary", {})
-
-                # Step 2: AI match analysis
-                role_family = target.get("role_family", "tpm_program")
-                analysis = analyze_job_with_ai(title, company, jd_text, role_family)
-
-                if analysis and "match_score" in analysis:
-                    if job_id in job_map:
-                        job_map[job_id]["match_score"] = analysis["match_score"]
-                        job_map[job_id]["analysis"] = analysis
-                        scored += 1
-                        print(f"[Match] {company} | {title[:40]} → {analysis['match_score']}%")
-                else:
-                    errors += 1
-
-            except Exception as e:
-                print(f"[Match] Error for {job_id}: {e}")
-                errors += 1
-
-            time.sleep(0.3)  # Rate limit (Haiku is fast)
-
-            # Save every 20 jobs
-            if (scored + errors) % 20 == 0:
-                save_j(list(job_map.values()))
-                print(f"[Match] Progress: {scored} scored, {errors} errors")
-
-        save_j(list(job_map.values()))
-        print(f"[Match] Done: {scored} scored, {errors} errors out of {len(batch)}")
-
-    background_tasks.add_task(_do_batch_match)
-    return {
-        "ok": True,
-        "message": f"Scoring {len(batch)} jobs in background",
-        "total": len(batch),
-        "remaining": len(to_score) - len(batch)
-    }
-
-
-class ParseJDRequest(BaseModel):
-    job_id: str
-    url: str
-    title: str
-    company: str
-    ats: str = "greenhouse"
-
-
-@app.post("/jd/parse")
-def parse_jd_endpoint(payload: ParseJDRequest):
-    """
-    Parse job description from URL and extract structured summary.
-    Saves full text to data/jd/{job_id}.txt and returns summary.
-    """
-    try:
-        from parsers.jd_parser import parse_and_store_jd
-        
-        result = parse_and_store_jd(
-            job_id=payload.job_id,
-            url=payload.url,
-            title=payload.title,
-            company=payload.company,
-            ats=payload.ats
-        )
-        
-        if result.get("ok"):
-            # Initialize variables
-            match_score = None
-            analysis = None
-
-            # Update job in storage with jd_summary
-            job = get_job_by_id(payload.job_id)
-            if job:
-                # Use storage function to save jd_summary
-                from storage.job_storage import update_jd_summary, _load_jobs, _save_jobs
-                update_jd_summary(payload.job_id, result["summary"])
-
-                jd_text = result.get("jd_text", "")
-                if jd_text and len(jd_text) > 100:
-                    try:
-                        from api.prepare_application import analyze_job_with_ai
-                        role_family = job.get("role_family", "tpm_program")
-                        analysis = analyze_job_with_ai(payload.title, payload.company, jd_text, role_family)
-                        if analysis and "match_score" in analysis:
-                            match_score = analysis["match_score"]
-                            # Save match_score to job
-                            jobs = _load_jobs()
-                            for j in jobs:
-                                if j.get("id") == payload.job_id:
-                                    j["match_score"] = match_score
-                                    j["analysis"] = analysis
-                                    break
-                            _save_jobs(jobs)
-                    except Exception as e:
-                        print(f"AI analysis error: {e}")
-
-            return {
-                "ok": True,
-                "summary": result["summary"],
-                "jd_preview": result.get("jd_text", "")[:500] + "...",
-                "match_score": match_score,
-                "analysis": analysis
-            }
-        else:
-            return {"ok": False, "error": result.get("error", "Unknown error")}
-            
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-
-@app.get("/jd/{job_id}")
-def get_jd_endpoint(job_id: str):
-    """Get stored JD for a job"""
-    try:
-        from parsers.jd_parser import get_stored_jd, has_jd
-        
-        if not has_jd(job_id):
-            return {"ok": False, "error": "JD not found"}
-        
-        jd_text = get_stored_jd(job_id)
-        job = get_job_by_id(job_id)
-        
-        return {
-            "ok": True,
-            "jd_text": jd_text,
-            "summary": job.get("jd_summary") if job else None
-        }
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-
-@app.get("/job/find-by-url")
-def find_job_by_url_endpoint(url: str = Query(..., description="Job URL to search")):
-    """
-    Search for a job by URL in all storages (pipeline, cache, etc.)
-    Returns job if found, or not_found status.
-    """
-    url = url.strip()
-    if not url:
-        return {"ok": False, "error": "URL is required"}
-    
-    # Normalize URL for comparison
-    from urllib.parse import urlparse, parse_qs
-    parsed = urlparse(url)
-    
-    # Extract job ID from URL based on ATS patterns
-    job_id = None
-    qs = parse_qs(parsed.query)
-    
-    # Greenhouse: gh_jid parameter, token parameter, or /jobs/NUMBER
-    if "gh_jid" in url:
-        job_id = qs.get("gh_jid", [None])[0]
-    elif "token" in qs:
-        # Greenhouse embed format: ?token=7404427&for=coinbase
-        job_id = qs.get("token", [None])[0]
-    elif "/jobs/" in parsed.path:
-        # Extract number from path like /jobs/12345
-        import re
-        match = re.search(r'/jobs/(\d+)', parsed.path)
-        if match:
-            job_id = match.group(1)
-    
-    # Lever: last segment of path
-    if "lever.co" in parsed.netloc:
-        job_id = parsed.path.rstrip('/').split('/')[-1]
-    
-    # SmartRecruiters: last segment
-    if "smartrecruiters.com" in parsed.netloc:
-        job_id = parsed.path.rstrip('/').split('/')[-1]
-    
-    # Search in all jobs
-    all_jobs = get_all_jobs()
-    
-    for job in all_jobs:
-        job_url = job.get("job_url", "") or job.get("url", "")
-        ats_job_id = str(job.get("ats_job_id", ""))
-        
-        # Skip jobs without URL
-        if not job_url:
-            continue
-        
-        # Match by exact URL
-        if url in job_url or job_url in url:
-            return {"ok": True, "found": True, "job": job}
-        
-        # Match by job ID
-        if job_id and ats_job_id == job_id:
-            return {"ok": True, "found": True, "job": job}
-    
-    return {"ok": True, "found": False, "message": "Job not found in database"}
-
-
-@app.get("/pipeline/attention")
-def pipeline_attention_endpoint():
-    """Get jobs that need attention (Closed, etc.)"""
-    all_jobs = get_all_jobs()
-    attention = [j for j in all_jobs if j.get("needs_attention")]
-    return {"count": len(attention), "jobs": attention}
-
-
-# ============= SYNC DEV->PROD ENDPOINT =============
-
-@app.post("/sync-to-prod")
-def sync_to_prod_endpoint():
-    """
-    Sync data from DEV to PROD.
-    Only available in DEV environment.
-    """
-    if ENV != "DEV":
-        return {"ok": False, "error": "Only available in DEV environment"}
-    
-    try:
-        from sync_to_prod import sync_companies, sync_jobs
-        
-        companies_result = sync_companies()
-        jobs_result = sync_jobs()
-        
-        return {
-            "ok": True,
-            "companies": companies_result,
-            "jobs": jobs_result,
-            "synced_at": datetime.now(timezone.utc).isoformat()
-        }
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-
-# ============= ONBOARDING ENDPOINTS =============
+# ============= ONBOARDING ENDPOINTS =============
 
 import re
 from urllib.parse import urlparse
@@ -4223,9 +2599,9 @@ def onboard_job(payload: OnboardRequest):
             "region": "global",
             "enabled": ats_supported  # Only enable for supported ATS
         }
-        companies.append(new_company)
-        with open(companies_path, "w") as f:
-            json.dump(companies, f, indent=2, ensure_ascii=False)
+        with companies_update(companies_path) as companies:
+            if not any(c.get("id") == company_slug for c in companies):  # re-check under the lock
+                companies.append(new_company)
 
         # If ATS is supported, trigger initial parsing of all company jobs
         if ats_supported:
@@ -4385,20 +2761,30 @@ class AnalyzeJobUrlRequest(BaseModel):
 
 class ClearAnalysisCacheRequest(BaseModel):
     url: Optional[str] = None  # If None, clears all cache
+    expired_only: bool = False  # With url=None: only drop entries past TTL
+
+# Cache for job analysis results: bounded LRU + TTL, write-through to data/analysis_cache/
+from utils.analysis_cache import AnalysisCache
+_analysis_cache = AnalysisCache()
+# Локальный keyword-анализ дешёвый: своё маленькое LRU в памяти, не вытесняет платные AI-результаты
+_keyword_cache = AnalysisCache(cache_dir=None, max_entries=100)
+
+
+def _analysis_cache_key(url: str) -> str:
+    """Normalize URL for cache key (remove tracking params)"""
+    import hashlib
+    cache_url = url.split('?')[0].lower().rstrip('/')
+    return hashlib.md5(cache_url.encode()).hexdigest()
 
-# Cache for job analysis results (in-memory, clears on restart)
-_analysis_cache = {}
 
 @app.post("/analyze-job-url")
 async def analyze_job_url_endpoint(payload: AnalyzeJobUrlRequest):
     """
     Analyze a job URL before adding to pipeline.
     Returns match score and recommendation.
-    Results are cached to ensure consistent responses.
+    Results are cached to ensure consistent responses; concurrent requests
+    for the same URL share one fetch + AI call.
     """
-    from api.prepare_application import analyze_job_with_ai
-    import hashlib
-
     url = payload.url.strip()
 
     # Detect thank-you/confirmation/application pages - these are NOT job postings
@@ -4425,14 +2811,17 @@ async def analyze_job_url_endpoint(payload: AnalyzeJobUrlRequest):
             "url": url
         }
 
-    # Normalize URL for cache key (remove tracking params)
-    cache_url = url.split('?')[0].lower().rstrip('/')
-    cache_key = hashlib.md5(cache_url.encode()).hexdigest()
+    # Only successful analyses are cached; errors are retried on the next request
+    return await _analysis_cache.get_or_compute(
+        _analysis_cache_key(url),
+        lambda: run_blocking(_analyze_job_url, url),
+        cacheable=lambda r: bool(r.get("ok")),
+    )
+
 
-    # Check cache first
-    if cache_key in _analysis_cache:
-        print(f"[AnalyzeJobUrl] Cache hit for {cache_url[:50]}...")
-        return _analysis_cache[cache_key]
+def _analyze_job_url(url: str) -> dict:
+    """Fetch + parse + AI analysis for /analyze-job-url (blocking, runs in a worker thread)."""
+    from api.prepare_application import analyze_job_with_ai
 
     # 1. Parse URL to get job data
     job_data = None
@@ -4852,10 +3241,7 @@ async def analyze_job_url_endpoint(payload: AnalyzeJobUrlRequest):
         "application_info": application_info if application_info else None
     }
     
-    # Cache successful result
-    _analysis_cache[cache_key] = result
-    print(f"[AnalyzeJobUrl] Cached result for {cache_url[:50]}... (score: {score}%)")
-
+    print(f"[AnalyzeJobUrl] Analyzed {url[:50]}... (score: {score}%)")
     return result
 
 
@@ -4864,29 +3250,33 @@ def clear_analysis_cache_endpoint(payload: ClearAnalysisCacheRequest):
     """
     Clear the analysis cache for a specific URL or all cached results.
     Use this when re-analyzing a job or clearing stale cached results.
+    expired_only=true drops only entries past their TTL (memory + disk).
     """
-    import hashlib
-    global _analysis_cache
-
     if payload.url:
         # Clear specific URL
         cache_url = payload.url.split('?')[0].lower().rstrip('/')
-        cache_key = hashlib.md5(cache_url.encode()).hexdigest()
-
-        if cache_key in _analysis_cache:
-            del _analysis_cache[cache_key]
+        if _analysis_cache.delete(_analysis_cache_key(payload.url)):
             print(f"[ClearCache] Cleared cache for {cache_url[:50]}...")
             return {"ok": True, "cleared": 1, "message": f"Cleared cache for {cache_url}"}
         else:
             return {"ok": True, "cleared": 0, "message": "URL not in cache"}
+    elif payload.expired_only:
+        count = _analysis_cache.prune_expired()
+        print(f"[ClearCache] Pruned {count} expired cached results")
+        return {"ok": True, "cleared": count, "message": f"Pruned {count} expired cached results"}
     else:
         # Clear all cache
-        count = len(_analysis_cache)
-        _analysis_cache = {}
+        count = _analysis_cache.clear()
         print(f"[ClearCache] Cleared all {count} cached results")
         return {"ok": True, "cleared": count, "message": f"Cleared all {count} cached results"}
 
 
+@app.get("/analysis-cache/stats")
+def analysis_cache_stats():
+    """Size, hit/miss/eviction counters of the analysis result cache"""
+    return {"ok": True, **_analysis_cache.info()}
+
+
 class CheckApplicationPageRequest(BaseModel):
     url: str
 
@@ -4915,7 +3305,7 @@ async def check_application_page(payload: CheckApplicationPageRequest):
     url = payload.url.strip()
 
     try:
-        result = navigate_to_application_form_sync(url)
+        result = await run_blocking(navigate_to_application_form_sync, url)
 
         is_intermediate = len(result.get("redirects", [])) > 0 or is_aggregator_url(url)
         has_form = result.get("has_form", False)
@@ -4960,7 +3350,7 @@ async def analyze_missing_scores():
     Find jobs without match_score and analyze them.
     Returns list of job IDs that will be analyzed.
     """
-    jobs = get_all_jobs()
+    jobs = await run_blocking(get_all_jobs)
     missing = [j for j in jobs if j.get("match_score") is None and j.get("status") in ["New", "Selected"]]
 
     return {
@@ -4981,7 +3371,7 @@ async def analyze_job_by_id(payload: AnalyzeJobByIdRequest):
     """
     from api.prepare_application import analyze_job_with_ai
 
-    job = get_job_by_id(payload.job_id)
+    job = await run_blocking(get_job_by_id, payload.job_id)
     if not job:
         return {"ok": False, "error": "Job not found"}
 
@@ -4993,7 +3383,7 @@ async def analyze_job_by_id(payload: AnalyzeJobByIdRequest):
     try:
         # Fetch JD
         ats_info = detect_ats_from_url(url)
-        job_data = fetch_single_job(ats_info)
+        job_data = await run_blocking(fetch_single_job, ats_info)
 
         if "error" in job_data:
             return {"ok": False, "error": job_data["error"]}
@@ -5006,7 +3396,7 @@ async def analyze_job_by_id(payload: AnalyzeJobByIdRequest):
             return {"ok": False, "error": "Could not fetch job description"}
 
         # Run AI analysis
-        analysis = analyze_job_with_ai(jd, title, company)
+        analysis = await run_blocking(analyze_job_with_ai, jd, title, company)
 
         if not analysis or "error" in analysis:
             return {"ok": False, "error": analysis.get("error", "Analysis failed")}
@@ -5015,13 +3405,17 @@ async def analyze_job_by_id(payload: AnalyzeJobByIdRequest):
 
         # Update job in storage
         from storage.job_storage import _load_jobs, _save_jobs
-        jobs = _load_jobs()
-        for j in jobs:
-            if j.get("id") == payload.job_id:
-                j["match_score"] = score
-                j["analysis"] = analysis
-                break
-        _save_jobs(jobs)
+
+        def save_score():
+            jobs = _load_jobs()
+            for j in jobs:
+                if j.get("id") == payload.job_id:
+                    j["match_score"] = score
+                    j["analysis"] = analysis
+                    break
+            _save_jobs(jobs)
+
+        await run_blocking(save_score)
 
         return {
             "ok": True,
@@ -5033,540 +3427,21 @@ async def analyze_job_by_id(payload: AnalyzeJobByIdRequest):
         return {"ok": False, "error": str(e)}
 
 
-# ============= APPLY AUTOMATION ENDPOINTS =============
-
-class ApplyRequest(BaseModel):
-    job_url: str
-    profile: str = "anton_tpm"
-
-
-@app.post("/apply/greenhouse")
-def apply_greenhouse_endpoint(payload: ApplyRequest):
-    """
-    Open Greenhouse job application and auto-fill form using SmartFillerV35.
-    """
-    import subprocess
-    import sys
-    import os
-    
-    job_url = payload.job_url
-    profile_name = payload.profile
-    
-    if "greenhouse" not in job_url.lower() and "gh_jid" not in job_url.lower():
-        return {"ok": False, "error": "Only Greenhouse URLs supported"}
-    
-    profile_path = Path(f"browser/profiles/{profile_name}.json")
-    if not profile_path.exists():
-        return {"ok": False, "error": f"Profile '{profile_name}' not found"}
-    
-    # Use absolute path 
-    cwd = os.path.dirname(os.path.abspath(__file__))
-    
-    # Write script to file to avoid shell escaping issues
-    script_file = "/tmp/greenhouse_apply_script.py"
-    with open(script_file, "w") as f:
-        f.write(f'''
-import sys
-sys.path.insert(0, '{cwd}')
-import os
-os.chdir('{cwd}')
-
-from browser.smart_filler_v35 import SmartFillerV35
-import re
-
-job_url = "{job_url}"
-
-# Convert company career page URL to direct Greenhouse form URL
-if 'gh_jid=' in job_url and 'job-boards.greenhouse.io' not in job_url:
-    match = re.search(r'gh_jid=(\\d+)', job_url)
-    if match:
-        gh_jid = match.group(1)
-        company_match = re.search(r'https?://(?:www\\.)?([^/]+)\\.com', job_url)
-        company = company_match.group(1) if company_match else 'company'
-        job_url = "https://job-boards.greenhouse.io/embed/job_app?token=" + gh_jid + "&for=" + company + "&gh_jid=" + gh_jid
-        print("Converted to direct Greenhouse URL: " + job_url)
-
-try:
-    filler = SmartFillerV35(headless=False)
-    filler.run(job_url, interactive=False)
-    
-    print("\\n" + "="*60)
-    print("Browser will stay open for 60 seconds for review...")
-    print("="*60)
-    
-    import time
-    time.sleep(60)
-except KeyboardInterrupt:
-    pass
-except Exception as e:
-    print(f"Error: {{e}}")
-    import traceback
-    traceback.print_exc()
-    import time
-    time.sleep(10)
-finally:
-    if 'filler' in dir() and filler:
-        filler.stop()
-    print("Browser closed")
-''')
-    
-    # Run script in background
-    log_file = "/tmp/apply_greenhouse.log"
-    with open(log_file, "w") as log:
-        log.write(f"Starting apply for: {job_url}\n")
-        log.write(f"Profile: {profile_name}\n")
-        log.write("="*60 + "\n")
-    
-    # Start subprocess
-    process = subprocess.Popen(
-        [sys.executable, script_file],
-        stdout=open(log_file, "a"),
-        stderr=subprocess.STDOUT,
-        cwd=cwd
-    )
-    
-    return {
-        "ok": True,
-        "message": "Application form opened with SmartFiller V3.5",
-        "pid": process.pid,
-        "log_file": log_file
-    }
-
-@app.get("/answers")
-def get_answer_library():
-    """Get the full answer library."""
-    path = Path("data/answer_library.json")
-    if not path.exists():
-        return {"personal": {}, "links": {}, "answers": {}, "cover_letter_template": {}}
-    with open(path) as f:
-        return json.load(f)
-
-
-@app.put("/answers")
-def update_answer_library(data: dict):
-    """Update the answer library."""
-    path = Path("data/answer_library.json")
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True}
-
-
-@app.get("/answers/{category}/{key}")
-def get_answer(category: str, key: str):
-    """Get a specific answer."""
-    path = Path("data/answer_library.json")
-    if not path.exists():
-        return {"error": "Answer library not found"}
-    with open(path) as f:
-        data = json.load(f)
-    
-    if category in data and key in data[category]:
-        return {"value": data[category][key]}
-    return {"error": f"Key {category}/{key} not found"}
-
-
-# ============= V5 PROFILE / KNOWLEDGE BASE / LEARNED DB =============
-
-@app.get("/api/v5/profile")
-def get_v5_profile():
-    """Get personal profile (read-only) from V5 profile file."""
-    profile_path = Path("browser/profiles/anton_tpm.json")
-    if not profile_path.exists():
-        return {"error": "Profile not found"}
-    with open(profile_path) as f:
-        data = json.load(f)
-    # Return structured sections
-    return {
-        "personal": data.get("personal", {}),
-        "links": data.get("links", {}),
-        "demographics": data.get("demographics", {}),
-        "education": data.get("education", []),
-        "work_experience": data.get("work_experience", []),
-        "certifications": data.get("certifications", []),
-        "common_answers": data.get("common_answers", {}),
-        "work_authorization": data.get("work_authorization", {}),
-        "salary": data.get("salary", {}),
-        "availability": data.get("availability", {}),
-        "summary": data.get("summary", ""),
-    }
-
-
-@app.put("/api/v5/profile/work-experience")
-def update_work_experience(payload: dict):
-    """Update the work experience list in profile."""
-    profile_path = Path("browser/profiles/anton_tpm.json")
-    if not profile_path.exists():
-        return {"error": "Profile not found"}
-    with open(profile_path) as f:
-        data = json.load(f)
-
-    if "work_experience" in payload:
-        data["work_experience"] = payload["work_experience"]
-    with open(profile_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "count": len(data["work_experience"])}
-
-
-@app.patch("/api/v5/profile/work-experience/{index}")
-def update_single_work_experience(index: int, payload: dict):
-    """Update a single work experience entry by index."""
-    profile_path = Path("browser/profiles/anton_tpm.json")
-    if not profile_path.exists():
-        return {"error": "Profile not found"}
-    with open(profile_path) as f:
-        data = json.load(f)
-
-    work_exp = data.get("work_experience", [])
-    if index < 0 or index >= len(work_exp):
-        return {"error": f"Index {index} out of range (0-{len(work_exp)-1})"}
-
-    # Update fields that are provided
-    for key in ["company", "title", "start_month", "start_year",
-                 "end_month", "end_year", "current", "description"]:
-        if key in payload:
-            work_exp[index][key] = payload[key]
-
-    data["work_experience"] = work_exp
-    with open(profile_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "updated_index": index}
-
-
-@app.post("/api/v5/profile/work-experience")
-def add_work_experience(payload: dict):
-    """Add a new work experience entry."""
-    profile_path = Path("browser/profiles/anton_tpm.json")
-    if not profile_path.exists():
-        return {"error": "Profile not found"}
-    with open(profile_path) as f:
-        data = json.load(f)
-
-    entry = {
-        "company": payload.get("company", ""),
-        "title": payload.get("title", ""),
-        "start_month": payload.get("start_month", ""),
-        "start_year": payload.get("start_year", ""),
-        "end_month": payload.get("end_month", ""),
-        "end_year": payload.get("end_year", ""),
-        "current": payload.get("current", False),
-        "description": payload.get("description", ""),
-    }
-
-    work_exp = data.get("work_experience", [])
-    work_exp.append(entry)
-    data["work_experience"] = work_exp
-
-    with open(profile_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "added_index": len(work_exp) - 1}
-
-
-@app.delete("/api/v5/profile/work-experience/{index}")
-def delete_work_experience(index: int):
-    """Delete a work experience entry by index."""
-    profile_path = Path("browser/profiles/anton_tpm.json")
-    if not profile_path.exists():
-        return {"error": "Profile not found"}
-    with open(profile_path) as f:
-        data = json.load(f)
-
-    work_exp = data.get("work_experience", [])
-    if index < 0 or index >= len(work_exp):
-        return {"error": f"Index {index} out of range"}
-
-    removed = work_exp.pop(index)
-    data["work_experience"] = work_exp
-
-    with open(profile_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "deleted": removed.get("company", "")}
-
-
-@app.get("/api/v5/knowledge-base")
-def get_knowledge_base():
-    """Get the full knowledge base."""
-    kb_path = Path("browser/knowledge_base.json")
-    if not kb_path.exists():
-        return {"error": "Knowledge base not found"}
-    with open(kb_path) as f:
-        return json.load(f)
-
-
-@app.put("/api/v5/knowledge-base")
-def update_knowledge_base(data: dict):
-    """Update the full knowledge base."""
-    kb_path = Path("browser/knowledge_base.json")
-    with open(kb_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True}
-
-
-@app.patch("/api/v5/knowledge-base/common-answer/{key}")
-def update_common_answer(key: str, payload: dict):
-    """Update a single common answer by key."""
-    kb_path = Path("browser/knowledge_base.json")
-    if not kb_path.exists():
-        return {"error": "Knowledge base not found"}
-    with open(kb_path) as f:
-        data = json.load(f)
-
-    ca = data.get("common_answers", {})
-    if key not in ca:
-        return {"error": f"Common answer '{key}' not found"}
-
-    # Update answer text (and optionally keywords)
-    if "answer" in payload:
-        ca[key]["answer"] = payload["answer"]
-    if "keywords" in payload:
-        ca[key]["keywords"] = payload["keywords"]
-
-    data["common_answers"] = ca
-    with open(kb_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "updated": key}
-
-
-@app.patch("/api/v5/knowledge-base/snippet/{key}")
-def update_snippet(key: str, payload: dict):
-    """Update a single experience snippet by key."""
-    kb_path = Path("browser/knowledge_base.json")
-    if not kb_path.exists():
-        return {"error": "Knowledge base not found"}
-    with open(kb_path) as f:
-        data = json.load(f)
-
-    snippets = data.get("experience_snippets", {})
-    if key not in snippets:
-        return {"error": f"Snippet '{key}' not found"}
-
-    if "text" in payload:
-        snippets[key] = payload["text"]
-
-    data["experience_snippets"] = snippets
-    with open(kb_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "updated": key}
-
-
-@app.post("/api/v5/knowledge-base/snippet")
-def add_snippet(payload: dict):
-    """Add a new experience snippet."""
-    kb_path = Path("browser/knowledge_base.json")
-    if not kb_path.exists():
-        return {"error": "Knowledge base not found"}
-
-    key = payload.get("key", "").strip()
-    text = payload.get("text", "").strip()
-    if not key or not text:
-        return {"error": "Both 'key' and 'text' are required"}
-
-    with open(kb_path) as f:
-        data = json.load(f)
-
-    snippets = data.get("experience_snippets", {})
-    if key in snippets:
-        return {"error": f"Snippet '{key}' already exists. Use PATCH to update."}
-
-    snippets[key] = text
-    data["experience_snippets"] = snippets
-    with open(kb_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "added": key}
-
-
-@app.delete("/api/v5/knowledge-base/snippet/{key}")
-def delete_snippet(key: str):
-    """Delete an experience snippet by key."""
-    kb_path = Path("browser/knowledge_base.json")
-    if not kb_path.exists():
-        return {"error": "Knowledge base not found"}
-    with open(kb_path) as f:
-        data = json.load(f)
-
-    snippets = data.get("experience_snippets", {})
-    if key not in snippets:
-        return {"error": f"Snippet '{key}' not found"}
-
-    del snippets[key]
-    data["experience_snippets"] = snippets
-    with open(kb_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "deleted": key}
-
-
-@app.get("/api/v5/learned")
-def get_learned_database():
-    """Get the learned database (answers + dropdown choices)."""
-    db_path = Path("browser/learned_database.json")
-    if not db_path.exists():
-        return {"answers": {}, "dropdown_choices": {}}
-    with open(db_path) as f:
-        return json.load(f)
-
-
-@app.patch("/api/v5/learned/{section}/{key:path}")
-def update_learned_answer(section: str, key: str, payload: dict):
-    """Update a single learned answer or dropdown choice.
-    section: 'answers' or 'dropdown_choices'
-    key: the question key (URL-encoded)
-    """
-    db_path = Path("browser/learned_database.json")
-    if not db_path.exists():
-        return {"error": "Learned database not found"}
-
-    if section not in ("answers", "dropdown_choices"):
-        return {"error": f"Invalid section '{section}'. Use 'answers' or 'dropdown_choices'."}
-
-    with open(db_path) as f:
-        data = json.load(f)
-
-    entries = data.get(section, {})
-    if key not in entries:
-        return {"error": f"Key not found in {section}"}
-
-    if "value" in payload:
-        entries[key] = payload["value"]
-
-    data[section] = entries
-    with open(db_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "updated": key[:50]}
-
-
-@app.delete("/api/v5/learned/{section}/{key:path}")
-def delete_learned_answer(section: str, key: str):
-    """Delete a learned answer or dropdown choice."""
-    db_path = Path("browser/learned_database.json")
-    if not db_path.exists():
-        return {"error": "Learned database not found"}
-
-    if section not in ("answers", "dropdown_choices"):
-        return {"error": f"Invalid section '{section}'"}
-
-    with open(db_path) as f:
-        data = json.load(f)
-
-    entries = data.get(section, {})
-    if key not in entries:
-        return {"error": f"Key not found in {section}"}
-
-    del entries[key]
-    data[section] = entries
-    with open(db_path, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    return {"ok": True, "deleted": key[:50]}
-
-
-@app.post("/api/v5/improve-answer")
-def improve_answer_with_ai(payload: dict):
-    """
-    Improve an answer using Claude AI.
-    Expects: {question, current_answer, user_comment}
-    Returns: {ok, improved_answer}
-    """
-    import anthropic
-
-    question = payload.get("question", "")
-    current_answer = payload.get("current_answer", "")
-    user_comment = payload.get("user_comment", "")
-
-    if not current_answer or not user_comment:
-        return {"error": "Both 'current_answer' and 'user_comment' are required"}
-
-    client = anthropic.Anthropic()
-
-    prompt = f"""You are improving a job application answer.
-
-Question: {question}
-
-Current answer:
-{current_answer}
-
-User's instruction for improvement:
-{user_comment}
-
-Rules:
-- Keep the answer professional and concise
-- Maintain the factual content — do NOT invent experience or credentials
-- Apply the user's instruction faithfully
-- Return ONLY the improved answer text, nothing else
-- No markdown formatting, no quotes — just the plain answer text"""
-
-    try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1000,
-            messages=[{"role": "user", "content": prompt}]
-        )
-        improved = response.content[0].text.strip()
-        return {"ok": True, "improved_answer": improved}
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-
-@app.get("/api/v5/form-schemas")
-def get_form_schemas():
-    """Get form schema stats for all ATS types."""
-    from browser.v5.engine import FormSchemaDB
-    db = FormSchemaDB()
-    return {"ok": True, "schemas": db.data, "stats": db.get_stats()}
-
-
-@app.get("/api/v5/form-schemas/{ats_type}")
-def get_form_schema(ats_type: str):
-    """Get form schema for a specific ATS type."""
-    from browser.v5.engine import FormSchemaDB
-    db = FormSchemaDB()
-    schema = db.get_schema(ats_type)
-    if not schema:
-        return {"ok": False, "error": f"No schema for {ats_type}"}
-    return {"ok": True, "ats_type": ats_type, "schema": schema}
+COVER_LETTER_TEMPLATES = {
+    "product": "Cover_Letter_Anton_Kondakov_ProductM.docx",
+    "tpm_program": "Cover_Letter_Anton_Kondakov_Delivery Lead.docx",
+    "project": "Cover_Letter_Anton_Kondakov_Project Manager.docx",
+    "scrum": "Cover_Letter_Anton_Kondakov_Scrum Master.docx",
+    "po": "Cover_Letter_Anton_Kondakov_PO.docx",
+}
 
 
-@app.post("/generate-cover-letter")
-def generate_cover_letter_endpoint(payload: dict):
-    """
-    Generate a personalized cover letter from DOCX template.
-    Expects: {company, position, job_description?, role_family?}
-    Returns: {ok, cover_letter, file_path}
-    """
+def _render_cover_letter(company: str, position: str, template_name: str, company_mission: str) -> dict:
+    """Fill DOCX template placeholders and save into Applications/{company}_{position}/."""
     from docx import Document
-    import shutil
-    
-    company = payload.get("company", "Company")
-    position = payload.get("position", "Position")
-    job_description = payload.get("job_description", "")
-    role_family = payload.get("role_family", "product")  # product, tpm_program, project
-    
-    # Map role_family to template
+
     cv_dir = GOLD_CV_PATH
-    template_map = {
-        "product": "Cover_Letter_Anton_Kondakov_ProductM.docx",
-        "tpm_program": "Cover_Letter_Anton_Kondakov_Delivery Lead.docx",
-        "project": "Cover_Letter_Anton_Kondakov_Project Manager.docx",
-        "scrum": "Cover_Letter_Anton_Kondakov_Scrum Master.docx",
-        "po": "Cover_Letter_Anton_Kondakov_PO.docx",
-    }
-    
-    template_name = template_map.get(role_family, template_map["product"])
-    template_path = cv_dir / template_name
-    
-    if not template_path.exists():
-        return {"error": f"Template not found: {template_name}"}
-    
-    # Generate company mission using AI
-    company_mission = ""
-    try:
-        from utils.ollama_ai import generate_company_mission, is_ollama_available
-        if is_ollama_available():
-            company_mission = generate_company_mission(company, job_description, position)
-            print(f"Generated mission: {company_mission}")
-    except Exception as e:
-        print(f"AI mission generation error: {e}")
-        company_mission = f"I'm excited about the opportunity to contribute to {company}'s continued success."
-    
-    # Load and modify template
-    doc = Document(str(template_path))
+    doc = Document(str(cv_dir / template_name))
     
     for para in doc.paragraphs:
         for run in para.runs:
@@ -5604,6 +3479,64 @@ def generate_cover_letter_endpoint(payload: dict):
         "template_used": template_name
     }
 
+
+@app.post("/generate-cover-letter")
+def generate_cover_letter_endpoint(payload: dict, stream: bool = Query(False, description="SSE: stream mission tokens, then the saved result")):
+    """
+    Generate a personalized cover letter from DOCX template.
+    Expects: {company, position, job_description?, role_family?}
+    Returns: {ok, cover_letter, file_path}
+    stream=true: text/event-stream of {type: start|token|done|error}; `done` carries the same result.
+    """
+    from utils.ollama_ai import company_mission_prompt, clean_company_mission, is_ollama_available, COMPANY_MISSION_SYSTEM
+    from utils.llm_stream import ollama_stream, complete, sse, sse_response
+    
+    company = payload.get("company", "Company")
+    position = payload.get("position", "Position")
+    job_description = payload.get("job_description", "")
+    role_family = payload.get("role_family", "product")  # product, tpm_program, project
+    
+    # Map role_family to template
+    template_name = COVER_LETTER_TEMPLATES.get(role_family, COVER_LETTER_TEMPLATES["product"])
+    
+    if not (GOLD_CV_PATH / template_name).exists():
+        error = f"Template not found: {template_name}"
+        return sse_response(iter([sse("error", error=error)])) if stream else {"error": error}
+    
+    prompt = company_mission_prompt(company, job_description, position)
+
+    if stream:
+        def events():
+            yield sse("start", company=company, position=position)
+            parts = []
+            try:
+                if is_ollama_available():
+                    for token in ollama_stream(prompt, COMPANY_MISSION_SYSTEM, temperature=0.7):
+                        parts.append(token)
+                        yield sse("token", text=token)
+            except Exception as e:
+                print(f"AI mission generation error: {e}")
+            company_mission = clean_company_mission("".join(parts), company) if parts else ""
+            try:
+                yield sse("done", result=_render_cover_letter(company, position, template_name, company_mission))
+            except Exception as e:
+                yield sse("error", error=str(e))
+        return sse_response(events())
+
+    # Generate company mission using AI
+    company_mission = ""
+    try:
+        if is_ollama_available():
+            company_mission = clean_company_mission(
+                complete(ollama_stream(prompt, COMPANY_MISSION_SYSTEM, temperature=0.7)), company
+            )
+            print(f"Generated mission: {company_mission}")
+    except Exception as e:
+        print(f"AI mission generation error: {e}")
+        company_mission = f"I'm excited about the opportunity to contribute to {company}'s continued success."
+    
+    return _render_cover_letter(company, position, template_name, company_mission)
+
 @app.post("/save-cover-letter")
 def save_cover_letter(payload: dict):
     """
@@ -5702,23 +3635,6 @@ def select_cv_for_job(payload: dict):
     return {"ok": True, "selected_cv": available_cvs[0], "filename": Path(available_cvs[0]).name, "ai_selected": False}
 
 
-@app.get("/apply-log")
-def get_apply_log():
-    """
-    Get the latest apply log content.
-    """
-    log_path = Path("/tmp/greenhouse_apply.log")
-    if not log_path.exists():
-        return {"ok": False, "log": "No log file found"}
-    
-    try:
-        with open(log_path, "r") as f:
-            content = f.read()
-        return {"ok": True, "log": content}
-    except Exception as e:
-        return {"ok": False, "log": f"Error reading log: {e}"}
-
-
 @app.post("/fetch-job-description")
 def fetch_job_description(payload: dict):
     """
@@ -5934,100 +3850,6 @@ def fetch_job_description(payload: dict):
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
-@app.post("/apply/vision")
-def apply_with_vision(payload: ApplyRequest):
-    """
-    Apply to job using Vision AI Agent.
-    AI looks at screenshots and fills form like a human.
-    """
-    import subprocess
-    import sys
-    import os
-    
-    job_url = payload.job_url
-    profile_name = payload.profile
-    
-    profile_path = Path(f"browser/profiles/{profile_name}.json")
-    if not profile_path.exists():
-        return {"ok": False, "error": f"Profile '{profile_name}' not found"}
-    
-    # Load profile data
-    with open(profile_path) as f:
-        profile_data = json.load(f)
-    
-    cwd = os.path.dirname(os.path.abspath(__file__))
-    if "Mobile Documents" in cwd:
-        cwd = cwd.replace(
-            str(AI_PROJECTS_PATH),
-            str(ICLOUD_PATH)
-        )
-    
-    script = f'''import sys
-sys.path.insert(0, '{cwd}')
-import os
-os.chdir('{cwd}')
-
-from browser.client import BrowserClient
-from browser.vision_agent import VisionFormAgent
-import json
-import time
-
-# Load profile from file
-with open("browser/profiles/{profile_name}.json") as f:
-    profile = json.load(f)
-
-# Start browser
-browser = BrowserClient()
-browser.start()
-
-try:
-    # Open job page
-    browser.open_job_page("{job_url}")
-    time.sleep(3)
-    
-    # Start Vision Agent
-    agent = VisionFormAgent(browser.page, profile)
-    result = agent.fill_form()
-    
-    print("\\n" + "="*50)
-    print(f"Result: {{result}}")
-    print("="*50)
-    
-    # Keep open for review
-    print("\\nBrowser stays open for 60 seconds...")
-    time.sleep(60)
-    
-except Exception as e:
-    print(f"Error: {{e}}")
-    import traceback
-    traceback.print_exc()
-    time.sleep(10)
-finally:
-    browser.close()
-'''
-    
-    # Write and execute script
-    script_file = "/tmp/vision_apply_script.py"
-    log_file = "/tmp/vision_apply.log"
-    
-    with open(script_file, "w") as f:
-        f.write(script)
-    
-    # Run in background
-    subprocess.Popen(
-        [sys.executable, script_file],
-        stdout=open(log_file, "w"),
-        stderr=subprocess.STDOUT,
-        start_new_session=True
-    )
-    
-    return {
-        "ok": True,
-        "message": f"Vision AI Agent started for {job_url}",
-        "log_file": log_file,
-        "screenshots_dir": "/tmp/vision_agent"
-    }
-
 
 @app.post("/open-folder")
 def open_folder(payload: dict):
@@ -6081,8 +3903,7 @@ class AnalyzeJobRequest(BaseModel):
     company: str
     role_family: str = "product"
 
-@app.post("/analyze-job")
-async def analyze_job_endpoint(payload: AnalyzeJobRequest):
+def _analyze_job_keywords(payload: AnalyzeJobRequest) -> dict:
     """
     Analyze job description against candidate profile.
     Returns match score, missing keywords, ATS tips.
@@ -6245,6 +4066,25 @@ async def analyze_job_endpoint(payload: AnalyzeJobRequest):
     }
 
 
+@app.post("/analyze-job")
+async def analyze_job_endpoint(payload: AnalyzeJobRequest, stream: bool = Query(False, description="SSE: same event protocol as the AI endpoints")):
+    """
+    Analyze job description against candidate profile (local keyword match, no model call).
+    stream=true returns a single `done` event so the UI can use one SSE code path.
+    """
+    import hashlib
+    key = "kw_" + hashlib.md5(json.dumps(
+        [payload.job_title, payload.company, payload.role_family, payload.job_description]
+    ).encode()).hexdigest()
+    result = await _keyword_cache.get_or_compute(
+        key, lambda: run_blocking(_analyze_job_keywords, payload)
+    )
+    if stream:
+        from utils.llm_stream import sse, sse_response
+        return sse_response(iter([sse("start"), sse("done", result=result)]))
+    return result
+
+
 # ============= COMPREHENSIVE APPLICATION PREPARATION =============
 
 class PrepareApplicationRequest(BaseModel):
@@ -6365,7 +4205,8 @@ async def prepare_application_endpoint(payload: PrepareApplicationRequest):
     """
     from api.prepare_application import prepare_application
     
-    result = prepare_application(
+    result = await run_blocking(
+        prepare_application,
         job_title=payload.job_title,
         company=payload.company,
         job_url=payload.job_url,
@@ -6405,873 +4246,9 @@ async def open_file_endpoint(file_type: str, path: str):
         return {"ok": False, "error": str(e)}
 
 
-# ============= CV PREVIEW & TAILORING =============
-
-class CVPreviewRequest(BaseModel):
-    job_title: str
-    company: str
-    role_family: str = "product"
-    keywords_to_add: list = []
-    matched_keywords: list = []
-    cv_path: str = None  # Optional: path to specific CV (e.g., AI-optimized)
-
-@app.post("/cv/preview")
-async def cv_preview_endpoint(payload: CVPreviewRequest):
-    """
-    Generate CV preview with highlighted keywords.
-    Returns HTML with:
-    - Green highlights: matched keywords (already in CV and JD)
-    - Yellow highlights: injected keywords (added to Skills section)
-    """
-    from docx import Document
-    from pathlib import Path
-    import re
-    
-    gold_cv_path = GOLD_CV_PATH
-    
-    # Use provided cv_path if specified, otherwise select by role
-    print(f"DEBUG cv/preview: payload.cv_path = {payload.cv_path}")
-    if payload.cv_path and Path(payload.cv_path).exists():
-        cv_path = Path(payload.cv_path)
-        cv_filename = cv_path.name
-        print(f"DEBUG cv/preview: Using provided CV: {cv_path}")
-    else:
-        # Select CV based on role
-        role_cv_map = {
-            "product": "CV_Anton_Kondakov_Product Manager.docx",
-            "tpm_program": "CV_Anton_Kondakov_TPM.docx",
-            "project": "CV_Anton_Kondakov_Project Manager.docx",
-        }
-        cv_filename = role_cv_map.get(payload.role_family, "CV_Anton_Kondakov_Product Manager.docx")
-        cv_path = gold_cv_path / cv_filename
-        print(f"DEBUG cv/preview: Using role-based CV: {cv_path}")
-    
-    if not cv_path.exists():
-        return {"ok": False, "error": f"CV not found: {cv_filename}"}
-    
-    doc = Document(cv_path)
-    
-    # Build HTML preview
-    html_parts = []
-    html_parts.append('<div class="cv-preview" style="font-family: Arial, sans-serif; font-size: 12px; line-height: 1.4; max-width: 800px;">')
-    
-    matched_kw = set(k.lower() for k in payload.matched_keywords)
-    inject_kw = set(k.lower() for k in payload.keywords_to_add)
-    
-    # Add yellow banner at the TOP if there are keywords to add
-    if inject_kw:
-        html_parts.append('<div style="margin: 0 0 16px 0; padding: 12px; background-color: #fef08a; border-radius: 8px; border-left: 4px solid #eab308;">')
-        html_parts.append('<strong style="color: #854d0e; font-size: 13px;">🔑 Keywords to be added to your CV:</strong><br>')
-        html_parts.append('<div style="margin-top: 8px;">')
-        html_parts.append(', '.join(f'<mark style="background-color: #facc15; padding: 2px 6px; border-radius: 3px; font-weight: 500;">{kw}</mark>' for kw in payload.keywords_to_add))
-        html_parts.append('</div></div>')
-    
-    # Fallback: if no keywords provided, use common PM keywords for highlighting
-    if not matched_kw:
-        matched_kw = {
-            "product strategy", "roadmap", "agile", "scrum", "stakeholder",
-            "cross-functional", "backlog", "user stories", "sprint", "kpi",
-            "okr", "prioritization", "requirements", "delivery", "release",
-            "jira", "confluence", "aws", "sql", "data analysis"
-        }
-    
-    def highlight_text(text: str, is_technical_section: bool = False) -> str:
-        """Highlight matched and injected keywords in text."""
-        result = text
-        
-        # First highlight matched keywords (green) - preserve original case
-        for kw in matched_kw:
-            pattern = re.compile(f'({re.escape(kw)})', re.IGNORECASE)
-            result = pattern.sub(
-                r'<mark style="background-color: #86efac !important; padding: 1px 3px; border-radius: 2px;">\1</mark>',
-                result
-            )
-        
-        # Add injected keywords to Technical section with yellow highlight
-        if is_technical_section and inject_kw:
-            injected_str = ', '.join(f'<mark style="background-color: #facc15 !important; padding: 1px 3px; border-radius: 2px; font-weight: 500;">{kw}</mark>' for kw in payload.keywords_to_add)
-            result += f' <span style="color: #854d0e;">[+Added: {injected_str}]</span>'
-        
-        return result
-    
-    keywords_injected = False
-    
-    for para in doc.paragraphs:
-        text = para.text.strip()
-        if not text:
-            continue
-        
-        style = para.style.name if para.style else "Normal"
-        
-        # Check if this is Technical Delivery/Acumen line where we inject keywords
-        # Must start with bullet point marker or "Technical Delivery" / "Technical Acumen"
-        is_technical = (text.startswith("Technical Delivery") or text.startswith("Technical Acumen") or 
-                       (text.startswith("•") and "Technical" in text)) and not keywords_injected
-        highlighted = highlight_text(text, is_technical_section=is_technical)
-        if is_technical and inject_kw:
-            keywords_injected = True
-        
-        # Detect section headers
-        if text.isupper() or style == "Heading 1" or text in ["CORE COMPETENCIES", "PROFESSIONAL EXPERIENCE", "EDUCATION", "CERTIFICATIONS"]:
-            html_parts.append(f'<h3 style="margin: 16px 0 8px 0; color: #1e3a5f; border-bottom: 1px solid #ddd; padding-bottom: 4px;">{text}</h3>')
-                
-        elif style == "List Paragraph":
-            html_parts.append(f'<div style="margin: 4px 0 4px 20px; padding-left: 10px; border-left: 2px solid #e5e7eb;">• {highlighted}</div>')
-        else:
-            # Check if it's a job title/company line
-            if " | " in text or "–" in text:
-                html_parts.append(f'<div style="margin: 12px 0 4px 0; font-weight: 600; color: #374151;">{highlighted}</div>')
-            else:
-                html_parts.append(f'<div style="margin: 4px 0;">{highlighted}</div>')
-    
-    html_parts.append('</div>')
-    
-    # Summary stats
-    stats = {
-        "matched_count": len(matched_kw),
-        "injected_count": len(inject_kw),
-        "cv_file": cv_filename
-    }
-    
-    return {
-        "ok": True,
-        "html": "\n".join(html_parts),
-        "stats": stats,
-        "keywords_matched": list(matched_kw),
-        "keywords_injected": list(inject_kw)
-    }
-
-
-class CVTailorRequest(BaseModel):
-    company: str
-    position: str  # Job title
-    role_family: str = "product"
-    keywords_to_add: list = []
-
-@app.post("/cv/tailor")
-async def cv_tailor_endpoint(payload: CVTailorRequest):
-    """
-    Create tailored CV with injected keywords.
-    Saves to Applications folder.
-    Returns path to new CV.
-    """
-    from docx import Document
-    from docx.shared import RGBColor
-    from pathlib import Path
-    import re
-    
-    gold_cv_path = GOLD_CV_PATH
-    apps_path = gold_cv_path / "Applications"
-    
-    # Select CV based on role
-    role_cv_map = {
-        "product": "CV_Anton_Kondakov_Product Manager.docx",
-        "tpm_program": "CV_Anton_Kondakov_TPM.docx",
-        "project": "CV_Anton_Kondakov_Project Manager.docx",
-    }
-    cv_filename = role_cv_map.get(payload.role_family, "CV_Anton_Kondakov_Product Manager.docx")
-    cv_path = gold_cv_path / cv_filename
-    
-    if not cv_path.exists():
-        return {"ok": False, "error": f"CV not found: {cv_filename}"}
-    
-    # Create application folder
-    safe_company = re.sub(r'[^\w\s-]', '', payload.company).strip().replace(' ', '_')
-    safe_position = re.sub(r'[^\w\s-]', '', payload.position).strip().replace(' ', '_')[:50]
-    folder_name = f"{safe_company}_{safe_position}"
-    app_folder = apps_path / folder_name
-    app_folder.mkdir(parents=True, exist_ok=True)
-    
-    # Load and modify CV
-    doc = Document(cv_path)
-    
-    keywords_to_add = payload.keywords_to_add
-    
-    if keywords_to_add:
-        # Find CORE COMPETENCIES section and add keywords
-        for i, para in enumerate(doc.paragraphs):
-            text = para.text.strip().upper()
-            if "COMPETENCIES" in text or "SKILLS" in text:
-                # Find the next list paragraph and add keywords there
-                for j in range(i+1, min(i+10, len(doc.paragraphs))):
-                    next_para = doc.paragraphs[j]
-                    if next_para.style and "List" in next_para.style.name:
-                        # Add keywords to Technical Acumen or create new line
-                        if "technical" in next_para.text.lower() or "tools" in next_para.text.lower():
-                            # Append to existing
-                            current_text = next_para.text
-                            if not current_text.endswith('.'):
-                                current_text += '.'
-                            new_keywords = ', '.join(keywords_to_add)
-                            next_para.clear()
-                            next_para.add_run(f"{current_text} Additional: {new_keywords}.")
-                            break
-                break
-    
-    # Save tailored CV
-    output_filename = f"CV_Anton_Kondakov_{safe_company}_{safe_position}.docx"
-    output_path = app_folder / output_filename
-    doc.save(output_path)
-    
-    # Also try to create PDF (if possible)
-    pdf_path = None
-    try:
-        import subprocess
-        # Try using LibreOffice for conversion (if available)
-        pdf_output = output_path.with_suffix('.pdf')
-        result = subprocess.run([
-            'soffice', '--headless', '--convert-to', 'pdf',
-            '--outdir', str(app_folder), str(output_path)
-        ], capture_output=True, timeout=30)
-        if pdf_output.exists():
-            pdf_path = str(pdf_output)
-    except Exception:
-        pass  # PDF conversion optional
-    
-    return {
-        "ok": True,
-        "cv_path": str(output_path),
-        "pdf_path": pdf_path,
-        "folder": str(app_folder),
-        "keywords_added": keywords_to_add
-    }
-
-
-class CVOptimizeRequest(BaseModel):
-    job_title: str
-    company: str
-    job_description: str
-    role_family: str = "product"
-
-
-@app.post("/cv/optimize-ai")
-async def cv_optimize_ai_endpoint(payload: CVOptimizeRequest):
-    """
-    Use Claude API to analyze JD and optimize CV.
-    Extracts key requirements and tailors CV accordingly.
-    """
-    import os
-    import re
-    from pathlib import Path
-    
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        return {"ok": False, "error": "ANTHROPIC_API_KEY not set"}
-    
-    jd = payload.job_description
-    if not jd or len(jd) < 50:
-        return {"ok": False, "error": "Job description too short for analysis"}
-    
-    # Call Claude API to analyze JD
-    try:
-        import requests
-        
-        prompt = f"""Analyze this job description and extract:
-1. Top 10 most important technical skills/tools required
-2. Top 5 soft skills emphasized
-3. Key experience requirements (years, domains)
-4. Any specific keywords that should be in the CV
-
-Job Title: {payload.job_title}
-Company: {payload.company}
-
-Job Description:
-{jd[:4000]}
-
-Respond in JSON format:
-{{
-  "technical_skills": ["skill1", "skill2", ...],
-  "soft_skills": ["skill1", ...],
-  "experience_requirements": ["req1", ...],
-  "keywords_to_add": ["keyword1", ...],
-  "cv_recommendations": ["recommendation1", ...]
-}}"""
-        
-        response = requests.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": api_key,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json"
-            },
-            json={
-                "model": "claude-sonnet-4-20250514",
-                "max_tokens": 1000,
-                "messages": [{"role": "user", "content": prompt}]
-            },
-            timeout=30
-        )
-        
-        if response.status_code != 200:
-            return {"ok": False, "error": f"Claude API error: {response.status_code}"}
-        
-        result = response.json()
-        ai_text = result.get("content", [{}])[0].get("text", "{}")
-        
-        # Parse JSON from response
-        import json
-        # Extract JSON from potential markdown
-        json_match = re.search(r'\{[\s\S]*\}', ai_text)
-        if json_match:
-            analysis = json.loads(json_match.group())
-        else:
-            analysis = {"error": "Could not parse AI response"}
-        
-        # Now tailor CV with extracted keywords
-        keywords = analysis.get("keywords_to_add", []) + analysis.get("technical_skills", [])[:5]
-        keywords = list(set(keywords))[:10]  # Dedupe and limit
-        
-        if keywords:
-            # Call existing tailor endpoint logic
-            from docx import Document
-            
-            gold_cv_path = GOLD_CV_PATH
-            apps_path = gold_cv_path / "Applications"
-            
-            role_cv_map = {
-                "product": "CV_Anton_Kondakov_Product Manager.docx",
-                "tpm_program": "CV_Anton_Kondakov_TPM.docx",
-                "project": "CV_Anton_Kondakov_Project Manager.docx",
-            }
-            cv_filename = role_cv_map.get(payload.role_family, "CV_Anton_Kondakov_Product Manager.docx")
-            cv_path = gold_cv_path / cv_filename
-            
-            if not cv_path.exists():
-                return {"ok": False, "error": f"Base CV not found: {cv_filename}"}
-            
-            # Create folder
-            safe_company = re.sub(r'[^\w\s-]', '', payload.company).strip().replace(' ', '_')
-            safe_position = re.sub(r'[^\w\s-]', '', payload.job_title).strip().replace(' ', '_')[:50]
-            folder_name = f"{safe_company}_{safe_position}_AI"
-            app_folder = apps_path / folder_name
-            app_folder.mkdir(parents=True, exist_ok=True)
-            
-            # Load and modify CV
-            doc = Document(cv_path)
-            
-            # Add keywords to Technical section
-            for i, para in enumerate(doc.paragraphs):
-                if "COMPETENCIES" in para.text.upper() or "SKILLS" in para.text.upper():
-                    for j in range(i+1, min(i+15, len(doc.paragraphs))):
-                        next_para = doc.paragraphs[j]
-                        if "technical" in next_para.text.lower() or "acumen" in next_para.text.lower():
-                            current = next_para.text.rstrip('.')
-                            added_kw = ', '.join(keywords[:5])
-                            next_para.clear()
-                            next_para.add_run(f"{current} [+Added: {added_kw}]")
-                            break
-                    break
-            
-            # Save
-            output_filename = f"CV_Anton_Kondakov_{safe_company}_AI_Optimized.docx"
-            output_path = app_folder / output_filename
-            doc.save(output_path)
-            
-            return {
-                "ok": True,
-                "cv_path": str(output_path),
-                "cv_name": output_filename,
-                "keywords_added": keywords[:5],
-                "analysis": analysis,
-                "folder": str(app_folder)
-            }
-        else:
-            return {
-                "ok": True,
-                "cv_path": None,
-                "cv_name": "No optimization needed",
-                "keywords_added": [],
-                "analysis": analysis
-            }
-            
-    except Exception as e:
-        import traceback
-        return {"ok": False, "error": str(e), "traceback": traceback.format_exc()}
-
-
-# ============= V5 FORM FILLER ENDPOINT =============
-
-
-# ============= V5 FORM FILLER ENDPOINT =============
-
-@app.post("/apply/v5")
-def apply_v5_endpoint(payload: ApplyRequest):
-    """
-    Apply to job using V5 Form Filler with Claude AI.
-    Auto-starts Chrome with debug port if not running.
-    """
-    import subprocess
-    import sys
-    
-    job_url = payload.job_url
-    profile_name = payload.profile
-    
-    # Check profile exists
-    profile_path = Path(f"browser/profiles/{profile_name}.json")
-    if not profile_path.exists():
-        return {"ok": False, "error": f"Profile '{profile_name}' not found"}
-    
-    # Start Chrome with debug port using our helper
-    cwd = Path(__file__).parent.resolve()
-    
-    try:
-        result = subprocess.run(
-            [sys.executable, str(cwd / "browser/start_chrome_debug.py")],
-            capture_output=True,
-            text=True,
-            timeout=15
-        )
-        
-        if "❌" in result.stdout:
-            return {"ok": False, "error": "Failed to start Chrome with debug port"}
-            
-    except subprocess.TimeoutExpired:
-        return {"ok": False, "error": "Chrome start timeout"}
-    except Exception as e:
-        return {"ok": False, "error": f"Chrome start error: {e}"}
-    
-    # Prepare V5 script
-    script_content = f'''
-import sys
-sys.path.insert(0, '{cwd}')
-import os
-os.chdir('{cwd}')
-
-# Tee output to log file
-import io
-class TeeWriter:
-    def __init__(self, *writers):
-        self.writers = writers
-    def write(self, text):
-        for w in self.writers:
-            w.write(text)
-            w.flush()
-    def flush(self):
-        for w in self.writers:
-            w.flush()
-
-log_file = open('/tmp/v5_apply.log', 'w')
-sys.stdout = TeeWriter(sys.__stdout__, log_file)
-sys.stderr = TeeWriter(sys.__stderr__, log_file)
-
-from browser.v5.engine import FormFillerV5, FillMode
-from browser.v5.browser_manager import BrowserMode
-import time
-
-job_url = "{job_url}"
-
-print("="*60)
-print("V5 Form Filler")
-print(f"URL: {{job_url}}")
-print("="*60)
-
-try:
-    # Initialize V5 with CDP (connects to existing Chrome)
-    filler = FormFillerV5(browser_mode=BrowserMode.CDP)
-    
-    # Run in interactive mode
-    result = filler.fill(job_url, mode=FillMode.INTERACTIVE)
-    
-    print("\\n" + "="*60)
-    print(f"Filled: {{result.filled_fields}}/{{result.total_fields}}")
-    print(f"Verified: {{result.verified_fields}}")
-    if result.errors > 0:
-        print(f"Errors: {{result.errors}}")
-    print("="*60)
-    
-    # Keep browser open for review
-    print("\\nBrowser stays open. Close manually when done.")
-    input("Press Enter to close...")
-    
-except Exception as e:
-    print(f"Error: {{e}}")
-    import traceback
-    traceback.print_exc()
-    input("Press Enter to close...")
-'''
-    
-    # Write and run script
-    script_file = Path("/tmp/v5_apply_script.py")
-    script_file.write_text(script_content)
-    
-    log_file = Path("/tmp/v5_apply.log")
-    
-    # Run in new Terminal window (so user can see output)
-    # Paths must be quoted because cwd may contain spaces (e.g. "Mobile Documents")
-    apple_script = f'''
-    tell application "Terminal"
-        activate
-        do script "cd \\"{cwd}\\" && \\"{sys.executable}\\" \\"{script_file}\\""
-    end tell
-    '''
-    
-    try:
-        subprocess.run(['osascript', '-e', apple_script], capture_output=True)
-    except:
-        # Fallback: run in background
-        subprocess.Popen(
-            [sys.executable, str(script_file)],
-            stdout=open(log_file, "w"),
-            stderr=subprocess.STDOUT,
-            cwd=str(cwd)
-        )
-    
-    return {
-        "ok": True,
-        "message": "V5 Form Filler started in Terminal",
-        "log_file": str(log_file),
-        "job_url": job_url
-    }
-
-
-@app.get("/apply/v5/log")
-def get_v5_log():
-    """Get V5 apply log content."""
-    log_path = Path("/tmp/v5_apply.log")
-    if not log_path.exists():
-        return {"ok": False, "log": "No log file"}
-    
-    try:
-        return {"ok": True, "log": log_path.read_text()}
-    except Exception as e:
-        return {"ok": False, "log": f"Error: {e}"}
-
-
-# ============= V6 FORM FILLER ENDPOINT =============
-
-@app.post("/apply/v6")
-def apply_v6_endpoint(payload: ApplyRequest):
-    """
-    Apply to job using V6 Form Filler with Claude AI.
-    Simpler engine, focused on Greenhouse forms.
-    """
-    import subprocess
-    import sys
-    
-    job_url = payload.job_url
-    profile_name = payload.profile
-    
-    # Start Chrome with debug port (uses separate profile, won't affect main browser)
-    cwd = Path(__file__).parent.resolve()
-    
-    try:
-        from browser.start_chrome_debug import start_chrome_debug
-        
-        result = start_chrome_debug()
-        
-        if not result["ok"]:
-            return {"ok": False, "error": result.get("message", "Failed to start Chrome")}
-            
-    except Exception as e:
-        return {"ok": False, "error": f"Chrome start error: {e}"}
-    
-    # Prepare V6 script
-    script_content = f'''
-import sys
-sys.path.insert(0, '{cwd}')
-import os
-os.chdir('{cwd}')
-
-# Tee output to log file
-import io
-class TeeWriter:
-    def __init__(self, *writers):
-        self.writers = writers
-    def write(self, text):
-        for w in self.writers:
-            w.write(text)
-            w.flush()
-    def flush(self):
-        for w in self.writers:
-            w.flush()
-
-log_file = open('/tmp/v6_apply.log', 'w')
-sys.stdout = TeeWriter(sys.__stdout__, log_file)
-sys.stderr = TeeWriter(sys.__stderr__, log_file)
-
-from browser.v6.engine import FormFillerV6
-import time
-
-job_url = "{job_url}"
-
-print("="*60)
-print("V6 Form Filler (AI-Powered)")
-print(f"URL: {{job_url}}")
-print("="*60)
-
-try:
-    # Initialize V6 and connect to Chrome
-    filler = FormFillerV6()
-    filler.connect()
-    
-    # Navigate to job URL first!
-    print(f"📍 Opening: {{job_url[:60]}}...")
-    filler.page.goto(job_url, wait_until="domcontentloaded", timeout=20000)
-    
-    # Wait for Greenhouse iframe to appear
-    print("⏳ Waiting for form to load...")
-    try:
-        filler.page.wait_for_selector('#grnhse_iframe', timeout=10000)
-    except:
-        pass
-    
-    if not filler.find_frame():
-        print("❌ No form found on current page")
-        print("Make sure you have the job application form open in Chrome")
-        input("Press Enter to close...")
-    else:
-        # Fill the form
-        filler.fill_greenhouse()
-        
-        print("\\n" + "="*60)
-        print("✅ Form filling complete!")
-        print("="*60)
-        
-        print("\\nBrowser stays open. Review and submit manually.")
-        input("Press Enter to close...")
-    
-except Exception as e:
-    print(f"Error: {{e}}")
-    import traceback
-    traceback.print_exc()
-    input("Press Enter to close...")
-'''
-    
-    # Write and run script
-    script_file = Path("/tmp/v6_apply_script.py")
-    script_file.write_text(script_content)
-    
-    log_file = Path("/tmp/v6_apply.log")
-    
-    # Open new terminal — paths quoted because cwd may contain spaces
-    apple_script = f'''
-    tell application "Terminal"
-        do script "cd \\"{cwd}\\" && \\"{sys.executable}\\" \\"{script_file}\\""
-        delay 0.3
-        set current settings of front window to settings set "Basic"
-        set font size of front window to 13
-    end tell
-    '''
-    
-    try:
-        subprocess.run(['osascript', '-e', apple_script], capture_output=True)
-    except:
-        # Fallback: run in background
-        subprocess.Popen(
-            [sys.executable, str(script_file)],
-            stdout=open(log_file, "w"),
-            stderr=subprocess.STDOUT,
-            cwd=str(cwd)
-        )
-    
-    return {
-        "ok": True,
-        "message": "V6 Form Filler started in Terminal",
-        "log_file": str(log_file),
-        "job_url": job_url
-    }
-
-
-@app.get("/apply/v6/log")
-def get_v6_log():
-    """Get V6 apply log content."""
-    log_path = Path("/tmp/v6_apply.log")
-    if not log_path.exists():
-        return {"ok": False, "log": "No log file"}
-    
-    try:
-        return {"ok": True, "log": log_path.read_text()}
-    except Exception as e:
-        return {"ok": False, "log": f"Error: {e}"}
-
-
-# ============= V7 AGENT FORM FILLER ENDPOINT =============
-
-@app.post("/apply/v7")
-def apply_v7(payload: ApplyPayload):
-    """
-    V7 Agent Form Filler - Uses Claude Vision to fill forms like a human.
-    """
-    job_url = payload.job_url
-    cwd = Path(__file__).parent.resolve()
-    
-    # Start Chrome with debug port
-    try:
-        from browser.start_chrome_debug import start_chrome_debug
-        result = start_chrome_debug()
-        if not result["ok"]:
-            return {"ok": False, "error": result.get("message", "Failed to start Chrome")}
-    except Exception as e:
-        return {"ok": False, "error": f"Chrome start error: {e}"}
-    
-    # Create V7 script
-    script_content = f'''
-import sys
-sys.path.insert(0, '{cwd}')
-
-from browser.v7.agent import FormFillerAgent
-
-job_url = "{job_url}"
-
-print("=" * 60)
-print("V7 AGENT Form Filler")
-print(f"URL: {{job_url}}")
-print("=" * 60)
-
-agent = FormFillerAgent()
-
-try:
-    agent.connect()
-    agent.fill_form(job_url)
-except KeyboardInterrupt:
-    print("\\n⚠️ Interrupted")
-except Exception as e:
-    print(f"\\n❌ Error: {{e}}")
-    import traceback
-    traceback.print_exc()
-finally:
-    input("\\nPress Enter to close...")
-    agent.close()
-'''
-    
-    script_file = Path("/tmp/v7_agent_script.py")
-    script_file.write_text(script_content)
-    
-    # Run in Terminal — paths quoted because cwd may contain spaces
-    apple_script = f'''
-    tell application "Terminal"
-        do script "cd \\"{cwd}\\" && \\"{sys.executable}\\" \\"{script_file}\\""
-        delay 0.3
-        set current settings of front window to settings set "Basic"
-        set font size of front window to 13
-    end tell
-    '''
-    
-    try:
-        subprocess.run(['osascript', '-e', apple_script], capture_output=True)
-    except:
-        subprocess.Popen(
-            [sys.executable, str(script_file)],
-            stdout=open("/tmp/v7_agent.log", "w"),
-            stderr=subprocess.STDOUT,
-            cwd=str(cwd)
-        )
-    
-    return {
-        "ok": True,
-        "message": "V7 Agent started in Terminal",
-        "job_url": job_url
-    }
-
-
-@app.get("/chrome/status")
-def chrome_debug_status():
-    """Check if Chrome is running with debug port."""
-    import socket
-    
-    def check_port(port):
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(1)
-                return s.connect_ex(('localhost', port)) == 0
-        except:
-            return False
-    
-    running = check_port(9222)
-    return {
-        "running": running,
-        "port": 9222,
-        "message": "Chrome debug ready" if running else "Chrome not running on debug port"
-    }
-
-
-@app.post("/chrome/start")
-def start_chrome_debug_endpoint():
-    """Start Chrome with debug port."""
-    import subprocess
-    import sys
-    
-    cwd = Path(__file__).parent.resolve()
-    
-    try:
-        result = subprocess.run(
-            [sys.executable, str(cwd / "browser/start_chrome_debug.py")],
-            capture_output=True,
-            text=True,
-            timeout=15
-        )
-        
-        if "✅" in result.stdout:
-            return {"ok": True, "message": result.stdout.strip()}
-        else:
-            return {"ok": False, "error": result.stdout.strip()}
-            
-    except Exception as e:
-        return {"ok": False, "error": str(e)}
-
-
-# ─────────────────────────────────────────────────────────────────────
-# Vision-based Form Filler
-# ─────────────────────────────────────────────────────────────────────
-
-@app.post("/apply/vision")
-async def apply_vision(payload: dict):
-    """
-    Fill job application using Claude Vision API.
-    Analyzes form screenshots and fills fields intelligently.
-    """
-    job_url = payload.get("job_url", "")
-    if not job_url:
-        return {"ok": False, "error": "job_url required"}
-    
-    # Run in background terminal
-    script = f'''
-import asyncio
-import sys
-sys.path.insert(0, str(Path(__file__).parent))
-
-from browser.v5.vision_filler import VisionFormFiller
-from playwright.async_api import async_playwright
-
-async def main():
-    filler = VisionFormFiller()
-    
-    async with async_playwright() as p:
-        browser = await p.chromium.connect_over_cdp("http://localhost:9222")
-        ctx = browser.contexts[0]
-        
-        print("Creating new page...")
-        page = await ctx.new_page()
-        await page.goto("{job_url}", wait_until="domcontentloaded", timeout=30000)
-        await asyncio.sleep(6)
-        
-        await page.bring_to_front()
-        print(f"Page loaded: {{await page.title()}}")
-        
-        print("\\nAnalyzing form with Claude Vision...")
-        analysis = await filler.analyze_form(page, num_screenshots=3)
-        print(analysis)
-        
-        input("\\nPress Enter to continue or Ctrl+C to cancel...")
-
-asyncio.run(main())
-'''
-    
-    # Save and run script
-    script_path = "/tmp/vision_apply.py"
-    with open(script_path, "w") as f:
-        f.write(script)
-    
-    import subprocess
-    subprocess.Popen([
-        "osascript", "-e",
-        f'tell application "Terminal" to do script "cd {str(Path(__file__).parent)} && source .venv/bin/activate && python {script_path}"'
-    ])
-    
-    return {"ok": True, "message": "Vision Form Filler started in Terminal"}
-
-
 if __name__ == "__main__":
+    import sys
     import uvicorn
+    sys.modules.setdefault("main", sys.modules[__name__])  # api.routers импортируют хелперы из main
     uvicorn.run(app, host="127.0.0.1", port=8001)
 
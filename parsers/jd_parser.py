@@ -391,8 +391,7 @@ def parse_and_store_jd(job_id: str, url: str, title: str, company: str, ats: str
     print(f"[JD Parser] Fetched {len(jd_text)} chars")
     
     # 2. Save full text to file
-    jd_file = JD_DIR / f"{job_id}.txt"
-    jd_file.write_text(jd_text, encoding='utf-8')
+    jd_file = save_jd_text(job_id, jd_text)
     print(f"[JD Parser] Saved to {jd_file.name}")
     
     # 3. Analyze with AI
@@ -421,6 +420,18 @@ def parse_and_store_jd(job_id: str, url: str, title: str, company: str, ats: str
     return {"ok": True, "summary": summary, "jd_text": jd_text}
 
 
+def save_jd_text(job_id: str, jd_text: str) -> Path:
+    """Save full JD text to data/jd/{job_id}.txt and add it to the semantic index."""
+    jd_file = JD_DIR / f"{job_id}.txt"
+    jd_file.write_text(jd_text, encoding='utf-8')
+    try:
+        from utils.semantic_index import on_jd_stored
+        on_jd_stored(job_id, jd_text)
+    except ImportError:
+        pass  # numpy not installed - semantic matching disabled
+    return jd_file
+
+
 def get_stored_jd(job_id: str) -> Optional[str]:
     """Get full JD text from file"""
     jd_file = JD_DIR / f"{job_id}.txt"
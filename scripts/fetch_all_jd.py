@@ -22,7 +22,7 @@ from datetime import datetime
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from parsers.jd_parser import fetch_jd_from_url
+from parsers.jd_parser import fetch_jd_from_url, save_jd_text
 from storage.job_storage import _load_jobs
 
 JD_DIR = PROJECT_ROOT / "data" / "jd"
@@ -62,8 +62,7 @@ def fetch_single_jd(job: dict) -> dict:
         jd_text = fetch_jd_from_url(url, ats)
         if jd_text and len(jd_text) > 50:
             # Save to file
-            jd_file = JD_DIR / f"{job_id}.txt"
-            jd_file.write_text(jd_text, encoding="utf-8")
+            save_jd_text(job_id, jd_text)
             return {"ok": True, "id": job_id, "chars": len(jd_text)}
         else:
             return {"ok": False, "id": job_id, "error": "empty or too short"}
@@ -12,4 +12,11 @@ fi
 
 echo "🟢 Starting PROD on http://localhost:8000"
 echo "🤖 Ollama AI: $(curl -s http://localhost:11434/api/tags >/dev/null 2>&1 && echo 'Ready' || echo 'Not available')"
+# Один процесс — uvicorn --workers N не поддерживается (см. utils/shared_state.py):
+# apply pool, логи apply, MATCH_BATCH_STATUS и meta SemanticIndex живут в памяти процесса,
+# запросы /apply/* и /match/* попадали бы в чужой worker (404 / "No log file").
+# Общая SQLite нужна только чтобы dev (:8001) и prod не крутили daemon одновременно.
+if [ -n "$WORKERS" ] && [ "$WORKERS" != "1" ]; then
+    echo "⚠️  WORKERS=$WORKERS игнорируется (apply/matching per-process) — запускаю 1 процесс"
+fi
 uvicorn main:app --port 8000 --reload
@@ -23,12 +23,18 @@ from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional, List, Set
 from utils.location_utils import normalize_job_location
+from utils.metrics import STORAGE_BYTES, STORAGE_SECONDS, timed
 
 
 DATA_DIR = Path(__file__).parent.parent / "data"
 JOBS_FILE = DATA_DIR / "jobs_new.json"  # Unified with pipeline
 REJECTED_FILE = DATA_DIR / "rejected_jobs.json"  # Memory of rejected/excluded job IDs
 
+
+def _timed_io(file: str, op: str):
+    """/metrics: latency of a storage read/write (bytes are counted inside)."""
+    return timed(STORAGE_SECONDS, labels=lambda *a, **kw: {"file": file, "op": op})
+
 # Статусы
 STATUS_NEW = "new"
 STATUS_APPLIED = "applied"
@@ -58,17 +64,20 @@ def _now_iso() -> str:
 
 SKIP_STATUSES = {STATUS_REJECTED, STATUS_EXCLUDED, STATUS_WITHDRAWN}
 
+@_timed_io("rejected", "read")
 def _load_rejected() -> dict:
     """Load rejected jobs memory: {ats_job_id: {title, company, date, reason}}"""
     if not REJECTED_FILE.exists():
         return {}
     try:
         with REJECTED_FILE.open("r", encoding="utf-8") as f:
+            STORAGE_BYTES.inc(os.fstat(f.fileno()).st_size, file="rejected", op="read")
             return json.load(f)
     except (json.JSONDecodeError, IOError):
         return {}
 
 
+@_timed_io("rejected", "write")
 def _save_rejected(data: dict):
     """Save rejected jobs memory with atomic write + fsync (iCloud safe)"""
     REJECTED_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -78,6 +87,7 @@ def _save_rejected(data: dict):
             json.dump(data, f, ensure_ascii=False, indent=2)
             f.flush()
             os.fsync(f.fileno())
+            STORAGE_BYTES.inc(os.fstat(f.fileno()).st_size, file="rejected", op="write")
         os.replace(tmp_path, str(REJECTED_FILE))
         dir_fd = os.open(str(REJECTED_FILE.parent), os.O_RDONLY)
         os.fsync(dir_fd)
@@ -124,17 +134,20 @@ def remove_from_rejected(ats_job_id: str):
         _save_rejected(rejected)
 
 
+@_timed_io("jobs", "read")
 def _load_jobs() -> List[dict]:
     """Load all jobs from storage"""
     if not JOBS_FILE.exists():
         return []
     try:
         with JOBS_FILE.open("r", encoding="utf-8") as f:
+            STORAGE_BYTES.inc(os.fstat(f.fileno()).st_size, file="jobs", op="read")
             return json.load(f)
     except (json.JSONDecodeError, IOError):
         return []
 
 
+@_timed_io("jobs", "write")
 def _save_jobs(jobs: List[dict]):
     """Save all jobs to storage with atomic write + fsync (iCloud safe)"""
     JOBS_FILE.parent.mkdir(parents=True, exist_ok=True)
@@ -144,6 +157,7 @@ def _save_jobs(jobs: List[dict]):
             json.dump(jobs, f, ensure_ascii=False, indent=2)
             f.flush()
             os.fsync(f.fileno())
+            STORAGE_BYTES.inc(os.fstat(f.fileno()).st_size, file="jobs", op="write")
         os.replace(tmp_path, str(JOBS_FILE))
         # fsync directory to ensure rename is persisted
         dir_fd = os.open(str(JOBS_FILE.parent), os.O_RDONLY)
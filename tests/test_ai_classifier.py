@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils import ai_classifier
+from utils.ai_classifier import apply_ai_role, normalize_title, parse_batch_response
+
+
+def test_normalize_title_strips_noise():
+    assert normalize_title("Sr. Program Lead (Remote) [R-12345]") == "sr program lead"
+    assert normalize_title("Program  Lead - REQ 991") == normalize_title("program lead")
+
+
+def test_parse_batch_response_validates_items():
+    response = """Here you go:
+    [{"i": 0, "role_family": "product", "role_id": "product_lead", "confidence": 88, "reason": "PM"},
+     {"i": 1, "role_family": "astronaut", "confidence": 90},
+     {"i": 2, "role_family": "other", "confidence": "abc"},
+     {"i": 7, "role_family": "project", "confidence": 80}]"""
+    parsed = parse_batch_response(response, 3)
+    assert list(parsed) == [0]
+    assert parsed[0]["role_family"] == "product"
+    assert parse_batch_response("not json", 3) == {}
+
+
+def test_batch_retries_only_failed_items(monkeypatch, tmp_path):
+    monkeypatch.setattr(ai_classifier, "CACHE_FILE", tmp_path / "cache.json")
+    monkeypatch.setattr(ai_classifier, "_cache", {})
+    prompts = []
+
+    def fake_call(prompt):
+        prompts.append(prompt)
+        if len(prompts) == 1:
+            # second item missing from the answer
+            return '[{"i": 0, "role_family": "product", "confidence": 90, "reason": "x"}]'
+        return '[{"i": 0, "role_family": "project", "confidence": 85, "reason": "y"}]'
+
+    monkeypatch.setattr(ai_classifier, "_resolve_backend", lambda backend: (fake_call, 1))
+    results = ai_classifier.classify_titles_batch(["Growth Lead", "Site Lead"], backend="test")
+
+    assert results["growth lead"]["role_family"] == "product"
+    assert results["site lead"]["role_family"] == "project"
+    assert len(prompts) == 2
+    assert "Growth Lead" not in prompts[1]
+    # Served from cache afterwards
+    assert ai_classifier.classify_titles_batch(["growth lead"], backend="test")["growth lead"]
+    assert len(prompts) == 2
+
+
+def test_failed_chunks_keep_finished_results(monkeypatch, tmp_path):
+    from utils.ai_executor import AIBudgetExceeded
+
+    monkeypatch.setattr(ai_classifier, "CACHE_FILE", tmp_path / "cache.json")
+    monkeypatch.setattr(ai_classifier, "_cache", {})
+    calls = []
+
+    def fake_call(prompt):
+        calls.append(prompt)
+        if "Site Lead" in prompt:
+            raise ConnectionError("boom")
+        if "Ops Lead" in prompt:
+            raise AIBudgetExceeded("over budget")
+        return '[{"i": 0, "role_family": "product", "confidence": 90, "reason": "x"}]'
+
+    monkeypatch.setattr(ai_classifier, "_resolve_backend", lambda backend: (fake_call, 1))
+    results = ai_classifier.classify_titles_batch(["Growth Lead", "Site Lead", "Ops Lead", "Data Lead"],
+                                                  backend="test", batch_size=1)
+
+    # Growth Lead done before the budget error, Data Lead never sent after it
+    assert set(results) == {"growth lead"}
+    assert not any("Data Lead" in p for p in calls)
+    assert "growth lead" in ai_classifier.json.loads((tmp_path / "cache.json").read_text())
+
+
+def test_apply_ai_role_respects_confidence():
+    job = {"title": "Growth Lead", "role_category": "unknown"}
+    assert not apply_ai_role(job, {"role_family": "product", "confidence": 40})
+    assert job["role_category"] == "unknown"
+    assert apply_ai_role(job, {"role_family": "product", "confidence": 90, "reason": "r"})
+    assert job["role_category"] == "adjacent" and job["role_family"] == "product"
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.ai_executor import AIBatchExecutor, AIBudgetExceeded, AIRetryableError, TokenBucket
+
+
+def _ok_response(text="ok", input_tokens=100, output_tokens=50):
+    return {
+        "content": [{"text": text}],
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+    }
+
+
+def test_token_bucket_blocks_until_refill():
+    bucket = TokenBucket(per_minute=6000)  # 100 tokens/sec
+    bucket.acquire(6000)
+    assert bucket.tokens < 1
+    bucket.acquire(10)  # ~0.1s wait
+    assert bucket.tokens < 10
+
+
+def test_retries_on_429_then_succeeds(monkeypatch):
+    executor = AIBatchExecutor(api_key="test", budget_usd=1.0, max_retries=3)
+    calls = {"n": 0}
+
+    def fake_post(prompt, max_tokens):
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise AIRetryableError(429, retry_after=0)
+        return _ok_response()
+
+    monkeypatch.setattr(executor, "_post", fake_post)
+    monkeypatch.setattr("utils.ai_executor.time.sleep", lambda s: None)
+
+    assert executor.call("hello", max_tokens=100) == "ok"
+    progress = executor.progress()
+    assert progress["retries"] == 2
+    assert progress["input_tokens"] == 100
+    assert progress["cost_usd"] > 0
+
+
+def test_budget_refuses_calls():
+    executor = AIBatchExecutor(api_key="test", budget_usd=0.0001)
+    with pytest.raises(AIBudgetExceeded):
+        executor.call("x" * 4000, max_tokens=2000)
+
+
+def test_map_counts_budget_skips(monkeypatch):
+    executor = AIBatchExecutor(api_key="test", budget_usd=0.02, max_workers=2)
+    monkeypatch.setattr(executor, "_post", lambda p, m: _ok_response(input_tokens=100, output_tokens=500))
+
+    results = executor.map(lambda item: executor.call("x" * 400, max_tokens=500), range(10))
+
+    progress = executor.progress()
+    assert progress["done"] == 10
+    assert progress["ok"] + progress["skipped_budget"] == 10
+    assert progress["skipped_budget"] > 0
+    assert progress["cost_usd"] <= 0.02
+    assert results.count(None) == progress["skipped_budget"]
+
+
+def test_map_clears_running_when_on_result_raises():
+    executor = AIBatchExecutor(api_key="test", budget_usd=1.0, max_workers=1)
+
+    def on_result(item, result):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        executor.map(lambda item: item, range(5), on_result=on_result)
+    assert executor.progress()["running"] is False  # следующий batch не блокируется
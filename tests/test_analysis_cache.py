@@ -0,0 +1,81 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.analysis_cache import AnalysisCache
+
+
+def test_lru_eviction_and_disk_read_through(tmp_path):
+    cache = AnalysisCache(cache_dir=tmp_path, max_entries=2)
+    cache.set("a", {"ok": True, "n": 1})
+    cache.set("b", {"ok": True, "n": 2})
+    cache.get("a")  # a становится самым свежим
+    cache.set("c", {"ok": True, "n": 3})
+
+    assert list(cache._data) == ["a", "c"]
+    assert cache.stats["evictions"] == 1
+
+    # Новый процесс / другой worker: память пустая, читаем с диска
+    other = AnalysisCache(cache_dir=tmp_path, max_entries=2)
+    assert other.get("b") == {"ok": True, "n": 2}
+    assert other.stats["disk_hits"] == 1
+
+
+def test_ttl_expiry_and_clear(tmp_path):
+    cache = AnalysisCache(cache_dir=tmp_path, ttl_seconds=60)
+    stale = time.time() - 120
+    cache._data["old"] = (stale, {"ok": True})
+    cache._write_disk("old", stale, {"ok": True})
+
+    assert cache.get("old") is None
+    assert cache.stats["expirations"] == 2  # память + диск
+    assert not (tmp_path / "old.json").exists()
+
+    cache.set("x", {"ok": True})
+    assert cache.delete("x") is True
+    assert cache.get("x") is None
+    cache.set("y", {"ok": True})
+    assert cache.clear() == 1
+    assert not list(tmp_path.glob("*.json"))
+
+
+def test_get_or_compute_coalesces_concurrent_requests(tmp_path):
+    cache = AnalysisCache(cache_dir=tmp_path)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"ok": True, "score": 80}
+
+    async def run():
+        return await asyncio.gather(*[cache.get_or_compute("k", compute) for _ in range(5)])
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == {"ok": True, "score": 80} for r in results)
+    assert cache.stats["coalesced"] == 4
+
+
+def test_get_or_compute_skips_uncacheable(tmp_path):
+    cache = AnalysisCache(cache_dir=tmp_path)
+
+    async def compute():
+        return {"ok": False, "error": "fetch failed"}
+
+    result = asyncio.run(cache.get_or_compute("k", compute, cacheable=lambda r: r.get("ok")))
+    assert result["ok"] is False
+    assert cache.get("k") is None
+
+
+def test_memory_only_cache_never_touches_disk(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = AnalysisCache(cache_dir=None, max_entries=1)
+    cache.set("kw_a", {"ok": True})
+    cache.set("kw_b", {"ok": True})
+    assert cache.get("kw_a") is None and cache.get("kw_b") == {"ok": True}
+    assert cache.info()["disk_entries"] == 0 and cache.clear() == 1
+    assert list(tmp_path.iterdir()) == []
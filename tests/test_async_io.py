@@ -0,0 +1,112 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import main
+from utils.async_io import gather_blocking, iterate_blocking, run_blocking
+
+
+async def asgi_get(app, path: str, query: str = "") -> tuple:
+    """Minimal in-process ASGI GET → (status, body) on the current event loop."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "", "headers": [(b"host", b"test")],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    status, chunks = None, []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)  # клиент не отключается
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+def test_gather_blocking_respects_limit():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work(n):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        if n == 3:
+            raise ValueError("boom")
+        return n * 10
+
+    async def run():
+        return [r async for r in gather_blocking(work, range(8), limit=3)]
+
+    results = asyncio.run(run())
+    assert peak[0] <= 3
+    assert sorted(r for _, r, e in results if e is None) == [0, 10, 20, 40, 50, 60, 70]
+    assert [type(e) for _, _, e in results if e is not None] == [ValueError]
+
+
+def test_iterate_blocking_runs_generator_off_loop():
+    loop_thread = threading.get_ident()
+    seen = []
+
+    def gen():
+        for i in range(3):
+            seen.append(threading.get_ident())
+            yield i
+
+    async def run():
+        return [i async for i in iterate_blocking(gen())], await run_blocking(sum, [1, 2, 3])
+
+    items, total = asyncio.run(run())
+    assert items == [0, 1, 2] and total == 6
+    assert loop_thread not in seen
+
+
+def test_health_stays_fast_during_full_refresh(monkeypatch):
+    companies = [{"id": f"gh{i}", "name": f"GH {i}", "ats": "greenhouse"} for i in range(10)]
+    companies += [{"id": f"wd{i}", "name": f"WD {i}", "ats": "workday"} for i in range(4)]
+
+    def slow_fetch(profile, cfg):
+        time.sleep(0.15)  # парсер: сетевой запрос + разбор
+        return [{"id": f"{cfg['id']}-1", "company": cfg["name"], "role_family": "product", "location_norm": {}}]
+
+    monkeypatch.setattr(main, "load_profile", lambda profile: companies)
+    monkeypatch.setattr(main, "_fetch_for_company", slow_fetch)
+    monkeypatch.setattr(main, "save_cache", lambda *a, **kw: None)
+    monkeypatch.setattr(main, "sync_cache_to_pipeline", lambda jobs: {"added": 0, "updated": 0})
+
+    async def run():
+        refresh = asyncio.ensure_future(asgi_get(main.app, "/refresh/stream", "profile=test"))
+        await asyncio.sleep(0.05)
+        latencies = []
+        while not refresh.done():
+            t0 = time.perf_counter()
+            status, body = await asgi_get(main.app, "/health")
+            latencies.append((time.perf_counter() - t0) * 1000)
+            assert status == 200 and json.loads(body)["status"] == "ok"
+            await asyncio.sleep(0.02)
+        return await refresh, latencies
+
+    (status, body), latencies = asyncio.run(run())
+    events = [json.loads(line[6:]) for line in body.decode().splitlines() if line.startswith("data: ")]
+    assert status == 200
+    assert events[-1] == {"type": "complete", "total_jobs": 14, "companies": 14, "pipeline_added": 0}
+    assert len(latencies) >= 20  # refresh длится ~2.1s
+    assert max(latencies) < 10, latencies
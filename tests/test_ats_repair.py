@@ -0,0 +1,114 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import ats_detector
+from ats_detector import ProbeCache, RepairQueue, try_repair_company
+
+
+def _fake_probes(monkeypatch, hit_url=None, delay=0.5):
+    calls = []
+
+    def run_probe(kind, url, target):
+        calls.append(url)
+        if url == hit_url:
+            return {"ats": "greenhouse", "board_url": "https://boards.greenhouse.io/acme", "verified": True}
+        time.sleep(delay)
+        return None
+
+    monkeypatch.setattr(ats_detector, "_run_probe", run_probe)
+    return calls
+
+
+def test_probes_run_in_parallel_and_first_hit_wins(tmp_path, monkeypatch):
+    hit = ats_detector.build_api_url("greenhouse", "acme")
+    calls = _fake_probes(monkeypatch, hit_url=hit)
+    start = time.time()
+    result = try_repair_company({"name": "Acme"}, cache=ProbeCache(tmp_path / "probes.json"))
+    assert result["ats"] == "greenhouse"
+    assert time.time() - start < 0.4  # не ждём медленные мёртвые пробы
+    assert len(calls) == len(ats_detector.repair_candidates({"name": "Acme"}))
+
+
+def test_dead_probes_are_cached_with_ttl(tmp_path, monkeypatch):
+    calls = _fake_probes(monkeypatch, delay=0)
+    cache = ProbeCache(tmp_path / "probes.json", ttl=60)
+    assert try_repair_company({"name": "Acme"}, cache=cache) is None
+    probed = len(calls)
+    assert probed > 0
+
+    # Следующий цикл (и новый процесс): все URL в negative cache → ни одной пробы
+    assert try_repair_company({"name": "Acme"}, cache=ProbeCache(tmp_path / "probes.json", ttl=60)) is None
+    assert len(calls) == probed
+
+    # TTL истёк → пробуем снова
+    expired = ProbeCache(tmp_path / "probes.json", ttl=0)
+    try_repair_company({"name": "Acme"}, cache=expired)
+    assert len(calls) == 2 * probed
+
+
+def test_repair_queue_dedupes_and_calls_back(monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow_repair(company):
+        started.set()
+        release.wait(2)
+        return {"ats": "lever", "board_url": "https://jobs.lever.co/acme", "verified": True}
+
+    monkeypatch.setattr(ats_detector, "try_repair_company", slow_repair)
+    repairs = RepairQueue()
+    assert repairs.submit({"name": "Acme"}, results.append) is True
+    started.wait(2)
+    assert repairs.submit({"name": "acme"}, results.append) is False  # уже в работе
+    release.set()
+    repairs._queue.join()
+    assert [r["ats"] for r in results] == ["lever"]
+    assert repairs.status()["repaired"] == 1 and repairs.status()["deduped"] == 1
+
+
+def test_repair_and_auto_disable_do_not_lose_updates(tmp_path, monkeypatch):
+    import json
+    import main
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    companies = [{"id": f"c{i}", "name": f"C{i}", "ats": "lever", "board_url": "x"} for i in range(20)]
+    (tmp_path / "data" / "companies.json").write_text(json.dumps(companies))
+
+    # ats-repair поток и daemon пишут companies.json одновременно
+    threads = [threading.Thread(target=main._save_company_repair,
+                                args=({"ats": "greenhouse", "board_url": f"gh/{i}"}, f"c{i}")) for i in range(10)]
+    threads += [threading.Thread(target=main._auto_disable_company, args=(f"c{i}", "HTTP 404", 5))
+                for i in range(10, 20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    saved = {c["id"]: c for c in json.loads((tmp_path / "data" / "companies.json").read_text())}
+    assert all(saved[f"c{i}"]["ats"] == "greenhouse" for i in range(10))
+    assert all(saved[f"c{i}"]["status"] == "auto_disabled" for i in range(10, 20))
+    assert not list((tmp_path / "data").glob("*.tmp"))
+
+
+def test_transient_probe_errors_are_not_cached(tmp_path, monkeypatch):
+    calls = []
+
+    def run_probe(kind, url, target):
+        calls.append(url)
+        if len(calls) % 2:
+            raise ats_detector.ProbeError("Read timed out")
+        return None  # 404 / ATS не найден
+
+    monkeypatch.setattr(ats_detector, "_run_probe", run_probe)
+    cache = ProbeCache(tmp_path / "probes.json", ttl=60)
+    assert try_repair_company({"name": "Acme"}, cache=cache) is None
+    failed = len(calls) // 2 + len(calls) % 2
+
+    calls.clear()
+    try_repair_company({"name": "Acme"}, cache=ProbeCache(tmp_path / "probes.json", ttl=60))
+    assert len(calls) == failed  # повторяются только упавшие по сети
@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import ats_detector
+from ats_detector import VerifyCache, verify_and_count_jobs, verify_ats_url
+
+
+class FakeResponse:
+    def __init__(self, status=200, body=b"", data=None):
+        self.status_code = status
+        self.body = body
+        self.data = data
+        self.read = 0
+        self.closed = False
+
+    def iter_content(self, size):
+        for i in range(0, len(self.body), size):
+            self.read += size
+            yield self.body[i:i + size]
+
+    def json(self):
+        return self.data
+
+    def close(self):
+        self.closed = True
+
+
+def _fresh_cache(monkeypatch):
+    monkeypatch.setattr(ats_detector, "_verify_cache", VerifyCache(ttl=60))
+
+
+def test_streamed_count_across_chunk_boundaries(monkeypatch):
+    _fresh_cache(monkeypatch)
+    monkeypatch.setattr(ats_detector, "STREAM_CHUNK", 7)
+    body = b'{"jobs": [' + b",".join(b'{"absolute_url": "u%d"}' % i for i in range(25)) + b"]}"
+    monkeypatch.setattr(ats_detector.requests, "get", lambda *a, **k: FakeResponse(body=body))
+
+    result = verify_and_count_jobs("greenhouse", "https://boards.greenhouse.io/acme")
+    assert result["ok"] and result["jobs_count"] == 25 and result["method"] == "stream"
+
+
+def test_at_least_aborts_download(monkeypatch):
+    _fresh_cache(monkeypatch)
+    resp = FakeResponse(body=b"".join(b'{"hostedUrl": "x"},' for _ in range(5000)))
+    monkeypatch.setattr(ats_detector.requests, "get", lambda *a, **k: resp)
+
+    result = verify_and_count_jobs("lever", "https://jobs.lever.co/acme", at_least=1)
+    assert result["jobs_count"] == 1
+    assert resp.closed and resp.read <= ats_detector.STREAM_CHUNK
+
+
+def test_total_field_and_cache(monkeypatch):
+    _fresh_cache(monkeypatch)
+    calls = []
+
+    def get(url, params=None, **kwargs):
+        calls.append(params)
+        return FakeResponse(data={"totalFound": 321, "content": [{}]})
+
+    monkeypatch.setattr(ats_detector.requests, "get", get)
+    first = verify_and_count_jobs("smartrecruiters", "https://jobs.smartrecruiters.com/Acme")
+    second = verify_and_count_jobs("smartrecruiters", "https://jobs.smartrecruiters.com/Acme")
+    assert first["jobs_count"] == second["jobs_count"] == 321
+    assert calls == [{"limit": 1}]
+
+
+def test_head_falls_back_to_streamed_get(monkeypatch):
+    _fresh_cache(monkeypatch)
+    got = []
+    monkeypatch.setattr(ats_detector.requests, "head", lambda *a, **k: FakeResponse(status=405))
+    monkeypatch.setattr(ats_detector.requests, "get",
+                        lambda *a, **k: got.append(k.get("stream")) or FakeResponse(status=200))
+
+    assert verify_ats_url("https://careers.example.com/jobs")
+    assert got == [True]
+    assert verify_ats_url("https://careers.example.com/jobs")  # из кэша
+    assert got == [True]
@@ -0,0 +1,60 @@
+import os
+import sys
+from pathlib import Path
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bench.corpus import ATS_MIX, generate_corpus
+from bench.mock_ats import MockATSServer, route_requests
+from bench.run import compare, run_bench
+
+
+def test_corpus_is_deterministic_and_covers_every_ats():
+    a, b = generate_corpus(800, seed=5), generate_corpus(800, seed=5)
+    assert a.fingerprint() == b.fingerprint()
+    assert a.fingerprint() != generate_corpus(800, seed=6).fingerprint()
+    summary = a.summary()
+    assert summary["jobs"] == 800 and set(summary["by_ats"]) == set(ATS_MIX)
+
+
+def test_every_parser_round_trips_through_mock():
+    import main
+
+    corpus = generate_corpus(1200, seed=7)
+    with MockATSServer(corpus) as server, route_requests(server):
+        for ats in ATS_MIX:
+            company = next(c for c in corpus.companies if c["ats"] == ats)
+            jobs = main.ATS_PARSERS[ats](company["board_url"])
+            assert len(jobs) == len(corpus.board(company)), ats
+        assert server.stats["not_found"] == 0
+
+
+def test_failing_boards_answer_503():
+    corpus = generate_corpus(300, seed=1)
+    with MockATSServer(corpus, failure_rate=1.0) as server, route_requests(server):
+        slug = next(c["slug"] for c in corpus.companies if c["ats"] == "greenhouse")
+        assert slug in server.failing
+        resp = requests.get(f"https://boards-api.greenhouse.io/v1/boards/{slug}/jobs", timeout=5)
+        assert resp.status_code == 503 and server.stats["failures"] == 1
+        assert requests.get("https://unknown.example.org/x", timeout=5).status_code == 404
+
+
+def test_scenarios_run_in_sandbox_and_compare():
+    import storage.job_storage as job_storage
+
+    jobs_file, cwd = job_storage.JOBS_FILE, os.getcwd()
+    result = run_bench([300], ["full_refresh", "jobs_filter", "pipeline_sync", "cache_load"], seed=3)
+    assert job_storage.JOBS_FILE == jobs_file and os.getcwd() == cwd  # всё восстановлено
+
+    rows = {r["scenario"]: r for r in result["results"]}
+    assert all(not r["error"] for r in rows.values()), rows
+    assert rows["full_refresh"]["jobs"] == 300
+    assert rows["pipeline_sync"]["updated"] == rows["pipeline_sync"]["added"] > 0
+
+    assert compare(result, result) == []
+    slower = {"results": [{**r, "seconds": r["seconds"] * 2 + 1} for r in result["results"]]}
+    assert len(compare(slower, result)) == len(rows)
+    other = {"results": [{**r, "fingerprint": "x"} for r in slower["results"]]}
+    assert compare(other, result) == []  # другой корпус — не сравниваем
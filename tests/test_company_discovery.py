@@ -0,0 +1,90 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from tools import company_discovery as cd
+
+
+def _candidates(n, host="careers.example.com"):
+    return [{"id": f"c{i}", "careers_url": f"https://{host}/{i}", "status": "pending_validation"}
+            for i in range(n)]
+
+
+def test_validate_runs_concurrently_and_persists(tmp_path, monkeypatch):
+    monkeypatch.setattr(cd, "STAGING_FILE", tmp_path / "staging.json")
+    monkeypatch.setattr(cd, "DISCOVERY_WORKERS", 8)
+
+    def detect(url):
+        time.sleep(0.2)
+        return {"ats": "greenhouse", "board_url": url, "ats_verified": True, "supported": True}
+
+    monkeypatch.setattr(cd, "detect_and_validate", detect)
+    # разные host → per-host limit не мешает
+    candidates = [c for i in range(6) for c in _candidates(1, host=f"h{i}.example.com")]
+    start = time.time()
+    assert cd.validate_candidates(candidates) == 6
+    assert time.time() - start < 0.8
+
+    saved = json.loads((tmp_path / "staging.json").read_text())
+    assert all(c["status"] == "validated" for c in saved)
+
+
+def test_per_host_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(cd, "STAGING_FILE", tmp_path / "staging.json")
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def detect(url):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return {"ats": "unknown", "board_url": url, "ats_verified": False, "supported": False}
+
+    monkeypatch.setattr(cd, "detect_and_validate", detect)
+    candidates = _candidates(10, host="same-host.example.com")
+    cd.validate_candidates(candidates, persist=False)
+    assert peak[0] <= cd.PER_HOST_LIMIT
+    assert all(c["status"] == "no_ats_detected" for c in candidates)
+
+
+def test_partial_run_is_resumable(tmp_path, monkeypatch):
+    monkeypatch.setattr(cd, "STAGING_FILE", tmp_path / "staging.json")
+
+    def detect(url):
+        if url.endswith("/3"):
+            raise RuntimeError("boom")
+        return {"ats": "lever", "board_url": url, "ats_verified": True, "supported": True}
+
+    monkeypatch.setattr(cd, "detect_and_validate", detect)
+    candidates = _candidates(5)
+    cd.validate_candidates(candidates)
+    saved = {c["id"]: c for c in json.loads((tmp_path / "staging.json").read_text())}
+    assert saved["c3"]["status"] == "validation_error"
+    assert saved["c3"]["error"] == "boom"
+    assert sum(1 for c in saved.values() if c["status"] == "validated") == 4
+
+    # повторный прогон: проверяется только упавший кандидат
+    monkeypatch.setattr(cd, "detect_and_validate", lambda url: {
+        "ats": "lever", "board_url": url, "ats_verified": True, "supported": True})
+    candidates = cd.load_staging()
+    assert cd.validate_candidates(candidates) == 1
+    retried = next(c for c in candidates if c["id"] == "c3")
+    assert retried["status"] == "validated" and "error" not in retried
+    assert cd.validate_candidates(cd.load_staging()) == 0
+
+
+def test_count_relevant_roles_uses_classify_role():
+    jobs = [
+        {"title": "Senior Technical Program Manager"},
+        {"title": "Product Manager, Payments"},
+        {"title": "Software Engineer"},
+    ]
+    roles = cd.count_relevant_roles(jobs)
+    assert roles["relevant"] == 2
+    assert "Software Engineer" not in roles["titles"]
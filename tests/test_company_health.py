@@ -0,0 +1,80 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.company_health import CompanyHealthStore, payload_hash
+
+
+def test_writes_stay_in_memory_until_flush(tmp_path):
+    path = tmp_path / "company_status.json"
+    store = CompanyHealthStore(path=path)
+    store.record_ok("Stripe", ats="greenhouse", jobs=[{"url": "a"}, {"url": "b"}], latency_ms=120)
+    assert store.record_error("figma", "HTTP 404") == 1
+    assert store.record_error("figma", "HTTP 404") == 2
+    assert not path.exists()
+
+    assert store.flush() is True
+    assert store.flush() is False  # nothing changed
+    saved = json.loads(path.read_text())
+    assert saved["stripe"]["jobs_count"] == 2
+    assert saved["stripe"]["payload_hash"] == payload_hash([{"url": "b"}, {"url": "a"}])
+    assert saved["figma"]["consecutive_errors"] == 2
+
+    # Счётчик ошибок переживает рестарт, успех его сбрасывает
+    other = CompanyHealthStore(path=path)
+    assert other.consecutive_errors("Figma") == 2
+    other.record_ok("figma")
+    assert other.consecutive_errors("figma") == 0
+    assert other.get("missing", "FIGMA")["ok"] is True
+
+
+def test_migrates_both_legacy_key_formats(tmp_path):
+    path = tmp_path / "company_status.json"
+    path.write_text(json.dumps({
+        "anton_tpm:Stripe": {"ok": True, "error": "", "checked_at": "2026-01-02T00:00:00Z", "ats": "greenhouse"},
+        "stripe": {"ok": False, "jobs_count": 0, "error": "timeout", "updated_at": "2026-01-01T00:00:00Z"},
+    }))
+    store = CompanyHealthStore(path=path)
+    entry = store.get("stripe")
+    assert entry["ok"] is True  # более свежая запись побеждает
+    assert entry["ats"] == "greenhouse"
+    assert list(store.snapshot()) == ["stripe"]
+
+
+def test_refresh_company_sync_records_every_failure(tmp_path, monkeypatch):
+    import main
+
+    store = CompanyHealthStore(path=tmp_path / "company_status.json")
+    monkeypatch.setattr(main, "company_health", store)
+
+    def broken(board_url):
+        raise ConnectionError("timeout")
+
+    monkeypatch.setitem(main.ATS_PARSERS, "greenhouse", broken)
+    result = main.refresh_company_sync({"id": "figma", "ats": "greenhouse", "board_url": "x"})
+    assert not result["ok"] and result["error"] == "timeout"
+
+    # Неизвестный ATS — тоже ошибка в health, иначе компанию никогда не починят и не отключат
+    result = main.refresh_company_sync({"id": "figma", "ats": "taleo", "board_url": "x"})
+    assert not result["ok"] and result["error"] == "Unknown ATS: taleo"
+    assert store.consecutive_errors("figma") == 2
+    assert store.get("figma")["error"] == "Unknown ATS: taleo"
+
+
+def test_health_store_is_in_memory_unless_sqlite_requested(tmp_path, monkeypatch):
+    import atexit
+
+    from utils import company_health, shared_state
+
+    monkeypatch.setattr(atexit, "register", lambda fn: fn)
+    monkeypatch.setattr(shared_state, "_state", shared_state.SharedState(tmp_path / "shared.db"))
+
+    monkeypatch.delenv("SHARED_STATE", raising=False)
+    monkeypatch.setattr(company_health, "_store", None)
+    assert company_health.get_health_store().info()["backend"] == "memory"
+
+    monkeypatch.setenv("SHARED_STATE", "sqlite")
+    monkeypatch.setattr(company_health, "_store", None)
+    assert company_health.get_health_store().info()["backend"] == "shared"
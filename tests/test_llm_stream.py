@@ -0,0 +1,76 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils import llm_stream
+
+
+class FakeStreamResponse:
+    def __init__(self, lines, status_code=200):
+        self.lines = lines
+        self.status_code = status_code
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self, decode_unicode=True):
+        return iter(self.lines)
+
+
+def _claude_lines(chunks):
+    lines = ["event: message_start", 'data: {"type": "message_start"}']
+    for text in chunks:
+        lines.append("data: " + json.dumps({"type": "content_block_delta", "delta": {"type": "text_delta", "text": text}}))
+    lines.append('data: {"type": "message_stop"}')
+    return lines
+
+
+def test_claude_stream_yields_deltas_and_caches(monkeypatch):
+    calls = []
+
+    def fake_post(*args, **kwargs):
+        calls.append(kwargs["json"])
+        return FakeStreamResponse(_claude_lines(["Hel", "lo"]))
+
+    monkeypatch.setattr(llm_stream.requests, "post", fake_post)
+    llm_stream._cache.clear()
+
+    assert list(llm_stream.claude_stream("prompt-1", api_key="k")) == ["Hel", "lo"]
+    assert calls[0]["stream"] is True
+    # Second call is served from the response cache
+    assert llm_stream.complete(llm_stream.claude_stream("prompt-1", api_key="k")) == "Hello"
+    assert len(calls) == 1
+
+
+def test_ollama_stream_parses_ndjson(monkeypatch):
+    lines = [json.dumps({"response": "a", "done": False}), json.dumps({"response": "b", "done": True})]
+    monkeypatch.setattr(llm_stream.requests, "post", lambda *a, **k: FakeStreamResponse(lines))
+    llm_stream._cache.clear()
+    assert list(llm_stream.ollama_stream("p")) == ["a", "b"]
+
+
+def test_sse_frame_format():
+    frame = llm_stream.sse("token", text="hi")
+    assert frame.startswith("data: ") and frame.endswith("\n\n")
+    assert json.loads(frame[6:]) == {"type": "token", "text": "hi"}
+
+
+def test_client_disconnect_is_not_an_ai_error(monkeypatch):
+    from utils import metrics
+
+    monkeypatch.setattr(llm_stream.requests, "post", lambda *a, **k: FakeStreamResponse(_claude_lines(["a", "b"])))
+    llm_stream._cache.clear()
+    metrics.AI_ERRORS.clear()
+    metrics.AI_CALL_SECONDS.clear()
+
+    stream = llm_stream.claude_stream("prompt-2", api_key="k")
+    assert next(stream) == "a"
+    stream.close()  # SSE-клиент ушёл → GeneratorExit внутри генератора
+
+    assert metrics.AI_CALL_SECONDS.count(backend="claude", model=llm_stream.CLAUDE_MODEL) == 1
+    assert metrics.AI_ERRORS.value(backend="claude", model=llm_stream.CLAUDE_MODEL) == 0
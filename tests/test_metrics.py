@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils import metrics
+from utils.metrics import Registry, timed
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    hist = registry.histogram("req_seconds", "Request time", ["route"], buckets=(0.1, 1))
+    hist.observe(0.05, route="/a")
+    hist.observe(0.1, route="/a")  # le="0.1" включает границу
+    hist.observe(3, route="/a")
+
+    text = registry.render()
+    assert "# TYPE jobtracker_req_seconds histogram" in text
+    assert 'jobtracker_req_seconds_bucket{route="/a",le="0.1"} 2' in text
+    assert 'jobtracker_req_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'jobtracker_req_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'jobtracker_req_seconds_count{route="/a"} 3' in text
+    assert hist.count(route="/a") == 3
+
+
+def test_timed_records_duration_and_errors():
+    registry = Registry()
+    hist = registry.histogram("work_seconds", "Work", ["kind"])
+    errors = registry.counter("work_errors", "Work errors", ["kind"])
+
+    @timed(hist, labels=lambda kind, fail=False: {"kind": kind}, errors=errors)
+    def work(kind, fail=False):
+        if fail:
+            raise ValueError(kind)
+        return kind.upper()
+
+    assert work("fetch") == "FETCH"
+    with pytest.raises(ValueError):
+        work("fetch", fail=True)
+
+    assert hist.count(kind="fetch") == 2
+    assert errors.value(kind="fetch") == 1
+    assert 'jobtracker_work_errors_total{kind="fetch"} 1' in registry.render()
+
+
+def test_observe_ai_counts_tokens_and_cost():
+    metrics.AI_TOKENS.clear()
+    metrics.AI_COST_USD.clear()
+    metrics.observe_ai("claude", "claude-sonnet-4-20250514", 1.2, input_tokens=1000, output_tokens=200)
+    metrics.observe_ai("ollama", "llama3.2:3b", 0.5, ok=False)
+
+    assert metrics.AI_TOKENS.value(backend="claude", model="claude-sonnet-4-20250514", direction="input") == 1000
+    assert metrics.AI_COST_USD.value(model="claude-sonnet-4-20250514") > 0
+    assert metrics.AI_ERRORS.value(backend="ollama", model="llama3.2:3b") >= 1
+
+
+def test_metrics_endpoint_exposes_app_metrics():
+    from fastapi.testclient import TestClient
+
+    import main
+
+    main.FETCH_TOTAL.clear()
+    main._observe_fetch("greenhouse", True, [{}, {}])
+    response = TestClient(main.app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'jobtracker_ats_fetch_total{ats="greenhouse",outcome="ok"} 1' in body
+    assert "# TYPE jobtracker_update_cache_for_company_seconds histogram" in body
+    assert "# TYPE jobtracker_ats_parser_fetch_seconds histogram" in body
+    assert "jobtracker_io_executor_active " in body
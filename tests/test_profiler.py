@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils import profiler, shared_state
+from utils.async_io import run_blocking
+
+
+def crunch(seconds: float):
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+@pytest.fixture
+def profile_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", tmp_path / "profiles")
+    monkeypatch.setattr(shared_state, "_state", shared_state.SharedState(tmp_path / "state.db"))
+    monkeypatch.setattr(profiler, "_config", {"slow_ms": 0.0, "checked": 0.0})
+    yield tmp_path / "profiles"
+    profiler.get_sampler().set_buffering(False)
+
+
+def test_requested_run_is_recorded_once(profile_env):
+    with profiler.profiled_if_requested("fill", "https://example.com/job") as recording:
+        assert recording is None  # nothing requested → no overhead
+
+    profiler.request_profile("fill")
+    assert set(profiler.pending()) == {"fill"}
+    with profiler.profiled_if_requested("fill", "https://example.com/job", thread_only=True) as recording:
+        crunch(0.15)
+    assert recording is not None and profiler.take_request("fill") is False
+
+    [info] = profiler.list_profiles()
+    assert info["kind"] == "fill" and info["samples"] > 0
+    collapsed = profiler.profile_path(info["name"]).read_text()
+    assert "tests/test_profiler.py:crunch" in collapsed
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+    assert profiler.profile_path("../state") is None
+
+
+def test_slow_request_middleware_saves_only_slow_requests(profile_env):
+    async def app(scope, receive, send):
+        seconds = 0.2 if scope["path"] in ("/slow", "/stream") else 0.0
+        headers = [(b"content-type", b"text/event-stream; charset=utf-8")] if scope["path"] == "/stream" else []
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await run_blocking(crunch, seconds)
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = profiler.SlowRequestProfiler(app)
+    profiler.set_slow_ms(100)
+
+    async def call(path):
+        scope = {"type": "http", "method": "GET", "path": path, "query_string": b"q=1"}
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware(scope, None, send)
+        return sent
+
+    async def run():
+        await call("/fast")
+        await call("/slow")
+        await call("/health")
+        await call("/stream")  # SSE всегда «медленный» — не профилируем
+
+    asyncio.run(run())
+    profiles = profiler.list_profiles()
+    assert [p["label"] for p in profiles] == ["GET /slow"]
+    assert profiles[0]["status"] == 200 and profiles[0]["duration_ms"] >= 100
+    assert "crunch" in profiler.profile_path(profiles[0]["name"]).read_text()
+
+    profiler.set_slow_ms(0)
+    deadline = time.time() + 2
+    while profiler.get_sampler().running and time.time() < deadline:
+        time.sleep(0.02)
+    assert not profiler.get_sampler().running  # no demand → sampler thread exits
+
+
+def test_debug_profiles_endpoint(profile_env):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    client = TestClient(main.app)
+    assert client.post("/debug/profiles/request/daemon").json()["pending"].keys() == {"daemon"}
+    assert client.post("/debug/profiles/request/nope").json()["ok"] is False
+
+    recording = profiler.begin("daemon", "cycle 1")
+    worker = threading.Thread(target=crunch, args=(0.1,), name="io_0")
+    worker.start()
+    worker.join()
+    profiler.finish(recording, companies=3)
+
+    listing = client.get("/debug/profiles").json()
+    assert listing["ok"] and [p["kind"] for p in listing["profiles"]] == ["daemon"]
+    name = listing["profiles"][0]["name"]
+    assert "io;" in client.get(f"/debug/profiles/{name}").text
+    assert client.get("/debug/profiles/missing").json()["ok"] is False
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from api.routers import ROUTERS, LazyRouterMiddleware, LazyRouters
+from tools.import_budget import check
+
+
+def test_match_prefixes():
+    lazy = LazyRouters(FastAPI())
+    assert lazy.match("/jobs") == "jobs"
+    assert lazy.match("/jobs/review") == "jobs"
+    assert lazy.match("/job/find-by-url") == "pipeline"
+    assert lazy.match("/apply-log") == "apply"
+    assert lazy.match("/api/v5/knowledge-base") == "knowledge_base"
+    assert lazy.match("/job_status") is None
+    assert lazy.match("/companies") is None
+
+
+def test_router_loaded_on_first_request():
+    app = FastAPI()
+    lazy = LazyRouters(app)
+    app.add_middleware(LazyRouterMiddleware, routers=lazy)
+    client = TestClient(app)
+
+    assert lazy.loaded == {}
+    response = client.get("/discovery/candidates")
+    assert response.status_code == 200
+    assert "candidates" in response.json()
+    assert list(lazy.loaded) == ["discovery"]
+
+    paths = client.get("/openapi.json").json()["paths"]
+    assert set(lazy.loaded) == set(ROUTERS)
+    assert "/cv/preview" in paths and "/apply/v5" in paths and "/pipeline/all" in paths
+
+
+def test_import_main_stays_light():
+    report = check("main", runs=1, total_ms=60_000, own_ms=60_000)
+    assert report["heavy_imports"] == []
@@ -0,0 +1,73 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils import semantic_index
+from utils.semantic_index import HashingEmbedder, SemanticIndex, chunk_text
+
+
+@pytest.fixture
+def index(monkeypatch, tmp_path):
+    monkeypatch.setattr(semantic_index, "INDEX_DIR", tmp_path / "emb")
+    monkeypatch.setattr(semantic_index, "VECTORS_FILE", tmp_path / "emb" / "vectors.f32")
+    monkeypatch.setattr(semantic_index, "META_FILE", tmp_path / "emb" / "meta.json")
+    monkeypatch.setattr(semantic_index, "_embedder", HashingEmbedder())
+    return SemanticIndex()
+
+
+def test_chunking_overlaps():
+    words = " ".join(f"w{i}" for i in range(450))
+    chunks = chunk_text(words, words=200, overlap=40)
+    assert len(chunks) == 3
+    assert chunks[1].split()[0] == "w160"
+
+
+def test_doc_scores_rank_related_text_higher(index):
+    index.add("tpm", "technical program manager cloud migration agile release planning stakeholders " * 20)
+    index.add("chef", "line cook kitchen menu restaurant food preparation " * 20)
+    index.add("pm", "product manager roadmap customer discovery agile stakeholders " * 60)
+
+    query = index.embedder.encode(["technical program manager agile cloud migration"])[0]
+    scores = index.doc_scores(query)
+    assert set(scores) == {"tpm", "chef", "pm"}
+    assert scores["tpm"] > scores["pm"] > scores["chef"]
+    assert index.top_k(query, k=1)[0][0] == "tpm"
+    # Subset query matches full query values
+    assert index.doc_scores(query, ["chef"])["chef"] == pytest.approx(scores["chef"])
+
+
+def test_index_persists_and_appends(index):
+    index.add("a", "alpha beta gamma " * 10)
+    reopened = SemanticIndex()
+    assert reopened.has("a")
+    reopened.add("b", "delta epsilon " * 10)
+    assert reopened.matrix.shape[0] == len(reopened.meta["rows"]) == 2
+
+
+def test_two_writers_and_crash_keep_rows_aligned(index):
+    other = SemanticIndex()  # второй процесс со своей meta в памяти
+    index.add("a", "alpha beta gamma " * 10)
+    other.add("b", "delta epsilon zeta " * 10)
+    index.add("c", "kitchen menu restaurant " * 10)
+
+    fresh = SemanticIndex()
+    assert set(fresh.meta["docs"]) == {"a", "b", "c"}
+    for doc_id, text in (("a", "alpha beta gamma"), ("b", "delta epsilon zeta"), ("c", "kitchen menu restaurant")):
+        query = fresh.embedder.encode([text * 10])[0]
+        assert fresh.top_k(query, k=1)[0][0] == doc_id
+
+    # Crash after the vector append, before meta.json → extra rows are dropped on load
+    with open(semantic_index.VECTORS_FILE, "ab") as f:
+        f.write(b"\0" * (fresh.embedder.dim * 4 * 2 + 3))
+    repaired = SemanticIndex()
+    assert repaired._file_rows() == len(repaired.meta["rows"]) == repaired.matrix.shape[0]
+
+    # Vectors shorter than meta → docs past the end are dropped
+    with open(semantic_index.VECTORS_FILE, "r+b") as f:
+        f.truncate(repaired.meta["docs"]["c"][0] * repaired.embedder.dim * 4)
+    assert set(SemanticIndex().meta["docs"]) == {"a", "b"}
@@ -0,0 +1,118 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.company_health import CompanyHealthStore
+from utils.shared_state import LeaderElector, SharedState
+
+
+def test_lease_expiry_bumps_fencing_token(tmp_path):
+    db = tmp_path / "state.db"
+    worker_a, worker_b = SharedState(db), SharedState(db)  # два процесса = два соединения
+
+    token_a = worker_a.acquire_lease("daemon", "a", ttl=0.2)
+    assert token_a == 1
+    assert worker_b.acquire_lease("daemon", "b", ttl=0.2) is None
+    assert worker_a.put("daemon", "status", {"by": "a"}, fence=("daemon", token_a))
+
+    time.sleep(0.25)  # a «завис» дольше lease
+    token_b = worker_b.acquire_lease("daemon", "b", ttl=5)
+    assert token_b == 2
+    assert worker_a.renew_lease("daemon", "a", token_a, ttl=5) is False
+    assert worker_a.put("daemon", "status", {"by": "a"}, fence=("daemon", token_a)) is False
+    assert worker_b.put("daemon", "status", {"by": "b"}, fence=("daemon", token_b)) is True
+    assert worker_a.get("daemon", "status") == {"by": "b"}
+
+    assert worker_b.release_lease("daemon", "b", token_b)
+    assert worker_a.acquire_lease("daemon", "a") == 3
+
+
+def test_update_is_atomic_across_connections(tmp_path):
+    db = tmp_path / "state.db"
+    SharedState(db)
+
+    def bump():
+        state = SharedState(db)
+        for _ in range(50):
+            state.update("counters", "hits", lambda v: v + 1, default=0)
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert SharedState(db).get("counters", "hits") == 200
+
+
+def test_leader_failover(tmp_path):
+    state = SharedState(tmp_path / "state.db")
+    first = LeaderElector("daemon", ttl=5, state=state, holder="w1")
+    second = LeaderElector("daemon", ttl=5, state=state, holder="w2")
+
+    assert first.tick() is True
+    assert second.tick() is False
+    assert first.tick() is True  # renew keeps the same token
+    assert first.fence == ("daemon", 1)
+
+    first.stop()  # shutdown releases the lease
+    assert first.is_leader is False
+    assert second.tick() is True
+    assert second.fence == ("daemon", 2)
+    assert state.check_fence("daemon", 1) is False
+
+
+def test_company_health_shared_between_workers(tmp_path):
+    legacy = tmp_path / "company_status.json"
+    legacy.write_text(json.dumps({"stripe": {"ok": True, "checked_at": "2026-01-01T00:00:00Z"}}))
+    db = tmp_path / "state.db"
+    worker_a = CompanyHealthStore(path=legacy, shared=SharedState(db))
+    worker_b = CompanyHealthStore(path=legacy, shared=SharedState(db))
+
+    assert worker_a.get("Stripe")["ok"] is True  # перенесено из company_status.json
+    assert worker_a.record_error("figma", "HTTP 404") == 1
+    assert worker_b.record_error("figma", "HTTP 404") == 2
+    assert worker_a.consecutive_errors("Figma") == 2
+    worker_b.reset_errors("figma")
+    assert worker_a.consecutive_errors("figma") == 0
+
+    assert worker_a.flush() is True
+    saved = json.loads(legacy.read_text())
+    assert set(saved) == {"stripe", "figma"}
+    assert worker_a.info()["backend"] == "shared"
+
+
+def test_stale_leader_cannot_write_cache_or_pipeline(tmp_path, monkeypatch):
+    import main
+    import storage.job_storage as job_storage
+    from utils import cache_manager
+
+    state = SharedState(tmp_path / "state.db")
+    monkeypatch.setattr(main, "get_shared_state", lambda: state)
+    monkeypatch.setattr(main, "classify_unknown_jobs", lambda jobs: None)
+    monkeypatch.setattr(cache_manager, "CACHE_DIR", tmp_path)
+    cache_path = tmp_path / "jobs_all.json"
+    cache_path.write_text(json.dumps({"jobs": [{"company_id": "stripe", "title": "Old"}]}))
+    bulk_calls = []
+    monkeypatch.setattr(job_storage, "get_all_jobs", lambda: [])
+    monkeypatch.setattr(job_storage, "add_jobs_bulk", lambda jobs: bulk_calls.append(jobs) or len(jobs))
+
+    def fresh_jobs():
+        return [{"id": "j1", "title": "TPM", "company": "Stripe", "url": "https://x/1",
+                 "role_category": "primary", "location_norm": {}}]
+
+    stale = ("daemon", state.acquire_lease("daemon", "a", ttl=0.2))
+    time.sleep(0.25)  # a завис, lease забрал b
+    current = ("daemon", state.acquire_lease("daemon", "b", ttl=5))
+
+    assert main.update_cache_for_company("stripe", fresh_jobs(), fence=stale) == 0
+    assert json.loads(cache_path.read_text())["jobs"] == [{"company_id": "stripe", "title": "Old"}]
+    assert not cache_path.with_suffix(".tmp").exists()
+    assert bulk_calls == []
+
+    assert main.update_cache_for_company("stripe", fresh_jobs(), fence=current) == 1
+    assert [j["title"] for j in json.loads(cache_path.read_text())["jobs"]] == ["TPM"]
+    assert len(bulk_calls) == 1
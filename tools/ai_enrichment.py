@@ -16,6 +16,7 @@ AI Enrichment Tool — заполнение пустых tags/industry/hq_state
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -27,6 +28,9 @@ COMPANIES_FILE = PROJECT_ROOT / "data" / "companies.json"
 # Загружаем .env (override=True нужен чтобы перезаписать пустые значения)
 load_dotenv(PROJECT_ROOT / ".env", override=True)
 
+MAX_CONCURRENT_BATCHES = 4
+MAX_ITEM_RETRIES = 2
+
 # Допустимые теги (из company_storage.py tag_mappings)
 VALID_TAGS = [
     # Security
@@ -161,6 +165,37 @@ def parse_enrichment_response(response: str) -> list:
     return []
 
 
+def enrich_batch(batch: list) -> list:
+    """
+    Один batch → один запрос. Валидируем каждый элемент ответа;
+    повторяем запрос только для компаний, которых нет в ответе / ответ невалиден.
+    """
+    results = {}
+    todo = batch
+    for attempt in range(MAX_ITEM_RETRIES + 1):
+        if not todo:
+            break
+        response = call_claude_api(build_enrichment_prompt(todo))
+        if response:
+            wanted = {c.get("id") for c in todo}
+            for e in parse_enrichment_response(response):
+                if isinstance(e, dict) and e.get("id") in wanted and (e.get("industry") or e.get("tags")):
+                    results[e["id"]] = e
+        todo = [c for c in todo if c.get("id") not in results]
+        if todo and attempt < MAX_ITEM_RETRIES:
+            print(f"  ⚠️ {len(todo)} компаний без валидного ответа, повтор ({attempt + 1}/{MAX_ITEM_RETRIES})")
+    return list(results.values())
+
+
+def enrich_batches(batches: list) -> list:
+    """Запускаем batch-и параллельно (до MAX_CONCURRENT_BATCHES запросов одновременно)"""
+    enrichments = []
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES) as pool:
+        for batch_result in pool.map(enrich_batch, batches):
+            enrichments.extend(batch_result)
+    return enrichments
+
+
 def apply_enrichment(companies: list, enrichments: list, dry_run: bool) -> int:
     """Применяем обогащение к компаниям"""
     # Индексируем enrichments по id
@@ -238,37 +273,20 @@ def main():
     # Batch по 10 компаний
     batch_size = 10
     total_changes = 0
+    batches = [needs_enrichment[i:i + batch_size] for i in range(0, len(needs_enrichment), batch_size)]
 
-    for i in range(0, len(needs_enrichment), batch_size):
-        batch = needs_enrichment[i:i + batch_size]
-        batch_num = i // batch_size + 1
-        total_batches = (len(needs_enrichment) + batch_size - 1) // batch_size
-
-        print(f"\n--- Batch {batch_num}/{total_batches} ({len(batch)} компаний) ---")
+    for batch_num, batch in enumerate(batches, 1):
+        print(f"\n--- Batch {batch_num}/{len(batches)} ({len(batch)} компаний) ---")
         for c in batch:
             print(f"  • {c['name']} ({c['ats']})")
 
-        if dry_run:
-            print("  [DRY RUN] Пропускаем API вызов")
-            continue
-
-        # Вызов Claude
-        prompt = build_enrichment_prompt(batch)
-        print("  🔄 Запрос к Claude API...")
-        response = call_claude_api(prompt)
-
-        if not response:
-            print("  ❌ Нет ответа от API, пропускаем batch")
-            continue
-
-        enrichments = parse_enrichment_response(response)
-        if not enrichments:
-            print("  ❌ Не удалось распарсить ответ")
-            continue
-
+    if dry_run:
+        print("\n  [DRY RUN] Пропускаем API вызовы")
+    else:
+        print(f"\n  🔄 Запрос к Claude API: {len(batches)} batch(ей), до {MAX_CONCURRENT_BATCHES} параллельно...")
+        enrichments = enrich_batches(batches)
         print(f"  ✅ Получено {len(enrichments)} результатов")
-        changes = apply_enrichment(companies, enrichments, dry_run=False)
-        total_changes += changes
+        total_changes = apply_enrichment(companies, enrichments, dry_run=False)
 
     print(f"\n{'=' * 50}")
     print(f"📝 Всего обогащено компаний: {total_changes}")
@@ -12,13 +12,20 @@ Company Discovery Tool — автоматический поиск компан
     python tools/company_discovery.py list             # показать кандидатов
     python tools/company_discovery.py validate         # проверить ATS + URL
     python tools/company_discovery.py preview          # preview релевантных ролей
+
+validate и preview идут параллельно (DISCOVERY_WORKERS потоков, не больше
+PER_HOST_LIMIT запросов на один host), staging сохраняется после каждого
+кандидата — прерванный прогон продолжается с того же места.
 """
 
 import json
 import os
 import re
 import sys
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from urllib.parse import urlparse
@@ -37,6 +44,10 @@ load_dotenv(PROJECT_ROOT / ".env", override=True)
 # Поддерживаемые ATS (из main.py ATS_PARSERS)
 SUPPORTED_ATS = ["greenhouse", "lever", "smartrecruiters", "ashby", "workday", "atlassian", "phenom"]
 
+# Параллелизм validate/preview
+DISCOVERY_WORKERS = int(os.getenv("DISCOVERY_WORKERS", "8"))
+PER_HOST_LIMIT = 3  # одновременных запросов на host (boards-api.greenhouse.io и т.п.)
+
 # Целевые роли (из config/roles.json — primary category)
 TARGET_ROLES = [
     "Product Manager", "Technical Program Manager", "Program Manager",
@@ -63,11 +74,58 @@ def load_staging() -> list:
         return json.load(f)
 
 
-def save_staging(candidates: list):
-    """Сохраняем staging area"""
-    with open(STAGING_FILE, "w", encoding="utf-8") as f:
-        json.dump(candidates, f, indent=2, ensure_ascii=False)
-    print(f"  💾 Сохранено {len(candidates)} кандидатов в {STAGING_FILE.name}")
+_staging_lock = threading.Lock()
+
+
+def save_staging(candidates: list, quiet: bool = False):
+    """Сохраняем staging area (атомарно: tmp + replace)"""
+    with _staging_lock:
+        tmp = STAGING_FILE.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(candidates, f, indent=2, ensure_ascii=False)
+        tmp.replace(STAGING_FILE)
+    if not quiet:
+        print(f"  💾 Сохранено {len(candidates)} кандидатов в {STAGING_FILE.name}")
+
+
+# ===== Concurrency helpers =====
+
+_host_limits: dict = {}
+_host_limits_lock = threading.Lock()
+
+
+@contextmanager
+def host_slot(url: str):
+    """Не больше PER_HOST_LIMIT одновременных запросов к одному host."""
+    host = urlparse(url or "").netloc.lower()
+    with _host_limits_lock:
+        sem = _host_limits.setdefault(host, threading.BoundedSemaphore(PER_HOST_LIMIT))
+    with sem:
+        yield
+
+
+def run_concurrently(candidates: list, items: list, work, apply, persist: bool = True) -> int:
+    """
+    work(item) → result в пуле потоков; apply(item, result) — в вызывающем потоке,
+    после чего staging сохраняется (persist) — прогресс переживает рестарт.
+    """
+    if not items:
+        return 0
+    done = 0
+    with ThreadPoolExecutor(max_workers=min(DISCOVERY_WORKERS, len(items)),
+                            thread_name_prefix="discovery") as pool:
+        futures = {pool.submit(work, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # noqa: BLE001
+                result = e
+            apply(item, result)
+            done += 1
+            if persist:
+                save_staging(candidates, quiet=True)
+    return done
 
 
 def get_existing_ids() -> set:
@@ -413,20 +471,29 @@ def discover_from_seed_list(existing_ids: set) -> list:
 
 # ===== Validation =====
 
-def validate_candidates(candidates: list) -> int:
-    """Проверяем ATS для кандидатов со статусом pending_validation"""
-    changes = 0
-    pending = [c for c in candidates if c.get("status") == "pending_validation"]
+def validate_candidates(candidates: list, persist: bool = True) -> int:
+    """
+    Проверяем ATS для кандидатов со статусом pending_validation (параллельно).
+    validation_error (таймаут, DNS, ...) — временная ошибка, повторяем при следующем запуске.
+    """
+    pending = [c for c in candidates if c.get("status") in ("pending_validation", "validation_error")]
 
-    print(f"\n🔍 Валидация {len(pending)} кандидатов...")
+    print(f"\n🔍 Валидация {len(pending)} кандидатов ({DISCOVERY_WORKERS} потоков)...")
 
-    for c in pending:
-        cid = c["id"]
+    def work(c):
         careers_url = c.get("careers_url", "")
-        print(f"  [{cid}] {careers_url}")
+        with host_slot(careers_url):
+            return detect_and_validate(careers_url)
 
-        result = detect_and_validate(careers_url)
+    def apply(c, result):
+        cid = c["id"]
+        if isinstance(result, Exception):
+            print(f"  [{cid}] 💥 Ошибка проверки (повторим в следующий раз): {result}")
+            c["status"] = "validation_error"
+            c["error"] = str(result)
+            return
 
+        c.pop("error", None)
         c["ats"] = result["ats"]
         c["board_url"] = result["board_url"]
         c["ats_verified"] = result["ats_verified"]
@@ -434,25 +501,37 @@ def validate_candidates(candidates: list) -> int:
 
         if result["supported"]:
             c["status"] = "validated"
-            print(f"    ✅ {result['ats']} → {result['board_url']}")
+            print(f"  [{cid}] ✅ {result['ats']} → {result['board_url']}")
         elif result["ats"] and result["ats"] != "unknown":
             c["status"] = "unsupported_ats"
-            print(f"    🟡 {result['ats']} (не поддерживается)")
+            print(f"  [{cid}] 🟡 {result['ats']} (не поддерживается)")
         else:
             c["status"] = "no_ats_detected"
-            print(f"    ❌ ATS не определён")
+            print(f"  [{cid}] ❌ ATS не определён ({c.get('careers_url', '')})")
 
-        changes += 1
-
-    return changes
+    return run_concurrently(candidates, pending, work, apply, persist)
 
 
 # ===== Preview Roles =====
 
-def preview_relevant_roles(candidates: list) -> int:
+def count_relevant_roles(jobs: list) -> dict:
+    """Классификация title через classify_role (config/roles.json), как в pipeline."""
+    from utils.job_utils import classify_role
+
+    relevant_titles, adjacent = [], 0
+    for job in jobs or []:
+        role = classify_role(job.get("title", ""), job.get("description") or "")
+        if role.get("role_category") == "primary":
+            relevant_titles.append(job.get("title", ""))
+        elif role.get("role_category") == "adjacent":
+            adjacent += 1
+    return {"relevant": len(relevant_titles), "adjacent": adjacent, "titles": relevant_titles}
+
+
+def preview_relevant_roles(candidates: list, persist: bool = True) -> int:
     """
     Для validated кандидатов — быстрый парсинг вакансий и подсчёт релевантных ролей.
-    Используем парсеры напрямую (без refresh_company_sync).
+    Используем парсеры напрямую (без refresh_company_sync), параллельно.
     """
     validated = [c for c in candidates if c.get("status") == "validated" and c.get("supported")]
 
@@ -460,7 +539,7 @@ def preview_relevant_roles(candidates: list) -> int:
         print("\n📊 Нет validated кандидатов для preview")
         return 0
 
-    print(f"\n📊 Preview ролей для {len(validated)} кандидатов...")
+    print(f"\n📊 Preview ролей для {len(validated)} кандидатов ({DISCOVERY_WORKERS} потоков)...")
 
     # Импортируем парсеры
     try:
@@ -481,60 +560,37 @@ def preview_relevant_roles(candidates: list) -> int:
         "workday": lambda url: fetch_workday("", url),
     }
 
-    # Ключевые слова для ролей
-    role_keywords = [
-        "product manager", "program manager", "project manager",
-        "tpm", "technical program", "product owner",
-        "delivery manager", "scrum master", "release manager",
-        "project lead",
-    ]
+    items = [c for c in validated if c["ats"] in ats_fetchers]
 
-    changes = 0
-    for c in validated:
-        cid = c["id"]
-        ats = c["ats"]
-        board_url = c["board_url"]
-
-        fetcher = ats_fetchers.get(ats)
-        if not fetcher:
-            continue
+    def work(c):
+        with host_slot(c["board_url"]):
+            jobs = ats_fetchers[c["ats"]](c["board_url"]) or []
+        return len(jobs), count_relevant_roles(jobs)
 
-        print(f"  [{cid}] Парсим {ats}: {board_url}...")
-
-        try:
-            jobs = fetcher(board_url)
-            total_jobs = len(jobs) if jobs else 0
-
-            # Считаем релевантные роли
-            relevant = 0
-            relevant_titles = []
-            for job in (jobs or []):
-                title = job.get("title", "").lower()
-                if any(kw in title for kw in role_keywords):
-                    relevant += 1
-                    relevant_titles.append(job.get("title", ""))
-
-            c["relevant_roles_count"] = relevant
-            c["total_jobs_count"] = total_jobs
-            c["relevant_titles_sample"] = relevant_titles[:5]
-
-            if relevant > 0:
-                c["status"] = "ready_to_approve"
-                print(f"    ✅ {total_jobs} вакансий, {relevant} релевантных")
-                for t in relevant_titles[:3]:
-                    print(f"       • {t}")
-            else:
-                c["status"] = "no_relevant_roles"
-                print(f"    ⚠️ {total_jobs} вакансий, 0 релевантных ролей")
-
-            changes += 1
-        except Exception as e:
-            print(f"    ❌ Ошибка парсинга: {e}")
+    def apply(c, result):
+        cid = c["id"]
+        if isinstance(result, Exception):
+            print(f"  [{cid}] ❌ Ошибка парсинга: {result}")
             c["status"] = "parse_error"
-            c["error"] = str(e)
-            changes += 1
+            c["error"] = str(result)
+            return
+
+        total_jobs, roles = result
+        c["relevant_roles_count"] = roles["relevant"]
+        c["adjacent_roles_count"] = roles["adjacent"]
+        c["total_jobs_count"] = total_jobs
+        c["relevant_titles_sample"] = roles["titles"][:5]
+
+        if roles["relevant"] > 0:
+            c["status"] = "ready_to_approve"
+            print(f"  [{cid}] ✅ {total_jobs} вакансий, {roles['relevant']} релевантных")
+            for t in roles["titles"][:3]:
+                print(f"       • {t}")
+        else:
+            c["status"] = "no_relevant_roles"
+            print(f"  [{cid}] ⚠️ {total_jobs} вакансий, 0 релевантных ролей")
 
-    return changes
+    return run_concurrently(candidates, items, work, apply, persist)
 
 
 # ===== List Candidates =====
@@ -557,6 +613,7 @@ def list_candidates():
         "ready_to_approve": "✅",
         "validated": "🔍",
         "pending_validation": "⏳",
+        "validation_error": "💥",
         "unsupported_ats": "🟡",
         "no_ats_detected": "❌",
         "no_relevant_roles": "⚠️",
@@ -23,6 +23,7 @@ from datetime import datetime
 from urllib.parse import urlparse
 
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 COMPANIES_FILE = PROJECT_ROOT / "data" / "companies.json"
 STATUS_FILE = PROJECT_ROOT / "data" / "company_status.json"
 
@@ -49,23 +50,16 @@ def load_status() -> dict:
 
 
 def verify_url(url: str, timeout: int = 10) -> bool:
-    """Проверяем доступность URL (HTTP 200)"""
+    """Проверяем доступность URL (HTTP 200) — через ats_detector (HEAD + TTL кэш)"""
+    from ats_detector import build_api_url, verify_ats_url
+
     try:
-        # Для greenhouse API
-        if "boards.greenhouse.io" in url:
-            token = url.rstrip("/").split("/")[-1]
-            api_url = f"https://boards-api.greenhouse.io/v1/boards/{token}/jobs"
-            r = requests.get(api_url, timeout=timeout)
-            return r.status_code == 200
-        # Для lever
-        if "jobs.lever.co" in url:
-            slug = url.rstrip("/").split("/")[-1]
-            api_url = f"https://api.lever.co/v0/postings/{slug}?mode=json"
-            r = requests.get(api_url, timeout=timeout)
-            return r.status_code == 200
+        # Для greenhouse / lever проверяем API борда
+        for host, ats in (("boards.greenhouse.io", "greenhouse"), ("jobs.lever.co", "lever")):
+            if host in url:
+                return verify_ats_url(build_api_url(ats, url.rstrip("/").split("/")[-1]), timeout)
         # Общая проверка
-        r = requests.head(url, timeout=timeout, allow_redirects=True)
-        return r.status_code < 400
+        return verify_ats_url(url, timeout)
     except Exception as e:
         print(f"  ⚠️ Ошибка проверки {url}: {e}")
         return False
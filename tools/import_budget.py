@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Import Budget — `python -X importtime -c "import main"` против бюджета (для CI)
+
+Проверяет:
+- total    полное время import main (median по --runs запускам), мс
+- own      self-time собственных модулей (main, api, parsers, utils, storage...), мс
+- heavy    тяжёлые зависимости, которые должны грузиться только внутри
+           handler-ов (bs4, docx, playwright, anthropic, numpy...), и
+           api.routers.* — routers подключаются лениво на первом запросе
+
+Exit code 1 при превышении бюджета или heavy-импорте.
+
+Использование:
+    python tools/import_budget.py                       # бюджеты по умолчанию
+    python tools/import_budget.py --total-ms 1200 --own-ms 150 --runs 7
+    python tools/import_budget.py --top 20              # самые дорогие модули
+    IMPORT_BUDGET_TOTAL_MS=2000 python tools/import_budget.py --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+TOTAL_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_TOTAL_MS", "1500"))
+OWN_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_OWN_MS", "200"))
+
+OWN_PACKAGES = ("main", "api", "parsers", "utils", "storage", "company_storage", "ats_detector")
+HEAVY_MODULES = (
+    "bs4", "docx", "playwright", "anthropic", "openai", "numpy", "pandas",
+    "torch", "sentence_transformers", "lxml", "api.routers.",
+)
+
+
+def measure_once(module: str = "main") -> dict:
+    """One `-X importtime` run in a fresh interpreter → {name: (self_us, cumulative_us)}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cum_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+            modules[name] = (int(self_us), int(cum_us))
+        except ValueError:
+            continue
+    return modules
+
+
+def is_own(name: str) -> bool:
+    return name.split(".")[0] in OWN_PACKAGES
+
+
+def is_heavy(name: str) -> bool:
+    return any(name == h or name.startswith(h if h.endswith(".") else h + ".") for h in HEAVY_MODULES)
+
+
+def check(module: str = "main", runs: int = 5, total_ms: float = TOTAL_BUDGET_MS,
+          own_ms: float = OWN_BUDGET_MS, top: int = 10) -> dict:
+    samples = [measure_once(module) for _ in range(max(1, runs))]
+    totals = [s.get(module, (0, 0))[1] / 1000 for s in samples]
+    owns = [sum(v[0] for k, v in s.items() if is_own(k)) / 1000 for s in samples]
+    last = samples[-1]
+    heavy = sorted(k for k in last if is_heavy(k))
+    slowest = sorted(last.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+
+    report = {
+        "module": module,
+        "runs": len(samples),
+        "total_ms": round(statistics.median(totals), 1),
+        "own_ms": round(statistics.median(owns), 1),
+        "total_budget_ms": total_ms,
+        "own_budget_ms": own_ms,
+        "heavy_imports": heavy,
+        "slowest_self_ms": [{"module": k, "self_ms": round(v[0] / 1000, 1), "cumulative_ms": round(v[1] / 1000, 1)}
+                            for k, v in slowest],
+    }
+    report["violations"] = (
+        ([f"total {report['total_ms']}ms > {total_ms}ms"] if report["total_ms"] > total_ms else [])
+        + ([f"own {report['own_ms']}ms > {own_ms}ms"] if report["own_ms"] > own_ms else [])
+        + [f"heavy import at startup: {m}" for m in heavy]
+    )
+    report["ok"] = not report["violations"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--total-ms", type=float, default=TOTAL_BUDGET_MS)
+    parser.add_argument("--own-ms", type=float, default=OWN_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = check(args.module, args.runs, args.total_ms, args.own_ms, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"⏱️  import {report['module']} (median of {report['runs']})")
+        print(f"   total: {report['total_ms']:7.1f} ms  (budget {report['total_budget_ms']:.0f})")
+        print(f"   own:   {report['own_ms']:7.1f} ms  (budget {report['own_budget_ms']:.0f})")
+        print("   slowest (self):")
+        for row in report["slowest_self_ms"]:
+            print(f"     {row['self_ms']:7.1f} ms  {row['module']}")
+        for v in report["violations"]:
+            print(f"❌ {v}")
+        if report["ok"]:
+            print("✅ Import budget OK")
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
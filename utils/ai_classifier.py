@@ -0,0 +1,304 @@
+"""
+Batch AI role classification for titles the rule engine can't place.
+
+classify_role() (utils/job_utils.py) returns role_category="unknown" for titles
+without a roles.json keyword. After a refresh there can be hundreds of them.
+Instead of one LLM request per title (ollama_ai.classify_role_ai) this module:
+
+- dedupes by normalized title and serves repeats from data/role_ai_cache.json
+- packs N titles into one structured-output prompt
+- validates every item of the JSON answer, retries only the failed items
+- runs batches concurrently against local Ollama or Claude
+
+Enabled by config/settings.json -> ai.enabled (cached answers are applied always).
+"""
+
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+DATA_DIR = Path(__file__).parent.parent / "data"
+CACHE_FILE = DATA_DIR / "role_ai_cache.json"
+
+ROLE_FAMILIES = {"product", "tpm_program", "project", "other"}
+MY_ROLE_FAMILIES = {"product", "tpm_program", "project"}
+
+BATCH_SIZE = 25
+MAX_RETRY_ROUNDS = 2
+MIN_CONFIDENCE = 70  # below this the job stays "unknown"
+
+_cache_lock = threading.Lock()
+_cache: Optional[Dict[str, dict]] = None
+
+
+SYSTEM_PROMPT = """You are a job role classifier. Classify each job title into one family:
+- product: Product Manager, Product Owner, Product Lead
+- tpm_program: Technical Program Manager, Program Manager, TPM, Delivery/Release Manager, Scrum Master
+- project: Project Manager, Project Lead, Implementation Manager
+- other: Not a PM/TPM/Project role
+
+Respond ONLY with a JSON array, one object per input item, same "i" as the input:
+[{"i": 0, "role_family": "...", "role_id": "snake_case_role or null", "confidence": 0-100, "reason": "short"}]"""
+
+
+def normalize_title(title: str) -> str:
+    """Cache key: lowercase, strip req ids / punctuation / extra spaces."""
+    t = (title or "").lower()
+    t = re.sub(r"\(.*?\)|\[.*?\]", " ", t)       # (Remote), [R-12345]
+    t = re.sub(r"\b(req|jr|r)[-_ ]?\d+\b", " ", t)
+    t = re.sub(r"[^a-z0-9+&/ ]+", " ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def load_ai_settings() -> dict:
+    """ai section of config/settings.json"""
+    try:
+        with (CONFIG_DIR / "settings.json").open("r", encoding="utf-8") as f:
+            return json.load(f).get("ai", {})
+    except Exception:
+        return {}
+
+
+# ---------- cache ----------
+
+def _load_cache() -> Dict[str, dict]:
+    global _cache
+    if _cache is None:
+        try:
+            _cache = json.loads(CACHE_FILE.read_text(encoding="utf-8")) if CACHE_FILE.exists() else {}
+        except Exception:
+            _cache = {}
+    return _cache
+
+
+def _save_cache():
+    with _cache_lock:
+        data = dict(_load_cache())
+    try:
+        tmp = CACHE_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(CACHE_FILE)
+    except Exception as e:
+        print(f"[RoleAI] Failed to save cache: {e}")
+
+
+def get_cached(title: str) -> Optional[dict]:
+    with _cache_lock:
+        return _load_cache().get(normalize_title(title))
+
+
+# ---------- prompt / parsing ----------
+
+def build_batch_prompt(titles: List[str]) -> str:
+    items = "\n".join(json.dumps({"i": i, "title": t}, ensure_ascii=False) for i, t in enumerate(titles))
+    return f"""Classify these {len(titles)} job titles:
+{items}
+
+JSON array:"""
+
+
+def _validate_item(item: dict) -> Optional[dict]:
+    if not isinstance(item, dict):
+        return None
+    family = str(item.get("role_family", "")).strip().lower()
+    if family not in ROLE_FAMILIES:
+        return None
+    try:
+        confidence = int(float(item.get("confidence", 0)))
+    except (TypeError, ValueError):
+        return None
+    role_id = item.get("role_id")
+    if role_id in ("", "null", "none"):
+        role_id = None
+    return {
+        "role_family": family,
+        "role_id": role_id if isinstance(role_id, str) else None,
+        "confidence": max(0, min(100, confidence)),
+        "reason": str(item.get("reason", ""))[:200],
+    }
+
+
+def parse_batch_response(response: Optional[str], count: int) -> Dict[int, dict]:
+    """Returns {index: validated result}. Missing/invalid items are simply absent."""
+    if not response:
+        return {}
+    start, end = response.find("["), response.rfind("]") + 1
+    if start < 0 or end <= start:
+        return {}
+    try:
+        items = json.loads(response[start:end])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    results: Dict[int, dict] = {}
+    for pos, item in enumerate(items):
+        idx = item.get("i", pos) if isinstance(item, dict) else pos
+        try:
+            idx = int(idx)
+        except (TypeError, ValueError):
+            continue
+        if 0 <= idx < count and idx not in results:
+            valid = _validate_item(item)
+            if valid:
+                results[idx] = valid
+    return results
+
+
+# ---------- backends ----------
+
+def _call_ollama(prompt: str) -> Optional[str]:
+    from utils.ollama_ai import ollama_request
+    return ollama_request(prompt, SYSTEM_PROMPT, temperature=0)
+
+
+def _make_claude_caller():
+    from utils.ai_executor import AIBatchExecutor
+    executor = AIBatchExecutor(max_workers=4, budget_usd=0.5)
+    return lambda prompt: executor.call(f"{SYSTEM_PROMPT}\n\n{prompt}", max_tokens=80 * BATCH_SIZE)
+
+
+def _resolve_backend(backend: str):
+    """Returns (call_fn, max_workers). Ollama serves ~1 request at a time locally."""
+    if backend == "auto":
+        from utils.ollama_ai import is_ollama_available
+        backend = "ollama" if is_ollama_available() else "claude"
+    if backend == "ollama":
+        return _call_ollama, 2
+    return _make_claude_caller(), 4
+
+
+# ---------- public API ----------
+
+def classify_titles_batch(titles: List[str], backend: str = "auto",
+                          batch_size: int = BATCH_SIZE) -> Dict[str, dict]:
+    """
+    Classify many titles with batched prompts.
+    Returns {normalized_title: {role_family, role_id, confidence, reason}}.
+    Titles that still fail after MAX_RETRY_ROUNDS are omitted.
+    """
+    results: Dict[str, dict] = {}
+    pending: Dict[str, str] = {}  # normalized -> original title (first seen)
+    with _cache_lock:
+        cache = _load_cache()
+        for title in titles:
+            key = normalize_title(title)
+            if not key:
+                continue
+            if key in cache:
+                results[key] = cache[key]
+            else:
+                pending.setdefault(key, title)
+
+    if not pending:
+        return results
+
+    call_fn, max_workers = _resolve_backend(backend)
+    print(f"[RoleAI] {len(pending)} new titles ({len(results)} cached), backend={backend}")
+
+    from utils.ai_executor import AIBudgetExceeded
+
+    stop = threading.Event()  # бюджет исчерпан → оставшиеся чанки не отправляем
+
+    def _run_chunk(keys: List[str]) -> Dict[str, dict]:
+        if stop.is_set():
+            return {}
+        prompt = build_batch_prompt([pending[k] for k in keys])
+        try:
+            answer = call_fn(prompt)
+        except AIBudgetExceeded:
+            stop.set()  # сразу в воркере: чанки из очереди уже не стартуют
+            raise
+        parsed = parse_batch_response(answer, len(keys))
+        return {keys[i]: r for i, r in parsed.items()}
+
+    todo = list(pending)
+    try:
+        for round_num in range(MAX_RETRY_ROUNDS + 1):
+            if not todo or stop.is_set():
+                break
+            # Smaller chunks on retry rounds: failures are often one bad item derailing the array
+            size = max(1, batch_size // (2 ** round_num))
+            chunks = [todo[i:i + size] for i in range(0, len(todo), size)]
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = [pool.submit(_run_chunk, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    try:
+                        results.update(future.result())
+                    except AIBudgetExceeded as e:
+                        print(f"[RoleAI] Budget exceeded, stopping batch: {e}")
+                    except Exception as e:
+                        # Сеть/таймаут в одном чанке — его ключи уйдут в следующий раунд
+                        print(f"[RoleAI] Chunk failed: {e}")
+            todo = [k for k in todo if k not in results]
+            if todo and not stop.is_set():
+                print(f"[RoleAI] Round {round_num + 1}: {len(todo)} items failed validation, retrying")
+    finally:
+        # Уже полученные ответы сохраняем всегда — даже если батч прерван
+        now = datetime.now(timezone.utc).isoformat()
+        with _cache_lock:
+            cache = _load_cache()
+            for key in pending:
+                if key in results:
+                    cache[key] = {**results[key], "classified_at": now}
+        _save_cache()
+    return results
+
+
+def apply_ai_role(job: dict, ai: dict) -> bool:
+    """Write AI classification onto a job dict. Returns True if category changed."""
+    family = ai.get("role_family", "other")
+    confidence = ai.get("confidence", 0)
+    if confidence < MIN_CONFIDENCE:
+        return False
+    if family in MY_ROLE_FAMILIES:
+        job["role_family"] = family
+        job["role_category"] = "adjacent"
+        job["role_id"] = ai.get("role_id") or job.get("role_id")
+        job["role_excluded"] = False
+    else:
+        job["role_family"] = "other"
+        job["role_category"] = "excluded"
+        job["role_excluded"] = True
+        job["role_exclude_reason"] = f"AI: {ai.get('reason', '')}"[:200]
+    job["role_confidence"] = confidence
+    job["role_reason"] = f"AI: {ai.get('reason', '')}"[:200]
+    job["role_source"] = "ai"
+    return True
+
+
+def classify_unknown_jobs(jobs: List[dict], backend: str = "auto") -> int:
+    """
+    Ingest hook: reclassify jobs with role_category == "unknown".
+    Cached titles are always applied; new titles go to the LLM only if
+    settings.json ai.enabled is true. Returns number of jobs updated.
+    """
+    unknown = [j for j in jobs if j.get("role_category") == "unknown" and j.get("title")]
+    if not unknown:
+        return 0
+
+    if load_ai_settings().get("enabled"):
+        try:
+            results = classify_titles_batch([j["title"] for j in unknown], backend=backend)
+        except Exception as e:
+            print(f"[RoleAI] Batch classification failed: {e}")
+            results = {}
+    else:
+        with _cache_lock:
+            cache = _load_cache()
+            results = {k: cache[k] for k in (normalize_title(j["title"]) for j in unknown) if k in cache}
+
+    updated = 0
+    for job in unknown:
+        ai = results.get(normalize_title(job["title"]))
+        if ai and apply_ai_role(job, ai):
+            updated += 1
+    if updated:
+        print(f"[RoleAI] Reclassified {updated}/{len(unknown)} unknown jobs")
+    return updated
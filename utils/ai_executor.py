@@ -0,0 +1,321 @@
+"""
+Budget-aware AI batch executor.
+
+Runs many Claude calls concurrently while respecting:
+- bounded concurrency (thread pool)
+- token-bucket limits on requests/min and tokens/min
+- retry with exponential backoff + jitter on 429 / 529 / 5xx
+- hard USD budget per batch (calls that would exceed it are refused)
+
+Usage:
+    executor = AIBatchExecutor(max_workers=4, budget_usd=2.0)
+    results = executor.map(score_job, jobs)   # score_job uses executor.call(prompt)
+    executor.progress()                       # {"done": .., "cost_usd": .., ...}
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+
+from utils.metrics import observe_ai
+
+
+ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
+DEFAULT_MODEL = "claude-sonnet-4-20250514"
+
+# USD per 1M tokens (input, output)
+MODEL_PRICING = {
+    "claude-sonnet-4-20250514": (3.0, 15.0),
+    "claude-3-5-haiku-20241022": (0.8, 4.0),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+}
+
+# Anthropic tier-1 style defaults; override via env for higher tiers
+DEFAULT_MAX_WORKERS = int(os.getenv("AI_MAX_WORKERS", "4"))
+DEFAULT_REQUESTS_PER_MINUTE = int(os.getenv("AI_REQUESTS_PER_MINUTE", "50"))
+DEFAULT_TOKENS_PER_MINUTE = int(os.getenv("AI_TOKENS_PER_MINUTE", "40000"))
+DEFAULT_BUDGET_USD = float(os.getenv("AI_BATCH_BUDGET_USD", "2.0"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 529}
+
+
+class AIBudgetExceeded(Exception):
+    """Raised when a call would push batch cost over the budget."""
+
+
+class AIRetryableError(Exception):
+    """Rate limit / overload response that should be retried."""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"AI API returned {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 chars per token), good enough for budgeting."""
+    return max(1, len(text or "") // 4)
+
+
+def estimate_cost(input_tokens: int, output_tokens: int, model: str = DEFAULT_MODEL) -> float:
+    price_in, price_out = MODEL_PRICING.get(model, MODEL_PRICING[DEFAULT_MODEL])
+    return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+class TokenBucket:
+    """Thread-safe token bucket. capacity tokens, refilled continuously per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(1, per_minute))
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60.0  # tokens per second
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0):
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(min(wait, 5.0))
+
+    def give_back(self, amount: float):
+        """Return unused tokens (when actual usage < reserved estimate)."""
+        if amount <= 0:
+            return
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class AIBatchExecutor:
+    """Concurrent, rate-limited, budget-capped Claude caller for batch jobs."""
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        budget_usd: float = DEFAULT_BUDGET_USD,
+        model: str = DEFAULT_MODEL,
+        max_retries: int = 5,
+        api_key: Optional[str] = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.model = model
+        self.budget_usd = budget_usd
+        self.max_retries = max_retries
+        self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY", "")
+
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+
+        self._lock = threading.Lock()
+        self._reserved_usd = 0.0
+        self.stats = {
+            "total": 0,
+            "done": 0,
+            "ok": 0,
+            "errors": 0,
+            "skipped_budget": 0,
+            "calls": 0,
+            "retries": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cost_usd": 0.0,
+            "budget_usd": budget_usd,
+            "started_at": None,
+            "finished_at": None,
+            "running": False,
+        }
+
+    # ---------- single call ----------
+
+    def _reserve(self, est_cost: float):
+        with self._lock:
+            committed = self.stats["cost_usd"] + self._reserved_usd
+            if committed + est_cost > self.budget_usd:
+                raise AIBudgetExceeded(
+                    f"Budget ${self.budget_usd:.2f} reached (spent ${self.stats['cost_usd']:.4f})"
+                )
+            self._reserved_usd += est_cost
+
+    def _settle(self, est_cost: float, input_tokens: int, output_tokens: int):
+        cost = estimate_cost(input_tokens, output_tokens, self.model)
+        with self._lock:
+            self._reserved_usd = max(0.0, self._reserved_usd - est_cost)
+            self.stats["input_tokens"] += input_tokens
+            self.stats["output_tokens"] += output_tokens
+            self.stats["cost_usd"] = round(self.stats["cost_usd"] + cost, 6)
+
+    def _post(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        resp = requests.post(
+            ANTHROPIC_URL,
+            headers={
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json={
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+            timeout=90,
+        )
+        if resp.status_code in RETRYABLE_STATUS:
+            retry_after = resp.headers.get("retry-after")
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            raise AIRetryableError(resp.status_code, retry_after)
+        resp.raise_for_status()
+        return resp.json()
+
+    def call(self, prompt: str, max_tokens: int = 2000) -> Optional[str]:
+        """
+        Rate-limited, budget-checked Claude call. Same contract as
+        api.prepare_application.call_claude_api: returns text or None.
+        Raises AIBudgetExceeded when the batch budget is spent.
+        """
+        if not self.api_key:
+            print("[AIExecutor] No ANTHROPIC_API_KEY")
+            return None
+
+        est_in = estimate_tokens(prompt)
+        est_cost = estimate_cost(est_in, max_tokens, self.model)
+        self._reserve(est_cost)
+
+        try:
+            for attempt in range(self.max_retries + 1):
+                self.request_bucket.acquire(1)
+                self.token_bucket.acquire(est_in + max_tokens)
+                with self._lock:
+                    self.stats["calls"] += 1
+                started = time.perf_counter()
+                try:
+                    data = self._post(prompt, max_tokens)
+                except AIRetryableError as e:
+                    observe_ai("claude", self.model, time.perf_counter() - started, ok=False)
+                    if attempt >= self.max_retries:
+                        print(f"[AIExecutor] Giving up after {attempt + 1} attempts: {e}")
+                        return None
+                    # Full jitter backoff, but honour retry-after if server sent one
+                    backoff = min(60.0, 2 ** attempt)
+                    delay = e.retry_after if e.retry_after else random.uniform(0, backoff)
+                    with self._lock:
+                        self.stats["retries"] += 1
+                    print(f"[AIExecutor] {e.status}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                except Exception as e:
+                    observe_ai("claude", self.model, time.perf_counter() - started, ok=False)
+                    print(f"[AIExecutor] Exception: {e}")
+                    return None
+
+                usage = data.get("usage", {}) or {}
+                input_tokens = int(usage.get("input_tokens", est_in))
+                output_tokens = int(usage.get("output_tokens", 0))
+                observe_ai("claude", self.model, time.perf_counter() - started,
+                           input_tokens=input_tokens, output_tokens=output_tokens)
+                self._settle(est_cost, input_tokens, output_tokens)
+                est_cost = 0.0
+                # Reservation was est_in + max_tokens; give back what wasn't used
+                self.token_bucket.give_back(est_in + max_tokens - input_tokens - output_tokens)
+                return (data.get("content") or [{}])[0].get("text", "")
+            return None
+        finally:
+            if est_cost:
+                with self._lock:
+                    self._reserved_usd = max(0.0, self._reserved_usd - est_cost)
+
+    # ---------- batch ----------
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        on_result: Optional[Callable[[Any, Any], None]] = None,
+    ) -> List[Any]:
+        """
+        Run fn(item) for every item with bounded concurrency.
+        fn should use self.call() for AI requests. on_result(item, result) is
+        called in the calling thread as items complete (as_completed loop), so
+        it may touch caller state without a lock; if it raises, pending items
+        are cancelled and the error propagates. Items refused by the budget
+        yield None.
+        """
+        items = list(items)
+        with self._lock:
+            self.stats.update({
+                "total": len(items),
+                "running": True,
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "finished_at": None,
+            })
+
+        results: List[Any] = [None] * len(items)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(fn, item): idx for idx, item in enumerate(items)}
+                try:
+                    for future in as_completed(futures):
+                        idx = futures[future]
+                        try:
+                            result = future.result()
+                            ok = result is not None
+                            with self._lock:
+                                self.stats["ok" if ok else "errors"] += 1
+                        except AIBudgetExceeded:
+                            result = None
+                            with self._lock:
+                                self.stats["skipped_budget"] += 1
+                        except Exception as e:
+                            print(f"[AIExecutor] Item {idx} failed: {e}")
+                            result = None
+                            with self._lock:
+                                self.stats["errors"] += 1
+                        results[idx] = result
+                        with self._lock:
+                            self.stats["done"] += 1
+                        if on_result:
+                            on_result(items[idx], result)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        finally:
+            # Иначе running=True навсегда и /pipeline/match-batch отказывает до рестарта
+            with self._lock:
+                self.stats["running"] = False
+                self.stats["finished_at"] = datetime.now(timezone.utc).isoformat()
+        return results
+
+    def progress(self) -> Dict[str, Any]:
+        """Snapshot of batch progress, spend and projected total cost."""
+        with self._lock:
+            snap = dict(self.stats)
+        done = snap["ok"] + snap["errors"]
+        if done and snap["total"]:
+            per_item = snap["cost_usd"] / done
+            snap["estimated_total_usd"] = round(per_item * snap["total"], 4)
+        else:
+            snap["estimated_total_usd"] = None
+        snap["cost_usd"] = round(snap["cost_usd"], 4)
+        return snap
@@ -0,0 +1,222 @@
+"""
+Bounded LRU + TTL cache for job analysis results, write-through to disk.
+
+Replaces the unbounded module-level _analysis_cache dict in main.py:
+- in-memory OrderedDict capped at max_entries (LRU eviction)
+- every entry expires after ttl_seconds
+- write-through to data/analysis_cache/{key}.json, so results survive restarts
+  and a miss in one uvicorn worker is served from another worker's write
+- concurrent requests for the same key are coalesced: one fetch/AI call in
+  flight per key, the other callers await its result
+- counters for /analysis-cache/stats
+
+cache_dir=None → memory only (cheap results that aren't worth a file write).
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+CACHE_DIR = Path(__file__).parent.parent / "data" / "analysis_cache"
+DEFAULT_MAX_ENTRIES = 500
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DISK_PRUNE_EVERY = 50  # writes between disk prunes
+
+
+class AnalysisCache:
+    def __init__(self, cache_dir: Optional[Path] = CACHE_DIR, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (created_at, value)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._writes = 0
+        self.stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "coalesced": 0,
+            "writes": 0,
+        }
+
+    # ---------- disk ----------
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            return entry["created_at"], entry["value"]
+        except Exception:
+            return None
+
+    def _write_disk(self, key: str, created_at: float, value: Any):
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(key).with_suffix(".tmp")
+            tmp.write_text(json.dumps({"created_at": created_at, "value": value}, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self._path(key))
+        except Exception as e:
+            print(f"[AnalysisCache] Disk write failed for {key}: {e}")
+
+    def _delete_disk(self, key: str):
+        if self.cache_dir is None:
+            return
+        try:
+            self._path(key).unlink(missing_ok=True)
+        except Exception:
+            pass
+
+    def prune_disk(self) -> int:
+        """Drop expired files and keep at most 2 x max_entries newest. Returns files removed."""
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return 0
+        now = time.time()
+        files = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        removed = 0
+        for i, path in enumerate(files):
+            if i >= self.max_entries * 2 or now - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    # ---------- sync API ----------
+
+    def _expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if self._expired(entry[0]):
+                    del self._data[key]
+                    self.stats["expirations"] += 1
+                else:
+                    self._data.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+
+        entry = self._read_disk(key)
+        if entry is None or self._expired(entry[0]):
+            if entry is not None:
+                self._delete_disk(key)
+                with self._lock:
+                    self.stats["expirations"] += 1
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            self._put_memory(key, entry)
+        return entry[1]
+
+    def _put_memory(self, key: str, entry: tuple):
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def set(self, key: str, value: Any):
+        entry = (time.time(), value)
+        with self._lock:
+            self._put_memory(key, entry)
+            self.stats["writes"] += 1
+            self._writes += 1
+            prune = self._writes % DISK_PRUNE_EVERY == 0
+        self._write_disk(key, *entry)
+        if prune:
+            self.prune_disk()
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            existed = self._data.pop(key, None) is not None
+        existed = (self.cache_dir is not None and self._path(key).exists()) or existed
+        self._delete_disk(key)
+        return existed
+
+    def clear(self) -> int:
+        with self._lock:
+            keys = set(self._data)
+            self._data.clear()
+        if self.cache_dir is not None and self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                keys.add(path.stem)
+                path.unlink(missing_ok=True)
+        return len(keys)
+
+    def prune_expired(self) -> int:
+        with self._lock:
+            expired = [k for k, (created, _) in self._data.items() if self._expired(created)]
+            for k in expired:
+                del self._data[k]
+            self.stats["expirations"] += len(expired)
+        return len(expired) + self.prune_disk()
+
+    def info(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            size = len(self._data)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        disk_files = (len(list(self.cache_dir.glob("*.json")))
+                      if self.cache_dir is not None and self.cache_dir.exists() else 0)
+        return {
+            "size": size,
+            "disk_entries": disk_files,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "inflight": len(self._inflight),
+            "hit_rate": round((stats["hits"] + stats["disk_hits"]) / lookups, 3) if lookups else None,
+            **stats,
+        }
+
+    # ---------- async API with request coalescing ----------
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             cacheable: Callable[[Any], bool] = lambda v: True) -> Any:
+        """
+        Return cached value, or run compute() once per key even if many
+        requests arrive together; the others await the same result.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            with self._lock:
+                self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+            if cacheable(value):
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
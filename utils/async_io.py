@@ -0,0 +1,107 @@
+"""
+Shared bounded executor for blocking I/O called from async handlers.
+
+Parsers (requests), storage (JSON files) and AI calls are synchronous; calling
+them directly inside `async def` endpoints stalls the event loop, so /health and
+SSE streams freeze for the whole refresh. Every such call goes through here:
+
+- get_io_executor(): one process-wide ThreadPoolExecutor (IO_WORKERS threads,
+  prefix "io") instead of ad-hoc pools per request
+- run_blocking(fn, *args, **kwargs): await fn in the executor
+- gather_blocking(fn, items, limit): fn(item) for many items, at most `limit`
+  in flight, results yielded as they complete
+- iterate_blocking(iterable): drive a sync generator (streaming parsers) from
+  an async generator, one next() per executor hop
+- info() for /health, shutdown() on app shutdown
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, Tuple
+
+IO_WORKERS = int(os.getenv("IO_WORKERS", "16"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stats = {"submitted": 0, "active": 0, "max_active": 0}
+_stats_lock = threading.Lock()
+
+_DONE = object()
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+    return _executor
+
+
+def _tracked(fn: Callable, *args, **kwargs):
+    with _stats_lock:
+        _stats["active"] += 1
+        _stats["max_active"] = max(_stats["max_active"], _stats["active"])
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        with _stats_lock:
+            _stats["active"] -= 1
+
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking call in the shared I/O executor and await its result."""
+    with _stats_lock:
+        _stats["submitted"] += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), functools.partial(_tracked, fn, *args, **kwargs))
+
+
+async def gather_blocking(fn: Callable, items: Iterable, limit: int = 8) -> AsyncIterator[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Yield (item, result, error) for fn(item) over items, in completion order.
+    At most `limit` calls occupy the executor at once, so one big refresh
+    cannot starve other handlers of I/O threads.
+    """
+    sem = asyncio.Semaphore(max(1, limit))
+
+    async def one(item):
+        async with sem:
+            try:
+                return item, await run_blocking(fn, item), None
+            except Exception as e:  # noqa: BLE001 — caller decides per item
+                return item, None, e
+
+    tasks = [asyncio.ensure_future(one(item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+async def iterate_blocking(iterable: Iterable) -> AsyncIterator[Any]:
+    """Async view of a sync iterator: each next() runs in the I/O executor."""
+    it = iter(iterable)
+    while True:
+        item = await run_blocking(next, it, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+
+def info() -> dict:
+    with _stats_lock:
+        return {"workers": IO_WORKERS, "started": _executor is not None, **_stats}
+
+
+def shutdown(wait: bool = False):
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait, cancel_futures=True)
+            _executor = None
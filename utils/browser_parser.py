@@ -580,8 +580,11 @@ def navigate_to_application_form_sync(url: str, max_redirects: int = 3) -> Dict[
         pass
 
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
+        try:
+            loop_running = asyncio.get_running_loop().is_running()
+        except RuntimeError:
+            loop_running = False  # worker thread (asyncio.to_thread) has no loop
+        if loop_running:
             import concurrent.futures
             with concurrent.futures.ThreadPoolExecutor() as pool:
                 future = pool.submit(asyncio.run, navigate_to_application_form(url, max_redirects))
@@ -602,8 +605,11 @@ def parse_job_page_sync(url: str, take_screenshot: bool = False) -> Dict[str, An
         pass
 
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
+        try:
+            loop_running = asyncio.get_running_loop().is_running()
+        except RuntimeError:
+            loop_running = False  # worker thread (asyncio.to_thread) has no loop
+        if loop_running:
             # Create a new thread to run the async function
             import concurrent.futures
             with concurrent.futures.ThreadPoolExecutor() as pool:
@@ -8,6 +8,8 @@ from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from utils.metrics import CACHE_BYTES, CACHE_JOBS, CACHE_SECONDS, timed
+
 CACHE_DIR = Path(__file__).parent.parent / "cache"
 CACHE_DIR.mkdir(exist_ok=True)
 TTL_HOURS = 6
@@ -41,6 +43,7 @@ def is_cache_valid(cache_data: Dict) -> bool:
         return False
 
 
+@timed(CACHE_SECONDS, labels=lambda *a, **kw: {"op": "load"})
 def load_cache(cache_key: str = "all", ignore_ttl: bool = False) -> Optional[Dict]:
     cache_path = get_cache_path(cache_key)
     
@@ -49,7 +52,9 @@ def load_cache(cache_key: str = "all", ignore_ttl: bool = False) -> Optional[Dic
     
     try:
         with cache_path.open("r", encoding="utf-8") as f:
+            CACHE_BYTES.set(os.fstat(f.fileno()).st_size, cache_key=cache_key)
             cache_data = json.load(f)
+        CACHE_JOBS.set(len(cache_data.get("jobs", [])), cache_key=cache_key)
         
         if ignore_ttl or is_cache_valid(cache_data):
             return cache_data
@@ -60,6 +65,7 @@ def load_cache(cache_key: str = "all", ignore_ttl: bool = False) -> Optional[Dic
         return None
 
 
+@timed(CACHE_SECONDS, labels=lambda *a, **kw: {"op": "save"})
 def save_cache(cache_key: str, jobs: List[Dict]) -> bool:
     """Save jobs to cache and compute stats."""
     cache_data = {
@@ -79,6 +85,8 @@ def save_cache(cache_key: str, jobs: List[Dict]) -> bool:
             json.dump(cache_data, f, ensure_ascii=False, indent=2)
             f.flush()
             os.fsync(f.fileno())
+            CACHE_BYTES.set(os.fstat(f.fileno()).st_size, cache_key=cache_key)
+        CACHE_JOBS.set(len(jobs), cache_key=cache_key)
         os.replace(tmp_path, str(cache_path))
         dir_fd = os.open(str(cache_path.parent), os.O_RDONLY)
         os.fsync(dir_fd)
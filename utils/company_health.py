@@ -0,0 +1,265 @@
+"""
+Company health store: per-company fetch state in memory, one writer to disk.
+
+Replaces the two writers of data/company_status.json
+(main._mark_company_status → "profile:company" keys and
+company_storage.update_company_status → company_id keys), which each reloaded
+and rewrote the whole file on every fetch, concurrently, without a lock.
+
+Per company (key = company id, lowercase; falls back to the name):
+- ok / error / checked_at            last fetch result
+- last_ok_at / last_error_at
+- consecutive_errors                 was main._COMPANY_ERRORS, lost on restart
+- latency_ms                         last fetch duration
+- jobs_count, payload_hash, payload_changed_at
+                                     hash of the job list → "board unchanged"
+- ats / url / checks
+
+Writes only mark the store dirty; flush() writes the file atomically
+(tmp + replace) from a background timer (FLUSH_INTERVAL seconds), on app
+shutdown and at interpreter exit. Reads (/companies) never touch the disk.
+
+With shared= (utils/shared_state.SharedState) every write is an atomic
+per-company row update in the shared SQLite DB and reads come from there, so
+several processes see one health view and consecutive_errors counts failures
+from all of them. That costs a BEGIN IMMEDIATE per fetch and a query per
+/companies read, so get_health_store() only uses it with SHARED_STATE=sqlite;
+the default is the in-memory store (prod runs a single process, see
+utils/shared_state.py). company_status.json stays as the exported snapshot
+for tools/.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+STATUS_FILE = Path(__file__).parent.parent / "data" / "company_status.json"
+FLUSH_INTERVAL = float(os.getenv("COMPANY_HEALTH_FLUSH_SECONDS", "30"))
+SHARED_NAMESPACE = "company_health"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def company_key(company_id: str) -> str:
+    return (company_id or "").strip().lower()
+
+
+def payload_hash(jobs: Iterable[dict]) -> str:
+    """Order-independent hash of a job list (by url / id / title)."""
+    keys = sorted(
+        str(j.get("url") or j.get("job_url") or j.get("id") or j.get("title") or "")
+        for j in jobs or []
+    )
+    return hashlib.sha1("\n".join(keys).encode("utf-8")).hexdigest()[:16]
+
+
+class CompanyHealthStore:
+    def __init__(self, path: Path = STATUS_FILE, flush_interval: float = FLUSH_INTERVAL, shared=None):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushes = 0
+        self._data: Dict[str, dict] = self._load()
+        if self.shared is not None:
+            # Первый запуск с общей БД: переносим company_status.json, не затирая свежие записи
+            self.shared.put_many(SHARED_NAMESPACE, self._data, only_missing=True)
+            self._data = {}
+
+    # ---------- disk ----------
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[CompanyHealth] Failed to load {self.path}: {e}")
+            return {}
+        data: Dict[str, dict] = {}
+        for key, entry in raw.items():
+            if not isinstance(entry, dict):
+                continue
+            # Старый формат main.py: "profile:company" → ключ по компании
+            key = company_key(key.split(":", 1)[1] if ":" in key else key)
+            if not key:
+                continue
+            entry = dict(entry)
+            entry.setdefault("checked_at", entry.pop("updated_at", ""))
+            entry["error"] = entry.get("error") or ""
+            current = data.get(key)
+            if current is None or entry.get("checked_at", "") >= current.get("checked_at", ""):
+                data[key] = {**(current or {}), **entry}
+        return data
+
+    def flush(self) -> bool:
+        """Write the file if anything changed since the last flush."""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return False
+                self._dirty = False
+            try:
+                snapshot = json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(f".{os.getpid()}.tmp")  # workers flush concurrently
+                tmp.write_text(snapshot, encoding="utf-8")
+                tmp.replace(self.path)
+                self.flushes += 1
+                return True
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True
+                print(f"[CompanyHealth] Flush failed: {e}")
+                return False
+
+    def start(self):
+        """Background flush every flush_interval seconds (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(self.flush_interval):
+                self.flush()
+
+        self._thread = threading.Thread(target=loop, name="company-health-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    # ---------- writes ----------
+
+    def _apply(self, company_id: str, mutate: Callable[[dict], dict]) -> dict:
+        """Run mutate(entry) under the store lock, or as one transaction in the shared DB."""
+        key = company_key(company_id)
+        if self.shared is not None:
+            entry = self.shared.update(SHARED_NAMESPACE, key,
+                                       lambda e: mutate(e or {"consecutive_errors": 0, "checks": 0}))
+        else:
+            with self._lock:
+                entry = dict(mutate(self._data.setdefault(key, {"consecutive_errors": 0, "checks": 0})))
+        with self._lock:
+            self._dirty = True
+        return entry
+
+    @staticmethod
+    def _touch(entry: dict, ats: str, url: str):
+        if ats:
+            entry["ats"] = ats
+        if url:
+            entry["url"] = url
+        entry["checks"] = entry.get("checks", 0) + 1
+
+    def record_ok(self, company_id: str, ats: str = "", url: str = "", jobs: Optional[list] = None,
+                  jobs_count: Optional[int] = None, latency_ms: Optional[float] = None) -> dict:
+        now = _now()
+        digest = payload_hash(jobs) if jobs is not None else None
+        if jobs is not None and jobs_count is None:
+            jobs_count = len(jobs)
+
+        def mutate(entry: dict) -> dict:
+            self._touch(entry, ats, url)
+            entry.update(ok=True, error="", checked_at=now, last_ok_at=now, consecutive_errors=0)
+            if latency_ms is not None:
+                entry["latency_ms"] = round(latency_ms, 1)
+            if digest is not None and entry.get("payload_hash") != digest:
+                entry["payload_hash"] = digest
+                entry["payload_changed_at"] = now
+            if jobs_count is not None:
+                entry["jobs_count"] = jobs_count
+            return entry
+
+        return self._apply(company_id, mutate)
+
+    def record_error(self, company_id: str, error: str, ats: str = "", url: str = "",
+                     latency_ms: Optional[float] = None) -> int:
+        """Returns the consecutive error count after this failure."""
+        now = _now()
+
+        def mutate(entry: dict) -> dict:
+            self._touch(entry, ats, url)
+            entry.update(ok=False, error=(error or "")[:500], checked_at=now, last_error_at=now)
+            entry["consecutive_errors"] = entry.get("consecutive_errors", 0) + 1
+            if latency_ms is not None:
+                entry["latency_ms"] = round(latency_ms, 1)
+            return entry
+
+        return self._apply(company_id, mutate)["consecutive_errors"]
+
+    def reset_errors(self, company_id: str):
+        if not self.consecutive_errors(company_id):
+            return
+
+        def mutate(entry: dict) -> dict:
+            entry["consecutive_errors"] = 0
+            return entry
+
+        self._apply(company_id, mutate)
+
+    # ---------- reads ----------
+
+    def consecutive_errors(self, company_id: str) -> int:
+        return self.get(company_id).get("consecutive_errors", 0)
+
+    def get(self, *company_ids: str) -> dict:
+        """Health of the first known key (e.g. get(cfg id, company name)); {} if unknown."""
+        for cid in company_ids:
+            if self.shared is not None:
+                entry = self.shared.get(SHARED_NAMESPACE, company_key(cid))
+            else:
+                with self._lock:
+                    entry = self._data.get(company_key(cid))
+            if entry:
+                return dict(entry)
+        return {}
+
+    def snapshot(self) -> Dict[str, dict]:
+        if self.shared is not None:
+            return self.shared.items(SHARED_NAMESPACE)
+        with self._lock:
+            return {k: dict(v) for k, v in self._data.items()}
+
+    def info(self) -> dict:
+        entries = list(self.snapshot().values())
+        with self._lock:
+            dirty = self._dirty
+        return {
+            "companies": len(entries),
+            "ok": sum(1 for e in entries if e.get("ok")),
+            "failing": sum(1 for e in entries if e.get("ok") is False),
+            "dirty": dirty,
+            "flushes": self.flushes,
+            "flush_interval": self.flush_interval,
+            "backend": "shared" if self.shared is not None else "memory",
+        }
+
+
+_store: Optional[CompanyHealthStore] = None
+_store_lock = threading.Lock()
+
+
+def get_health_store() -> CompanyHealthStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            shared = None
+            if os.getenv("SHARED_STATE", "memory").lower() == "sqlite":
+                from utils.shared_state import get_shared_state
+                shared = get_shared_state()
+            _store = CompanyHealthStore(shared=shared)
+            atexit.register(_store.flush)
+        return _store
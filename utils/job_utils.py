@@ -9,6 +9,8 @@ import re
 from pathlib import Path
 from typing import Optional
 
+from utils.metrics import JOB_CLASSIFY_SECONDS, timed
+
 CONFIG_DIR = Path(__file__).parent.parent / "config"
 
 
@@ -91,6 +93,7 @@ def keyword_in_text(keyword: str, text: str) -> bool:
     return keyword in text
 
 
+@timed(JOB_CLASSIFY_SECONDS)
 def classify_role(title: Optional[str], description: Optional[str] = None) -> dict:
     """
     Классифицирует роль на основе title и description.
@@ -0,0 +1,196 @@
+"""
+Token streaming from Anthropic / Ollama + SSE helpers.
+
+Generators yield text chunks as they arrive so endpoints can forward them
+to the UI over Server-Sent Events (same "data: {type: ...}" format as
+/refresh/stream). The assembled completion is kept in a small in-process
+LRU keyed by prompt, so repeating a request replays the cached text
+instantly instead of calling the model again.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+import requests
+
+from utils.metrics import observe_ai
+
+ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_MODEL = "llama3.2:3b"
+
+RESPONSE_CACHE_SIZE = 128
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class LLMStreamError(Exception):
+    """Model backend returned an error before/while streaming."""
+
+
+def _cache_key(*parts) -> str:
+    return hashlib.sha1("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _cache_lock:
+        text = _cache.get(key)
+        if text is not None:
+            _cache.move_to_end(key)
+        return text
+
+
+def _cache_put(key: str, text: str):
+    if not text:
+        return
+    with _cache_lock:
+        _cache[key] = text
+        _cache.move_to_end(key)
+        while len(_cache) > RESPONSE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def claude_stream(prompt: str, max_tokens: int = 1000, model: str = CLAUDE_MODEL,
+                  api_key: Optional[str] = None) -> Iterator[str]:
+    """Yield text deltas from the Anthropic Messages API (stream=true)."""
+    key = _cache_key("claude", model, max_tokens, prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise LLMStreamError("ANTHROPIC_API_KEY not set")
+
+    parts = []
+    usage = {}
+    started, ok = time.perf_counter(), False
+    try:
+        with requests.post(
+            ANTHROPIC_URL,
+            headers={
+                "x-api-key": api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json={
+                "model": model,
+                "max_tokens": max_tokens,
+                "stream": True,
+                "messages": [{"role": "user", "content": prompt}],
+            },
+            stream=True,
+            timeout=(10, 120),
+        ) as resp:
+            if resp.status_code != 200:
+                raise LLMStreamError(f"Claude API error: {resp.status_code}")
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                try:
+                    event = json.loads(line[5:].strip())
+                except json.JSONDecodeError:
+                    continue
+                etype = event.get("type")
+                if etype == "content_block_delta":
+                    text = (event.get("delta") or {}).get("text", "")
+                    if text:
+                        parts.append(text)
+                        yield text
+                elif etype == "message_start":
+                    usage.update((event.get("message") or {}).get("usage") or {})
+                elif etype == "message_delta":
+                    usage.update(event.get("usage") or {})
+                elif etype == "error":
+                    raise LLMStreamError((event.get("error") or {}).get("message", "stream error"))
+                elif etype == "message_stop":
+                    break
+        ok = True
+    except GeneratorExit:
+        ok = True  # клиент SSE отключился — это не ошибка AI
+        raise
+    finally:
+        observe_ai("claude", model, time.perf_counter() - started, ok,
+                   usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+    _cache_put(key, "".join(parts))
+
+
+def ollama_stream(prompt: str, system: Optional[str] = None, temperature: float = 0.1,
+                  model: str = OLLAMA_MODEL) -> Iterator[str]:
+    """Yield text chunks from Ollama /api/generate with stream=true (NDJSON)."""
+    key = _cache_key("ollama", model, temperature, system, prompt)
+    cached = _cache_get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": True,
+        "options": {"temperature": temperature},
+    }
+    if system:
+        payload["system"] = system
+
+    parts = []
+    final = {}
+    started, ok = time.perf_counter(), False
+    try:
+        with requests.post(OLLAMA_URL, json=payload, stream=True, timeout=(5, 120)) as resp:
+            if resp.status_code != 200:
+                raise LLMStreamError(f"Ollama error: {resp.status_code}")
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                try:
+                    chunk = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                text = chunk.get("response", "")
+                if text:
+                    parts.append(text)
+                    yield text
+                if chunk.get("done"):
+                    final = chunk  # prompt_eval_count / eval_count
+                    break
+        ok = True
+    except GeneratorExit:
+        ok = True  # клиент SSE отключился — это не ошибка AI
+        raise
+    finally:
+        observe_ai("ollama", model, time.perf_counter() - started, ok,
+                   final.get("prompt_eval_count", 0), final.get("eval_count", 0))
+    _cache_put(key, "".join(parts))
+
+
+def complete(stream: Iterator[str]) -> str:
+    """Drain a token stream into the full text (non-streaming callers)."""
+    return "".join(stream)
+
+
+def sse(event_type: str, **data) -> str:
+    """One SSE frame in the repo's {"type": ...} format."""
+    return f"data: {json.dumps({'type': event_type, **data}, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events: Iterator[str]):
+    """Wrap an SSE generator. Sync generators run in Starlette's threadpool."""
+    from fastapi.responses import StreamingResponse
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # don't let a proxy buffer tokens
+        },
+    )
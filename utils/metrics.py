@@ -0,0 +1,305 @@
+"""
+Lightweight in-process metrics registry + Prometheus text exposition (/metrics).
+
+No client library: Counter / Gauge / Histogram with labels, guarded by one
+lock per metric. Recording is a dict lookup + a couple of adds (~1 µs);
+text is rendered only when /metrics is scraped. METRICS=0 turns timed() into
+a plain call and inc()/observe() into no-ops.
+
+    from utils.metrics import CACHE_SECONDS, timed
+
+    @timed(CACHE_SECONDS, labels=lambda key, *a, **kw: {"op": "load"})
+    def load_cache(key): ...
+
+    with FETCH_SECONDS.time(ats="greenhouse"):
+        ...
+
+All app metrics are defined at the bottom of this module, so /metrics lists
+them (with HELP/TYPE) even before the code path that feeds them has run.
+Per-process: dev and prod (and any extra process) each report their own numbers
+(scrape each server or sum in the collector).
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+ENABLED = os.getenv("METRICS", "1").lower() not in ("0", "false", "no")
+PREFIX = "jobtracker_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+FAST_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05)
+COUNT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, object] = {}
+
+    def _key(self, labels: dict) -> LabelKey:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def _label_str(self, key: LabelKey, extra: str = "") -> str:
+        parts = [f'{n}="{_escape(v)}"' for n, v in zip(self.labels, key)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"] + self.samples()
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        super().__init__(name + "_total", help, labels)
+
+    def inc(self, amount: float = 1, **labels):
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._label_str(k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), fn: Optional[Callable] = None):
+        super().__init__(name, help, labels)
+        self.fn = fn  # callback gauge: fn() → number, or [(labels dict, number)]
+
+    def set(self, value: float, **labels):
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        if self.fn is not None:
+            try:
+                result = self.fn()
+            except Exception as e:  # noqa: BLE001 — scrape must not fail because of one gauge
+                return [f"# {self.name} callback failed: {_escape(e)}"]
+            pairs = result if isinstance(result, list) else [({}, result)]
+            return [f"{self.name}{self._label_str(self._key(labels))} {_fmt(float(v))}" for labels, v in pairs]
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._label_str(k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        idx = bisect_left(self.buckets, value)  # первый bucket с le >= value
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for le, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le_label = 'le="%s"' % _fmt(le)
+                lines.append(f"{self.name}_bucket{self._label_str(key, le_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing  # module reload / повторное объявление
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = (), fn: Optional[Callable] = None) -> Gauge:
+        return self._register(Gauge(name, help, labels, fn))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+REGISTRY = Registry()
+
+
+def timed(histogram: Histogram, labels: Optional[Callable[..., dict]] = None, errors: Optional[Counter] = None):
+    """
+    Decorator: observe the call duration in `histogram`.
+    labels(*args, **kwargs) → label dict for this call; errors is incremented
+    (same labels) when the call raises.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            call_labels = labels(*args, **kwargs) if labels else {}
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(**call_labels)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started, **call_labels)
+        return wrapper
+    return decorator
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+# ---------- app metrics ----------
+
+FETCH_SECONDS = REGISTRY.histogram(
+    "ats_fetch_seconds", "Company fetch duration incl. normalize/classify (_fetch_for_company)", ["ats"])
+PARSER_FETCH_SECONDS = REGISTRY.histogram(
+    "ats_parser_fetch_seconds", "Raw ATS parser call in the daemon (refresh_company_sync), no normalize", ["ats"])
+FETCH_TOTAL = REGISTRY.counter("ats_fetch", "Company fetches by outcome (ok/error)", ["ats", "outcome"])
+COMPANY_JOBS = REGISTRY.histogram(
+    "company_jobs_parsed", "Jobs parsed per successful company fetch", ["ats"], buckets=COUNT_BUCKETS)
+
+JOB_NORMALIZE_SECONDS = REGISTRY.histogram(
+    "job_normalize_seconds", "normalize_location() time per job", buckets=FAST_BUCKETS)
+JOB_CLASSIFY_SECONDS = REGISTRY.histogram(
+    "job_classify_seconds", "classify_role() time per job", buckets=FAST_BUCKETS)
+
+CACHE_SECONDS = REGISTRY.histogram("cache_seconds", "Job cache load/save duration", ["op"])
+CACHE_BYTES = REGISTRY.gauge("cache_bytes", "Job cache file size after last load/save", ["cache_key"])
+CACHE_JOBS = REGISTRY.gauge("cache_jobs", "Jobs in cache after last load/save", ["cache_key"])
+UPDATE_CACHE_SECONDS = REGISTRY.histogram(
+    "update_cache_for_company_seconds", "Daemon per-company cache merge + pipeline sync")
+
+STORAGE_SECONDS = REGISTRY.histogram("storage_seconds", "Pipeline storage read/write latency", ["file", "op"])
+STORAGE_BYTES = REGISTRY.counter("storage_bytes", "Pipeline storage bytes read/written", ["file", "op"])
+
+JOBS_FILTER_SECONDS = REGISTRY.histogram(
+    "jobs_filter_seconds", "/jobs filter + score + sort time (excluding fetch)", buckets=FAST_BUCKETS + LATENCY_BUCKETS[4:])
+
+AI_CALL_SECONDS = REGISTRY.histogram("ai_call_seconds", "AI backend call latency", ["backend", "model"])
+AI_ERRORS = REGISTRY.counter("ai_errors", "Failed AI calls", ["backend", "model"])
+AI_TOKENS = REGISTRY.counter("ai_tokens", "AI tokens used", ["backend", "model", "direction"])
+AI_COST_USD = REGISTRY.counter("ai_cost_usd", "Estimated AI spend, USD", ["model"])
+
+DAEMON_CYCLE_SECONDS = REGISTRY.histogram(
+    "daemon_cycle_seconds", "Full background refresh cycle duration",
+    buckets=(60, 300, 600, 1200, 1800, 3600, 7200, 14400))
+DAEMON_COMPANIES = REGISTRY.counter("daemon_companies", "Companies refreshed by the daemon", ["outcome"])
+
+
+def observe_ai(backend: str, model: str, seconds: float, ok: bool = True,
+               input_tokens: int = 0, output_tokens: int = 0):
+    """One AI call: latency, errors, tokens and (Claude) estimated cost."""
+    if not ENABLED:
+        return
+    AI_CALL_SECONDS.observe(seconds, backend=backend, model=model)
+    if not ok:
+        AI_ERRORS.inc(backend=backend, model=model)
+    if input_tokens:
+        AI_TOKENS.inc(input_tokens, backend=backend, model=model, direction="input")
+    if output_tokens:
+        AI_TOKENS.inc(output_tokens, backend=backend, model=model, direction="output")
+    if backend == "claude" and (input_tokens or output_tokens):
+        from utils.ai_executor import estimate_cost
+        AI_COST_USD.inc(estimate_cost(input_tokens, output_tokens, model), model=model)
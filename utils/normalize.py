@@ -1,6 +1,8 @@
 import re
 from typing import Optional
 
+from utils.metrics import JOB_NORMALIZE_SECONDS, timed
+
 STATE_MAP = {
     "alabama": "AL",
     "alaska": "AK",
@@ -74,6 +76,7 @@ NON_US_COUNTRIES = {
 }
 
 
+@timed(JOB_NORMALIZE_SECONDS)
 def normalize_location(location: Optional[str]) -> dict:
     raw = location or ""
     if not raw:
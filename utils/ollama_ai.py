@@ -5,8 +5,11 @@ Provides AI-powered classification, parsing fixes, and autonomous problem solvin
 
 import requests
 import json
+import time
 from typing import Optional
 
+from utils.metrics import observe_ai
+
 
 OLLAMA_URL = "http://localhost:11434/api/generate"
 MODEL = "llama3.2:3b"
@@ -14,6 +17,7 @@ MODEL = "llama3.2:3b"
 
 def ollama_request(prompt: str, system: str = None, temperature: float = 0.1) -> Optional[str]:
     """Make a request to Ollama API."""
+    started = time.perf_counter()
     try:
         payload = {
             "model": MODEL,
@@ -28,11 +32,16 @@ def ollama_request(prompt: str, system: str = None, temperature: float = 0.1) ->
         
         resp = requests.post(OLLAMA_URL, json=payload, timeout=60)
         if resp.status_code == 200:
-            return resp.json().get("response", "").strip()
+            data = resp.json()
+            observe_ai("ollama", MODEL, time.perf_counter() - started,
+                       input_tokens=data.get("prompt_eval_count", 0), output_tokens=data.get("eval_count", 0))
+            return data.get("response", "").strip()
         else:
+            observe_ai("ollama", MODEL, time.perf_counter() - started, ok=False)
             print(f"Ollama error: {resp.status_code}")
             return None
     except Exception as e:
+        observe_ai("ollama", MODEL, time.perf_counter() - started, ok=False)
         print(f"Ollama connection error: {e}")
         return None
 
@@ -464,16 +473,12 @@ if __name__ == "__main__":
         print(f"Company name: {fixed}")
 
 
-def generate_company_mission(company: str, job_description: str = "", position: str = "") -> str:
-    """
-    Generate a personalized sentence about why the candidate wants to work at this company.
-    Based on company name, job description, and position.
-    
-    Returns something like:
-    "I'm particularly drawn to Coinbase's mission to increase economic freedom - 
-    a vision I'm eager to contribute to through my fintech experience."
-    """
-    prompt = f"""Generate ONE sentence (30-50 words) explaining why a candidate is excited to work at {company}.
+COMPANY_MISSION_SYSTEM = "You are a career coach helping write compelling cover letters. Be specific and genuine, avoid generic phrases."
+
+
+def company_mission_prompt(company: str, job_description: str = "", position: str = "") -> str:
+    """Prompt for generate_company_mission (shared with the streaming endpoint)."""
+    return f"""Generate ONE sentence (30-50 words) explaining why a candidate is excited to work at {company}.
 
 Company: {company}
 Position: {position}
@@ -492,10 +497,9 @@ Example good outputs:
 
 Generate the sentence:"""
 
-    system = "You are a career coach helping write compelling cover letters. Be specific and genuine, avoid generic phrases."
-    
-    result = ollama_request(prompt, system, temperature=0.7)
-    
+
+def clean_company_mission(result: Optional[str], company: str) -> str:
+    """Post-process model output; fallback sentence if empty."""
     if result:
         # Clean up the result
         result = result.strip().strip('"').strip("'")
@@ -507,3 +511,16 @@ Generate the sentence:"""
     # Fallback
     return f"I'm excited about the opportunity to contribute to {company}'s continued growth and innovation."
 
+
+def generate_company_mission(company: str, job_description: str = "", position: str = "") -> str:
+    """
+    Generate a personalized sentence about why the candidate wants to work at this company.
+    Based on company name, job description, and position.
+    
+    Returns something like:
+    "I'm particularly drawn to Coinbase's mission to increase economic freedom - 
+    a vision I'm eager to contribute to through my fintech experience."
+    """
+    prompt = company_mission_prompt(company, job_description, position)
+    result = ollama_request(prompt, COMPANY_MISSION_SYSTEM, temperature=0.7)
+    return clean_company_mission(result, company)
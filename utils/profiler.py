@@ -0,0 +1,396 @@
+"""
+Opt-in sampling profiler: slow requests, one daemon cycle, one v5 fill run.
+
+One background thread ("profiler-sampler") walks sys._current_frames() every
+PROFILE_INTERVAL_MS and records the Python stack of every busy thread — a
+wall-clock profile, so time spent waiting on the network/Playwright shows up
+too. Idle pool threads (executor workers waiting for work, the event loop in
+select) are skipped. The thread only runs while something needs samples:
+
+- slow requests: SlowRequestProfiler (ASGI middleware) keeps the last
+  PROFILE_BUFFER samples in a ring buffer while the threshold is > 0; a
+  request that took >= slow_ms gets the samples of its time window saved.
+  Samples cover all threads, so concurrent requests share a profile.
+  Streaming responses (text/event-stream) are never saved — they stay
+  open as long as the client listens.
+- on demand: request_profile("daemon" | "fill") — the next daemon cycle
+  (in the leader worker) or the next FormFillerV5.fill run is recorded from
+  start to end into its own counter (no buffer limit).
+
+The threshold and pending requests live in SharedState (namespace "profiler"),
+so /debug/profiles on any worker reaches the worker that does the work.
+
+Output: logs/profiles/<ts>_<kind>_<label>.collapsed in collapsed-stack format
+("thread;file:func;file:func count" per line — flamegraph.pl, speedscope,
+inferno) plus a .json sidecar with metadata. The oldest files beyond
+PROFILE_KEEP are deleted.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(PROJECT_ROOT / "logs" / "profiles")))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))  # 0 = slow-request profiling off
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+PROFILE_BUFFER = int(os.getenv("PROFILE_BUFFER", "100000"))  # samples kept for slow-request windows
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+CONFIG_TTL = 5.0  # seconds between re-reads of the shared threshold
+
+NAMESPACE = "profiler"
+TARGETS = ("daemon", "fill")
+EXCLUDE_PATHS = ("/health", "/metrics", "/static", "/debug/profiles")
+
+# Leaf frames of threads that are just waiting for work
+IDLE_LEAVES = {
+    "threading.py:Condition.wait",
+    "thread.py:_worker",
+    "selectors.py:EpollSelector.select",
+    "selectors.py:KqueueSelector.select",
+    "selectors.py:PollSelector.select",
+    "selectors.py:SelectSelector.select",
+}
+
+_SITE_PACKAGES = re.compile(r".*[/\\](?:site|dist)-packages[/\\]")
+
+
+def _short_path(filename: str) -> str:
+    try:
+        return Path(filename).resolve().relative_to(PROJECT_ROOT).as_posix()
+    except ValueError:
+        pass
+    stripped = _SITE_PACKAGES.sub("", filename)
+    return stripped.replace("\\", "/") if stripped != filename else os.path.basename(filename)
+
+
+def _thread_group(name: str) -> str:
+    # io_3 → io, ThreadPoolExecutor-0_2 → ThreadPoolExecutor, apply-worker-1 → apply-worker
+    return re.sub(r"[-_\d]+$", "", name) or name
+
+
+class Recording:
+    """Samples for one on-demand profile (daemon cycle, fill run)."""
+
+    def __init__(self, kind: str, label: str, thread: Optional[int] = None):
+        self.kind = kind
+        self.label = label
+        self.thread = thread  # only this thread's stacks; None = all threads
+        self.stacks: Counter = Counter()
+        self.started = time.monotonic()
+
+
+class StackSampler:
+    def __init__(self, interval_ms: float = PROFILE_INTERVAL_MS, buffer_size: int = PROFILE_BUFFER):
+        self.interval = interval_ms / 1000
+        self.buffering = False
+        self._buffer: deque = deque(maxlen=buffer_size)  # (monotonic ts, stack line)
+        self._recordings: List[Recording] = []
+        self._labels: Dict[object, str] = {}  # code object → "file:qualname"
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.ticks = 0
+
+    # ---------- demand ----------
+
+    def set_buffering(self, enabled: bool):
+        with self._lock:
+            self.buffering = enabled
+            if not enabled:
+                self._buffer.clear()
+        if enabled:
+            self._ensure_running()
+
+    def add(self, recording: Recording):
+        with self._lock:
+            self._recordings.append(recording)
+        self._ensure_running()
+
+    def remove(self, recording: Recording):
+        with self._lock:
+            if recording in self._recordings:
+                self._recordings.remove(recording)
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+                self._thread.start()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    # ---------- sampling ----------
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                if not (self.buffering or self._recordings):
+                    self._thread = None  # no demand → thread exits, next add() starts a new one
+                    return
+                self._sample(me)
+            time.sleep(self.interval)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{_short_path(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+            self._labels[code] = label
+        return label
+
+    def _sample(self, me: int):
+        """One tick; caller holds self._lock."""
+        self.ticks += 1
+        now = time.monotonic()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            frames = []
+            while frame is not None:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if frames[0] in IDLE_LEAVES:
+                continue
+            frames.append(_thread_group(names.get(ident, str(ident))))
+            line = ";".join(reversed(frames))
+            if self.buffering:
+                self._buffer.append((now, line))
+            for rec in self._recordings:
+                if rec.thread is None or rec.thread == ident:
+                    rec.stacks[line] += 1
+
+    def window(self, start: float, end: float) -> Counter:
+        """Buffered stacks sampled between two time.monotonic() values."""
+        with self._lock:
+            samples = list(self._buffer)
+        return Counter(line for ts, line in samples if start <= ts <= end)
+
+    def oldest(self) -> Optional[float]:
+        with self._lock:
+            return self._buffer[0][0] if self._buffer else None
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "interval_ms": self.interval * 1000,
+                "buffering": self.buffering,
+                "buffered": len(self._buffer),
+                "recordings": [f"{r.kind}:{r.label}" for r in self._recordings],
+                "ticks": self.ticks,
+            }
+
+
+_sampler = StackSampler()
+
+
+def get_sampler() -> StackSampler:
+    return _sampler
+
+
+# ---------- profile files ----------
+
+def save_profile(kind: str, label: str, stacks: Counter, duration_ms: float, **meta) -> dict:
+    """Write <name>.collapsed + <name>.json into PROFILE_DIR; returns the metadata."""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")[:60] or "run"
+    name = f"{now.strftime('%Y%m%dT%H%M%S')}{now.microsecond // 1000:03d}_{kind}_{slug}_{os.getpid()}"
+    info = {
+        "name": name,
+        "kind": kind,
+        "label": label,
+        "created_at": now.isoformat(),
+        "duration_ms": round(duration_ms, 1),
+        "samples": sum(stacks.values()),
+        "stacks": len(stacks),
+        "interval_ms": _sampler.interval * 1000,
+        "pid": os.getpid(),
+        **meta,
+    }
+    (PROFILE_DIR / f"{name}.collapsed").write_text(
+        "".join(f"{line} {count}\n" for line, count in stacks.most_common()), encoding="utf-8")
+    (PROFILE_DIR / f"{name}.json").write_text(json.dumps(info, ensure_ascii=False, indent=2), encoding="utf-8")
+    _prune()
+    print(f"[Profiler] 🔬 {kind} {label}: {info['duration_ms']:.0f}ms, {info['samples']} samples → {name}.collapsed")
+    return info
+
+
+def _prune(keep: int = PROFILE_KEEP):
+    metas = sorted(PROFILE_DIR.glob("*.json"))
+    for old in metas[:max(0, len(metas) - keep)]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".collapsed").unlink(missing_ok=True)
+
+
+def list_profiles(limit: int = 100, kind: Optional[str] = None) -> List[dict]:
+    """Newest first."""
+    result = []
+    for meta_path in sorted(PROFILE_DIR.glob("*.json"), reverse=True):
+        try:
+            info = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        if kind and info.get("kind") != kind:
+            continue
+        info["bytes"] = meta_path.with_suffix(".collapsed").stat().st_size \
+            if meta_path.with_suffix(".collapsed").exists() else 0
+        result.append(info)
+        if len(result) >= limit:
+            break
+    return result
+
+
+def profile_path(name: str) -> Optional[Path]:
+    """Path of a listed profile, None for unknown names (no path traversal)."""
+    if not re.fullmatch(r"[A-Za-z0-9_]+", name or ""):
+        return None
+    path = PROFILE_DIR / f"{name}.collapsed"
+    return path if path.exists() else None
+
+
+# ---------- configuration (shared between workers) ----------
+
+_config = {"slow_ms": PROFILE_SLOW_MS, "checked": 0.0}
+
+
+def slow_ms() -> float:
+    """Current slow-request threshold; re-read from SharedState every CONFIG_TTL seconds."""
+    now = time.monotonic()
+    if now - _config["checked"] >= CONFIG_TTL:
+        _config["checked"] = now
+        from utils.shared_state import get_shared_state
+        try:
+            value = get_shared_state().get(NAMESPACE, "slow_ms")
+        except sqlite3.Error as e:
+            print(f"[Profiler] ⚠️ config read failed: {e}")
+            value = None
+        _config["slow_ms"] = float(value) if value is not None else PROFILE_SLOW_MS
+        if _config["slow_ms"] > 0 or _sampler.buffering:
+            _sampler.set_buffering(_config["slow_ms"] > 0)
+    return _config["slow_ms"]
+
+
+def set_slow_ms(value: float):
+    from utils.shared_state import get_shared_state
+    get_shared_state().put(NAMESPACE, "slow_ms", max(0.0, float(value)))
+    _config["checked"] = 0.0  # this worker applies it right away, others within CONFIG_TTL
+    slow_ms()
+
+
+def request_profile(target: str):
+    """Record the next run of `target` ("daemon" cycle / v5 "fill")."""
+    if target not in TARGETS:
+        raise ValueError(f"Unknown profile target: {target}")
+    from utils.shared_state import get_shared_state
+    get_shared_state().put(NAMESPACE, f"next:{target}", {"requested_at": datetime.now(timezone.utc).isoformat()})
+
+
+def take_request(target: str) -> bool:
+    """Consume a pending request (atomic: exactly one run gets profiled)."""
+    from utils.shared_state import get_shared_state
+    try:
+        return get_shared_state().delete(NAMESPACE, f"next:{target}")
+    except sqlite3.Error as e:
+        print(f"[Profiler] ⚠️ request check failed: {e}")
+        return False
+
+
+def pending() -> Dict[str, dict]:
+    from utils.shared_state import get_shared_state
+    items = get_shared_state().items(NAMESPACE)
+    return {key[5:]: value for key, value in items.items() if key.startswith("next:")}
+
+
+# ---------- on-demand recordings ----------
+
+def begin(kind: str, label: str, thread: Optional[int] = None) -> Recording:
+    recording = Recording(kind, label, thread)
+    _sampler.add(recording)
+    print(f"[Profiler] ⏺️ recording {kind} {label}")
+    return recording
+
+
+def finish(recording: Recording, **meta) -> Optional[dict]:
+    """Stop recording and save it; None if the file could not be written."""
+    _sampler.remove(recording)
+    duration_ms = (time.monotonic() - recording.started) * 1000
+    try:
+        return save_profile(recording.kind, recording.label, recording.stacks, duration_ms, **meta)
+    except OSError as e:
+        print(f"[Profiler] ⚠️ could not save {recording.kind} profile: {e}")
+        return None
+
+
+@contextmanager
+def profiled_if_requested(kind: str, label: str, thread_only: bool = False):
+    """Profile this block if request_profile(kind) is pending; yields the Recording or None."""
+    recording = begin(kind, label, threading.get_ident() if thread_only else None) if take_request(kind) else None
+    try:
+        yield recording
+    finally:
+        if recording is not None:
+            finish(recording)
+
+
+# ---------- slow-request middleware ----------
+
+class SlowRequestProfiler:
+    """ASGI middleware: save the sampled stacks of requests slower than slow_ms()."""
+
+    def __init__(self, app, exclude: tuple = EXCLUDE_PATHS):
+        self.app = app
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or path.startswith(self.exclude):
+            await self.app(scope, receive, send)
+            return
+        threshold = slow_ms()
+        if threshold <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        status = {"code": None, "stream": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                # SSE (/refresh/stream, /apply/jobs/{id}/stream, ...) живёт столько, сколько клиент
+                # слушает — длительность ничего не говорит о медленном коде
+                status["stream"] = any(k.lower() == b"content-type" and v.startswith(b"text/event-stream")
+                                       for k, v in message.get("headers", []))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            ended = time.monotonic()
+            duration_ms = (ended - started) * 1000
+            if duration_ms >= threshold and not status["stream"]:
+                oldest = _sampler.oldest()
+                label = f"{scope.get('method', 'GET')} {path}"
+                from utils.async_io import run_blocking
+                try:
+                    await run_blocking(
+                        save_profile, "request", label, _sampler.window(started, ended), duration_ms,
+                        threshold_ms=threshold, status=status["code"],
+                        query=scope.get("query_string", b"").decode("latin-1"),
+                        truncated=oldest is None or oldest > started,
+                    )
+                except OSError as e:
+                    print(f"[Profiler] ⚠️ could not save request profile: {e}")
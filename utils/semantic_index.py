@@ -0,0 +1,375 @@
+"""
+Local semantic JD <-> CV matching (no per-job LLM calls).
+
+- JD texts from data/jd/*.txt are chunked (~200 words, 40 overlap) and embedded
+  on CPU; vectors live in a memory-mapped float32 matrix data/embeddings/vectors.f32
+  with row metadata in data/embeddings/meta.json.
+- CVs from get_cv_for_role() are embedded once per file (cached by mtime).
+- score_jobs() computes cosine similarity for every indexed JD in one BLAS
+  matmul and reduces chunk scores to a per-job score (max over chunks).
+- New JDs are appended incrementally (parsers.jd_parser.save_jd_text hook).
+  Appends hold an flock on data/embeddings/index.lock and take the row offset
+  from the vectors file size, so several processes can share one index; on
+  load, vectors and meta are reconciled if a crash left them out of step.
+
+Embedding backend:
+- sentence-transformers (all-MiniLM-L6-v2) if installed
+- otherwise a hashing embedder (word uni+bigrams, signed feature hashing),
+  numpy only, deterministic - weaker but still a useful pre-filter.
+"""
+
+import hashlib
+import json
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+JD_DIR = DATA_DIR / "jd"
+INDEX_DIR = DATA_DIR / "embeddings"
+VECTORS_FILE = INDEX_DIR / "vectors.f32"
+META_FILE = INDEX_DIR / "meta.json"
+
+ST_MODEL = "all-MiniLM-L6-v2"
+HASH_DIM = 512
+CHUNK_WORDS = 200
+CHUNK_OVERLAP = 40
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+_STOPWORDS = {
+    "the", "and", "for", "with", "you", "our", "are", "will", "your", "that", "this",
+    "from", "have", "has", "but", "not", "all", "can", "who", "what", "their", "they",
+    "its", "was", "were", "been", "be", "to", "of", "in", "on", "a", "an", "as", "at",
+    "by", "or", "is", "it", "we", "us", "if", "do", "so", "any", "more", "other",
+}
+
+
+# ---------- embedders ----------
+
+class HashingEmbedder:
+    """Signed feature hashing of unigrams+bigrams with sublinear tf, L2-normalized."""
+
+    name = f"hashing-{HASH_DIM}"
+
+    def __init__(self, dim: int = HASH_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        words = [w for w in _TOKEN_RE.findall((text or "").lower()) if w not in _STOPWORDS and len(w) > 1]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts: Dict[int, float] = {}
+            for feat in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feat.encode(), digest_size=8).digest(), "little")
+                idx = h % self.dim
+                sign = 1.0 if (h >> 63) & 1 else -1.0
+                counts[idx] = counts.get(idx, 0.0) + sign
+            for idx, val in counts.items():
+                out[row, idx] = np.sign(val) * (1.0 + np.log(abs(val))) if val else 0.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+class SentenceTransformerEmbedder:
+    name = ST_MODEL
+
+    def __init__(self):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(ST_MODEL, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vecs = self.model.encode(texts, batch_size=32, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vecs, dtype=np.float32)
+
+
+_embedder = None
+
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        try:
+            _embedder = SentenceTransformerEmbedder()
+        except Exception:
+            _embedder = HashingEmbedder()
+        print(f"[Semantic] Embedder: {_embedder.name}")
+    return _embedder
+
+
+def chunk_text(text: str, words: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    tokens = (text or "").split()
+    if not tokens:
+        return []
+    step = max(1, words - overlap)
+    return [" ".join(tokens[i:i + words]) for i in range(0, max(1, len(tokens) - overlap), step)]
+
+
+# ---------- index ----------
+
+@contextmanager
+def _index_file_lock():
+    """Cross-process lock for vectors.f32 + meta.json (no-op where fcntl is unavailable)."""
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(INDEX_DIR / "index.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class SemanticIndex:
+    """
+    Append-only chunk matrix. meta["rows"][i] = doc_id of row i; rows of a doc are contiguous.
+    Re-adding a doc marks old rows stale (filtered at query time, dropped on rebuild).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.embedder = get_embedder()
+        self._meta_stamp = None  # (mtime_ns, size) meta.json после нашего последнего чтения/записи
+        with _index_file_lock():
+            self.meta = self._load_meta()
+        self._matrix = None
+
+    def _empty_meta(self) -> dict:
+        return {"model": self.embedder.name, "dim": self.embedder.dim, "rows": [], "docs": {}}
+
+    @staticmethod
+    def _stamp():
+        try:
+            st = META_FILE.stat()
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _load_meta(self) -> dict:
+        """Read meta.json and reconcile it with vectors.f32. Call under _index_file_lock()."""
+        meta = self._read_meta()
+        self._meta_stamp = self._stamp()
+        return meta
+
+    def _read_meta(self) -> dict:
+        if not META_FILE.exists() or not VECTORS_FILE.exists():
+            VECTORS_FILE.unlink(missing_ok=True)  # векторы без meta бесполезны
+            return self._empty_meta()
+        try:
+            meta = json.loads(META_FILE.read_text(encoding="utf-8"))
+        except Exception:
+            VECTORS_FILE.unlink(missing_ok=True)
+            return self._empty_meta()
+        if meta.get("model") != self.embedder.name or meta.get("dim") != self.embedder.dim:
+            print(f"[Semantic] Index built with {meta.get('model')}, rebuilding for {self.embedder.name}")
+            VECTORS_FILE.unlink(missing_ok=True)
+            return self._empty_meta()
+        return self._reconcile(meta)
+
+    def _file_rows(self) -> int:
+        row_bytes = self.embedder.dim * 4
+        return VECTORS_FILE.stat().st_size // row_bytes if VECTORS_FILE.exists() else 0
+
+    def _reconcile(self, meta: dict) -> dict:
+        """
+        Bring meta and vectors.f32 back in line after a crash between the two writes:
+        extra vector rows are truncated, docs pointing past the end of the file are dropped.
+        """
+        rows, file_rows = len(meta["rows"]), self._file_rows()
+        if file_rows == rows and VECTORS_FILE.stat().st_size == rows * self.embedder.dim * 4:
+            return meta
+        print(f"[Semantic] ⚠️ Index out of sync (meta {rows} rows, vectors {file_rows}), repairing")
+        keep = min(rows, file_rows)
+        with open(VECTORS_FILE, "r+b") as f:
+            f.truncate(keep * self.embedder.dim * 4)
+        meta["rows"] = meta["rows"][:keep]
+        meta["docs"] = {d: r for d, r in meta["docs"].items() if r[1] <= keep}
+        self._write_meta(meta)
+        return meta
+
+    def _write_meta(self, meta: dict):
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = META_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        tmp.replace(META_FILE)
+        self._meta_stamp = self._stamp()
+
+    def _save_meta(self):
+        self._write_meta(self.meta)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Memory-mapped [rows, dim] view; remapped after appends."""
+        if self._matrix is None:
+            n = len(self.meta["rows"])
+            if n == 0:
+                return np.zeros((0, self.meta["dim"]), dtype=np.float32)
+            self._matrix = np.memmap(VECTORS_FILE, dtype=np.float32, mode="r", shape=(n, self.meta["dim"]))
+        return self._matrix
+
+    def has(self, doc_id: str) -> bool:
+        return doc_id in self.meta["docs"]
+
+    def add(self, doc_id: str, text: str) -> int:
+        """Embed and append one document. Returns number of chunks added."""
+        chunks = chunk_text(text)
+        if not chunks:
+            return 0
+        vecs = self.embedder.encode(chunks).astype(np.float32)
+        with self.lock, _index_file_lock():
+            # Другой процесс мог дописать строки: перечитываем meta, если она менялась
+            # не нами или разошлась с файлом; offset — всегда из размера файла
+            if self._stamp() != self._meta_stamp or self._file_rows() != len(self.meta["rows"]):
+                self.meta = self._load_meta()
+            start = self._file_rows()
+            with open(VECTORS_FILE, "ab") as f:
+                f.write(vecs.tobytes())
+            self.meta["rows"].extend([doc_id] * len(chunks))
+            self.meta["docs"][doc_id] = [start, start + len(chunks)]
+            self._matrix = None
+            self._save_meta()
+        return len(chunks)
+
+    def sync_dir(self, jd_dir: Path = JD_DIR) -> int:
+        """Embed every data/jd/*.txt not yet in the index. Returns docs added."""
+        added = 0
+        for path in sorted(jd_dir.glob("*.txt")):
+            if not self.has(path.stem):
+                try:
+                    if self.add(path.stem, path.read_text(encoding="utf-8")):
+                        added += 1
+                except Exception as e:
+                    print(f"[Semantic] Failed to embed {path.name}: {e}")
+        if added:
+            print(f"[Semantic] Indexed {added} new JDs ({len(self.meta['rows'])} chunks total)")
+        return added
+
+    def rebuild(self, jd_dir: Path = JD_DIR) -> int:
+        with self.lock, _index_file_lock():
+            VECTORS_FILE.unlink(missing_ok=True)
+            self.meta = self._empty_meta()
+            self._save_meta()
+            self._matrix = None
+        return self.sync_dir(jd_dir)
+
+    def doc_scores(self, query: np.ndarray, doc_ids: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Cosine similarity of every indexed doc to `query` (1D, normalized):
+        one matmul over all chunk rows, then max over each doc's row range.
+        """
+        mat = self.matrix
+        if mat.shape[0] == 0:
+            return {}
+        sims = mat @ query.astype(np.float32)
+        docs = self.meta["docs"]
+        wanted = doc_ids if doc_ids is not None else list(docs)
+        ranges = [(d, docs[d]) for d in wanted if d in docs]
+        if not ranges:
+            return {}
+        starts = np.array([r[0] for _, r in ranges])
+        # reduceat needs monotonic start offsets; sort, reduce, then map back
+        order = np.argsort(starts)
+        sorted_ranges = [ranges[i] for i in order]
+        bounds = np.array([b for _, (a, e) in sorted_ranges for b in (a, e)])
+        maxes = np.maximum.reduceat(sims, bounds[:-1] if bounds[-1] == len(sims) else bounds)[::2]
+        return {doc_id: float(m) for (doc_id, _), m in zip(sorted_ranges, maxes)}
+
+    def top_k(self, query: np.ndarray, k: int = 20) -> List[tuple]:
+        scores = self.doc_scores(query)
+        if not scores:
+            return []
+        ids = list(scores)
+        vals = np.fromiter(scores.values(), dtype=np.float32, count=len(ids))
+        k = min(k, len(ids))
+        idx = np.argpartition(-vals, k - 1)[:k]
+        idx = idx[np.argsort(-vals[idx])]
+        return [(ids[i], float(vals[i])) for i in idx]
+
+
+_index: Optional[SemanticIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SemanticIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SemanticIndex()
+        return _index
+
+
+# ---------- CV vectors ----------
+
+_cv_cache: Dict[str, tuple] = {}  # cv path -> (mtime, vector)
+
+
+def cv_vector(role_family: str, job_title: str = "") -> Optional[np.ndarray]:
+    """Mean of the CV's chunk embeddings (normalized), cached per CV file."""
+    from api.prepare_application import get_cv_for_role, CANDIDATE_PROFILE
+
+    cv_path, cv_text = get_cv_for_role(role_family, job_title)
+    key = str(cv_path) if cv_path else "static_profile"
+    mtime = cv_path.stat().st_mtime if cv_path else 0
+    cached = _cv_cache.get(key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    text = cv_text if cv_text and len(cv_text) > 500 else CANDIDATE_PROFILE
+    vecs = get_index().embedder.encode(chunk_text(text))
+    if not len(vecs):
+        return None
+    vec = vecs.mean(axis=0)
+    vec /= (np.linalg.norm(vec) or 1.0)
+    _cv_cache[key] = (mtime, vec)
+    return vec
+
+
+def score_jobs(jobs: List[dict], sync: bool = True) -> Dict[str, int]:
+    """
+    Vectorized semantic score (0-100) for every job with an indexed JD.
+    Jobs are grouped by role_family so each CV vector is used in one matmul.
+    Sets job["semantic_score"] in place and returns {job_id: score}.
+    """
+    index = get_index()
+    if sync:
+        index.sync_dir()
+
+    groups: Dict[str, List[dict]] = {}
+    for job in jobs:
+        if job.get("id") and index.has(job["id"]):
+            groups.setdefault(job.get("role_family") or "product", []).append(job)
+
+    result: Dict[str, int] = {}
+    for role_family, group in groups.items():
+        vec = cv_vector(role_family)
+        if vec is None:
+            continue
+        scores = index.doc_scores(vec, [j["id"] for j in group])
+        for job in group:
+            if job["id"] in scores:
+                score = int(round(max(0.0, scores[job["id"]]) * 100))
+                job["semantic_score"] = score
+                result[job["id"]] = score
+    return result
+
+
+def on_jd_stored(job_id: str, text: str):
+    """Hook for parsers.jd_parser.save_jd_text: embed new JD incrementally."""
+    try:
+        index = get_index()
+        if not index.has(job_id):
+            index.add(job_id, text)
+    except Exception as e:
+        print(f"[Semantic] Incremental index failed for {job_id}: {e}")
@@ -0,0 +1,342 @@
+"""
+Shared state between app processes on one machine: daemon lease + kv.
+
+start-dev.sh (:8001) and start-prod.sh (:8000) run from the same checkout and
+both start the refresh daemon against the same data/ and cache/; a --reload
+restart briefly overlaps the old process too. State they must agree on lives
+in one local SQLite database (WAL mode):
+
+- kv:     namespace/key → JSON value (daemon enabled flag + published status,
+          company health)
+- leases: named lease with holder, expiry and a fencing token that grows on
+          every new acquisition
+
+Leader election: each process runs a LeaderElector for lease "daemon"; only
+the holder runs the refresh cycle. A leader that stalled past its lease (laptop
+sleep, long GC) and lost it to another process still has the old token, so its
+fenced writes — put(..., fence=("daemon", token)) — are rejected inside the
+same transaction that would have applied them. File writes (jobs_all.json,
+the pipeline) go through fenced(fence), which holds the DB write lock across
+the check and the write.
+
+The DB is machine-local: default ~/.job_tracker/shared_state_<project hash>.db,
+override with SHARED_STATE_DB. data/ is synced via iCloud and SQLite files must
+not be; cross-machine exclusion stays with data/daemon.lock.
+
+Out of scope: uvicorn --workers N. The warm apply pool (browser/apply_worker.py
+— jobs, SSE streams, v5/v6 logs, CDP sessions to one Chrome), MATCH_BATCH_STATUS,
+the AI executor budget and the SemanticIndex row metadata used for reads stay
+in process memory, and a request routed to another worker would not find them. Each server is one process
+(start-prod.sh ignores WORKERS); company health uses this DB only with
+SHARED_STATE=sqlite.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = (Path.home() / ".job_tracker"
+              / f"shared_state_{hashlib.sha1(str(PROJECT_ROOT).encode()).hexdigest()[:10]}.db")
+DB_PATH = Path(os.getenv("SHARED_STATE_DB", str(DEFAULT_DB)))
+LEASE_TTL = float(os.getenv("LEADER_LEASE_TTL", "30"))
+BUSY_TIMEOUT = 10.0  # seconds to wait for another process's write transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name        TEXT PRIMARY KEY,
+    holder      TEXT,
+    token       INTEGER NOT NULL DEFAULT 0,
+    expires_at  REAL NOT NULL DEFAULT 0,
+    acquired_at REAL,
+    renewed_at  REAL
+);
+"""
+
+Fence = Tuple[str, int]  # (lease name, token)
+
+
+class SharedState:
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    # ---------- connection / transactions ----------
+
+    def _conn(self) -> sqlite3.Connection:
+        # Одно соединение на поток: sqlite3 connections нельзя делить между потоками
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _tx(self):
+        """Write transaction: BEGIN IMMEDIATE takes the DB write lock up front."""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    @staticmethod
+    def _fence_ok(db: sqlite3.Connection, fence: Fence) -> bool:
+        name, token = fence
+        row = db.execute("SELECT token, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+        return bool(row) and row[0] == token and row[1] > time.time()
+
+    # ---------- key/value ----------
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        row = self._conn().execute(
+            "SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        rows = self._conn().execute("SELECT key, value FROM kv WHERE namespace = ?", (namespace,))
+        return {key: json.loads(value) for key, value in rows}
+
+    def put(self, namespace: str, key: str, value: Any, fence: Optional[Fence] = None) -> bool:
+        """Upsert; with fence=(lease, token) only while that token still holds the lease."""
+        with self._tx() as db:
+            if fence and not self._fence_ok(db, fence):
+                return False
+            self._upsert(db, namespace, key, value)
+            return True
+
+    def update(self, namespace: str, key: str, fn: Callable[[Any], Any], default: Any = None) -> Any:
+        """Atomic read-modify-write across processes; returns the new value."""
+        with self._tx() as db:
+            row = db.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            value = fn(json.loads(row[0]) if row else default)
+            self._upsert(db, namespace, key, value)
+            return value
+
+    def put_many(self, namespace: str, values: Dict[str, Any], only_missing: bool = False):
+        verb = "INSERT OR IGNORE" if only_missing else "INSERT OR REPLACE"
+        now = time.time()
+        with self._tx() as db:
+            db.executemany(
+                f"{verb} INTO kv (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)",
+                [(namespace, k, json.dumps(v, ensure_ascii=False), now) for k, v in values.items()],
+            )
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._tx() as db:
+            return db.execute(
+                "DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            ).rowcount > 0
+
+    @staticmethod
+    def _upsert(db: sqlite3.Connection, namespace: str, key: str, value: Any):
+        db.execute(
+            "INSERT INTO kv (namespace, key, value, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (namespace, key, json.dumps(value, ensure_ascii=False), time.time()),
+        )
+
+    # ---------- leases ----------
+
+    def acquire_lease(self, name: str, holder: str, ttl: float = LEASE_TTL) -> Optional[int]:
+        """
+        Take (or extend our own) lease. Returns the fencing token, None if
+        another holder's lease is still live. A new acquisition always gets
+        token + 1, so tokens of previous leaders become stale.
+        """
+        now = time.time()
+        with self._tx() as db:
+            row = db.execute("SELECT holder, token, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row and row[2] > now:
+                if row[0] != holder:
+                    return None
+                db.execute("UPDATE leases SET expires_at = ?, renewed_at = ? WHERE name = ?",
+                           (now + ttl, now, name))
+                return row[1]
+            token = (row[1] if row else 0) + 1
+            db.execute(
+                "INSERT INTO leases (name, holder, token, expires_at, acquired_at, renewed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, "
+                "token = excluded.token, expires_at = excluded.expires_at, "
+                "acquired_at = excluded.acquired_at, renewed_at = excluded.renewed_at",
+                (name, holder, token, now + ttl, now, now),
+            )
+            return token
+
+    def renew_lease(self, name: str, holder: str, token: int, ttl: float = LEASE_TTL) -> bool:
+        now = time.time()
+        with self._tx() as db:
+            return db.execute(
+                "UPDATE leases SET expires_at = ?, renewed_at = ? "
+                "WHERE name = ? AND holder = ? AND token = ? AND expires_at > ?",
+                (now + ttl, now, name, holder, token, now),
+            ).rowcount == 1
+
+    def release_lease(self, name: str, holder: str, token: int) -> bool:
+        """Expire our lease now (token is kept, the next holder gets token + 1)."""
+        with self._tx() as db:
+            return db.execute(
+                "UPDATE leases SET holder = NULL, expires_at = 0 WHERE name = ? AND holder = ? AND token = ?",
+                (name, holder, token),
+            ).rowcount == 1
+
+    def check_fence(self, name: str, token: int) -> bool:
+        return self._fence_ok(self._conn(), (name, token))
+
+    @contextmanager
+    def fenced(self, fence: Fence):
+        """
+        Yield whether fence still holds, keeping the DB write lock until the block exits.
+
+        For writes that can't go through put(fence=...) (files): no other process can
+        acquire or renew the lease while the block runs, so a leader that was fenced
+        out can't write, and the lease can't change hands between check and write.
+        Keep the block short — other processes wait up to BUSY_TIMEOUT for the lock.
+        """
+        with self._tx() as db:
+            yield self._fence_ok(db, fence)
+
+    def lease(self, name: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT holder, token, expires_at, acquired_at, renewed_at FROM leases WHERE name = ?", (name,)
+        ).fetchone()
+        if not row:
+            return None
+        holder, token, expires_at, acquired_at, renewed_at = row
+        return {
+            "holder": holder,
+            "token": token,
+            "live": bool(holder) and expires_at > time.time(),
+            "expires_in": round(max(0.0, expires_at - time.time()), 1),
+            "acquired_at": acquired_at,
+            "renewed_at": renewed_at,
+        }
+
+
+class LeaderElector:
+    """
+    Background thread that keeps trying to hold lease `name` for this process.
+
+    is_leader is also bounded by local time: if renewals stop (process
+    suspended, DB unavailable) we stop acting as leader when our lease may
+    already have expired, without waiting for a failed write to tell us.
+    """
+
+    def __init__(self, name: str, ttl: float = LEASE_TTL, state: Optional[SharedState] = None,
+                 holder: Optional[str] = None):
+        self.name = name
+        self.ttl = ttl
+        self._state = state
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.token: Optional[int] = None
+        self._valid_until = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> SharedState:
+        return self._state or get_shared_state()
+
+    @property
+    def is_leader(self) -> bool:
+        return self.token is not None and time.monotonic() < self._valid_until
+
+    @property
+    def fence(self) -> Optional[Fence]:
+        return (self.name, self.token) if self.is_leader else None
+
+    def tick(self) -> bool:
+        """One acquire/renew attempt; returns is_leader."""
+        started = time.monotonic()
+        was_leader = self.is_leader
+        try:
+            if self.token is not None and self.state.renew_lease(self.name, self.holder, self.token, self.ttl):
+                token = self.token
+            else:
+                token = self.state.acquire_lease(self.name, self.holder, self.ttl)
+            self.last_error = None
+        except sqlite3.Error as e:
+            token = None
+            self.last_error = str(e)
+            print(f"[Leader] ⚠️ {self.name}: lease check failed: {e}")
+        self.token = token
+        # Запас 10%: считаем себя лидером чуть меньше, чем живёт lease в БД
+        self._valid_until = started + self.ttl * 0.9 if token is not None else 0.0
+        if self.is_leader != was_leader:
+            print(f"[Leader] {'👑 acquired' if self.is_leader else '🔻 lost'} {self.name} "
+                  f"(holder={self.holder}, token={token})")
+        return self.is_leader
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while True:
+                self.tick()
+                if self._stop.wait(self.ttl / 3):
+                    return
+
+        self._thread = threading.Thread(target=loop, name=f"leader-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, release: bool = True):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if release and self.token is not None:
+            try:
+                self.state.release_lease(self.name, self.holder, self.token)
+            except sqlite3.Error as e:
+                print(f"[Leader] ⚠️ {self.name}: release failed: {e}")
+        self.token = None
+        self._valid_until = 0.0
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "holder": self.holder,
+            "is_leader": self.is_leader,
+            "token": self.token,
+            "ttl": self.ttl,
+            "last_error": self.last_error,
+        }
+
+
+_state: Optional[SharedState] = None
+_state_lock = threading.Lock()
+
+
+def get_shared_state() -> SharedState:
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = SharedState()
+        return _state